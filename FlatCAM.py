@@ -1,11 +1,6 @@
 import sys
 import os
 
-from PyQt5 import QtWidgets
-from PyQt5.QtCore import QSettings, Qt
-from app_Main import App
-from appGUI import VisPyPatches
-
 from multiprocessing import freeze_support
 # import copyreg
 # import types
@@ -54,6 +49,19 @@ if __name__ == '__main__':
               "Your Python version is: %s.%s" % (MIN_VERSION_MAJOR, MIN_VERSION_MINOR, str(major_v), str(minor_v)))
         sys.exit(0)
 
+    # a script run with --headless=1 runs in the headless engine, without Qt and the GUI
+    from appHeadless import headless_script, run_shellfile
+    headless_job = headless_script(sys.argv[1:])
+    if headless_job is not None:
+        sys.exit(run_shellfile(*headless_job))
+
+    # the worker processes of the job server are spawned with this module as __mp_main__; they must not import the
+    # App and the GUI (appJobWorker)
+    from PyQt5 import QtWidgets
+    from PyQt5.QtCore import QSettings, Qt
+    from app_Main import App
+    from appGUI import VisPyPatches
+
     debug_trace()
     VisPyPatches.apply_patches()
 
@@ -0,0 +1,207 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+from collections import OrderedDict
+import threading
+import hashlib
+
+from shapely.ops import unary_union
+from shapely.geometry.base import BaseGeometry
+
+
+class BufferCache:
+    """
+    Size bounded LRU cache of the buffers and the unions of geometry. The tools buffer the same geometry by the same
+    distances each time they are run again with other parameters; with the cache only the first run makes them.
+
+    The geometry is owned by an object (Gerber, Geometry etc.), when it is its solid_geometry, or it is a Shapely
+    geometry or a list of them. The results made from the geometry of an object are keyed by the id of the object and
+    the version of its geometry (camlib.Geometry.geometry_version), which changes each time the solid_geometry is set
+    or changed by the methods of the object, such that they are not used after the geometry changes. The length and
+    the last item of the solid_geometry list are in the key too, for the lists changed in place by other code.
+    The results made from Shapely geometry are keyed by a digest of its WKB.
+
+    The results are shared by all the users of the cache and they must not be changed.
+    """
+
+    def __init__(self, max_entries=32, max_size=256 * 1024 * 1024):
+        """
+        :param max_entries:     the number of results kept; the least recently used ones are dropped
+        :param max_size:        the total size of the results kept, as the size of their WKB in bytes
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+
+        self.entries = OrderedDict()
+        # the size of each result and their total
+        self.sizes = {}
+        self.size = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def owner_key(owner):
+        if isinstance(owner, (BaseGeometry, list)):
+            digest = hashlib.blake2b(digest_size=20)
+            for geo in BufferCache.flat_geometry(owner):
+                digest.update(geo.wkb)
+            return 'wkb', digest.digest()
+
+        geometry = owner.solid_geometry
+        if isinstance(geometry, list):
+            content = (len(geometry), id(geometry[-1]) if geometry else None)
+        else:
+            content = id(geometry)
+        return id(owner), owner.geometry_version, content
+
+    @staticmethod
+    def result_size(result):
+        """
+        :param result:  a result of the cache: Shapely geometry or a list (tuple) of them
+        :return:        the size of the result, the size of its WKB in bytes
+        """
+        if isinstance(result, (list, tuple)):
+            return sum(BufferCache.result_size(geo) for geo in result)
+        if isinstance(result, BaseGeometry) and not result.is_empty:
+            return len(result.wkb)
+        return 0
+
+    @staticmethod
+    def flat_geometry(owner):
+        """
+        :param owner:   the object that owns the geometry, a Shapely geometry or a list of them
+        :return:        the list of the geometry, without the nested lists
+        """
+        if isinstance(owner, BaseGeometry):
+            return [owner]
+
+        geometry = owner if isinstance(owner, list) else owner.solid_geometry
+        if not isinstance(geometry, list):
+            return [geometry]
+
+        flat = []
+        for geo in geometry:
+            if isinstance(geo, list):
+                flat += BufferCache.flat_geometry(geo)
+            elif geo is not None:
+                flat.append(geo)
+        return flat
+
+    def get(self, owner, operation, function):
+        """
+        :param owner:       the object that owns the geometry, a Shapely geometry or a list of them
+        :param operation:   tuple with the name and the parameters of the operation, part of the key
+        :param function:    function without parameters that makes the result when it is not in the cache
+        :return:            the result of the operation
+        """
+        key = (self.owner_key(owner), operation)
+        result = self.lookup_key(key)
+        if result is None:
+            result = function()
+            self.store_key(key, result)
+        return result
+
+    def lookup(self, owner, operation):
+        """
+        :param owner:       the object that owns the geometry, a Shapely geometry or a list of them
+        :param operation:   tuple with the name and the parameters of the operation
+        :return:            the result of the operation or None if it is not in the cache
+        """
+        return self.lookup_key((self.owner_key(owner), operation))
+
+    def store(self, owner, operation, result):
+        """
+        :param owner:       the object that owns the geometry, a Shapely geometry or a list of them
+        :param operation:   tuple with the name and the parameters of the operation
+        :param result:      the result of the operation
+        :return:            None
+        """
+        self.store_key((self.owner_key(owner), operation), result)
+
+    def lookup_key(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def store_key(self, key, result):
+        result_size = self.result_size(result)
+        with self.lock:
+            # the results made from the previous versions of the geometry of this object are stale
+            if key[0][0] != 'wkb':
+                for stale in [k for k in self.entries if k[0][0] == key[0][0] and k[0][1:] != key[0][1:]]:
+                    self.drop_key(stale)
+
+            if key in self.entries:
+                self.drop_key(key)
+            self.entries[key] = result
+            self.sizes[key] = result_size
+            self.size += result_size
+            while len(self.entries) > self.max_entries or self.size > self.max_size:
+                self.drop_key(next(iter(self.entries)))
+
+    def drop_key(self, key):
+        # the lock is held by the caller
+        del self.entries[key]
+        self.size -= self.sizes.pop(key)
+
+    def union(self, owner):
+        """
+        :param owner:   the object that owns the geometry, a Shapely geometry or a list of them
+        :return:        the union of the geometry
+        """
+        return self.get(owner, ('union', ), lambda: unary_union(self.flat_geometry(owner)))
+
+    def buffer(self, owner, distance, join_style=1, resolution=16):
+        """
+        :param owner:       the object that owns the geometry, a Shapely geometry or a list of them
+        :param distance:    the buffer distance
+        :param join_style:  1 (round), 2 (mitre) or 3 (bevel)
+        :param resolution:  the number of segments of a quarter circle
+        :return:            the buffered geometry; the geometry lists are buffered as their union
+        """
+        def make_buffer():
+            geometry = self.flat_geometry(owner)
+            geometry = geometry[0] if len(geometry) == 1 else self.union(owner)
+            return geometry.buffer(distance, int(resolution), join_style=join_style)
+
+        return self.get(owner, ('buffer', distance, join_style, int(resolution)), make_buffer)
+
+    def invalidate(self, owner):
+        """
+        Drops the results made from the geometry of an object, e.g. when it is deleted.
+
+        :param owner:   the object that owns the geometry
+        :return:        None
+        """
+        with self.lock:
+            for key in [k for k in self.entries if k[0][0] == id(owner)]:
+                self.drop_key(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        :return:    the hits, the misses, the number and the total size of the results in the cache
+        :rtype:     dict
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self.entries),
+                'size': self.size,
+                'hit_rate': self.hits / float(self.hits + self.misses) if self.hits + self.misses else 0.0
+            }
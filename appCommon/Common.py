@@ -15,7 +15,6 @@ from PyQt5 import QtCore
 from shapely.geometry import Polygon, Point, LineString
 from shapely.ops import unary_union
 
-from appGUI.VisPyVisuals import ShapeCollection
 from appTool import AppTool
 
 from copy import deepcopy
@@ -239,6 +238,7 @@ class ExclusionAreas(QtCore.QObject):
         # Storage for shapes, storage that can be used by FlatCAm tools for utility geometry
         # VisPy visuals
         if self.app.is_legacy is False:
+            from appGUI.VisPyVisuals import ShapeCollection
             try:
                 self.exclusion_shapes = ShapeCollection(parent=self.app.plotcanvas.view.scene, layers=1)
             except AttributeError:
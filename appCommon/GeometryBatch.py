@@ -0,0 +1,241 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+import math
+
+import numpy as np
+
+import shapely
+import shapely.affinity as affinity
+from shapely.geometry.base import BaseGeometry
+
+from appCommon.PointArray import PointArray
+
+# Shapely 2 has vectorized functions that work on arrays of geometry
+shapely_vectorized = hasattr(shapely, 'transform')
+
+
+def scale_matrix(xfact, yfact, origin):
+    """
+    :return:    the affine transformation matrix (a, b, d, e, xoff, yoff), as shapely.affinity.affine_transform()
+                takes it, of shapely.affinity.scale() around the origin point
+    """
+    x0, y0 = origin
+    return xfact, 0.0, 0.0, yfact, x0 - x0 * xfact, y0 - y0 * yfact
+
+
+def translate_matrix(xoff, yoff):
+    return 1.0, 0.0, 0.0, 1.0, xoff, yoff
+
+
+def rotate_matrix(angle, origin):
+    """
+    :param angle:   the angle in degrees; positive angles are counter-clockwise
+    :param origin:  the x, y coordinates of the rotation center
+    :return:        the affine transformation matrix of shapely.affinity.rotate()
+    """
+    x0, y0 = origin
+    angle = math.radians(angle)
+    cosp = math.cos(angle)
+    sinp = math.sin(angle)
+    # as shapely.affinity.rotate() does, for the exact multiples of 90 degrees
+    if abs(cosp) < 2.5e-16:
+        cosp = 0.0
+    if abs(sinp) < 2.5e-16:
+        sinp = 0.0
+    return cosp, -sinp, sinp, cosp, x0 - x0 * cosp + y0 * sinp, y0 - x0 * sinp - y0 * cosp
+
+
+def skew_matrix(xs, ys, origin):
+    """
+    :param xs:      the shear angle for the X axis, in degrees
+    :param ys:      the shear angle for the Y axis, in degrees
+    :param origin:  the x, y coordinates of the skew origin
+    :return:        the affine transformation matrix of shapely.affinity.skew()
+    """
+    x0, y0 = origin
+    tanx = math.tan(math.radians(xs))
+    tany = math.tan(math.radians(ys))
+    if abs(tanx) < 2.5e-16:
+        tanx = 0.0
+    if abs(tany) < 2.5e-16:
+        tany = 0.0
+    return 1.0, tanx, tany, 1.0, -y0 * tanx, -x0 * tany
+
+
+class GeometryBatch:
+    """
+    Transforms all the geometry of an object at once. The geometry is gathered from the nested lists, tuples and
+    dictionaries where the object keeps it into one array, the transform is applied to the whole array and the
+    transformed geometry is scattered back in the same places.
+
+    With Shapely 2 each transform is one call of a vectorized Shapely function for each chunk of the array. With
+    Shapely 1.x the transform is applied to each geometry of the array.
+
+    The PointArrays (the drills and the slots of the Excellon objects) are kept as they are for the affine
+    transforms, that are one matrix operation on their coordinates; the other transforms are applied to their items.
+    """
+
+    # the progress is reported after each chunk
+    chunk_size = 5000
+
+    buffer_join_styles = {1: 'round', 2: 'mitre', 3: 'bevel'}
+
+    def __init__(self, progress=None):
+        """
+        :param progress:    function called with the percentage (0 to 99) of the transformed geometry, only when it
+                            changes; it can be None
+        """
+        self.progress = progress
+        self.geoms = []
+        self.arrays = []
+        self.templates = []
+
+    def add(self, obj):
+        """
+        Gathers the geometry of obj.
+
+        :param obj:     geometry or nested lists, tuples and dictionaries with geometry; anything else is kept as it is
+        :return:        the index of obj, for result()
+        :rtype:         int
+        """
+        self.templates.append(self.gather(obj))
+        return len(self.templates) - 1
+
+    def gather(self, obj):
+        if type(obj) is list:
+            return [self.gather(el) for el in obj]
+        if type(obj) is tuple:
+            return tuple(self.gather(el) for el in obj)
+        if type(obj) is dict:
+            return {key: self.gather(val) for key, val in obj.items()}
+        if isinstance(obj, BaseGeometry):
+            self.geoms.append(obj)
+            return GeometrySlot(len(self.geoms) - 1)
+        if isinstance(obj, PointArray):
+            self.arrays.append(obj)
+            return ArraySlot(len(self.arrays) - 1)
+        return obj
+
+    def result(self, index):
+        """
+        :param index:   the index of the object, returned by add()
+        :return:        the object with the transformed geometry, in new lists, tuples and dictionaries
+        """
+        return self.scatter(self.templates[index])
+
+    def copy(self):
+        """
+        :return:    a batch with the same gathered geometry, that is transformed without changing this batch
+        """
+        batch = GeometryBatch(progress=self.progress)
+        batch.chunk_size = self.chunk_size
+        batch.geoms = list(self.geoms)
+        batch.arrays = list(self.arrays)
+        batch.templates = self.templates
+        return batch
+
+    def scatter(self, template):
+        if type(template) is list:
+            return [self.scatter(el) for el in template]
+        if type(template) is tuple:
+            return tuple(self.scatter(el) for el in template)
+        if type(template) is dict:
+            return {key: self.scatter(val) for key, val in template.items()}
+        if type(template) is GeometrySlot:
+            return self.geoms[template.index]
+        if type(template) is ArraySlot:
+            return self.scatter(self.arrays[template.index])
+        return template
+
+    def apply(self, array_function, geometry_function):
+        """
+        Replaces the gathered geometry with the transformed geometry.
+
+        :param array_function:      function that transforms an array of geometry, with Shapely 2; if None
+                                    geometry_function is used with Shapely 2, too
+        :param geometry_function:   function that transforms one geometry, with Shapely 1.x
+        :return:                    None
+        """
+        # the point arrays are replaced with the lists of their items (Points or tuples of Points for the slots), that
+        # are gathered and transformed as the other geometry
+        self.arrays = [self.gather(list(array)) if isinstance(array, PointArray) else array for array in self.arrays]
+        self.apply_geoms(array_function, geometry_function)
+
+    def apply_geoms(self, array_function, geometry_function):
+        total = len(self.geoms)
+        old_disp_number = 0
+        transformed = []
+        for start in range(0, total, self.chunk_size):
+            chunk = self.geoms[start:start + self.chunk_size]
+            if shapely_vectorized and array_function is not None:
+                array = np.empty(len(chunk), dtype=object)
+                array[:] = chunk
+                transformed += array_function(array).tolist()
+            else:
+                transformed += [geometry_function(geo) for geo in chunk]
+
+            disp_number = int(np.interp(len(transformed), [0, total], [0, 99]))
+            if self.progress is not None and old_disp_number < disp_number:
+                self.progress(disp_number)
+                old_disp_number = disp_number
+        self.geoms = transformed
+
+    def map(self, geometry_function):
+        """
+        Transforms each geometry with a function, for the transforms that have no vectorized version.
+
+        :param geometry_function:   function that transforms one geometry
+        :return:                    None
+        """
+        self.apply(None, geometry_function)
+
+    def affine(self, matrix):
+        """
+        :param matrix:  the affine transformation matrix (a, b, d, e, xoff, yoff), like the ones of scale_matrix(),
+                        translate_matrix(), rotate_matrix() and skew_matrix()
+        :return:        None
+        """
+        a, b, d, e, xoff, yoff = matrix
+        linear = np.array([[a, b], [d, e]], dtype=float).T
+        offset = np.array([xoff, yoff], dtype=float)
+
+        self.arrays = [array.affine(matrix) if isinstance(array, PointArray) else array for array in self.arrays]
+        self.apply_geoms(lambda array: shapely.transform(array, lambda coords: coords @ linear + offset),
+                         lambda geo: affinity.affine_transform(geo, matrix))
+
+    def buffer(self, distance, resolution=16, join_style=1):
+        """
+        :param distance:    the buffer distance
+        :param resolution:  the number of segments of a quarter circle
+        :param join_style:  1 (round), 2 (mitre) or 3 (bevel)
+        :return:            None
+        """
+        self.apply(lambda array: shapely.buffer(array, distance, quad_segs=int(resolution),
+                                                join_style=self.buffer_join_styles[int(join_style)]),
+                   lambda geo: geo.buffer(distance, resolution=int(resolution), join_style=join_style))
+
+
+class GeometrySlot:
+    """
+    The place of a geometry in the structure gathered by GeometryBatch.
+    """
+
+    __slots__ = ['index']
+
+    def __init__(self, index):
+        self.index = index
+
+
+class ArraySlot:
+    """
+    The place of a PointArray in the structure gathered by GeometryBatch.
+    """
+
+    __slots__ = ['index']
+
+    def __init__(self, index):
+        self.index = index
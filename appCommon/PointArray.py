@@ -0,0 +1,191 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+import numpy as np
+
+import shapely
+from shapely.geometry import Point, LineString, Polygon
+
+# Shapely 2 makes the Points of an array of coordinates in one call
+shapely_vectorized = hasattr(shapely, 'points')
+
+
+class PointArray:
+    """
+    The drills of an Excellon tool, kept as an (N, 2) array of coordinates. The transforms are one matrix operation
+    on the array.
+
+    It is used as the list of Shapely Points it replaces: iterating and indexing give Points, that are made only then,
+    and Points or (x, y) coordinates can be appended. The ones appended one by one are kept in a list until the array
+    is used.
+    """
+
+    # the number of coordinates of an item
+    width = 2
+
+    def __init__(self, items=None):
+        """
+        :param items:   an array of coordinates, another PointArray or an iterable of items (Points)
+        """
+        self.array = np.empty((0, self.width))
+        self.pending = []
+        if items is not None:
+            self.extend(items)
+
+    @classmethod
+    def of(cls, items):
+        """
+        :param items:   a PointArray or an iterable of items, like the lists of the Excellon objects made before
+        :return:        items as a PointArray, itself if it is one
+        """
+        return items if isinstance(items, cls) else cls(items)
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """
+        :param arrays:  PointArrays or iterables of items, as of() takes them
+        :return:        a new array with the coordinates of all the arrays, in order, stacked once
+        """
+        coords = [cls.of(array).coords for array in arrays]
+        return cls(np.vstack(coords) if coords else None)
+
+    @property
+    def coords(self):
+        """
+        :return:    the (N, width) array of coordinates
+        """
+        if self.pending:
+            self.array = np.vstack([self.array, np.array(self.pending, dtype=float).reshape(-1, self.width)])
+            self.pending = []
+        return self.array
+
+    @staticmethod
+    def row(item):
+        if isinstance(item, Point):
+            return item.x, item.y
+        return tuple(item)
+
+    @staticmethod
+    def items(coords):
+        """
+        :param coords:  an (N, width) array of coordinates
+        :return:        the list of the items made from the coordinates
+        """
+        if shapely_vectorized:
+            return shapely.points(coords).tolist()
+        return [Point(x, y) for x, y in coords.tolist()]
+
+    def coords_of(self, items):
+        if isinstance(items, PointArray):
+            return items.coords
+        if isinstance(items, np.ndarray):
+            return items.reshape(-1, self.width)
+        return np.array([self.row(item) for item in items], dtype=float).reshape(-1, self.width)
+
+    def append(self, item):
+        self.pending.append(self.row(item))
+
+    def extend(self, items):
+        coords = self.coords_of(items)
+        if len(coords):
+            self.array = np.vstack([self.coords, coords])
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __add__(self, items):
+        result = type(self)(self.coords)
+        result.extend(items)
+        return result
+
+    def __len__(self):
+        return len(self.array) + len(self.pending)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return iter(self.items(self.coords))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self)(self.coords[index])
+        return self.items(self.coords[[index]])[0]
+
+    def __contains__(self, item):
+        return bool(np.any(np.all(self.coords == np.array(self.row(item), dtype=float), axis=1)))
+
+    def __repr__(self):
+        return '%s(%d)' % (type(self).__name__, len(self))
+
+    def affine(self, matrix):
+        """
+        :param matrix:  the affine transformation matrix (a, b, d, e, xoff, yoff), as the ones made by the functions
+                        of appCommon.GeometryBatch
+        :return:        a new array with the transformed coordinates
+        """
+        a, b, d, e, xoff, yoff = matrix
+        linear = np.array([[a, b], [d, e]], dtype=float).T
+        offset = np.array([xoff, yoff], dtype=float)
+
+        # the start and the stop points of the slots are transformed the same way
+        coords = self.coords.reshape(-1, 2) @ linear + offset
+        return type(self)(coords.reshape(-1, self.width))
+
+    def buffer(self, distance, resolution=16):
+        """
+        :param distance:    the radius of the circles
+        :param resolution:  the number of segments of a quarter circle
+        :return:            the list of the circles around the points, as Point.buffer() makes them; the circle is made
+                            once and translated to each point
+        """
+        circle = Point(0, 0).buffer(distance, int(resolution))
+        if circle.is_empty:
+            return [Polygon() for __ in range(len(self))]
+
+        rings = np.array(circle.exterior.coords)[np.newaxis, :, :] + self.coords[:, np.newaxis, :]
+        if shapely_vectorized:
+            return shapely.polygons(rings).tolist()
+        return [Polygon(ring) for ring in rings]
+
+    def to_list(self):
+        """
+        :return:    the coordinates as lists of floats, for the project files
+        """
+        return self.coords.tolist()
+
+
+class SlotArray(PointArray):
+    """
+    The slots of an Excellon tool, kept as an (N, 4) array with the coordinates of the start and of the stop points.
+    It is used as the list of (start Point, stop Point) tuples it replaces.
+    """
+
+    width = 4
+
+    @staticmethod
+    def row(item):
+        if len(item) == 2:
+            start, stop = item
+            return start.x, start.y, stop.x, stop.y
+        return tuple(item)
+
+    @staticmethod
+    def items(coords):
+        points = PointArray.items(coords.reshape(-1, 2))
+        return list(zip(points[0::2], points[1::2]))
+
+    def buffer(self, distance, resolution=16):
+        """
+        :param distance:    the buffer distance, the radius of the tool
+        :param resolution:  the number of segments of a quarter circle
+        :return:            the list of the buffers of the lines from the start to the stop points
+        """
+        lines = self.coords.reshape(-1, 2, 2)
+        if shapely_vectorized:
+            return shapely.buffer(shapely.linestrings(lines), distance, quad_segs=int(resolution)).tolist()
+        return [LineString(line).buffer(distance, int(resolution)) for line in lines]
@@ -0,0 +1,420 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+import io
+import os
+import struct
+import zipfile
+import zlib
+import lzma
+from concurrent.futures import Future
+
+import numpy as np
+import simplejson as json
+
+from shapely.geometry import LinearRing
+from shapely.geometry.base import BaseGeometry
+from shapely import wkb as shply_wkb
+from shapely import wkt as shply_wkt
+
+from camlib import to_dict, dict2obj
+from appCommon.PointArray import PointArray, SlotArray
+
+# optional, faster, compressors
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+def _compressors():
+    """
+    :return:    Dictionary with the available blob compressors; each is a tuple of a function (data, level) -> bytes
+                and a function (bytes) -> data
+    """
+    compressors = {
+        'none': (lambda data, level: data, lambda data: data),
+        'zlib': (lambda data, level: zlib.compress(data, min(max(int(level), 0), 9)), zlib.decompress),
+        'lzma': (lambda data, level: lzma.compress(data, preset=min(max(int(level), 0), 9)), lzma.decompress),
+    }
+    if lz4_frame is not None:
+        compressors['lz4'] = (lambda data, level: lz4_frame.compress(data, compression_level=int(level)),
+                              lz4_frame.decompress)
+    if zstandard is not None:
+        compressors['zstd'] = (lambda data, level: zstandard.ZstdCompressor(level=max(int(level), 1)).compress(data),
+                               lambda data: zstandard.ZstdDecompressor().decompress(data))
+    return compressors
+
+
+class ProjectArchive:
+    """
+    FlatCAM project container: a ZIP archive with a JSON manifest (the project options and, for each object, the
+    serialized attributes) and a binary blob for each object with its geometry (WKB) and NumPy arrays.
+    Each blob is compressed on its own so the objects can be decoded in parallel and only when they are needed.
+
+    The geometry and the arrays in the attributes are replaced in the manifest by references to the parts of the
+    object blob:
+
+        {"__class__": "WKB" | "WKT" | "NDArray", "__inst__": part index}
+
+    The coordinate arrays of the Excellon drills and slots are NDArray parts with the name of their class in
+    "__array__".
+
+    A journal of the saved blobs makes the next save (the autosave) compress only the objects that changed. The
+    snapshot entries keep the fingerprint of their blob so an entry that is saved again is not even encoded.
+
+    The blob has a little-endian uint32 with the number of parts, the uint64 offsets of the parts ends and then the
+    parts.
+    """
+
+    format_name = "FlatCAM Project Archive"
+    format_version = 1
+    manifest_name = 'manifest.json'
+
+    compressors = _compressors()
+    # the preferred compressor is the first available
+    compression_order = ['zstd', 'lz4', 'zlib']
+
+    # the coordinate arrays of the Excellon drills and slots, by class name
+    point_arrays = {'PointArray': PointArray, 'SlotArray': SlotArray}
+
+    def __init__(self, filename):
+        """
+        Opens a project archive and reads its manifest. The object blobs are read by load_object().
+
+        :param filename:    Path to the project archive
+        :type filename:     str
+        """
+        self.filename = filename
+
+        with zipfile.ZipFile(filename, 'r') as archive:
+            self.manifest = json.loads(archive.read(self.manifest_name).decode('utf-8'), object_hook=dict2obj)
+
+        if self.manifest.get('format') != self.format_name:
+            raise ValueError("Not a FlatCAM project archive: %s" % filename)
+        if int(self.manifest.get('format_version', 0)) > self.format_version:
+            raise ValueError("The project archive %s was saved in a newer format version: %s" %
+                             (filename, str(self.manifest['format_version'])))
+
+    @property
+    def options(self):
+        return self.manifest['options']
+
+    @property
+    def objects(self):
+        """
+        :return:    List of dictionaries with the 'kind' and the 'name' of each object of the project, in order
+        """
+        return self.manifest['objs']
+
+    @staticmethod
+    def is_archive(filename):
+        """
+        :param filename:    Path to a project file
+        :return:            True if the file is a project archive and not a JSON (plain or LZMA compressed) project
+        """
+        try:
+            return zipfile.is_zipfile(filename)
+        except OSError:
+            return False
+
+    @classmethod
+    def default_compression(cls):
+        for name in cls.compression_order:
+            if name in cls.compressors:
+                return name
+        return 'none'
+
+    def load_object(self, index):
+        """
+        Reads and decodes the blob of an object. It can run in a worker thread, each call opens the archive.
+
+        :param index:   index of the object in the project
+        :type index:    int
+        :return:        Dictionary with the serialized attributes of the object, as to_dict() of the object makes it
+        :rtype:         dict
+        """
+        entry = self.objects[index]
+        with zipfile.ZipFile(self.filename, 'r') as archive:
+            blob = archive.read(entry['blob'])
+
+        if zlib.crc32(blob) != entry['crc']:
+            raise ValueError("The blob of the object %s is corrupted" % entry['name'])
+
+        parts = self.unpack_parts(self.compressors[entry['compression']][1](blob))
+        return self.resolve(entry['data'], parts)
+
+    def verify(self):
+        """
+        Checks that the blobs of all the objects are in the archive and that they are not corrupted.
+
+        :return:    True if the project archive is good
+        :rtype:     bool
+        """
+        with zipfile.ZipFile(self.filename, 'r') as archive:
+            names = set(archive.namelist())
+            for entry in self.objects:
+                if entry['blob'] not in names or zlib.crc32(archive.read(entry['blob'])) != entry['crc']:
+                    return False
+        return True
+
+    def load_objects(self, executor=None):
+        """
+        :param executor:    concurrent.futures executor where the objects are decoded; if None they are decoded now
+        :return:            List with a future for each object (or the decoded object dictionaries if the executor
+                            is None)
+        """
+        if executor is None:
+            return [self.load_object(idx) for idx in range(len(self.objects))]
+        return [executor.submit(self.load_object, idx) for idx in range(len(self.objects))]
+
+    @classmethod
+    def read(cls, filename, executor=None):
+        """
+        Reads a project file: a Project archive (only its manifest) or a JSON project, plain or LZMA compressed.
+
+        :param filename:    Path to the project file
+        :param executor:    concurrent.futures executor where the objects of a Project archive are decoded; if None
+                            each one is decoded when it is asked for
+        :return:            The project options and a list of (kind, name, function that returns the serialized
+                            attributes) for each object of the project, in order
+        """
+        if cls.is_archive(filename):
+            archive = cls(filename)
+            if executor is not None:
+                data = [future.result for future in archive.load_objects(executor)]
+            else:
+                data = [lambda idx=idx: archive.load_object(idx) for idx in range(len(archive.objects))]
+            objs = [(entry['kind'], entry['name'], load) for entry, load in zip(archive.objects, data)]
+            return archive.options, objs
+
+        try:
+            with open(filename, 'r') as f:
+                d = json.load(f, object_hook=dict2obj)
+        except ValueError:
+            # an LZMA compressed JSON project
+            with lzma.open(filename) as f:
+                d = json.loads(f.read().decode('utf-8'), object_hook=dict2obj)
+        return d['options'], [(obj['kind'], obj['options']['name'], lambda obj=obj: obj) for obj in d['objs']]
+
+    @staticmethod
+    def cancel(objs):
+        """
+        Cancels the decoding of the objects of a Project archive read with an executor that did not start yet, e.g.
+        when the loading of the project is aborted. concurrent.futures executors cancel them on shutdown only from
+        Python 3.9 (cancel_futures).
+
+        :param objs:    The list of objects returned by read()
+        :return:        None
+        """
+        for __, __, load in objs:
+            future = getattr(load, '__self__', None)
+            if isinstance(future, Future):
+                future.cancel()
+
+    @classmethod
+    def snapshot(cls, objs):
+        """
+        Takes a copy of the serialized attributes of the objects that can be saved later, in another thread, while
+        the objects change. The containers are copied; the Shapely geometry is immutable so it is only referenced
+        and the arrays are copied.
+
+        :param objs:    List of dictionaries, each with the serialized attributes of an object (to_dict())
+        :type objs:     list
+        :return:        List of dictionaries with the 'kind', 'name', 'data' (the attributes with references to the
+                        parts of the blob), 'parts' (the geometry and the arrays) and 'fingerprint' (of the encoded
+                        parts, set by save()) of each object
+        :rtype:         list
+        """
+        snapshot = []
+        for obj in objs:
+            parts = []
+            data = cls.extract(obj, parts)
+            snapshot.append({
+                "kind":         obj['kind'],
+                "name":         obj['options']['name'],
+                "data":         data,
+                "parts":        parts,
+                "fingerprint":  None
+            })
+        return snapshot
+
+    @staticmethod
+    def fingerprint(encoded_parts):
+        """
+        :param encoded_parts:   the encoded geometry and arrays of an object, made by encode_part()
+        :return:                a key that is the same only for the same content of the parts
+        """
+        return tuple((len(part), zlib.crc32(part)) for part in encoded_parts)
+
+    @classmethod
+    def save(cls, filename, objs, options, version, compression=None, level=3, journal=None):
+        """
+        Saves the project in a project archive. The archive is written to a temporary file which then replaces
+        the old one.
+
+        :param filename:        Path to the project archive
+        :type filename:         str
+        :param objs:            Snapshot of the objects, made by ProjectArchive.snapshot()
+        :type objs:             list
+        :param options:         Project options
+        :type options:          dict
+        :param version:         Application version
+        :param compression:     Name of the compressor of the blobs, one of ProjectArchive.compressors. If None the
+                                first available of ProjectArchive.compression_order is used
+        :type compression:      str
+        :param level:           Compression level
+        :type level:            int
+        :param journal:         Dictionary with the blobs of the last save, by fingerprint. The objects with the same
+                                parts are not compressed again and their blobs are copied; the ones of a snapshot
+                                entry that was already saved are not encoded either. It is updated with the blobs of
+                                this save
+        :type journal:          dict
+        :return:                the number of the objects that were compressed and the number of the copied ones
+        :rtype:                 tuple
+        """
+        if compression is None:
+            compression = cls.default_compression()
+        compress = cls.compressors[compression][0]
+        if journal is None:
+            journal = {}
+
+        manifest = {
+            "format":           cls.format_name,
+            "format_version":   cls.format_version,
+            "version":          version,
+            "options":          options,
+            "objs":             []
+        }
+
+        saved = {}
+        encoded_nr = 0
+        tmp_filename = filename + '.tmp'
+        try:
+            with zipfile.ZipFile(tmp_filename, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for idx, obj in enumerate(objs):
+                    # an entry saved before keeps the fingerprint of its parts; the others are encoded and only the
+                    # compression of the unchanged ones is skipped
+                    key = (compression, obj.get('fingerprint'))
+                    if key not in saved and key not in journal:
+                        encoded_parts = [cls.encode_part(part) for part in obj['parts']]
+                        obj['fingerprint'] = cls.fingerprint(encoded_parts)
+                        key = (compression, obj['fingerprint'])
+                    if key in saved:
+                        blob = saved[key]
+                    elif key in journal:
+                        blob = journal[key]
+                    else:
+                        blob = compress(cls.pack_parts(encoded_parts), level)
+                        encoded_nr += 1
+                    saved[key] = blob
+
+                    blob_name = 'objs/%d.bin' % idx
+                    archive.writestr(blob_name, blob)
+
+                    manifest['objs'].append({
+                        "kind":         obj['kind'],
+                        "name":         obj['name'],
+                        "blob":         blob_name,
+                        "compression":  compression,
+                        "crc":          zlib.crc32(blob),
+                        "data":         obj['data']
+                    })
+
+                archive.writestr(cls.manifest_name, json.dumps(manifest, default=to_dict, indent=2).encode('utf-8'))
+
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            # no partial archive is left behind, whatever stopped the save; the old project file is untouched
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+            raise
+
+        journal.clear()
+        journal.update(saved)
+        return encoded_nr, len(objs) - encoded_nr
+
+    @classmethod
+    def extract(cls, data, parts):
+        """
+        Copies the serialized attributes replacing the geometry and the arrays with references to the parts.
+
+        :param data:    the serialized attributes or one of their values
+        :param parts:   list of the parts of the object blob (geometry and arrays), where the new parts are added
+        :return:        the attributes (or the value) with the references
+        """
+        if isinstance(data, dict):
+            return {key: cls.extract(val, parts) for key, val in data.items()}
+        if isinstance(data, (list, tuple)):
+            return [cls.extract(val, parts) for val in data]
+
+        if isinstance(data, BaseGeometry):
+            parts.append(data)
+            # WKB has no empty points or polygons and no linear rings so those are kept as text
+            part_class = "WKT" if data.is_empty or isinstance(data, LinearRing) else "WKB"
+            return {"__class__": part_class, "__inst__": len(parts) - 1}
+
+        if isinstance(data, np.ndarray) and data.dtype != object:
+            parts.append(data.copy())
+            return {"__class__": "NDArray", "__inst__": len(parts) - 1}
+
+        if isinstance(data, PointArray):
+            # the drills and the slots are saved as the arrays of their coordinates
+            parts.append(data.coords.copy())
+            return {"__class__": "NDArray", "__inst__": len(parts) - 1, "__array__": type(data).__name__}
+
+        return data
+
+    @staticmethod
+    def encode_part(part):
+        if isinstance(part, np.ndarray):
+            buffer = io.BytesIO()
+            np.save(buffer, part, allow_pickle=False)
+            return buffer.getvalue()
+        if part.is_empty or isinstance(part, LinearRing):
+            return shply_wkt.dumps(part).encode('utf-8')
+        return shply_wkb.dumps(part)
+
+    @classmethod
+    def resolve(cls, data, parts):
+        """
+        Reverse of extract(): replaces the references with the geometry and the arrays of the parts.
+        """
+        if isinstance(data, dict):
+            part_class = data.get('__class__')
+            if part_class == "WKB":
+                return shply_wkb.loads(parts[data['__inst__']])
+            if part_class == "WKT":
+                return shply_wkt.loads(parts[data['__inst__']].decode('utf-8'))
+            if part_class == "NDArray":
+                array = np.load(io.BytesIO(parts[data['__inst__']]), allow_pickle=False)
+                if data.get('__array__') in cls.point_arrays:
+                    return cls.point_arrays[data['__array__']](array)
+                return array
+            return {key: cls.resolve(val, parts) for key, val in data.items()}
+        if isinstance(data, list):
+            return [cls.resolve(val, parts) for val in data]
+        return data
+
+    @staticmethod
+    def pack_parts(parts):
+        ends = np.cumsum([len(part) for part in parts], dtype='<u8')
+        return struct.pack('<I', len(parts)) + ends.tobytes() + b''.join(parts)
+
+    @staticmethod
+    def unpack_parts(blob):
+        count = struct.unpack_from('<I', blob)[0]
+        ends = np.frombuffer(blob, dtype='<u8', count=count, offset=4).tolist()
+        start = 4 + 8 * count
+        data = memoryview(blob)[start:]
+        return [bytes(data[begin:end]) for begin, end in zip([0] + ends[:-1], ends)]
@@ -0,0 +1,62 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+from appCommon.GeometryBatch import GeometryBatch, translate_matrix
+
+
+class StepRepeat:
+    """
+    A step and repeat panel: the copies of one source placed on a grid of columns and rows, described by the number of
+    copies and the steps between them. instances() makes the geometry of the copies one at a time, as they are
+    iterated, by translating the source geometry gathered once. The panel objects made from it hold the geometry of
+    all the copies; while it is not changed they plot the source once, at the offsets of the copies.
+    """
+
+    def __init__(self, columns, rows, step_x, step_y):
+        """
+        :param columns:     number of copies on the X axis
+        :param rows:        number of copies on the Y axis
+        :param step_x:      the distance between the columns, the width of the source plus the spacing
+        :param step_y:      the distance between the rows, the height of the source plus the spacing
+        """
+        self.columns = int(columns)
+        self.rows = int(rows)
+        self.step_x = step_x
+        self.step_y = step_y
+
+    def __len__(self):
+        return self.columns * self.rows
+
+    @property
+    def offsets(self):
+        """
+        :return:    the (x, y) offsets of the copies, row by row starting with the source one at (0, 0)
+        """
+        return [(col * self.step_x, row * self.step_y) for row in range(self.rows) for col in range(self.columns)]
+
+    def instances(self, source):
+        """
+        Generator of the copies of the source.
+
+        :param source:  geometry or nested lists, tuples and dictionaries with geometry, as GeometryBatch.add() takes
+        :return:        yields the source with the geometry translated to each offset, in new lists and dictionaries
+        """
+        batch = GeometryBatch()
+        idx = batch.add(source)
+        for xoff, yoff in self.offsets:
+            cell = batch.copy()
+            if xoff or yoff:
+                cell.affine(translate_matrix(xoff, yoff))
+            yield cell.result(idx)
+
+    def gerber_block(self, gerber_code, factor=1):
+        """
+        :param gerber_code:     the Gerber code of the source
+        :param factor:          the units conversion factor of the exported coordinates
+        :return:                the Gerber code in a step and repeat block (%SR), which repeats it for each copy
+        """
+        return '%%SRX%dY%dI%.6fJ%.6f*%%\n%s%%SR*%%\n' % (self.columns, self.rows, self.step_x * factor,
+                                                       self.step_y * factor, gerber_code)
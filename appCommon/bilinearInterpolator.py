@@ -1,11 +1,10 @@
 # import csv
-import math
 import numpy as np
 
 
 class bilinearInterpolator:
     """
-    This class takes a collection of 3-dimensional points from a .csv file.  
+    This class takes a collection of 3-dimensional points from a .csv file (or an array of points).
     It contains a bilinear interpolator to find unknown points within the grid.
     """
     @property
@@ -17,35 +16,30 @@ class bilinearInterpolator:
     This is done to get around any floating point errors that may exist in the data
     """
     def __init__(self, pointsFile):
-        
-        self.pointsFile = pointsFile
-        self.points = np.loadtxt(self.pointsFile, delimiter=',')
+
+        if isinstance(pointsFile, str):
+            self.pointsFile = pointsFile
+            self.points = np.loadtxt(self.pointsFile, delimiter=',')
+        else:
+            self.pointsFile = None
+            self.points = np.asarray(pointsFile, dtype=float)
 
         self.xMin, self.xMax, self.xSpacing, self.xCount = self._axisParams(0)
         self.yMin, self.yMax, self.ySpacing, self.yCount = self._axisParams(1)
 
         # generate ideal grid to match actually probed points -- this is due to floating-point error issues
-        idealGrid = ([
-            [(x, y) for x in np.linspace(self.xMin, self.xMax, self.xCount, True)]
-            for y in np.linspace(self.yMin, self.yMax, self.yCount, True)
-            ])
-
-        self._probedGrid = [[0] * self.yCount for i in range(0, self.xCount)]
-
-        # align ideal grid indices with probed data points
-        for rowIndex, row in enumerate(idealGrid):
-            for colIndex, idealPoint in enumerate(row):
-                minSqDist = math.inf
-                for probed in self.points:
-                    # find closest point in ideal grid that corresponds to actual tested point
-                    # put z value in correct index
-                    sqDist = pow(probed[0] - idealPoint[0], 2) + pow(probed[1] - idealPoint[1], 2)
-                    if sqDist <= minSqDist:
-                        minSqDist = sqDist
-                        indexX = rowIndex
-                        indexY = colIndex
-                        closestProbed = probed
-                self.probedGrid[indexY][indexX] = closestProbed
+        idealX, idealY = np.meshgrid(
+            np.linspace(self.xMin, self.xMax, self.xCount, True),
+            np.linspace(self.yMin, self.yMax, self.yCount, True)
+        )
+        idealGrid = np.column_stack((idealX.ravel(), idealY.ravel()))
+
+        # align ideal grid indices with probed data points: find closest point in ideal grid that corresponds to
+        # actual tested point
+        closest = self._closestProbed(idealGrid)
+
+        # indexed [x index][y index], each item is the probed point (x, y, z)
+        self._probedGrid = self.points[closest].reshape((self.yCount, self.xCount, 3)).transpose((1, 0, 2))
 
     def Interpolate(self, point):
         """
@@ -54,72 +48,102 @@ class bilinearInterpolator:
         NOTE: If one axis is outside the grid, linear interpolation is used instead.
         If both axes are outside of the grid, the z-value of the closest corner of the grid is returned.
         """
-        lin = False
-
-        if point[0] < self.xMin:
-            ix1 = 0
-            lin = True
-        elif point[0] > self.xMax:
-            ix1 = self.xCount-1
-            lin = True
-        else:
-            ix1 = math.floor((point[0] - self.xMin)/self.xSpacing)
-            ix2 = math.ceil((point[0] - self.xMin)/self.xSpacing)
-
-        def interpolatePoint(p1, p2, pt, axis):
-            return (p2[2]*(pt[axis] - p1[axis]) + p1[2]*(p2[axis] - pt[axis]))/(p2[axis] - p1[axis])
-
-        if point[1] < self.yMin:
-            if lin:
-                return self.probedGrid[ix1][0][2]
-            return interpolatePoint(self.probedGrid[ix1][0], self.probedGrid[ix2][0], point, 0)
-        elif point[1] > self.yMax:           
-            if lin:
-                return self.probedGrid[ix1][self.yCount - 1][2]
-            return interpolatePoint(
-                self.probedGrid[ix1][self.yCount - 1], self.probedGrid[ix2][self.yCount - 1], point, 0)
-        else:
-            iy1 = math.floor((point[1] - self.yMin)/self.ySpacing)
-            iy2 = math.ceil((point[1] - self.yMin)/self.ySpacing)
-            # if x was at an extrema, but y was not, perform linear interpolation on x axis
-            if lin:
-                return interpolatePoint(self.probedGrid[ix1][iy1], self.probedGrid[ix1][iy2], point, 1)
+        return float(self.interpolate_many(np.array([point[:2]], dtype=float))[0])
+
+    def interpolate_many(self, points):
+        """
+        Bilinear interpolation of many points at once. Same as Interpolate(), for an array of points.
 
+        :param points:  array of (x, y) points
+        :return:        array of z-values
+        """
+        points = np.asarray(points, dtype=float)
+        x = points[:, 0]
+        y = points[:, 1]
+
+        ix1, ix2 = self._cellIndexes(x, self.xMin, self.xMax, self.xSpacing, self.xCount)
+        iy1, iy2 = self._cellIndexes(y, self.yMin, self.yMax, self.ySpacing, self.yCount)
+
+        # outside the grid both indexes of an axis are the same and the interpolation on that axis is dropped
         def specialDiv(a, b):
-            if b == 0:
-                return 0.5
-            else:
-                return a/b      
-
-        x1 = self.probedGrid[ix1][iy1][0]
-        x2 = self.probedGrid[ix2][iy1][0]
-        y1 = self.probedGrid[ix2][iy1][1]
-        y2 = self.probedGrid[ix2][iy2][1]
-
-        Q11 = self.probedGrid[ix1][iy1][2]
-        Q12 = self.probedGrid[ix1][iy2][2]
-        Q21 = self.probedGrid[ix2][iy1][2]
-        Q22 = self.probedGrid[ix2][iy2][2]
-
-        r1 = specialDiv(point[0]-x1, x2-x1)*Q21 + specialDiv(x2-point[0], x2-x1)*Q11
-        r2 = specialDiv(point[0]-x1, x2-x1)*Q22 + specialDiv(x2-point[0], x2-x1)*Q12
-        p = specialDiv(point[1]-y1, y2-y1)*r2 + specialDiv(y2-point[1], y2-y1)*r1
-            
+            zero = b == 0
+            return np.where(zero, 0.5, a / np.where(zero, 1.0, b))
+
+        grid = self._probedGrid
+        x1 = grid[ix1, iy1, 0]
+        x2 = grid[ix2, iy1, 0]
+        y1 = grid[ix2, iy1, 1]
+        y2 = grid[ix2, iy2, 1]
+
+        Q11 = grid[ix1, iy1, 2]
+        Q12 = grid[ix1, iy2, 2]
+        Q21 = grid[ix2, iy1, 2]
+        Q22 = grid[ix2, iy2, 2]
+
+        r1 = specialDiv(x - x1, x2 - x1) * Q21 + specialDiv(x2 - x, x2 - x1) * Q11
+        r2 = specialDiv(x - x1, x2 - x1) * Q22 + specialDiv(x2 - x, x2 - x1) * Q12
+        p = specialDiv(y - y1, y2 - y1) * r2 + specialDiv(y2 - y, y2 - y1) * r1
+
         return p
 
+    # Returns the indexes of the grid cell of the values, on one axis
+    @staticmethod
+    def _cellIndexes(values, axisMin, axisMax, axisSpacing, axisCount):
+        pos = (values - axisMin) / axisSpacing
+        i1 = np.clip(np.floor(pos), 0, axisCount - 1).astype(int)
+        i2 = np.clip(np.ceil(pos), 0, axisCount - 1).astype(int)
+
+        i1[values < axisMin] = i2[values < axisMin] = 0
+        i1[values > axisMax] = i2[values > axisMax] = axisCount - 1
+        return i1, i2
+
+    # Returns the index of the closest probed point for each of the locations in the ideal grid (row by row)
+    def _closestProbed(self, idealGrid):
+        probedXY = self.points[:, :2]
+        xStep = (self.xMax - self.xMin) / (self.xCount - 1)
+        yStep = (self.yMax - self.yMin) / (self.yCount - 1)
+
+        # snap every probed point to the ideal grid location it rounds to
+        ix = np.clip(np.rint((probedXY[:, 0] - self.xMin) / xStep), 0, self.xCount - 1).astype(int)
+        iy = np.clip(np.rint((probedXY[:, 1] - self.yMin) / yStep), 0, self.yCount - 1).astype(int)
+        cell = iy * self.xCount + ix
+
+        closest = np.full(len(idealGrid), -1, dtype=int)
+        single = np.bincount(cell, minlength=len(idealGrid))[cell] == 1
+        closest[cell[single]] = np.nonzero(single)[0]
+
+        # every other probed point rounds to another location so it is at least half a step away; a single point
+        # closer than that is the closest one. The rest of the locations are searched in all the probed points
+        sqDist = ((probedXY[closest] - idealGrid) ** 2).sum(axis=1)
+        pending = np.nonzero((closest < 0) | (sqDist >= (min(xStep, yStep) / 2.0) ** 2))[0]
+        if len(pending):
+            closest[pending] = self._searchClosest(idealGrid[pending], probedXY)
+        return closest
+
+    # Returns the index of the closest probed point for each of the locations, searching all of them
+    @staticmethod
+    def _searchClosest(locations, probedXY, chunk=4096):
+        probedSq = (probedXY ** 2).sum(axis=1)
+
+        # |p - q|^2 = |q|^2 - 2 p.q + |p|^2 and |p|^2 is the same for all the probed points q; the search goes on
+        # the reversed points so, as before, the last of the equally close points is taken
+        closest = np.empty(len(locations), dtype=int)
+        for start in range(0, len(locations), chunk):
+            sqDist = probedSq - 2.0 * (locations[start:start + chunk] @ probedXY.T)
+            closest[start:start + chunk] = len(probedXY) - 1 - np.argmin(sqDist[:, ::-1], axis=1)
+        return closest
+
     # Returns the min, max, spacing and size of one axis of the 2D grid
     def _axisParams(self, sortAxis):
-        # sort the set and eliminate the previous, unsorted set
-        srtSet = sorted(self.points, key=lambda x: x[sortAxis])
+        srtSet = np.sort(self.points[:, sortAxis])
 
-        dists = []
-        for item0, item1 in zip(srtSet[:(len(srtSet)-2)], srtSet[1:]):
-            dists.append(float(item1[sortAxis]) - float(item0[sortAxis]))
-        axisSpacing = max(dists)
+        axisSpacing = float(np.diff(srtSet).max()) if len(srtSet) > 1 else 0.0
+        if axisSpacing == 0:
+            raise ValueError("The points do not make a grid on the axis %d" % sortAxis)
 
         # add an extra one for axisCount to account for the starting point
-        axisMin = float(min(srtSet, key=lambda x: x[sortAxis])[sortAxis])
-        axisMax = float(max(srtSet, key=lambda x: x[sortAxis])[sortAxis])
+        axisMin = float(srtSet[0])
+        axisMax = float(srtSet[-1])
         axisRange = axisMax - axisMin
         axisCount = round((axisRange/axisSpacing) + 1)
 
@@ -8,10 +8,11 @@
 
 from vispy.visuals import CompoundVisual, LineVisual, MeshVisual, TextVisual, MarkersVisual
 from vispy.scene.visuals import VisualNode, generate_docstring, visuals
-from vispy.gloo import set_state
+from vispy.gloo import set_state, VertexBuffer
 from vispy.color import Color
 from shapely.geometry import Polygon, LineString, LinearRing
 import threading
+import time
 import numpy as np
 from appGUI.VisPyTesselators import GLUTess
 
@@ -27,6 +28,134 @@ class FlatCAMLineVisual(LineVisual):
         self._changed['pos'] = True
         self.update()
 
+    def set_data_range(self, start, pos, color):
+        """
+        Replaces a range of vertices. If the buffers on the GPU hold the whole data only this range is uploaded,
+        otherwise the data is set again with set_data().
+        :param start: int
+            Index of the first vertex to replace
+        :param pos: numpy.array
+            Vertices of the range
+        :param color: numpy.array
+            Colors (rgba) of the range
+        """
+        stop = start + len(pos)
+        self.pos[start:stop] = pos
+        self.color[start:stop] = color
+
+        # the buffers and the flags of the pending uploads are private to the VisPy line visual; they are checked
+        # here and with a VisPy version that has others the data is set again
+        changed = getattr(self, '_changed', None)
+        line_visual = getattr(self, '_line_visual', None)
+        pos_vbo = getattr(line_visual, '_pos_vbo', None)
+        color_vbo = getattr(line_visual, '_color_vbo', None)
+
+        if isinstance(changed, dict) and (changed.get('pos') or changed.get('color')):
+            # the buffers pending a whole upload will take the range from the arrays above
+            pass
+        elif isinstance(changed, dict) and _holds_rows(pos_vbo, len(self.pos)) and \
+                _holds_rows(color_vbo, len(self.color)):
+            pos_vbo.set_subdata(np.ascontiguousarray(pos, dtype=np.float32), offset=start)
+            color_vbo.set_subdata(np.ascontiguousarray(color, dtype=np.float32), offset=start)
+        else:
+            self.set_data(pos=self.pos, color=self.color)
+
+        self.update()
+
+
+def _holds_rows(vbo, rows):
+    """
+    :return: True if vbo is a VertexBuffer of the given number of rows, so a range of them can be replaced
+    """
+    return isinstance(vbo, VertexBuffer) and hasattr(vbo, 'set_subdata') and vbo.size == rows
+
+
+class FlatCAMMeshVisual(MeshVisual):
+    """
+    Mesh visual fed with unindexed faces (three vertices for each face) through MeshVisual.set_data(), so a range of
+    faces maps to a range of the vertex buffers and can be uploaded without touching the rest of the mesh.
+
+    The range uploads use the vertex buffer, the flag of the pending upload and the shader of the VisPy mesh, which
+    are private to it (VisPy version in requirements.txt); with a VisPy version that has others the mesh is set again.
+    """
+    def __init__(self):
+        MeshVisual.__init__(self)
+
+        self.unfreeze()
+        self._flat_pos = None
+        self._flat_colors = None
+        # the colors of the faces on the GPU, in a buffer that is kept so its ranges can be replaced
+        self._colors_vbo = VertexBuffer(np.zeros((0, 4), dtype=np.float32))
+        self._colors_bound = False
+        # True when the mesh data holds the arrays above, not copies of them
+        self._flat_shared = False
+        self.freeze()
+
+    def set_flat_data(self, pos=None, colors=None):
+        """
+        Sets the mesh data. Without data the mesh is cleared.
+        :param pos: numpy.array
+            Vertices of the faces, three for each face
+        :param colors: numpy.array
+            Colors (rgba) of the vertices
+        """
+        if pos is None or len(pos) == 0:
+            self._flat_pos = None
+            self._flat_colors = None
+            self.set_data()
+            self._flat_shared = False
+        else:
+            self._flat_pos = pos
+            self._flat_colors = colors
+            self.set_data(vertices=pos.reshape(-1, 3, pos.shape[-1]), vertex_colors=colors.reshape(-1, 3, 4))
+            self._flat_shared = np.may_share_memory(self.mesh_data.get_vertices(indexed='faces'), pos) and \
+                np.may_share_memory(self.mesh_data.get_vertex_colors(indexed='faces'), colors)
+
+    def set_flat_range(self, start, pos, colors):
+        """
+        Replaces a range of vertices. If the buffers on the GPU hold the whole mesh only this range is uploaded,
+        otherwise the mesh is set again.
+        :param start: int
+            Index of the first vertex to replace
+        :param pos: numpy.array
+            Vertices of the range
+        :param colors: numpy.array
+            Colors (rgba) of the range
+        """
+        stop = start + len(pos)
+        self._flat_pos[start:stop] = pos
+        self._flat_colors[start:stop] = colors
+
+        data_changed = getattr(self, '_data_changed', None)
+        if data_changed is True and self._flat_shared:
+            # the pending whole upload takes the range from the arrays above
+            self.update()
+        elif data_changed is False and self._colors_bound and \
+                _holds_rows(getattr(self, '_vertices', None), len(self._flat_pos)) and \
+                _holds_rows(self._colors_vbo, len(self._flat_colors)):
+            # MeshVisual keeps the vertices with a z coordinate
+            pos3 = np.zeros((len(pos), 3), dtype=np.float32)
+            pos3[:, :pos.shape[-1]] = pos
+            self._vertices.set_subdata(pos3, offset=start)
+            self._colors_vbo.set_subdata(np.ascontiguousarray(colors, dtype=np.float32), offset=start)
+            self.update()
+        else:
+            self.set_flat_data(self._flat_pos, self._flat_colors)
+
+    def _update_data(self):
+        self._colors_bound = False
+        if MeshVisual._update_data(self) is False:
+            return False
+
+        # the colors go to the shader from the kept buffer; a VisPy version with another shader keeps its own
+        # buffer and the ranges are uploaded whole
+        self._colors_vbo.set_data(np.ascontiguousarray(self._flat_colors, dtype=np.float32))
+        try:
+            self.shared_program.vert['base_color'] = self._colors_vbo
+            self._colors_bound = True
+        except (AttributeError, KeyError, TypeError):
+            pass
+
 
 def _update_shape_buffers(data, triangulation='glu'):
     """
@@ -36,11 +165,11 @@ def _update_shape_buffers(data, triangulation='glu'):
     :param triangulation: str
         Triangulation engine
     """
-    mesh_vertices = []                                              # Vertices for mesh
-    mesh_tris = []                                                  # Faces for mesh
-    mesh_colors = []                                                # Face colors
-    line_pts = []                                                   # Vertices for line
-    line_colors = []                                                # Line color
+    mesh_vertices = np.empty((0, 2), dtype=np.float32)                # Vertices for mesh
+    mesh_tris = np.empty((0,), dtype=np.uint32)                       # Faces for mesh
+    line_pts = np.empty((0, 2), dtype=np.float32)                     # Vertices for line
+    mesh_rgba = None                                                  # Face color
+    line_rgba = None                                                  # Line color
 
     geo, color, face_color, tolerance = data['geometry'], data['color'], data['face_color'], data['tolerance']
 
@@ -52,11 +181,11 @@ def _update_shape_buffers(data, triangulation='glu'):
 
         if type(geo) == LineString:
             # Prepare lines
-            pts = _linestring_to_segments(list(simplified_geo.coords))
+            pts = [_linestring_to_segments(simplified_geo.coords)]
 
         elif type(geo) == LinearRing:
             # Prepare lines
-            pts = _linearring_to_segments(list(simplified_geo.coords))
+            pts = [_linearring_to_segments(simplified_geo.coords)]
 
         elif type(geo) == Polygon:
             # Prepare polygon faces
@@ -69,31 +198,28 @@ def _update_shape_buffers(data, triangulation='glu'):
 
             # Prepare polygon edges
             if color is not None:
-                pts = _linearring_to_segments(list(simplified_geo.exterior.coords))
+                pts = [_linearring_to_segments(simplified_geo.exterior.coords)]
                 for ints in simplified_geo.interiors:
-                    pts += _linearring_to_segments(list(ints.coords))
+                    pts.append(_linearring_to_segments(ints.coords))
 
         # Appending data for mesh
         if len(tri_pts) > 0 and len(tri_tris) > 0:
-            mesh_tris += tri_tris
-            mesh_vertices += tri_pts
-            face_color_rgba = Color(face_color).rgba
-            # mesh_colors += [face_color_rgba] * (len(tri_tris) // 3)
-            mesh_colors += [face_color_rgba for __ in range(len(tri_tris) // 3)]
+            mesh_tris = np.asarray(tri_tris, dtype=np.uint32)
+            mesh_vertices = np.asarray(tri_pts, dtype=np.float32)[:, :2]
+            mesh_rgba = Color(face_color).rgba
 
         # Appending data for line
         if len(pts) > 0:
-            line_pts += pts
-            colo_rgba = Color(color).rgba
-            # line_colors += [colo_rgba] * len(pts)
-            line_colors += [colo_rgba for __ in range(len(pts))]
+            line_pts = np.concatenate(pts) if len(pts) > 1 else pts[0]
+            if len(line_pts) > 0:
+                line_rgba = Color(color).rgba
 
-    # Store buffers
+    # Store buffers; the colors are stored once per shape and they are expanded when the buffers are merged
     data['line_pts'] = line_pts
-    data['line_colors'] = line_colors
+    data['line_rgba'] = line_rgba
     data['mesh_vertices'] = mesh_vertices
     data['mesh_tris'] = mesh_tris
-    data['mesh_colors'] = mesh_colors
+    data['mesh_rgba'] = mesh_rgba
 
     # Clear shapely geometry
     del data['geometry']
@@ -110,8 +236,9 @@ def _linearring_to_segments(arr):
     :return: numpy.array
         Line segments
     """
-    if arr[0] != arr[-1]:
-        arr.append(arr[0])
+    arr = np.asarray(arr, dtype=np.float32)
+    if len(arr) > 0 and not np.array_equal(arr[0], arr[-1]):
+        arr = np.concatenate((arr, arr[:1]))
 
     return _linestring_to_segments(arr)
 
@@ -124,7 +251,237 @@ def _linestring_to_segments(arr):
     :return: numpy.array
         Line segments
     """
-    return [arr[i // 2] for i in range(0, len(arr) * 2)][1:-1]
+    arr = np.asarray(arr, dtype=np.float32)
+    if len(arr) < 2:
+        return np.empty((0, 2), dtype=np.float32)
+
+    # each inner vertex is the end of a segment and the start of the next one
+    return np.repeat(arr[:, :2], 2, axis=0)[1:-1]
+
+
+class ShapeRows(object):
+    """
+    Vertices and colors of one kind of primitives (line segments or mesh faces) of a collection layer.
+    The rows are allocated in chunks, so adding shapes seldom reallocates the buffers, and the ranges changed
+    since the last upload are tracked so only those are sent to the GPU.
+    Hidden rows are collapsed in the origin, making degenerate primitives that are not drawn.
+    """
+
+    # a multiple of 2 (segments) and 3 (faces) so the unused rows never make a partial primitive
+    chunk = 12288
+
+    def __init__(self):
+        self.pts = np.zeros((0, 2), dtype=np.float32)
+        self.colors = np.zeros((0, 4), dtype=np.float32)
+        self.shown = np.zeros((0,), dtype=bool)
+
+        self.size = 0           # Used rows
+        self.unused = 0         # Rows of the removed shapes, recovered on compaction
+        self.resized = True     # Buffers were reallocated and they have to be uploaded whole
+        self.changes = []       # Ranges (start, stop) changed since the last upload
+
+    def append(self, pts, rgba, shown):
+        """
+        Appends rows
+        :param pts: numpy.array
+            Vertices
+        :param rgba: tuple
+            Color of the vertices
+        :param shown: bool
+            Rows visibility
+        :return: tuple
+            Range (start, stop) of the rows
+        """
+        start = self.size
+        stop = start + len(pts)
+        if stop == start:
+            return start, stop
+        if stop > len(self.pts):
+            self._reallocate(stop)
+
+        self.pts[start:stop] = pts
+        self.colors[start:stop] = rgba
+        self.shown[start:stop] = shown
+
+        self.size = stop
+        self.changed(start, stop)
+        return start, stop
+
+    def compact(self, ranges):
+        """
+        Drops the unused rows
+        :param ranges: list
+            Ranges (start, stop) of the rows to keep, in order
+        :return: list
+            New starts of the kept ranges
+        """
+        lengths = [stop - start for start, stop in ranges]
+        keep = np.concatenate([np.arange(start, stop) for start, stop in ranges]) if ranges else \
+            np.empty((0,), dtype=np.int64)
+
+        pts, colors, shown = self.pts[keep], self.colors[keep], self.shown[keep]
+
+        self.size = 0
+        self.unused = 0
+        self._reallocate(len(keep))
+        self.pts[:len(keep)] = pts
+        self.colors[:len(keep)] = colors
+        self.shown[:len(keep)] = shown
+        self.size = len(keep)
+
+        return list(np.cumsum([0] + lengths[:-1]))
+
+    def _reallocate(self, rows):
+        capacity = max(rows, 2 * self.size)
+        capacity = -(-capacity // self.chunk) * self.chunk
+
+        pts = np.zeros((capacity, 2), dtype=np.float32)
+        colors = np.zeros((capacity, 4), dtype=np.float32)
+        shown = np.zeros((capacity,), dtype=bool)
+        pts[:self.size] = self.pts[:self.size]
+        colors[:self.size] = self.colors[:self.size]
+        shown[:self.size] = self.shown[:self.size]
+
+        self.pts, self.colors, self.shown = pts, colors, shown
+        self.resized = True
+        self.changes = []
+
+    def changed(self, start, stop):
+        if not self.resized and stop > start:
+            self.changes.append((start, stop))
+
+    def upload_data(self, start=0, stop=None):
+        """
+        Data to upload for a range of rows
+        :return: tuple
+            Vertices, with the hidden ones collapsed in the origin, and colors (a view on the buffer)
+        """
+        stop = len(self.pts) if stop is None else stop
+
+        pts = self.pts[start:stop].copy()
+        pts[~self.shown[start:stop]] = 0
+        return pts, self.colors[start:stop]
+
+    def pop_changes(self):
+        """
+        Ranges to upload and resets the changes tracking
+        :return: list
+            Merged ranges (start, stop) or None if the buffers have to be uploaded whole
+        """
+        if self.resized:
+            self.resized = False
+            self.changes = []
+            return None
+
+        merged = []
+        for start, stop in sorted(self.changes):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], stop)
+            else:
+                merged.append([start, stop])
+        self.changes = []
+
+        # many scattered ranges cost more than a whole upload
+        if sum(stop - start for start, stop in merged) > len(self.pts) // 2:
+            return None
+
+        return merged
+
+    def bounds(self, axis):
+        values = self.pts[:self.size, axis][self.shown[:self.size]]
+        if len(values) == 0:
+            return None
+        return float(values.min()), float(values.max())
+
+
+class ShapeBuffers(object):
+    """
+    Buffers of one layer of a shape collection. Every shape owns a range of line rows and a range of mesh rows.
+    """
+    def __init__(self):
+        self.lines = ShapeRows()
+        self.meshes = ShapeRows()
+
+        # Shape key: [line start, line stop, mesh start, mesh stop]
+        self.ranges = {}
+
+    def __contains__(self, key):
+        return key in self.ranges
+
+    def add(self, key, data):
+        """
+        Adds the buffers of a shape
+        :param key: int
+            Shape key
+        :param data: dict
+            Shape data as made by _update_shape_buffers()
+        """
+        mesh_pts = data['mesh_vertices'][data['mesh_tris']] if len(data['mesh_tris']) > 0 else \
+            data['mesh_vertices'][:0]
+        line_pts = data['line_pts']
+
+        if data.get('offsets') is not None:
+            # the shape is tessellated once and drawn at each offset, e.g. the copies of a step and repeat panel
+            offsets = np.asarray(data['offsets'], dtype=np.float32).reshape(-1, 1, 2)
+            line_pts = (line_pts[np.newaxis] + offsets).reshape(-1, 2)
+            mesh_pts = (mesh_pts[np.newaxis] + offsets).reshape(-1, 2)
+
+        line_range = self.lines.append(line_pts, data['line_rgba'], data['visible'])
+        mesh_range = self.meshes.append(mesh_pts, data['mesh_rgba'], data['visible'])
+        self.ranges[key] = list(line_range + mesh_range)
+
+    def remove(self, key):
+        self.set_visible(key, False)
+
+        line_start, line_stop, mesh_start, mesh_stop = self.ranges.pop(key)
+        self.lines.unused += line_stop - line_start
+        self.meshes.unused += mesh_stop - mesh_start
+
+        if self.lines.unused > max(ShapeRows.chunk, self.lines.size // 2) or \
+                self.meshes.unused > max(ShapeRows.chunk, self.meshes.size // 2):
+            self.compact()
+
+    def set_visible(self, key, state):
+        line_start, line_stop, mesh_start, mesh_stop = self.ranges[key]
+
+        self.lines.shown[line_start:line_stop] = state
+        self.lines.changed(line_start, line_stop)
+        self.meshes.shown[mesh_start:mesh_stop] = state
+        self.meshes.changed(mesh_start, mesh_stop)
+
+    def set_colors(self, key, line_rgba=None, mesh_rgba=None):
+        line_start, line_stop, mesh_start, mesh_stop = self.ranges[key]
+
+        if line_rgba is not None:
+            self.lines.colors[line_start:line_stop] = line_rgba
+            self.lines.changed(line_start, line_stop)
+        if mesh_rgba is not None:
+            self.meshes.colors[mesh_start:mesh_stop] = mesh_rgba
+            self.meshes.changed(mesh_start, mesh_stop)
+
+    def compact(self):
+        by_line = sorted(self.ranges, key=lambda k: self.ranges[k][0])
+        by_mesh = sorted(self.ranges, key=lambda k: self.ranges[k][2])
+        line_starts = self.lines.compact([self.ranges[k][0:2] for k in by_line])
+        mesh_starts = self.meshes.compact([self.ranges[k][2:4] for k in by_mesh])
+
+        for k, start in zip(by_line, line_starts):
+            line_start, line_stop = self.ranges[k][0:2]
+            self.ranges[k][0:2] = [int(start), int(start) + line_stop - line_start]
+        for k, start in zip(by_mesh, mesh_starts):
+            mesh_start, mesh_stop = self.ranges[k][2:4]
+            self.ranges[k][2:4] = [int(start), int(start) + mesh_stop - mesh_start]
+
+    def clear(self):
+        self.lines = ShapeRows()
+        self.meshes = ShapeRows()
+        self.ranges.clear()
+
+    def bounds(self, axis):
+        bounds = [b for b in (self.lines.bounds(axis), self.meshes.bounds(axis)) if b is not None]
+        if not bounds:
+            return None
+        return min(b[0] for b in bounds), max(b[1] for b in bounds)
 
 
 class ShapeGroup(object):
@@ -193,19 +550,16 @@ class ShapeGroup(object):
         :param value: bool
         """
         self._visible = value
-        for i in self._indexes:
-            self._collection.data[i]['visible'] = value
+        self._collection.update_visibility(value, indexes=self._indexes)
 
         self._collection.redraw([])
 
     def update_visibility(self, state, indexes=None):
         if indexes:
-            for i in indexes:
-                if i in self._indexes:
-                    self._collection.data[i]['visible'] = state
+            group_indexes = set(self._indexes)
+            self._collection.update_visibility(state, indexes=[i for i in indexes if i in group_indexes])
         else:
-            for i in self._indexes:
-                self._collection.data[i]['visible'] = state
+            self._collection.update_visibility(state, indexes=self._indexes)
 
         self._collection.redraw([])
 
@@ -238,7 +592,16 @@ class ShapeCollectionVisual(CompoundVisual):
         self.pool = pool
         self.results = {}
 
-        self._meshes = [MeshVisual() for _ in range(0, layers)]
+        # Layers buffers; the shapes changed since the last update are synced in them and only the changed
+        # ranges are uploaded
+        self._buffers = [ShapeBuffers() for _ in range(0, layers)]
+        self._shape_layer = {}
+        self._changed_keys = set()
+
+        # Duration (seconds) and uploaded rows of the last update
+        self.update_stats = {'time': 0.0, 'rows': 0}
+
+        self._meshes = [FlatCAMMeshVisual() for _ in range(0, layers)]
         # self._lines = [LineVisual(antialias=True) for _ in range(0, layers)]
         self._lines = [FlatCAMLineVisual(antialias=True) for _ in range(0, layers)]
 
@@ -260,7 +623,7 @@ class ShapeCollectionVisual(CompoundVisual):
         self.freeze()
 
     def add(self, shape=None, color=None, face_color=None, alpha=None, visible=True,
-            update=False, layer=1, tolerance=0.01, linewidth=None):
+            update=False, layer=1, tolerance=0.01, linewidth=None, offsets=None):
         """
         Adds shape to collection
         :return:
@@ -282,6 +645,8 @@ class ShapeCollectionVisual(CompoundVisual):
             Geometry simplifying tolerance
         :param linewidth: int
             Width of the line
+        :param offsets: list
+            (x, y) offsets where the shape is drawn, instead of its own place; the shape is tessellated once
         :return: int
             Index of shape
         """
@@ -293,7 +658,7 @@ class ShapeCollectionVisual(CompoundVisual):
 
         # Prepare data for translation
         self.data[key] = {'geometry': shape, 'color': color, 'alpha': alpha, 'face_color': face_color,
-                          'visible': visible, 'layer': layer, 'tolerance': tolerance}
+                          'visible': visible, 'layer': layer, 'tolerance': tolerance, 'offsets': offsets}
 
         if linewidth:
             self._line_width = linewidth
@@ -303,6 +668,7 @@ class ShapeCollectionVisual(CompoundVisual):
             self.results[key] = self.pool.map_async(_update_shape_buffers, [self.data[key]])
         except Exception:
             self.data[key] = _update_shape_buffers(self.data[key])
+            self._mark_changed([key])
 
         if update:
             self.redraw()   # redraw() waits for pool process end
@@ -325,6 +691,7 @@ class ShapeCollectionVisual(CompoundVisual):
 
         # Remove data
         del self.data[key]
+        self._mark_changed([key])
 
         if update:
             self.__update()
@@ -335,7 +702,18 @@ class ShapeCollectionVisual(CompoundVisual):
         :param update: bool
             Set True to redraw collection
         """
+        self.update_lock.acquire(True)
         self.data.clear()
+
+        self.key_lock.acquire(True)
+        self._changed_keys.clear()
+        self.key_lock.release()
+
+        self._shape_layer.clear()
+        for buffers in self._buffers:
+            buffers.clear()
+        self.update_lock.release()
+
         if update:
             self.__update()
 
@@ -343,15 +721,99 @@ class ShapeCollectionVisual(CompoundVisual):
         # Lock sub-visuals updates
         self.update_lock.acquire(True)
         if indexes is None:
-            for k, data in list(self.data.items()):
-                self.data[k]['visible'] = state
+            keys = list(self.data.keys())
         else:
-            for k, data in list(self.data.items()):
-                if k in indexes:
-                    self.data[k]['visible'] = state
+            keys = [k for k in indexes if k in self.data]
+
+        for k in keys:
+            self.data[k]['visible'] = state
+        self._mark_changed(keys)
 
         self.update_lock.release()
 
+    def _mark_changed(self, keys):
+        self.key_lock.acquire(True)
+        self._changed_keys.update(keys)
+        self.key_lock.release()
+
+    def _sync_buffers(self):
+        """
+        Applies the changes of the shapes to the layers buffers. Must be called with the update lock held.
+        """
+        self.key_lock.acquire(True)
+        changed_keys = self._changed_keys
+        self._changed_keys = set()
+        self.key_lock.release()
+
+        for key in changed_keys:
+            data = self.data.get(key)
+            layer = self._shape_layer.get(key)
+
+            if layer is not None:
+                if data is None:
+                    self._buffers[layer].remove(key)
+                    del self._shape_layer[key]
+                else:
+                    self._buffers[layer].set_visible(key, data['visible'])
+            elif data is not None and 'line_pts' in data:
+                self._buffers[data['layer']].add(key, data)
+                self._shape_layer[key] = data['layer']
+
+                # the vertices live in the layer buffers from now on
+                del data['line_pts'], data['mesh_vertices'], data['mesh_tris']
+
+    def _upload_buffers(self):
+        """
+        Uploads the changed ranges of the layers buffers, or the whole buffers after a reallocation.
+        Must be called with the update lock held.
+        :return: int
+            Uploaded rows
+        """
+        uploaded = 0
+
+        for i, buffers in enumerate(self._buffers):
+            mesh, line = self._meshes[i], self._lines[i]
+
+            # Updating meshes
+            rows = buffers.meshes
+            changes = rows.pop_changes()
+            if changes is None:
+                if len(rows.pts) > 0:
+                    set_state(polygon_offset_fill=False)
+                    mesh.set_flat_data(*rows.upload_data())
+                else:
+                    mesh.set_flat_data()
+                uploaded += len(rows.pts)
+            else:
+                for start, stop in changes:
+                    mesh.set_flat_range(start, *rows.upload_data(start, stop))
+                    uploaded += stop - start
+
+            # Updating lines
+            rows = buffers.lines
+            changes = rows.pop_changes()
+            if changes is None:
+                if len(rows.pts) > 0:
+                    pos, colors = rows.upload_data()
+                    line.set_data(pos=pos, color=colors, width=self._line_width, connect='segments')
+                else:
+                    line.clear_data()
+                uploaded += len(rows.pts)
+            else:
+                for start, stop in changes:
+                    line.set_data_range(start, *rows.upload_data(start, stop))
+                    uploaded += stop - start
+
+        self._bounds_changed()
+        return uploaded
+
+    def _compute_bounds(self, axis, view):
+        bounds = [b.bounds(axis) for b in self._buffers]
+        bounds = [b for b in bounds if b is not None]
+        if not bounds:
+            return None
+        return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
     def update_color(self, new_mesh_color=None, new_line_color=None, indexes=None):
         if new_mesh_color is None and new_line_color is None:
             return
@@ -374,169 +836,55 @@ class ShapeCollectionVisual(CompoundVisual):
             else:
                 new_line_color = None
 
-        mesh_colors = [[] for _ in range(0, len(self._meshes))]     # Face colors
-        line_colors = [[] for _ in range(0, len(self._meshes))]     # Line colors
-        line_pts = [[] for _ in range(0, len(self._lines))]         # Vertices for line
-
         # Lock sub-visuals updates
         self.update_lock.acquire(True)
-        # Merge shapes buffers
+        self._sync_buffers()
 
-        if indexes is None:
-            for k, data in list(self.data.items()):
-                if data['visible'] and 'line_pts' in data:
-                    if new_mesh_color and new_mesh_color != '':
-                        dim_mesh_tris = (len(data['mesh_tris']) // 3)
-                        if dim_mesh_tris != 0:
-                            try:
-                                mesh_colors[data['layer']] += [mesh_color_rgba] * dim_mesh_tris
-                                self.data[k]['face_color'] = new_mesh_color
-
-                                data['mesh_colors'] = [mesh_color_rgba for __ in range(len(data['mesh_colors']))]
-                            except Exception as e:
-                                print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                                      "Create mesh colors --> Data error. %s" % str(e))
-
-                    if new_line_color and new_line_color != '':
-                        dim_line_pts = (len(data['line_pts']))
-                        if dim_line_pts != 0:
-                            try:
-                                line_pts[data['layer']] += data['line_pts']
-                                line_colors[data['layer']] += [line_color_rgba] * dim_line_pts
-                                self.data[k]['color'] = new_line_color
-
-                                data['line_colors'] = [mesh_color_rgba for __ in range(len(data['line_colors']))]
-                            except Exception as e:
-                                print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                                      "Create line colors --> Data error. %s" % str(e))
-        else:
-            for k, data in list(self.data.items()):
-                if data['visible'] and 'line_pts' in data:
-                    dim_mesh_tris = (len(data['mesh_tris']) // 3)
-                    dim_line_pts = (len(data['line_pts']))
-
-                    if k in indexes:
-                        if new_mesh_color and new_mesh_color != '':
-                            if dim_mesh_tris != 0:
-                                try:
-                                    mesh_colors[data['layer']] += [mesh_color_rgba] * dim_mesh_tris
-                                    self.data[k]['face_color'] = new_mesh_color
-
-                                    data['mesh_colors'] = [mesh_color_rgba for __ in range(len(data['mesh_colors']))]
-                                except Exception as e:
-                                    print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                                          "Create mesh colors --> Data error. %s" % str(e))
-                        if new_line_color and new_line_color != '':
-                            if dim_line_pts != 0:
-                                try:
-                                    line_pts[data['layer']] += data['line_pts']
-                                    line_colors[data['layer']] += [line_color_rgba] * dim_line_pts
-                                    self.data[k]['color'] = new_line_color
-
-                                    data['line_colors'] = [mesh_color_rgba for __ in range(len(data['line_colors']))]
-                                except Exception as e:
-                                    print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                                          "Create line colors --> Data error. %s" % str(e))
-                    else:
-                        if dim_mesh_tris != 0:
-                            try:
-                                mesh_colors[data['layer']] += [Color(data['face_color']).rgba] * dim_mesh_tris
-                            except Exception as e:
-                                print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                                      "Create mesh colors --> Data error. %s" % str(e))
-
-                        if dim_line_pts != 0:
-                            try:
-                                line_pts[data['layer']] += data['line_pts']
-                                line_colors[data['layer']] += [Color(data['color']).rgba] * dim_line_pts
-                            except Exception as e:
-                                print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                                      "Create line colors --> Data error. %s" % str(e))
-
-        # Updating meshes
-        if new_mesh_color and new_mesh_color != '':
-            for i, mesh in enumerate(self._meshes):
-                if mesh_colors[i]:
-                    try:
-                        mesh._meshdata.set_face_colors(colors=np.asarray(mesh_colors[i]))
-                        mesh.mesh_data_changed()
-                    except Exception as e:
-                        print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                              "Apply mesh colors --> Data error. %s" % str(e))
-
-        # Updating lines
-        if new_line_color and new_line_color != '':
-            for i, line in enumerate(self._lines):
-                if len(line_pts[i]) > 0:
-                    try:
-                        line._color = np.asarray(line_colors[i])
-                        line._changed['color'] = True
-                        line.update()
-                    except Exception as e:
-                        print("VisPyVisuals.ShapeCollectionVisual.update_color(). "
-                              "Apply line colors --> Data error. %s" % str(e))
-                else:
-                    line.clear_data()
+        # Set the new colors of the shapes
+        keys = list(self.data.keys()) if indexes is None else indexes
+        for k in keys:
+            data = self.data.get(k)
+            if data is None or not data['visible'] or k not in self._shape_layer:
+                continue
+
+            line_rgba = mesh_rgba = None
+            if mesh_color_rgba is not None and data['mesh_rgba'] is not None:
+                data['face_color'] = new_mesh_color
+                data['mesh_rgba'] = mesh_rgba = mesh_color_rgba
+            if line_color_rgba is not None and data['line_rgba'] is not None:
+                data['color'] = new_line_color
+                data['line_rgba'] = line_rgba = line_color_rgba
+
+            self._buffers[self._shape_layer[k]].set_colors(k, line_rgba=line_rgba, mesh_rgba=mesh_rgba)
+
+        try:
+            self._upload_buffers()
+        except Exception as e:
+            print("VisPyVisuals.ShapeCollectionVisual.update_color() --> Data error. %s" % str(e))
 
         self.update_lock.release()
 
     def __update(self):
         """
-        Merges internal buffers, sets data to visuals, redraws collection on scene
+        Syncs the changed shapes in the layers buffers, uploads the changed ranges to visuals, redraws collection on
+        scene. The cost depends on the changed shapes only, not on the collection size.
         """
-        mesh_vertices = [[] for _ in range(0, len(self._meshes))]       # Vertices for mesh
-        mesh_tris = [[] for _ in range(0, len(self._meshes))]           # Faces for mesh
-        mesh_colors = [[] for _ in range(0, len(self._meshes))]         # Face colors
-        line_pts = [[] for _ in range(0, len(self._lines))]             # Vertices for line
-        line_colors = [[] for _ in range(0, len(self._lines))]          # Line color
+        start_time = time.time()
 
         # Lock sub-visuals updates
         self.update_lock.acquire(True)
 
-        # Merge shapes buffers
-        for data in list(self.data.values()):
-            if data['visible'] and 'line_pts' in data:
-                try:
-                    line_pts[data['layer']] += data['line_pts']
-                    line_colors[data['layer']] += data['line_colors']
-
-                    mesh_tris[data['layer']] += [x + len(mesh_vertices[data['layer']]) for x in data['mesh_tris']]
-                    mesh_vertices[data['layer']] += data['mesh_vertices']
-                    mesh_colors[data['layer']] += data['mesh_colors']
-                except Exception as e:
-                    print("VisPyVisuals.ShapeCollectionVisual._update() --> Data error. %s" % str(e))
-
-        # Updating meshes
-        for i, mesh in enumerate(self._meshes):
-            if len(mesh_vertices[i]) > 0:
-                set_state(polygon_offset_fill=False)
-                faces_array = np.asarray(mesh_tris[i], dtype=np.uint32)
-                mesh.set_data(
-                    vertices=np.asarray(mesh_vertices[i]),
-                    faces=faces_array.reshape((-1, 3)),
-                    face_colors=np.asarray(mesh_colors[i])
-                )
-            else:
-                mesh.set_data()
-
-            mesh._bounds_changed()
-
-        # Updating lines
-        for i, line in enumerate(self._lines):
-            if len(line_pts[i]) > 0:
-                line.set_data(
-                    pos=np.asarray(line_pts[i]),
-                    color=np.asarray(line_colors[i]),
-                    width=self._line_width,
-                    connect='segments')
-            else:
-                line.clear_data()
-
-            line._bounds_changed()
+        try:
+            self._sync_buffers()
+            rows = self._upload_buffers()
+        except Exception as e:
+            print("VisPyVisuals.ShapeCollectionVisual._update() --> Data error. %s" % str(e))
+            rows = 0
 
-        self._bounds_changed()
         self.update_lock.release()
 
+        self.update_stats = {'time': time.time() - start_time, 'rows': rows}
+
     def redraw(self, indexes=None, update_colors=None):
         """
         Redraws collection
@@ -547,13 +895,14 @@ class ShapeCollectionVisual(CompoundVisual):
         # Only one thread can update data
         self.results_lock.acquire(True)
 
-        for i in list(self.data.keys()) if not indexes else indexes:
-            if i in list(self.results.keys()):
+        for i in list(self.results.keys()) if not indexes else indexes:
+            if i in self.results:
                 try:
                     self.results[i].wait()                                  # Wait for process results
                     if i in self.data:
                         self.data[i] = self.results[i].get()[0]             # Store translated data
                         del self.results[i]
+                        self._mark_changed([i])
                 except Exception as e:
                     print("VisPyVisuals.ShapeCollectionVisual.redraw() --> Data error = %s. Indexes = %s" %
                           (str(e), str(indexes)))
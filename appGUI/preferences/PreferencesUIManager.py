@@ -251,6 +251,7 @@ class PreferencesUIManager:
             "geometry_plot_line":           self.ui.geometry_defaults_form.geometry_gen_group.line_color_entry,
             "geometry_optimization_type":   self.ui.geometry_defaults_form.geometry_gen_group.opt_algorithm_radio,
             "geometry_search_time":         self.ui.geometry_defaults_form.geometry_gen_group.optimization_time_entry,
+            "geometry_connect_paths":       self.ui.geometry_defaults_form.geometry_gen_group.connect_paths_cb,
 
             # Geometry Options
             "geometry_cutz":            self.ui.geometry_defaults_form.geometry_opt_group.cutz_entry,
@@ -218,13 +218,16 @@ class ExcellonGenPrefGroupUI(OptionsGroupUI):
               "If <<Basic>> is checked then Google OR-Tools Basic algorithm is used.\n"
               "If <<TSA>> is checked then Travelling Salesman algorithm is used for\n"
               "drill path optimization.\n"
+              "If <<Nearest>> is checked then a fast Nearest Neighbour algorithm is used\n"
+              "and the path is improved with 2-opt for the set Duration.\n"
               "\n"
               "Some options are disabled when the application works in 32bit mode.")
         )
 
         self.excellon_optimization_radio = RadioSet([{'label': _('MetaHeuristic'), 'value': 'M'},
                                                      {'label': _('Basic'), 'value': 'B'},
-                                                     {'label': _('TSA'), 'value': 'T'}],
+                                                     {'label': _('TSA'), 'value': 'T'},
+                                                     {'label': _('Nearest'), 'value': 'N'}],
                                                     orientation='vertical', stretch=False)
 
         grid2.addWidget(self.excellon_optimization_label, 9, 0)
@@ -233,7 +236,7 @@ class ExcellonGenPrefGroupUI(OptionsGroupUI):
         self.optimization_time_label = QtWidgets.QLabel('%s:' % _('Duration'))
         self.optimization_time_label.setAlignment(QtCore.Qt.AlignLeft)
         self.optimization_time_label.setToolTip(
-            _("When OR-Tools Metaheuristic (MH) is enabled there is a\n"
+            _("When OR-Tools Metaheuristic (MH) or Nearest is enabled there is a\n"
               "maximum threshold for how much time is spent doing the\n"
               "path optimization. This max duration is set here.\n"
               "In seconds.")
@@ -333,7 +336,7 @@ class ExcellonGenPrefGroupUI(OptionsGroupUI):
         self.excellon_optimization_radio.activated_custom.connect(self.optimization_selection)
 
     def optimization_selection(self):
-        if self.excellon_optimization_radio.get_value() == 'M':
+        if self.excellon_optimization_radio.get_value() in ['M', 'N']:
             self.optimization_time_label.setDisabled(False)
             self.optimization_time_entry.setDisabled(False)
         else:
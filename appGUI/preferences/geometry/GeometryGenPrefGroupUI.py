@@ -129,6 +129,14 @@ class GeometryGenPrefGroupUI(OptionsGroupUI):
         grid0.addWidget(self.optimization_time_label, 14, 0)
         grid0.addWidget(self.optimization_time_entry, 14, 1)
 
+        self.connect_paths_cb = FCCheckBox(_("Connect Paths"))
+        self.connect_paths_cb.setToolTip(
+            _("When checked, the paths that touch on their ends\n"
+              "are joined before the G-code is generated\n"
+              "so they are cut without lifting the tool.")
+        )
+        grid0.addWidget(self.connect_paths_cb, 15, 0, 1, 2)
+
         separator_line = QtWidgets.QFrame()
         separator_line.setFrameShape(QtWidgets.QFrame.HLine)
         separator_line.setFrameShadow(QtWidgets.QFrame.Sunken)
@@ -0,0 +1,1006 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+"""
+The FlatCAM engine without the GUI, for the Tcl scripts run in batch:
+
+    python appHeadless.py [--jobs=<processes>] [--shellvar=<1,'C:\\path',23>] script1.tcl [script2.tcl ...]
+
+or from Python:
+
+    engine = HeadlessApp()
+    engine.exec_command('open_gerber top.gbr')
+    engine.run('isolate', 'top.gbr', dia=0.2, passes=2)
+    engine.collection.get_by_name('top.gbr_iso')
+"""
+
+from contextlib import contextmanager
+import ast
+from multiprocessing import Pool
+import getopt
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+
+import tkinter as tk
+
+import appVersion
+from defaults import FlatCAMDefaults
+
+import gettext
+import appTranslation as fcTranslate
+import builtins
+
+fcTranslate.apply_language('strings')
+if '_' not in builtins.__dict__:
+    _ = gettext.gettext
+
+log = logging.getLogger('base')
+
+
+class Signal:
+    """
+    Stand-in for the Qt signals of the App: the connected functions are called at once, in the thread that emits.
+    """
+
+    def __init__(self):
+        self.slots = []
+
+    def __getitem__(self, types):
+        # the overloaded signals, like inform[str, bool]
+        return self
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self.slots = []
+        elif slot in self.slots:
+            self.slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self.slots):
+            slot(*args)
+
+
+class NoOp:
+    """
+    Stand-in for the plot canvas and the other GUI parts: all the calls do nothing.
+    """
+
+    def __getattr__(self, item):
+        return lambda *args, **kwargs: NoOp()
+
+    def __bool__(self):
+        return False
+
+
+class HeadlessCanvas(NoOp):
+    """
+    The plot canvas: the objects make their shape collections without a scene and nothing is drawn.
+    """
+
+    class View:
+        scene = None
+
+    view = View()
+
+
+class HeadlessProcessContainer:
+
+    new_text = ''
+
+    @contextmanager
+    def new(self, text):
+        log.debug(text)
+        yield
+
+    def update_view_text(self, text):
+        pass
+
+    def done(self):
+        pass
+
+
+class HeadlessCollection:
+    """
+    The objects of the HeadlessApp, by name, in the order they were added; the part of the ObjectCollection API that
+    the Tcl commands and the objects use.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.objects = []
+        self.active = []
+
+    def append(self, obj):
+        name = obj.options["name"]
+
+        # Prevent same name, as ObjectCollection.append()
+        while name in self.get_names():
+            match = re.search(r'(.*[^\d])?(\d+)$', name)
+            if match:
+                name = (match.group(1) or '') + str(int(match.group(2)) + 1)
+            else:
+                name += "_1"
+        obj.options["name"] = name
+        obj.load_complete = True
+
+        self.objects.append(obj)
+        self.app.object_status_changed.emit(obj, 'append', name)
+
+    def get_list(self):
+        return list(self.objects)
+
+    def get_names(self):
+        return [obj.options['name'] for obj in self.objects]
+
+    def get_by_name(self, name, isCaseSensitive=None):
+        for obj in self.objects:
+            if obj.options['name'] == name or \
+                    (isCaseSensitive is False and obj.options['name'].lower() == str(name).lower()):
+                return obj
+        return None
+
+    def delete_by_name(self, name, select_project=True):
+        obj = self.get_by_name(name)
+        if obj is None:
+            return
+        self.objects.remove(obj)
+        if obj in self.active:
+            self.active.remove(obj)
+        self.app.object_status_changed.emit(obj, 'delete', name)
+        self.app.buffer_cache.invalidate(obj)
+
+    def delete_all(self):
+        for name in self.get_names():
+            self.delete_by_name(name)
+
+    def get_active(self):
+        return self.active[0] if self.active else None
+
+    def get_selected(self):
+        return list(self.active)
+
+    def set_active(self, name):
+        obj = self.get_by_name(name)
+        if obj is not None and obj not in self.active:
+            self.active.append(obj)
+
+    def set_all_active(self):
+        self.active = list(self.objects)
+
+    def set_all_inactive(self):
+        self.active = []
+
+    def set_inactive(self, name):
+        obj = self.get_by_name(name)
+        if obj in self.active:
+            self.active.remove(obj)
+
+    # the objects are added at once so nothing is promised
+    def promise(self, obj_name):
+        pass
+
+    def has_promises(self):
+        return False
+
+    def plot_promise(self, plot_obj_name):
+        pass
+
+    def plot_remove_promise(self, plot_obj_name):
+        pass
+
+    def has_plot_promises(self):
+        return False
+
+    def update_view(self):
+        pass
+
+
+class HeadlessAppObject:
+    """
+    AppObject.new_object() without the GUI: the object is added to the collection before new_object() returns.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.inform = app.inform
+
+        self.object_created = Signal()
+        self.object_changed = Signal()
+        self.object_plotted = Signal()
+        self.plots_updated = Signal()
+        self.new_object_available = Signal()
+
+    def new_object(self, kind, name, initialize, plot=False, autoselected=True, callback=None, callback_params=None):
+        """
+        Creates a new FlatCAMObj and adds it to the collection. Same parameters as AppObject.new_object(); nothing
+        is plotted.
+
+        :return:    Either the object or the string 'fail'
+        """
+        from appObjects.FlatCAMCNCJob import CNCJobObject
+        from appObjects.FlatCAMExcellon import ExcellonObject
+        from appObjects.FlatCAMGeometry import GeometryObject
+        from appObjects.FlatCAMGerber import GerberObject
+
+        log.debug("HeadlessAppObject.new_object()")
+        classdict = {
+            "gerber": GerberObject,
+            "excellon": ExcellonObject,
+            "cncjob": CNCJobObject,
+            "geometry": GeometryObject
+        }
+        if kind not in classdict:
+            self.app.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Not available in the headless engine"), kind))
+            return "fail"
+
+        obj = classdict[kind](name)
+        obj.units = self.app.options["units"]
+
+        # the application defaults related to the object
+        obj.copy_app_options(self.app.options, kind)
+
+        try:
+            return_value = initialize(obj, self.app)
+        except Exception as e:
+            msg = '[ERROR_NOTCL] %s' % _("An internal error has occurred. See shell.\n")
+            msg += _("Object ({kind}) failed because: {error} \n\n").format(kind=kind, error=str(e))
+            msg += traceback.format_exc()
+            self.app.inform.emit(msg)
+            return "fail"
+
+        if return_value == 'fail':
+            log.debug("Object (%s) parsing and/or geometry creation failed." % kind)
+            return "fail"
+
+        if self.app.options["units"].upper() != obj.units.upper():
+            self.app.inform.emit('%s: %s' % (_("Converting units to "), self.app.options["units"]))
+            obj.convert_units(self.app.options["units"])
+
+        try:
+            obj.options['xmin'], obj.options['ymin'], obj.options['xmax'], obj.options['ymax'] = obj.bounds()
+        except Exception as e:
+            log.warning("HeadlessAppObject.new_object() -> The object has no bounds properties. %s" % str(e))
+            return "fail"
+
+        self.app.collection.append(obj)
+        if autoselected:
+            self.app.collection.set_all_inactive()
+            self.app.collection.set_active(obj.options["name"])
+        self.new_object_available.emit(obj)
+
+        if callback is not None:
+            callback(*(callback_params if callback_params is not None else []))
+        return obj
+
+    def new_excellon_object(self):
+        self.new_object('excellon', 'new_exc', lambda x, y: None, plot=False)
+
+    def new_gerber_object(self):
+        def initialize(grb_obj, app):
+            grb_obj.multitool = False
+            grb_obj.source_file = []
+            grb_obj.multigeo = False
+            grb_obj.follow = False
+            grb_obj.apertures = {}
+            grb_obj.solid_geometry = []
+
+        self.new_object('gerber', 'new_grb', initialize, plot=False)
+
+    def on_object_changed(self, obj):
+        pass
+
+
+class HeadlessFileHandlers:
+    """
+    The MenuFileHandlers methods that the Tcl commands use, for the files opened by the HeadlessApp.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.inform = app.inform
+        self.defaults = app.defaults
+
+    def open_file(self, kind, filename, outname, from_tcl, obj_init):
+        with self.app.proc_container.new(_("Opening ...")):
+            name = outname or filename.split('/')[-1].split('\\')[-1]
+
+            ret_val = self.app.app_obj.new_object(kind, name, lambda obj, app_obj: obj_init(obj, app_obj, filename),
+                                                  autoselected=False)
+            if ret_val == 'fail' and from_tcl:
+                # the file may be in the Tcl path
+                filename = self.defaults['global_tcl_path'] + '/' + name
+                ret_val = self.app.app_obj.new_object(kind, name,
+                                                      lambda obj, app_obj: obj_init(obj, app_obj, filename),
+                                                      autoselected=False)
+            if ret_val == 'fail':
+                self.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open file"), filename))
+                return 'fail'
+
+            self.app.file_opened.emit(kind, filename)
+            self.inform.emit('[success] %s: %s' % (_("Opened"), filename))
+
+    def open_gerber(self, filename, outname=None, plot=False, from_tcl=False):
+        from camlib import ParseError
+
+        def obj_init(gerber_obj, app_obj, path):
+            try:
+                gerber_obj.parse_file(path)
+            except IOError:
+                return "fail"
+            except ParseError as err:
+                app_obj.inform.emit('[ERROR_NOTCL] %s: %s. %s' % (_("Failed to parse file"), path, str(err)))
+                return "fail"
+
+            if gerber_obj.is_empty():
+                app_obj.inform.emit('[ERROR_NOTCL] %s' %
+                                    _("Object is not Gerber file or empty. Aborting object creation."))
+                return "fail"
+
+        return self.open_file('gerber', filename, outname, from_tcl, obj_init)
+
+    def open_excellon(self, filename, outname=None, plot=False, from_tcl=False):
+        def obj_init(excellon_obj, app_obj, path):
+            try:
+                if excellon_obj.parse_file(filename=path) == "fail":
+                    app_obj.inform.emit('[ERROR_NOTCL] %s' % _("This is not Excellon file."))
+                    return "fail"
+            except IOError:
+                return "fail"
+
+            if excellon_obj.create_geometry() == 'fail':
+                return "fail"
+
+            if not any(tool['solid_geometry'] for tool in excellon_obj.tools.values()):
+                app_obj.inform.emit('[ERROR_NOTCL] %s: %s' % (_("No geometry found in file"), path))
+                return "fail"
+
+        return self.open_file('excellon', filename, outname, from_tcl, obj_init)
+
+    def open_gcode(self, filename, outname=None, force_parsing=None, plot=False, from_tcl=False):
+        def obj_init(job_obj, app_obj, path):
+            try:
+                with open(path) as f:
+                    job_obj.gcode = f.read()
+            except IOError:
+                return "fail"
+
+            if job_obj.gcode_parse(force_parsing=force_parsing) == "fail":
+                app_obj.inform.emit('[ERROR_NOTCL] %s' % _("This is not GCODE"))
+                return "fail"
+            job_obj.create_geometry()
+
+        return self.open_file('cncjob', filename, outname, from_tcl, obj_init)
+
+    def open_project(self, filename, run_from_arg=None, plot=False, cli=None, from_tcl=False):
+        """
+        Loads a project, in place of the objects of the engine; as MenuFileHandlers.open_project().
+        """
+        from appCommon.ProjectArchive import ProjectArchive
+
+        if from_tcl and not os.path.isfile(filename):
+            # the file may be in the Tcl path
+            filename = self.defaults['global_tcl_path'] + '/' + filename.split('/')[-1].split('\\')[-1]
+
+        try:
+            project_options, objs = ProjectArchive.read(filename)
+        except Exception as e:
+            self.app.log.error("Failed to open project file: %s with error: %s" % (filename, str(e)))
+            self.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open project file"), filename))
+            return 'fail'
+
+        self.on_file_new(cli=cli)
+        self.app.options.update(project_options)
+
+        for obj_kind, obj_name, obj_data in objs:
+            def obj_init(obj_inst, app_inst):
+                try:
+                    obj_inst.from_dict(obj_data())
+                except Exception as erro:
+                    app_inst.log.error('HeadlessFileHandlers.open_project() --> ' + str(erro))
+                    return 'fail'
+
+            self.app.app_obj.new_object(obj_kind, obj_name, obj_init, plot=False)
+
+        self.app.file_opened.emit("project", filename)
+        self.inform.emit('[success] %s: %s' % (_("Project loaded from"), filename))
+
+    def save_project(self, filename, quit_action=False, silent=False, from_tcl=False):
+        """
+        Saves the objects of the engine in a Project archive; as MenuFileHandlers.save_project(), only the objects
+        that changed since the last save are encoded again.
+        """
+        from appCommon.ProjectArchive import ProjectArchive
+
+        if self.defaults["global_save_compressed"] is True:
+            compression = ProjectArchive.default_compression()
+        else:
+            compression = 'none'
+
+        try:
+            ProjectArchive.save(filename,
+                                objs=[obj.project_entry() for obj in self.app.collection.get_list()],
+                                options=dict(self.app.options),
+                                version=self.app.version,
+                                compression=compression,
+                                level=int(self.defaults['global_compression_level']),
+                                journal=self.app.project_journal)
+            verified = ProjectArchive(filename).verify()
+        except Exception as e:
+            self.app.log.error("HeadlessFileHandlers.save_project() --> %s" % str(e))
+            self.app.shell.raise_tcl_error('%s: %s' % (_("Failed to save project file"), filename))
+            return
+
+        if not verified:
+            self.app.shell.raise_tcl_error('%s: %s' % (_("Failed to verify project file"), filename))
+        self.app.file_saved.emit("project", filename)
+        if silent is False:
+            self.inform.emit('[success] %s: %s' % (_("Project saved to"), filename))
+
+    def export_svg(self, obj_name, filename, scale_stroke_factor=0.00):
+        obj = self.app.collection.get_by_name(str(obj_name))
+        if obj is None:
+            return 'fail'
+
+        with open(filename, 'w') as fp:
+            fp.write(obj.export_svg_document(scale_stroke_factor=scale_stroke_factor))
+
+        self.app.file_saved.emit("SVG", filename)
+        self.inform.emit('[success] %s: %s' % (_("SVG file exported to"), filename))
+
+    def export_dxf(self, obj_name, filename, local_use=None, use_thread=False):
+        obj = self.app.collection.get_by_name(str(obj_name)) if local_use is None else local_use
+        if obj is None:
+            return 'fail'
+
+        dxf_code = obj.export_dxf()
+        if local_use is not None:
+            return dxf_code
+        if dxf_code is None:
+            self.inform.emit('[WARNING_NOTCL] %s' % _('Could not export.'))
+            return 'fail'
+
+        dxf_code.saveas(filename)
+        self.app.file_saved.emit("DXF", filename)
+        self.inform.emit('[success] %s: %s' % (_("DXF file exported to"), filename))
+
+    def on_file_new(self, cli=None):
+        self.app.collection.delete_all()
+        self.app.buffer_cache.clear()
+        self.app.project_journal.clear()
+
+    # the Gerber and Excellon file code is made in the MenuFileHandlers of the App
+    def export_gerber(self, obj_name, filename, local_use=None, use_thread=True, step_repeat=None):
+        self.app.not_available(_("Export Gerber"))
+
+    def export_excellon(self, obj_name, filename, local_use=None, use_thread=True):
+        self.app.not_available(_("Export Excellon"))
+
+
+class HeadlessShell:
+    """
+    The Tcl interpreter of the HeadlessApp, with the commands of the FlatCAM shell. The output of the commands and
+    of the Tcl puts is kept in self.output.
+    """
+
+    class TclErrorException(Exception):
+        pass
+
+    # the safe interpreter where the code runs when it is not trusted
+    safe_interp = 'job'
+
+    def __init__(self, app, echo=False, safe=False):
+        """
+        :param app:     the HeadlessApp
+        :param echo:    if True the output is printed, too
+        :param safe:    if True the code runs in a safe Tcl interpreter, without exec, open, file, socket, source,
+                        load and cd; the FlatCAM commands are there as aliases
+        """
+        import tclCommands
+
+        self.app = app
+        self.echo = echo
+        self.safe = safe
+        self.output = []
+
+        self.tcl_commands_storage = {}
+        tclCommands.register_all_commands(self.app, self.tcl_commands_storage)
+
+        self.tcl = tk.Tcl()
+        for cmd in self.tcl_commands_storage:
+            self.tcl.createcommand(cmd, self.tcl_commands_storage[cmd]['fcn'])
+
+        # the Tcl puts to stdout goes to the output
+        self.tcl.createcommand('headless_output', lambda text: self.append_output(text + '\n'))
+
+        if self.safe:
+            self.tcl.call('interp', 'create', '-safe', self.safe_interp)
+            for cmd in list(self.tcl_commands_storage) + ['headless_output']:
+                self.tcl.call('interp', 'alias', self.safe_interp, cmd, '', cmd)
+
+        self.eval('''
+            rename puts original_puts
+            proc puts {args} {
+                if {[llength $args] == 1} {
+                    headless_output [lindex $args 0]
+                } else {
+                    eval original_puts $args
+                }
+            }
+            ''')
+
+    def eval(self, text):
+        """
+        :param text:    Tcl code, run in the safe interpreter if the shell is safe
+        :return:        the result of the Tcl code
+        """
+        if not self.safe:
+            return self.tcl.eval(text)
+
+        self.tcl.setvar('headless_script', text)
+        return self.tcl.eval('interp eval %s $headless_script' % self.safe_interp)
+
+    def setvar(self, name, value):
+        """
+        Sets a variable of the scripts.
+        """
+        if not self.safe:
+            self.tcl.setvar(name, value)
+        else:
+            self.tcl.call('interp', 'eval', self.safe_interp, ('set', name, value))
+
+    def exec_command(self, text, no_echo=False):
+        """
+        :param text:        Tcl code
+        :param no_echo:     if True the result is not added to the output
+        :return:            the result of the Tcl code
+        """
+        try:
+            result = self.eval(str(text))
+        except tk.TclError:
+            error_info = self.tcl.eval("set errorInfo")
+            self.app.log.error("Exception on Tcl Command execution: %s" % error_info)
+            self.append_error('ERROR Report: ' + error_info + '\n')
+            raise
+
+        if result != 'None' and result != '' and no_echo is False:
+            self.append_output(result + '\n')
+        return result
+
+    def append_output(self, text):
+        self.output.append(text)
+        if self.echo:
+            sys.stdout.write(text)
+
+    append_raw = append_output
+
+    def append_error(self, text):
+        self.output.append(text)
+        if self.echo:
+            sys.stderr.write(text)
+
+    def raise_tcl_unknown_error(self, unknown_exception):
+        if not isinstance(unknown_exception, self.TclErrorException):
+            self.raise_tcl_error("Unknown error: %s" % str(unknown_exception))
+        else:
+            raise unknown_exception
+
+    def display_tcl_error(self, error, error_info=None):
+        """
+        Passes the error to the Tcl interpreter, as FCShell.display_tcl_error() does.
+        """
+        if isinstance(error, Exception):
+            exc_type, exc_value, exc_traceback = error_info
+            if not isinstance(error, self.TclErrorException) or \
+                    int(self.app.defaults['global_verbose_error_level']) > 0:
+                trc = traceback.format_list(traceback.extract_tb(exc_traceback))
+                text = "%s\nPython traceback: %s\n%s" % (
+                    exc_value, exc_type, "\n".join(a.replace("    ", " > ").replace("\n", "") for a in reversed(trc)))
+            else:
+                text = "%s" % error
+        else:
+            text = error
+
+        text = text.replace('[', '\\[').replace('"', '\\"')
+        self.tcl.eval('return -code error "%s"' % text)
+
+    def raise_tcl_error(self, text):
+        self.display_tcl_error(text)
+        raise self.TclErrorException(text)
+
+    def open_processing(self, detail=None):
+        pass
+
+    def close_processing(self):
+        pass
+
+    def command_line(self):
+        return NoOp()
+
+
+class HeadlessApp:
+    """
+    The FlatCAM application without the GUI: the objects, the defaults and the Tcl commands, with no Qt widgets, no
+    plot canvas and no event loop. The commands run synchronously in the calling thread, the objects are in a
+    HeadlessCollection and the messages go to the log.
+    """
+
+    decimals = 4
+    is_legacy = False
+    cmd_line_headless = 1
+    # the Tcl commands run synchronously
+    cmd_line_headless_engine = True
+    version = appVersion.version
+    version_date = appVersion.version_date
+    beta = appVersion.beta
+
+    def __init__(self, defaults_file=None, echo=False, safe=False):
+        """
+        :param defaults_file:   file with the defaults, as saved by the application; the factory defaults if None
+        :param echo:            if True the messages and the output of the commands are printed
+        :param safe:            if True the Tcl code runs in a safe interpreter (HeadlessShell), for the code that is
+                                not trusted
+        """
+        from appCommon.BufferCache import BufferCache
+        from appWorkerStack import task_cancelled
+
+        self.task_cancelled = task_cancelled
+        self.log = log
+        self.echo = echo
+        self.safe = safe
+
+        # Signals, called synchronously
+        for signal_name in ('inform', 'inform_shell', 'file_opened', 'object_status_changed', 'thread_exception',
+                            'shell_command_finished', 'file_saved', 'plots_updated', 'replot_signal'):
+            setattr(self, signal_name, Signal())
+        self.inform.connect(self.on_inform)
+        self.inform_shell.connect(self.on_inform)
+
+        self.defaults = FlatCAMDefaults(beta=self.beta, version=self.version)
+        if defaults_file is not None:
+            self.defaults.load(filename=defaults_file, inform=self.inform)
+        # what reset() goes back to
+        self.initial_defaults = dict(self.defaults)
+        self.options = dict(self.defaults)
+        self.set_decimals()
+
+        self.abort_all_flag = False
+        self.should_we_save = False
+        self.myKeywords = []
+        self.main_thread = None
+
+        # the preprocessors of the package, whatever the current directory is, and the ones of the user; they are
+        # loaded once in a process
+        from appPreProcessor import load_preprocessors, preprocessors
+        package_path = os.path.dirname(os.path.realpath(__file__))
+        if sys.platform == 'win32':
+            self.data_path = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'FlatCAM')
+        else:
+            self.data_path = os.path.join(os.path.expanduser('~'), '.FlatCAM')
+        if not preprocessors:
+            if os.path.realpath(os.getcwd()) != package_path:
+                data_path, self.data_path = self.data_path, package_path
+                load_preprocessors(self)
+                self.data_path = data_path
+            load_preprocessors(self)
+        self.preprocessors = preprocessors
+
+        self.proc_container = HeadlessProcessContainer()
+        self.plotcanvas = HeadlessCanvas()
+        self.ui = NoOp()
+        self.buffer_cache = BufferCache()
+        self.collection = HeadlessCollection(self)
+        # the blobs of the last project save, for the next one
+        self.project_journal = {}
+        self._exc_areas = None
+        self.app_obj = HeadlessAppObject(self)
+        self.f_handlers = HeadlessFileHandlers(self)
+
+        # the apps of the FlatCAM objects before this one, set back by uninstall()
+        self.previous_apps = None
+        self.install()
+
+        self.shell = HeadlessShell(self, echo=echo, safe=safe)
+        self.tcl_commands_list = list(self.shell.tcl_commands_storage)
+
+    def set_decimals(self):
+        self.decimals = int(self.defaults['decimals_metric']) if self.defaults['units'] == 'MM' else \
+            int(self.defaults['decimals_inch'])
+
+    def reset(self):
+        """
+        Goes back to the state after the start, for the next job: no objects, the defaults as they were loaded and a
+        new Tcl interpreter, with no variables and procedures of the previous scripts.
+        """
+        self.f_handlers.on_file_new(cli=True)
+        self.defaults.update(self.initial_defaults)
+        self.options = dict(self.defaults)
+        self.set_decimals()
+        self.abort_all_flag = False
+
+        self.shell = HeadlessShell(self, echo=self.echo, safe=self.safe)
+
+    def install(self):
+        """
+        Makes this the app of the FlatCAM objects and of camlib, until uninstall(). The apps they had are kept and
+        uninstall() sets them back.
+        """
+        from camlib import Geometry
+        from appObjects.FlatCAMObj import FlatCAMObj
+        from appTool import AppTool
+
+        if self.previous_apps is None:
+            # not all of them have an app before one is set
+            self.previous_apps = [(cls, 'app' in cls.__dict__, cls.__dict__.get('app'))
+                                  for cls in (FlatCAMObj, Geometry, AppTool)]
+        for cls, __, __ in self.previous_apps:
+            cls.app = self
+
+    def uninstall(self):
+        """
+        Gives the FlatCAM objects and camlib back the apps they had before install().
+        """
+        if self.previous_apps is None:
+            return
+        for cls, had_app, app in self.previous_apps:
+            if had_app:
+                cls.app = app
+            elif 'app' in cls.__dict__:
+                del cls.app
+        self.previous_apps = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+    @property
+    def exc_areas(self):
+        # made when a command asks for it: no exclusion areas are drawn so the storage stays empty, and the shape
+        # collection of the areas loads VisPy
+        if self._exc_areas is None:
+            from appCommon.Common import ExclusionAreas
+            self._exc_areas = ExclusionAreas(app=self)
+        return self._exc_areas
+
+    @property
+    def abort_flag(self):
+        return self.abort_all_flag or self.task_cancelled()
+
+    @abort_flag.setter
+    def abort_flag(self, value):
+        self.abort_all_flag = value
+
+    def on_inform(self, msg, shell_echo=True):
+        log.info(msg)
+        if self.echo:
+            print(msg)
+
+    @property
+    def worker_task(self):
+        # the tasks run at once, in the calling thread
+        return self
+
+    def emit(self, task):
+        task['fcn'](*task['params'])
+
+    def dec_format(self, val, dec=None):
+        dec = dec if dec is not None else self.decimals
+        return float('%.*f' % (dec, val))
+
+    def exec_command(self, text):
+        """
+        :param text:    Tcl code, like the lines of a script
+        :return:        the result of the Tcl code
+        """
+        return self.shell.exec_command(text)
+
+    def run(self, command, *args, **options):
+        """
+        Runs a Tcl command with Python values.
+
+        :param command:     the name of the command, e.g. 'isolate'
+        :param args:        the values of the arguments
+        :param options:     the values of the options, by name
+        :return:            the output of the command
+        """
+        if command not in self.shell.tcl_commands_storage:
+            raise KeyError("Unknown command: %s" % command)
+
+        tcl_args = [str(arg) for arg in args]
+        for key, val in options.items():
+            tcl_args += ['-%s' % key, str(val)]
+        return self.shell.tcl_commands_storage[command]['fcn'](*tcl_args)
+
+    def run_script(self, filename, shellvar=None):
+        """
+        :param filename:    the Tcl script
+        :param shellvar:    comma separated values set in the 'shellvar_<n>' Tcl variables of the script; the
+                            Python literals are set as their values, as the App does, e.g. 'C:\\path' as C:\\path
+        :return:            the result of the script
+        """
+        if shellvar:
+            for idx, val in enumerate(str(shellvar).split(',')):
+                try:
+                    val = ast.literal_eval(val)
+                except (ValueError, SyntaxError):
+                    pass
+                # if there are Windows paths then replace the path separator with a Unix like one
+                val = str(val).replace('\\', '/') if sys.platform == 'win32' else str(val)
+                self.shell.setvar('shellvar_%d' % idx, val)
+
+        with open(filename, 'r') as f:
+            script = f.read()
+        return self.exec_command(script)
+
+    def not_available(self, feature):
+        """
+        Fails the running Tcl command with an error that names the feature the headless engine does not have.
+
+        :param feature: the name of the tool or of the file handler
+        """
+        self.shell.raise_tcl_error('%s: %s %s' % (feature, _("Not available in the headless engine."),
+                                                  _("Run the script in the FlatCAM GUI.")))
+
+    # the tools that have a GUI are not made by the headless engine
+    @property
+    def ncclear_tool(self):
+        return self.not_available(_("NCC Tool"))
+
+    @property
+    def paint_tool(self):
+        return self.not_available(_("Paint Tool"))
+
+    def on_set_zero_click(self, event, location=None, noplot=False, use_thread=True):
+        x, y = location if location is not None else (0, 0)
+        for obj in self.collection.get_list():
+            obj.offset((-x, -y))
+            obj.options['xmin'], obj.options['ymin'], obj.options['xmax'], obj.options['ymax'] = obj.bounds()
+
+    def on_delete(self, force_deletion=False):
+        for obj in self.collection.get_selected():
+            self.collection.delete_by_name(obj.options['name'])
+
+    def plot_all(self, fit_view=True, muted=False, use_thread=True):
+        pass
+
+    def on_plots_updated(self):
+        pass
+
+    def quit_application(self):
+        pass
+
+    def save_project(self, filename, quit_action=False, silent=False, from_tcl=False):
+        self.f_handlers.save_project(filename, quit_action=quit_action, silent=silent, from_tcl=from_tcl)
+
+    def version_check(self):
+        pass
+
+
+def run_job(job):
+    """
+    Runs a Tcl script in a new HeadlessApp; the function of the processes of run_scripts().
+
+    :param job:     the filename of the script and the shellvar values
+    :return:        dictionary with the 'script', 'status' ('done' or 'fail'), 'output', 'error', 'time' and the names
+                    of the objects
+    """
+    filename, shellvar = job
+    t0 = time.time()
+    result = {'script': filename, 'status': 'done', 'output': [], 'error': None, 'objects': []}
+    try:
+        with HeadlessApp() as engine:
+            try:
+                engine.run_script(filename, shellvar=shellvar)
+            finally:
+                result['output'] = engine.shell.output
+                result['objects'] = engine.collection.get_names()
+    except Exception as e:
+        result['status'] = 'fail'
+        result['error'] = str(e)
+    result['time'] = time.time() - t0
+    return result
+
+
+def run_scripts(filenames, processes=1, shellvar=None):
+    """
+    Runs each Tcl script in its own HeadlessApp, in parallel in a pool of processes.
+
+    :param filenames:   the Tcl scripts
+    :param processes:   the number of processes; with 1 the scripts are run in this process, one after the other
+    :param shellvar:    comma separated values set in the 'shellvar_<n>' Tcl variables of the scripts
+    :return:            the results of run_job(), in the order of the scripts
+    """
+    jobs = [(filename, shellvar) for filename in filenames]
+    if processes <= 1 or len(jobs) <= 1:
+        return [run_job(job) for job in jobs]
+
+    with Pool(processes=min(processes, len(jobs))) as pool:
+        return pool.map(run_job, jobs)
+
+
+def headless_script(argv):
+    """
+    The script of a FlatCAM command line that needs no GUI: --headless=1 with a --shellfile, with no job server and no
+    files to open.
+
+    :param argv:    the arguments of the FlatCAM command line, without the program
+    :return:        the shellfile and the shellvar values, or None if the command line is for the App
+    """
+    try:
+        cmd_line_options, args = getopt.getopt(argv, "h:", ["shellfile=", "shellvar=", "headless=", "job_server=",
+                                                            "multiprocessing-fork="])
+    except getopt.GetoptError:
+        return None
+
+    # the job server listens for the clients in the App
+    options = dict(cmd_line_options)
+    if options.get('--headless', '').strip() != '1' or not options.get('--shellfile') or args or \
+            '-h' in options or '--job_server' in options:
+        return None
+    return options['--shellfile'], options.get('--shellvar')
+
+
+def run_shellfile(filename, shellvar=None):
+    """
+    Runs the script of a FlatCAM command line started with --headless=1 in a HeadlessApp, with its output on stdout.
+
+    :param filename:    the Tcl script
+    :param shellvar:    comma separated values set in the 'shellvar_<n>' Tcl variables of the script
+    :return:            the exit status: 0 if the script is done, 2 if it fails, as the App exits
+    """
+    with HeadlessApp(echo=True) as engine:
+        try:
+            engine.run_script(filename, shellvar=shellvar)
+        except Exception as e:
+            print("ERROR: ", e, file=sys.stderr)
+            return 2
+    return 0
+
+
+def main(argv):
+    help_text = "appHeadless.py [--jobs=<processes>] [--shellvar=<1,'C:\\path',23>] script1.tcl [script2.tcl ...]"
+    try:
+        cmd_line_options, scripts = getopt.getopt(argv, "h", ["jobs=", "shellvar="])
+    except getopt.GetoptError:
+        print(help_text)
+        return 2
+
+    processes = 1
+    shellvar = None
+    for opt, arg in cmd_line_options:
+        if opt == '-h':
+            print(help_text)
+            return 0
+        elif opt == '--jobs':
+            processes = int(arg) if int(arg) > 0 else os.cpu_count()
+        elif opt == '--shellvar':
+            shellvar = arg
+
+    if not scripts:
+        print(help_text)
+        return 2
+
+    status = 0
+    for result in run_scripts(scripts, processes=processes, shellvar=shellvar):
+        for line in result['output']:
+            sys.stdout.write(line)
+        print('%s: %s in %.2f s' % (result['script'], result['status'], result['time']))
+        if result['status'] != 'done':
+            print(result['error'], file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
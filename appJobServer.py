@@ -0,0 +1,408 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+"""
+The job server: the clients send Tcl scripts or JSON job specs over the connection of the listener of the App
+(ArgsThread) and the jobs run in a pool of worker processes. Each process starts a HeadlessApp once and reuses it,
+after a reset, for the next jobs. The progress and the timings of each job are sent back to its client.
+
+    FlatCAM.py --headless=1 --job_server=<processes>
+    python appJobServer.py [--jobs=<processes>] [--address=<socket or pipe>]
+
+A job is a dict, or its JSON text:
+
+    {"id": "board1", "script": "open_gerber /boards/b1/top.gbr -outname top\\nisolate top -dia 0.2"}
+    {"id": "board2", "script_file": "/boards/b2/job.tcl", "shellvar": "b2,0.2"}
+    {"id": "board3", "steps": [
+        ["open_gerber", "/boards/b3/top.gbr", {"outname": "top"}],
+        ["isolate", "top", {"dia": 0.2, "passes": 2}],
+        ["cncjob", "top_iso", {"dia": 0.2, "z_cut": -0.1, "z_move": 2, "feedrate": 100}],
+        ["write_gcode", "top_iso_cnc", "/boards/b3/top.nc"]]}
+
+The events of a job are dicts with its 'job' id and the 'event': 'queued', 'started' (with the 'wait' in the queue),
+'step' (after each command, with 'step', 'steps', 'command' and its 'time') and at the end 'done' or 'failed', with the
+'output', the 'objects', the 'error', the 'wait' and the run 'time'. A client sends 'stats' for the state of the server
+and 'close' when it is finished; the events of its jobs are sent until they are all finished.
+
+The listener is a socket in a directory of the user (a pipe with the name of the user on Windows) and the clients have
+to know its key, a random token in a file only the user can read (server_authkey()). The jobs run in a safe Tcl
+interpreter, with the FlatCAM commands but without exec, open, file, source or socket.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import Listener, Client, AuthenticationError
+import multiprocessing
+import simplejson as json
+import itertools
+import threading
+import getpass
+import getopt
+import secrets
+import socket
+import stat
+import tempfile
+import time
+import sys
+import os
+
+import logging
+
+from appJobWorker import init_worker, run_job
+
+log = logging.getLogger('base')
+
+
+def user_dir():
+    """
+    :return:    the directory of the socket and of the key of the listener; only the user can use it
+    """
+    if sys.platform == 'win32':
+        path = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'FlatCAM')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    path = os.path.join(base, 'FlatCAM-%d' % os.getuid())
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    # in a shared directory someone else may have made it first
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError("The directory %s is not private to the user." % path)
+    return path
+
+
+def server_address():
+    """
+    :return:    (address, family) of the listener of the App and of the job server: a socket in the directory of
+                the user or, on Windows, a pipe with the name of the user
+    """
+    if sys.platform == 'win32':
+        return r'\\.\pipe\FlatCAM-%s' % getpass.getuser(), 'AF_PIPE'
+    return os.path.join(user_dir(), 'ipc'), 'AF_UNIX'
+
+
+def server_authkey():
+    """
+    The clients have to know the key to connect, so only the processes of the user can send the (pickled) messages.
+
+    :return:    the key of the listener: a random token in a file only the user can read, made the first time
+    """
+    filename = os.path.join(user_dir(), 'job_server.key')
+    try:
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # it may be written by another process just now
+        for attempt in range(50):
+            with open(filename, 'rb') as f:
+                key = f.read()
+            if key:
+                return key
+            time.sleep(0.01)
+        raise ValueError("The key file %s is empty." % filename)
+
+    key = secrets.token_hex(32).encode('ascii')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+class Job:
+
+    def __init__(self, key, spec, client):
+        self.key = key
+        self.id = spec.get('id', key)
+        self.spec = spec
+        self.client = client
+        self.submitted = time.time()
+        self.started = None
+
+
+class JobClient:
+    """
+    A connection to a client. The events are sent from the threads of the server so they are sent one at a time.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.finished = threading.Condition()
+
+    def send(self, event):
+        with self.lock:
+            try:
+                self.conn.send(event)
+            except (OSError, EOFError):
+                # the client is gone; its jobs run to the end
+                pass
+
+    def add_job(self):
+        with self.finished:
+            self.pending += 1
+
+    def job_finished(self):
+        with self.finished:
+            self.pending -= 1
+            self.finished.notify_all()
+
+    def wait(self):
+        with self.finished:
+            self.finished.wait_for(lambda: self.pending == 0)
+
+
+class JobServer:
+    """
+    Runs the jobs of the clients in a pool of worker processes. A process starts the FlatCAM engine once, so a job
+    pays only for its own work. The processes are started with 'spawn' so they do not inherit the Qt state of the App;
+    if one of them dies the jobs it had are failed and a new pool is made for the next ones.
+    """
+
+    def __init__(self, processes=None, defaults_file=None):
+        """
+        :param processes:       the most jobs that run at the same time; the number of CPUs if None
+        :param defaults_file:   the defaults of the engines; the factory defaults if None
+        """
+        self.processes = processes if processes else (os.cpu_count() or 1)
+        self.defaults_file = defaults_file
+
+        self.context = multiprocessing.get_context('spawn')
+        self.executor = None
+        self.lock = threading.Lock()
+
+        self.jobs = {}                      # {key: Job}
+        self.keys = itertools.count(1)
+        self.counters = {'done': 0, 'failed': 0}
+
+        # the events of the workers and the ends of the jobs, in the order they happen
+        self.events = self.context.SimpleQueue()
+        self.reader = threading.Thread(target=self.read_events, daemon=True)
+        self.reader.start()
+
+    def pool(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=self.context,
+                                                    initializer=init_worker,
+                                                    initargs=(self.events, self.defaults_file))
+            return self.executor
+
+    def submit(self, spec, client):
+        """
+        :param spec:    the job, a dict or its JSON text
+        :param client:  the JobClient that gets the events of the job
+        :return:        the id of the job
+        """
+        key = next(self.keys)
+        try:
+            if isinstance(spec, str):
+                spec = json.loads(spec)
+            if not any(k in spec for k in ('script', 'script_file', 'steps')):
+                raise ValueError("A job needs a 'script', a 'script_file' or 'steps'.")
+        except Exception as e:
+            job_id = spec.get('id', key) if isinstance(spec, dict) else key
+            with self.lock:
+                self.counters['failed'] += 1
+            client.send({'job': job_id, 'event': 'failed', 'error': str(e)})
+            return job_id
+
+        job = Job(key, spec, client)
+        with self.lock:
+            self.jobs[key] = job
+        client.add_job()
+        client.send({'job': job.id, 'event': 'queued', 'jobs': len(self.jobs)})
+
+        for attempt in range(2):
+            executor = self.pool()
+            try:
+                future = executor.submit(run_job, key, spec)
+            except BrokenProcessPool:
+                self.drop_pool(executor)
+                continue
+            future.add_done_callback(lambda f, j=job, e=executor: self.on_job_done(j, e, f))
+            break
+        else:
+            self.events.put((key, {'status': 'failed', 'error': "The worker processes can not be started."}))
+        return job.id
+
+    def drop_pool(self, executor):
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False)
+
+    def on_job_done(self, job, executor, future):
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            result = {'status': 'failed', 'error': "The worker process ended abruptly."}
+            self.drop_pool(executor)
+        except Exception as e:
+            result = {'status': 'failed', 'error': str(e)}
+
+        # after the events the worker put in the queue
+        self.events.put((job.key, result))
+
+    def read_events(self):
+        while True:
+            key, event = self.events.get()
+            if key is None:
+                break
+
+            with self.lock:
+                job = self.jobs.get(key)
+            if job is None:
+                continue
+
+            if 'status' in event:
+                self.finish(job, event)
+                continue
+
+            if event['event'] == 'started':
+                job.started = time.time()
+                event['wait'] = job.started - job.submitted
+            job.client.send(dict(job=job.id, **event))
+
+    def finish(self, job, result):
+        with self.lock:
+            self.jobs.pop(job.key, None)
+            self.counters['done' if result['status'] == 'done' else 'failed'] += 1
+
+        event = {'job': job.id, 'event': result['status'], 'wait': (job.started or time.time()) - job.submitted}
+        event.update((k, v) for k, v in result.items() if k != 'status')
+        job.client.send(event)
+        job.client.job_finished()
+
+    def stats(self):
+        """
+        :return:    the number of the processes, of the jobs that wait and run and of the finished ones
+        :rtype:     dict
+        """
+        with self.lock:
+            running = sum(1 for job in self.jobs.values() if job.started is not None)
+            stats = {
+                'processes': self.processes,
+                'queued': len(self.jobs) - running,
+                'running': running,
+            }
+            stats.update(self.counters)
+            return stats
+
+    def serve(self, conn, on_args=None):
+        """
+        Serves a client until it sends 'close' and its jobs are finished, or until it is gone.
+
+        :param conn:        the connection of the client
+        :param on_args:     function for the command line arguments sent by a new launch of the App
+        """
+        client = JobClient(conn)
+        try:
+            while True:
+                msg = conn.recv()
+                if msg == 'close':
+                    client.wait()
+                    break
+                elif msg == 'stats':
+                    client.send(dict(event='stats', **self.stats()))
+                elif isinstance(msg, (dict, str)):
+                    self.submit(msg, client)
+                elif on_args is not None:
+                    on_args(msg)
+        except (EOFError, OSError) as e:
+            log.debug("JobServer.serve() --> %s" % str(e))
+        conn.close()
+
+    def accept(self, conn, on_args=None):
+        """
+        Serves a client in its own thread, so the clients do not wait for each other.
+        """
+        threading.Thread(target=self.serve, args=(conn, on_args), daemon=True).start()
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        self.events.put((None, None))
+
+
+def run_jobs(jobs, address=None, authkey=None):
+    """
+    Sends jobs to a job server and yields their events until all of them are finished.
+
+    :param jobs:        the jobs, dicts or JSON texts
+    :param address:     (address, family) of the listener of the server; the one of the user if None
+    :param authkey:     the key of the listener; the one of the user if None
+    :return:            generator of the events
+    """
+    conn = Client(*(address or server_address()), authkey=authkey or server_authkey())
+    try:
+        for job in jobs:
+            conn.send(job)
+
+        remaining = len(jobs)
+        while remaining:
+            event = conn.recv()
+            yield event
+            if event['event'] in ('done', 'failed'):
+                remaining -= 1
+        conn.send('close')
+    finally:
+        conn.close()
+
+
+def main(argv):
+    help_text = "appJobServer.py [--jobs=<processes>] [--address=<socket or pipe>] [--defaults=<defaults file>]"
+    try:
+        cmd_line_options, args = getopt.getopt(argv, "h", ["jobs=", "address=", "defaults="])
+    except getopt.GetoptError:
+        print(help_text)
+        return 2
+
+    processes = None
+    listener_address = None
+    defaults_file = None
+    for opt, arg in cmd_line_options:
+        if opt == '-h':
+            print(help_text)
+            return 0
+        elif opt == '--jobs':
+            processes = int(arg) if int(arg) > 0 else None
+        elif opt == '--address':
+            listener_address = (arg, None)
+        elif opt == '--defaults':
+            defaults_file = arg
+
+    if listener_address is None:
+        listener_address = server_address()
+    try:
+        listener = Listener(*listener_address, authkey=server_authkey())
+    except socket.error as e:
+        print("The address %s is in use: %s" % (listener_address[0], str(e)), file=sys.stderr)
+        return 1
+
+    server = JobServer(processes=processes, defaults_file=defaults_file)
+    print("FlatCAM job server on %s with %d processes" % (listener_address[0], server.processes))
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                # a client with a wrong key or one gone in the handshake
+                log.debug("appJobServer.main() --> %s" % str(e))
+                continue
+            server.accept(conn)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
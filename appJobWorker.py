@@ -0,0 +1,116 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+"""
+The worker processes of the job server (appJobServer): each one starts a HeadlessApp once and runs the jobs it is
+given in it, after a reset. The processes are started with 'spawn': they import this module and the engine, not the
+App and its GUI, so the main module of the server (FlatCAM.py) must not import them when it is not run as __main__.
+"""
+
+import time
+import os
+
+import logging
+
+log = logging.getLogger('base')
+
+# the HeadlessApp of the worker process and the queue of the events
+engine = None
+events = None
+
+
+def init_worker(queue, defaults_file=None):
+    """
+    The initializer of the worker processes: starts the engine, with a safe Tcl interpreter for the jobs.
+
+    :param queue:           where the events of the jobs are put
+    :param defaults_file:   the defaults of the engine; the factory defaults if None
+    """
+    global engine, events
+
+    from appHeadless import HeadlessApp
+    engine = HeadlessApp(defaults_file=defaults_file, safe=True)
+    events = queue
+
+
+def split_script(tcl, script):
+    """
+    :param tcl:     Tcl interpreter
+    :param script:  Tcl code
+    :return:        the commands of the script, without the comments; a command can span more lines
+    """
+    commands = []
+    chunk = ''
+    for line in script.splitlines():
+        chunk += line + '\n'
+        if tcl.getboolean(tcl.call('info', 'complete', chunk)):
+            if chunk.strip() and not chunk.strip().startswith('#'):
+                commands.append(chunk.strip())
+            chunk = ''
+    if chunk.strip():
+        # an incomplete command; Tcl reports the error
+        commands.append(chunk.strip())
+    return commands
+
+
+def job_commands(spec):
+    """
+    :param spec:    the job
+    :return:        list of (name, function) for the commands of the job
+    """
+    if 'steps' in spec:
+        commands = []
+        for step in spec['steps']:
+            if isinstance(step, str):
+                commands.append((step.split(maxsplit=1)[0], lambda text=step: engine.exec_command(text)))
+            else:
+                args = list(step[1:])
+                options = args.pop() if args and isinstance(args[-1], dict) else {}
+                commands.append((step[0], lambda cmd=step[0], a=args, o=options: engine.run(cmd, *a, **o)))
+        return commands
+
+    if 'script_file' in spec:
+        with open(spec['script_file'], 'r') as f:
+            script = f.read()
+    else:
+        script = spec['script']
+    return [(text.split(maxsplit=1)[0], lambda text=text: engine.exec_command(text))
+            for text in split_script(engine.shell.tcl, script)]
+
+
+def run_job(key, spec):
+    """
+    Runs a job in the HeadlessApp of the worker process. The events are put in the queue as they happen.
+
+    :param key:     the key of the job in the JobServer
+    :param spec:    the job
+    :return:        dictionary with the 'status' ('done' or 'failed'), 'output', 'objects', 'error' and 'time'
+    """
+    t0 = time.time()
+    events.put((key, {'event': 'started', 'pid': os.getpid()}))
+
+    result = {'status': 'done', 'error': None}
+    try:
+        engine.reset()
+        if spec.get('shellvar'):
+            for idx, val in enumerate(str(spec['shellvar']).split(',')):
+                engine.shell.setvar('shellvar_%d' % idx, val)
+
+        commands = job_commands(spec)
+        for idx, (name, command) in enumerate(commands):
+            t_step = time.time()
+            command()
+            events.put((key, {'event': 'step', 'step': idx + 1, 'steps': len(commands), 'command': name,
+                              'time': time.time() - t_step}))
+    except Exception as e:
+        log.debug("appJobWorker.run_job() --> %s" % str(e))
+        result['status'] = 'failed'
+        result['error'] = str(e)
+
+    result['output'] = ''.join(engine.shell.output)
+    result['objects'] = engine.collection.get_names()
+    result['time'] = time.time() - t0
+    return result
@@ -118,38 +118,10 @@ class AppObject(QtCore.QObject):
         obj.isHovering = False
         obj.notHovering = True
 
-        # IMPORTANT
-        # The key names in defaults and options dictionary's are not random:
-        # they have to have in name first the type of the object (geometry, excellon, cncjob and gerber) or how it's
-        # called here, the 'kind' followed by an underline. Above the App default values from self.defaults are
-        # copied to self.options. After that, below, depending on the type of
-        # object that is created, it will strip the name of the object and the underline (if the original key was
-        # let's say "excellon_toolchange", it will strip the excellon_) and to the obj.options the key will become
-        # "toolchange"
-
         # ############################################################################################################
         # this section copies the application defaults related to the object to the object OPTIONS
         # ############################################################################################################
-        for option in self.app.options:
-            if option.find(kind + "_") == 0:
-                oname = option[len(kind) + 1:]
-                obj.options[oname] = self.app.options[option]
-
-        # add some of the FlatCAM Tools related properties
-        if kind == 'excellon':
-            for option in self.app.options:
-                if option.find('tools_drill_') == 0 or option.find('tools_mill_') == 0:
-                    obj.options[option] = self.app.options[option]
-        if kind == 'gerber':
-            for option in self.app.options:
-                if option.find('tools_iso_') == 0:
-                    obj.options[option] = self.app.options[option]
-        if kind == 'geometry':
-            for option in self.app.options:
-                if option.find('tools_mill_') == 0:
-                    obj.options[option] = self.app.options[option]
-        # ############################################################################################################
-        # ############################################################################################################
+        obj.copy_app_options(self.app.options, kind)
 
         # Initialize as per user request
         # User must take care to implement initialize
@@ -469,7 +441,7 @@ class AppObject(QtCore.QObject):
         # Send to worker
         # self.worker.add_task(worker_task, [self])
         if plot is True:
-            self.app.worker_task.emit({'fcn': plotting_task, 'params': [obj]})
+            self.app.worker_task.emit({'fcn': plotting_task, 'params': [obj], 'priority': 'interactive'})
 
         if callback is not None:
             # callback(*callback_params)
@@ -20,6 +20,7 @@ from appObjects.FlatCAMObj import *
 from matplotlib.backend_bases import KeyEvent as mpl_key_event
 
 from camlib import CNCjob
+from appCommon.bilinearInterpolator import bilinearInterpolator
 
 from shapely.ops import unary_union
 from shapely.geometry import Point, MultiPoint, Polygon, LineString, box
@@ -34,6 +35,7 @@ except Exception:
 import os
 import sys
 import time
+import itertools
 import serial
 import glob
 import math
@@ -58,6 +60,12 @@ class CNCJobObject(FlatCAMObj, CNCjob):
 
     ui_type = CNCObjectUI
 
+    # the size in bytes of the write buffer of the exported GCode files
+    gcode_write_buffer = 1024 * 1024
+
+    # the most distances between points computed at once by the autolevelling (4M float64 values, 32 MB)
+    al_block_size = 4 * 1024 * 1024
+
     def __init__(self, name, units="in", kind="generic", z_move=0.1,
                  feedrate=3.0, feedrate_rapid=3.0, z_cut=-0.002, tooldia=0.0,
                  spindlespeed=None):
@@ -220,8 +228,10 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         self.pressed_button = None
 
         if self.app.is_legacy is False:
+            from appGUI.VisPyVisuals import ShapeCollection
             self.probing_shapes = ShapeCollection(parent=self.app.plotcanvas.view.scene, layers=1)
         else:
+            from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
             self.probing_shapes = ShapeCollectionLegacy(obj=self, app=self.app, name=name + "_probing_shapes")
 
         # Attributes to be included in serialization
@@ -1140,24 +1150,220 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         self.ui.al_frame.show() if state else self.ui.al_frame.hide()
         self.app.defaults["cncjob_al_status"] = True if state else False
 
-    def autolevell_gcode(self):
-        pass
+    def autolevell_gcode(self, chunks):
+        """
+        Applies the height map (the probed points heights) to the GCode. The moves are split in segments no longer
+        than the probing points spacing and the Z of each segment end is corrected with the height of the surface
+        in that location. The GCode is processed as it is read from the pieces, a block of lines at a time.
 
-    def autolevell_gcode_line(self, gcode_line):
-        al_method = self.ui.al_method_radio.get_value()
+        :param chunks:  iterable of GCode strings, e.g. the gcode_chunks() generator
+        :return:        generator of the autolevelled GCode blocks or None if there is no height map
+        """
+        probe_pts = [
+            (value['point'].x, value['point'].y, value['height']) for value in self.al_voronoi_geo_storage.values()
+            if 'point' in value and 'height' in value
+        ]
+        if not probe_pts:
+            return None
+        probe_pts = np.array(probe_pts, dtype=float)
+
+        al_method = self.ui.al_method_radio.get_value() if self.ui else self.app.defaults['cncjob_al_method']
+        if al_method == 'b':
+            try:
+                height_fcn = bilinearInterpolator(probe_pts).interpolate_many
+            except ValueError as err:
+                self.app.inform.emit('[ERROR_NOTCL] %s' % _("The probing points are not on a grid."))
+                log.debug("CNCJobObject.autolevell_gcode() --> %s" % str(err))
+                return None
+        else:
+            probe_grid = self.LocationsGrid(probe_pts[:, :2])
 
-        coords = ()
+            def height_fcn(xy):
+                return self.autolevell_voronoi(probe_pts, xy, grid=probe_grid)
 
-        if al_method == 'v':
-            self.autolevell_voronoi(gcode_line, coords)
-        elif al_method == 'b':
-            self.autolevell_bilinear(gcode_line, coords)
+        # the segments are no longer than the spacing between the probing points
+        step = self.al_probe_spacing(probe_pts)
 
-    def autolevell_bilinear(self, gcode_line, coords):
-        pass
+        return self.autolevell_gcode_lines(self.gcode_lines(chunks, keepends=True), height_fcn=height_fcn, step=step,
+                                           decimals=self.coords_decimals)
 
-    def autolevell_voronoi(self, gcode_line, coords):
-        pass
+    @staticmethod
+    def autolevell_gcode_lines(lines, height_fcn, step, decimals=4, block_size=65536):
+        """
+        Streams over the GCode lines and yields the autolevelled GCode, block by block. The moves of a block of lines
+        are split and their heights are found all at once.
+
+        The linear feed moves (G1) are split in segments no longer than step and each segment end gets the Z
+        corrected with the surface height. The rapid moves (G0) and the arcs (G2, G3) are corrected only in the end
+        point. The moves in relative mode (G91) are not changed.
+
+        :param lines:       GCode lines (an iterable, each line with the line ending)
+        :param height_fcn:  function taking an array of (x, y) locations and returning the surface heights
+        :param step:        the maximum length of the segments
+        :param decimals:    decimals used for the coordinates
+        :param block_size:  number of lines processed at once
+        :return:            generator of the autolevelled GCode blocks (text)
+        """
+        word_re = re.compile(r'([A-Z])\s*([+-]?(?:\d+\.?\d*|\.\d+))', re.IGNORECASE)
+        coords_re = re.compile(r'\s*[XYZ]\s*[+-]?(?:\d+\.?\d*|\.\d+)', re.IGNORECASE)
+        comment_re = re.compile(r'\(.*?\)|;.*')
+        # most of the lines are linear moves in the XY plane, as FlatCAM writes them: "G01 X1.0000Y2.0000"
+        xy_move_re = re.compile(r'(G0?([01]) ?)?X([+-]?\d*\.?\d+) ?Y([+-]?\d*\.?\d+)\s*$')
+
+        # GCodes with coordinates that are not moves in the current coordinates system
+        not_moves = {'4', '04', '10', '28', '30', '38.2', '53', '92'}
+
+        seg_fmt = 'X%.{0}fY%.{0}fZ%.{0}f'.format(decimals)
+        z_fmt = 'Z%.{0}f'.format(decimals)
+
+        # modal state
+        x = y = z = np.nan
+        motion = None
+        absolute = True
+
+        block = []
+        for line in itertools.chain(lines, [None]):
+            if line is not None:
+                block.append(line)
+                if len(block) < block_size:
+                    continue
+            if not block:
+                break
+
+            # moves of the block: line index, start and end coordinates, if it can be split and the line without
+            # the coordinates (None if it has to be found)
+            m_idx = []
+            m_coords = []
+            m_split = []
+            m_heads = []
+            for idx, gline in enumerate(block):
+                match = xy_move_re.match(gline)
+                if match and absolute:
+                    head, g_nr, new_x, new_y = match.groups()
+                    if g_nr is not None:
+                        motion = int(g_nr)
+                    if motion == 0 or motion == 1:
+                        new_x = float(new_x)
+                        new_y = float(new_y)
+                        m_idx.append(idx)
+                        m_coords += (x, y, z, new_x, new_y, z)
+                        m_split.append(motion == 1)
+                        m_heads.append(head or '')
+                        x, y = new_x, new_y
+                        continue
+
+                code = comment_re.sub('', gline) if '(' in gline or ';' in gline else gline
+                words = word_re.findall(code)
+                if not words:
+                    continue
+
+                coords = {}
+                skip = False
+                for letter, value in words:
+                    letter = letter.upper()
+                    if letter == 'G':
+                        if value in ('0', '00', '1', '01', '2', '02', '3', '03'):
+                            motion = int(value)
+                        elif value == '90':
+                            absolute = True
+                        elif value == '91':
+                            absolute = False
+                        elif value in not_moves:
+                            skip = True
+                    elif letter in 'XYZ':
+                        coords[letter] = float(value)
+
+                if skip or not coords or motion is None:
+                    continue
+
+                if absolute:
+                    new_x, new_y, new_z = coords.get('X', x), coords.get('Y', y), coords.get('Z', z)
+                    m_idx.append(idx)
+                    m_coords += (x, y, z, new_x, new_y, new_z)
+                    m_split.append(motion == 1)
+                    m_heads.append(None)
+                    x, y, z = new_x, new_y, new_z
+                else:
+                    x, y, z = x + coords.get('X', 0.0), y + coords.get('Y', 0.0), z + coords.get('Z', 0.0)
+
+            if m_idx:
+                m_coords = np.array(m_coords, dtype=float).reshape((-1, 6))
+                start = m_coords[:, :3]
+                end = m_coords[:, 3:]
+
+                # only the moves with known coordinates can be autolevelled
+                known = ~np.isnan(end).any(axis=1)
+                split = np.array(m_split) & known & ~np.isnan(start).any(axis=1)
+                start[~split] = end[~split]
+
+                seg_nr = known.astype(int)
+                if np.isfinite(step) and step > 0:
+                    length = np.hypot(end[split, 0] - start[split, 0], end[split, 1] - start[split, 1])
+                    seg_nr[split] = np.maximum(np.ceil(length / step), 1)
+
+                # the segments ends, at the fraction t of the move
+                seg_move = np.repeat(np.arange(len(seg_nr)), seg_nr)
+                seg_first = np.cumsum(seg_nr) - seg_nr
+                t = (np.arange(len(seg_move)) - seg_first[seg_move] + 1) / seg_nr[seg_move]
+                seg_pts = end[seg_move] - (end[seg_move] - start[seg_move]) * (1.0 - t)[:, None]
+                seg_pts[:, 2] += height_fcn(seg_pts[:, :2])
+
+                seg_pts = seg_pts.tolist()
+
+                for idx, head, first, nr in zip(m_idx, m_heads, seg_first.tolist(), seg_nr.tolist()):
+                    if nr == 0:
+                        continue
+
+                    gline = block[idx]
+                    eol = '\n' if gline.endswith('\n') else ''
+                    if nr == 1 and head is not None:
+                        # a simple XY move keeps its text, only the Z is added
+                        block[idx] = gline.rstrip() + z_fmt % seg_pts[first][2] + eol
+                        continue
+
+                    if head is None:
+                        head = coords_re.sub('', gline.rstrip('\r\n')).rstrip()
+                        head = head + ' ' if head else head
+
+                    # the first segment keeps the other words of the line (GCode, feedrate, ...)
+                    seg_text = [seg_fmt % tuple(pt) for pt in seg_pts[first:first + nr]]
+                    block[idx] = head + '\nG01 '.join(seg_text) + eol
+
+            yield ''.join(block)
+            block = []
+
+    @classmethod
+    def al_probe_spacing(cls, probe_pts, block_size=None):
+        """
+        The smallest distance between two probing points, not counting the duplicates.
+
+        :param probe_pts:   array of the probed points, (x, y, height)
+        :param block_size:  the most distances computed at once; al_block_size if None
+        :return:            the distance; infinite with less than two probing points
+        """
+        if len(probe_pts) < 2:
+            return np.inf
+
+        # the pairs are searched in the next cells of a grid hash of the probing points
+        return cls.LocationsGrid(probe_pts[:, :2]).spacing(block_size=block_size or cls.al_block_size)
+
+    @classmethod
+    def autolevell_voronoi(cls, probe_pts, xy, block_size=None, grid=None):
+        """
+        The Voronoi cell of a location is the cell of the nearest probing point, therefore the height of a location
+        is the height of the nearest probing point.
+
+        :param probe_pts:   array of the probed points, (x, y, height)
+        :param xy:          array of (x, y) locations
+        :param block_size:  the most distances computed at once; al_block_size if None
+        :param grid:        the LocationsGrid of the probing points, made once for many calls; made here if None
+        :return:            array of heights
+        """
+        if grid is None:
+            grid = cls.LocationsGrid(probe_pts[:, :2])
+
+        # the nearest probing point is searched in the cells around each location
+        return probe_pts[grid.nearest(xy, block_size=block_size or cls.al_block_size), 2]
 
     def on_show_al_table(self, state):
         self.ui.al_probe_points_table.show() if state else self.ui.al_probe_points_table.hide()
@@ -1873,7 +2079,18 @@ class CNCJobObject(FlatCAMObj, CNCjob):
             self.app.inform.emit('[ERROR_NOTCL] %s' % _("Empty GRBL heightmap."))
 
     def on_grbl_apply_autolevel(self):
-        # TODO here we call the autolevell method
+        # GRBL reports each probing as [PRB:x,y,z:1], in machine coordinates; the heights are stored relative to
+        # the first probing point. The height map is applied to the GCode when it is exported.
+        prb_re = re.compile(r'PRB:\s*([+-]?\d*\.?\d+),\s*([+-]?\d*\.?\d+),\s*([+-]?\d*\.?\d+)')
+        heights = [float(match.group(3)) for match in prb_re.finditer(self.grbl_probe_result)]
+        if not heights:
+            self.app.inform.emit('[ERROR_NOTCL] %s' % _("Empty GRBL heightmap."))
+            return
+
+        for pt_key, height in zip(self.al_voronoi_geo_storage, heights):
+            self.al_voronoi_geo_storage[pt_key]['height'] = height - heights[0]
+
+        self.build_al_table_sig.emit()
         self.app.inform.emit('%s' % _("Finished autolevelling."))
 
     def on_updateplot_button_click(self, *args):
@@ -2142,7 +2359,9 @@ class CNCJobObject(FlatCAMObj, CNCjob):
 
     def export_gcode(self, filename=None, preamble='', postamble='', to_file=False, from_tcl=False):
         """
-        This will save the GCode from the Gcode object to a file on the OS filesystem
+        This will save the GCode from the Gcode object to a file on the OS filesystem.
+        The GCode is written piece by piece, as gcode_chunks() makes it, into a buffered file such that the program
+        is not held in memory as a whole.
 
         :param filename:    filename for the GCode file
         :param preamble:    a custom Gcode block to be added at the beginning of the Gcode file
@@ -2151,13 +2370,6 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         :param from_tcl:    True if run from Tcl Shell
         :return:            None
         """
-        # gcode = ''
-        # roland = False
-        # hpgl = False
-        # isel_icp = False
-
-        include_header = True
-
         if preamble == '':
             preamble = self.app.defaults["cncjob_prepend"]
         if postamble == '':
@@ -2173,126 +2385,7 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         except AttributeError:
             pass
 
-        # if this dict is not empty then the object is a Geometry object
-        if self.cnc_tools:
-            first_key = next(iter(self.cnc_tools))
-            include_header = self.app.preprocessors[self.cnc_tools[first_key]['data']['ppname_g']].include_header
-
-        # if this dict is not empty then the object is an Excellon object
-        if self.exc_cnc_tools:
-            first_key = next(iter(self.exc_cnc_tools))
-            include_header = self.app.preprocessors[
-                self.exc_cnc_tools[first_key]['data']['tools_drill_ppname_e']
-            ].include_header
-
-        gcode = ''
-        if include_header is False:
-            # detect if using multi-tool and make the Gcode summation correctly for each case
-            if self.multitool is True:
-                for tooluid_key in self.cnc_tools:
-                    for key, value in self.cnc_tools[tooluid_key].items():
-                        if key == 'gcode':
-                            gcode += value
-                            break
-            else:
-                gcode += self.gcode
-
-            g = preamble + '\n' + gcode + '\n' + postamble
-        else:
-            # search for the GCode beginning which is usually a G20 or G21
-            # fix so the preamble gets inserted in between the comments header and the actual start of GCODE
-            # g_idx = gcode.rfind('G20')
-            #
-            # # if it did not find 'G20' then search for 'G21'
-            # if g_idx == -1:
-            #     g_idx = gcode.rfind('G21')
-            #
-            # # if it did not find 'G20' and it did not find 'G21' then there is an error and return
-            # if g_idx == -1:
-            #     self.app.inform.emit('[ERROR_NOTCL] %s' % _("G-code does not have a units code: either G20 or G21"))
-            #     return
-
-            # detect if using multi-tool and make the Gcode summation correctly for each case
-            if self.multitool is True:
-                if self.origin_kind == 'excellon':
-                    for tooluid_key in self.exc_cnc_tools:
-                        for key, value in self.exc_cnc_tools[tooluid_key].items():
-                            if key == 'gcode' and value:
-                                gcode += value
-                                break
-                else:
-                    for tooluid_key in self.cnc_tools:
-                        for key, value in self.cnc_tools[tooluid_key].items():
-                            if key == 'gcode' and value:
-                                gcode += value
-                                break
-            else:
-                gcode += self.gcode
-
-            end_gcode = self.gcode_footer() if self.app.defaults['cncjob_footer'] is True else ''
-
-            # detect if using a HPGL preprocessor
-            hpgl = False
-            if self.cnc_tools:
-                for key in self.cnc_tools:
-                    if 'ppname_g' in self.cnc_tools[key]['data']:
-                        if 'hpgl' in self.cnc_tools[key]['data']['ppname_g']:
-                            hpgl = True
-                            break
-            elif self.exc_cnc_tools:
-                for key in self.cnc_tools:
-                    if 'ppname_e' in self.cnc_tools[key]['data']:
-                        if 'hpgl' in self.cnc_tools[key]['data']['ppname_e']:
-                            hpgl = True
-                            break
-
-            if hpgl:
-                processed_body_gcode = ''
-                pa_re = re.compile(r"^PA\s*(-?\d+\.\d*),?\s*(-?\d+\.\d*)*;?$")
-
-                # process body gcode
-                for gline in gcode.splitlines():
-                    match = pa_re.search(gline)
-                    if match:
-                        x_int = int(float(match.group(1)))
-                        y_int = int(float(match.group(2)))
-                        new_line = 'PA%d,%d;\n' % (x_int, y_int)
-                        processed_body_gcode += new_line
-                    else:
-                        processed_body_gcode += gline + '\n'
-
-                gcode = processed_body_gcode
-                g = self.gc_header + '\n' + self.gc_start + '\n' + preamble + '\n' + \
-                    gcode + '\n' + postamble + end_gcode
-            else:
-                # try:
-                #     g_idx = gcode.index('G94')
-                #     if preamble != '' and postamble != '':
-                #         g = self.gc_header + gcode[:g_idx + 3] + '\n' + preamble + '\n' + \
-                #             gcode[(g_idx + 3):] + postamble + end_gcode
-                #     elif preamble == '':
-                #         g = self.gc_header + gcode[:g_idx + 3] + '\n' + \
-                #             gcode[(g_idx + 3):] + postamble + end_gcode
-                #     elif postamble == '':
-                #         g = self.gc_header + gcode[:g_idx + 3] + '\n' + preamble + '\n' + \
-                #             gcode[(g_idx + 3):] + end_gcode
-                #     else:
-                #         g = self.gc_header + gcode[:g_idx + 3] + gcode[(g_idx + 3):] + end_gcode
-                # except ValueError:
-                #     self.app.inform.emit('[ERROR_NOTCL] %s' %
-                #                          _("G-code does not have a G94 code.\n"
-                #                            "Append Code snippet will not be used.."))
-                #     g = self.gc_header + '\n' + gcode + postamble + end_gcode
-                g = ''
-                if preamble != '' and postamble != '':
-                    g = self.gc_header + self.gc_start + '\n' + preamble + '\n' + gcode + '\n' + \
-                        postamble + '\n' + end_gcode
-                if preamble == '':
-                    g = self.gc_header + self.gc_start + '\n' + gcode + '\n' + postamble + '\n' + end_gcode
-                if postamble == '':
-                    g = self.gc_header + self.gc_start + '\n' + preamble + '\n' + gcode + '\n' + end_gcode
-                if preamble == '' and postamble == '':
-                    g = self.gc_header + self.gc_start + '\n' + gcode + '\n' + end_gcode
+        chunks = self.gcode_chunks(preamble=preamble, postamble=postamble)
 
         # if toolchange custom is used, replace M6 code with the code from the Toolchange Custom Text box
         # if self.ui.toolchange_cb.get_value() is True:
@@ -2308,20 +2401,18 @@ class CNCJobObject(FlatCAMObj, CNCjob):
         #         g = g.replace('M6', m6_code)
         #         self.app.inform.emit('[success] %s' % _("Toolchange G-code was replaced by a custom code."))
 
-        lines = StringIO(g)
+        # apply the height map to the GCode, block by block as the pieces are written
+        if self.app.defaults["cncjob_al_status"] is True and self.al_voronoi_geo_storage and \
+                not ('Roland' in self.pp_excellon_name or 'Roland' in self.pp_geometry_name or
+                     'hpgl' in self.pp_geometry_name):
+            al_chunks = self.autolevell_gcode(chunks)
+            if al_chunks is not None:
+                chunks = al_chunks
 
         # Write
         if filename is not None:
             try:
-                force_windows_line_endings = self.app.defaults['cncjob_line_ending']
-                if force_windows_line_endings and sys.platform != 'win32':
-                    with open(filename, 'w', newline='\r\n') as f:
-                        for line in lines:
-                            f.write(line)
-                else:
-                    with open(filename, 'w') as f:
-                        for line in lines:
-                            f.write(line)
+                self.write_gcode(filename, chunks)
             except FileNotFoundError:
                 self.app.inform.emit('[WARNING_NOTCL] %s' % _("No such file or directory"))
                 return
@@ -2339,8 +2430,155 @@ class CNCJobObject(FlatCAMObj, CNCjob):
 
             self.app.inform.emit('[success] %s: %s' % (_("Saved to"), filename))
         else:
+            lines = StringIO()
+            for chunk in chunks:
+                lines.write(chunk)
+            lines.seek(0)
             return lines
 
+    def write_gcode(self, filename, chunks):
+        """
+        Writes the GCode pieces into a file, through a write buffer of gcode_write_buffer bytes. They are written to
+        a temporary file in the same folder which then replaces the file, so a failed export leaves no partial file.
+
+        :param filename:    filename for the GCode file
+        :param chunks:      iterable of GCode strings, e.g. the gcode_chunks() generator
+        :return:            None
+        """
+        force_windows_line_endings = self.app.defaults['cncjob_line_ending']
+        newline = '\r\n' if force_windows_line_endings and sys.platform != 'win32' else None
+
+        tmp_filename = filename + '.tmp'
+        try:
+            with open(tmp_filename, 'w', newline=newline, buffering=self.gcode_write_buffer) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            # whatever stopped the export, the old file is untouched
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+            raise
+
+    def gcode_chunks(self, preamble='', postamble=''):
+        """
+        Generator of the GCode pieces of the program: the header, the start code, the preamble, the GCode of each
+        tool, the postamble and the footer, in order. Joined, they are the program that is exported.
+
+        :param preamble:    a custom Gcode block to be added at the beginning of the GCode
+        :param postamble:   a custom Gcode block to be added at the end of the GCode
+        :return:            generator of GCode strings
+        """
+        include_header = True
+
+        # if this dict is not empty then the object is a Geometry object
+        if self.cnc_tools:
+            first_key = next(iter(self.cnc_tools))
+            include_header = self.app.preprocessors[self.cnc_tools[first_key]['data']['ppname_g']].include_header
+
+        # if this dict is not empty then the object is an Excellon object
+        if self.exc_cnc_tools:
+            first_key = next(iter(self.exc_cnc_tools))
+            include_header = self.app.preprocessors[
+                self.exc_cnc_tools[first_key]['data']['tools_drill_ppname_e']
+            ].include_header
+
+        if include_header is False:
+            yield preamble + '\n'
+            yield from self.gcode_body(self.cnc_tools)
+            yield '\n' + postamble
+            return
+
+        # search for the GCode beginning which is usually a G20 or G21
+        # fix so the preamble gets inserted in between the comments header and the actual start of GCODE
+        # g_idx = gcode.rfind('G20')
+        #
+        # # if it did not find 'G20' then search for 'G21'
+        # if g_idx == -1:
+        #     g_idx = gcode.rfind('G21')
+        #
+        # # if it did not find 'G20' and it did not find 'G21' then there is an error and return
+        # if g_idx == -1:
+        #     self.app.inform.emit('[ERROR_NOTCL] %s' % _("G-code does not have a units code: either G20 or G21"))
+        #     return
+
+        tools = self.exc_cnc_tools if self.origin_kind == 'excellon' else self.cnc_tools
+
+        end_gcode = self.gcode_footer() if self.app.defaults['cncjob_footer'] is True else ''
+
+        # detect if using a HPGL preprocessor
+        hpgl = False
+        if self.cnc_tools:
+            for key in self.cnc_tools:
+                if 'ppname_g' in self.cnc_tools[key]['data']:
+                    if 'hpgl' in self.cnc_tools[key]['data']['ppname_g']:
+                        hpgl = True
+                        break
+        elif self.exc_cnc_tools:
+            for key in self.cnc_tools:
+                if 'ppname_e' in self.cnc_tools[key]['data']:
+                    if 'hpgl' in self.cnc_tools[key]['data']['ppname_e']:
+                        hpgl = True
+                        break
+
+        if hpgl:
+            yield self.gc_header + '\n' + self.gc_start + '\n' + preamble + '\n'
+
+            # process body gcode
+            pa_re = re.compile(r"^PA\s*(-?\d+\.\d*),?\s*(-?\d+\.\d*)*;?$")
+            for gline in self.gcode_lines(self.gcode_body(tools)):
+                match = pa_re.search(gline)
+                if match:
+                    x_int = int(float(match.group(1)))
+                    y_int = int(float(match.group(2)))
+                    yield 'PA%d,%d;\n' % (x_int, y_int)
+                else:
+                    yield gline + '\n'
+
+            yield '\n' + postamble + end_gcode
+        else:
+            yield self.gc_header + self.gc_start + '\n'
+            if preamble != '':
+                yield preamble + '\n'
+            yield from self.gcode_body(tools)
+            yield '\n'
+            if postamble != '':
+                yield postamble + '\n'
+            yield end_gcode
+
+    def gcode_body(self, tools):
+        """
+        :param tools:   the tools of the multi-tool jobs, self.cnc_tools or self.exc_cnc_tools
+        :return:        generator of the GCode of each tool or of the GCode of the single-tool job
+        """
+        if self.multitool is True:
+            for tooluid_key in tools:
+                gcode = tools[tooluid_key].get('gcode')
+                if gcode:
+                    yield gcode
+        else:
+            yield self.gcode
+
+    @staticmethod
+    def gcode_lines(chunks, keepends=False):
+        """
+        :param chunks:      iterable of GCode strings
+        :param keepends:    if True the lines keep their line endings
+        :return:            generator of the lines of the joined GCode strings
+        """
+        rest = ''
+        for chunk in chunks:
+            if not chunk:
+                continue
+            lines = (rest + chunk).splitlines(keepends)
+            # the last line continues in the next chunk
+            rest = '' if chunk[-1] in '\r\n' else lines.pop()
+            yield from lines
+        if rest:
+            yield rest
+
     # def on_toolchange_custom_clicked(self, signal):
     #     """
     #     Handler for clicking toolchange custom.
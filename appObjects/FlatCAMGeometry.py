@@ -11,13 +11,12 @@
 # ##########################################################
 
 from shapely.geometry import MultiLineString, LineString, LinearRing, box
-import shapely.affinity as affinity
 
 from camlib import Geometry, grace
+from appCommon.GeometryBatch import scale_matrix, translate_matrix
 
 from appObjects.FlatCAMObj import *
 
-import ezdxf
 import math
 import numpy as np
 from copy import deepcopy
@@ -96,7 +95,7 @@ class GeometryObject(FlatCAMObj, Geometry):
             else:
                 try:
                     tools_string = self.app.defaults["geometry_cnctooldia"].split(",")
-                    tools_diameters = [eval(a) for a in tools_string if a != '']
+                    tools_diameters = [float(a) for a in tools_string if a != '']
                     self.options["cnctooldia"] = tools_diameters[0] if tools_diameters else 0.0
                 except Exception as e:
                     log.debug("FlatCAMObj.GeometryObject.init() --> %s" % str(e))
@@ -517,7 +516,7 @@ class GeometryObject(FlatCAMObj, Geometry):
             try:
                 temp_tools = self.options["cnctooldia"].split(",")
                 tools_list = [
-                    float(eval(dia)) for dia in temp_tools if dia != ''
+                    float(dia) for dia in temp_tools if dia != ''
                 ]
             except Exception as e:
                 log.error("GeometryObject.set_ui() -> At least one tool diameter needed. "
@@ -1788,6 +1787,9 @@ class GeometryObject(FlatCAMObj, Geometry):
             self.ui.geo_tools_table.setCurrentItem(self.ui.geo_tools_table.item(row, 0))
 
     def export_dxf(self):
+        # ezdxf is imported when needed, it is slow to load
+        import ezdxf
+
         dwg = None
         try:
             dwg = ezdxf.new('R2010')
@@ -2480,7 +2482,13 @@ class GeometryObject(FlatCAMObj, Geometry):
         if isinstance(endxy, str):
             endxy = re.sub('[()\[\]]', '', endxy)
             if endxy and endxy != '':
-                endxy = [float(eval(a)) for a in endxy.split(",")]
+                try:
+                    endxy = [float(a) for a in endxy.split(",")]
+                except ValueError:
+                    self.app.inform.emit('[ERROR_NOTCL] %s' % _("The End Move X,Y field in Edit -> Preferences has to "
+                                                                "be in the format (x, y) but now there is only one "
+                                                                "value, not two."))
+                    return 'fail'
 
         toolchangez = toolchangez if toolchangez else float(self.options["toolchangez"])
 
@@ -2488,7 +2496,11 @@ class GeometryObject(FlatCAMObj, Geometry):
         if isinstance(toolchangexy, str):
             toolchangexy = re.sub('[()\[\]]', '', toolchangexy)
             if toolchangexy and toolchangexy != '':
-                toolchangexy = [float(eval(a)) for a in toolchangexy.split(",")]
+                try:
+                    toolchangexy = [float(a) for a in toolchangexy.split(",")]
+                except ValueError:
+                    self.app.inform.emit('[ERROR_NOTCL] %s' % _("The Toolchange X,Y format has to be (x, y)."))
+                    return 'fail'
 
         toolchange = toolchange if toolchange else self.options["toolchange"]
 
@@ -2693,52 +2705,8 @@ class GeometryObject(FlatCAMObj, Geometry):
         else:
             px, py = point
 
-        self.geo_len = 0
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def scale_recursion(geom):
-            if type(geom) is list:
-                geoms = []
-                for local_geom in geom:
-                    geoms.append(scale_recursion(local_geom))
-                return geoms
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.scale(geom, xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return geom
-
-        if self.multigeo is True:
-            for tool in self.tools:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.tools[tool]['solid_geometry'])
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.tools[tool]['solid_geometry'] = scale_recursion(self.tools[tool]['solid_geometry'])
-
         try:
-            # variables to display the percentage of work done
-            self.geo_len = 0
-            try:
-                self.geo_len = len(self.solid_geometry)
-            except TypeError:
-                self.geo_len = 1
-            self.old_disp_number = 0
-            self.el_count = 0
-
-            self.solid_geometry = scale_recursion(self.solid_geometry)
+            self.transform_all(lambda batch: batch.affine(scale_matrix(xfactor, yfactor, (px, py))))
         except AttributeError:
             self.solid_geometry = []
             return
@@ -2769,52 +2737,7 @@ class GeometryObject(FlatCAMObj, Geometry):
         if dx == 0 and dy == 0:
             return
 
-        self.geo_len = 0
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def translate_recursion(geom):
-            if type(geom) is list:
-                geoms = []
-                for local_geom in geom:
-                    geoms.append(translate_recursion(local_geom))
-                return geoms
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.translate(geom, xoff=dx, yoff=dy)
-                except AttributeError:
-                    return geom
-
-        if self.multigeo is True:
-            for tool in self.tools:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.tools[tool]['solid_geometry'])
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.tools[tool]['solid_geometry'] = translate_recursion(self.tools[tool]['solid_geometry'])
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        self.solid_geometry = translate_recursion(self.solid_geometry)
+        self.transform_all(lambda batch: batch.affine(translate_matrix(dx, dy)))
 
         self.app.proc_container.new_text = ''
         self.app.inform.emit('[success] %s' % _("Done."))
@@ -2843,7 +2766,10 @@ class GeometryObject(FlatCAMObj, Geometry):
         if self.app.defaults["geometry_toolchangexy"] == '':
             self.options['toolchangexy'] = "0.0, 0.0"
         else:
-            coords_xy = [float(eval(coord)) for coord in self.app.defaults["geometry_toolchangexy"].split(",")]
+            try:
+                coords_xy = [float(coord) for coord in self.app.defaults["geometry_toolchangexy"].split(",")]
+            except ValueError:
+                coords_xy = []
             if len(coords_xy) < 2:
                 self.app.inform.emit('[ERROR] %s' %
                                      _("The Toolchange X,Y field in Edit -> Preferences "
@@ -3039,7 +2965,7 @@ class GeometryObject(FlatCAMObj, Geometry):
             self.ui.exclusion_table.selectAll()
             self.draw_sel_shape()
 
-    def plot_element(self, element, color=None, visible=None):
+    def plot_element(self, element, color=None, visible=None, offsets=None):
 
         if color is None:
             color = '#FF0000FF'
@@ -3047,11 +2973,11 @@ class GeometryObject(FlatCAMObj, Geometry):
         visible = visible if visible else self.options['plot']
         try:
             for sub_el in element:
-                self.plot_element(sub_el, color=color)
+                self.plot_element(sub_el, color=color, offsets=offsets)
 
         except TypeError:  # Element is not iterable...
             # if self.app.is_legacy is False:
-            self.add_shape(shape=element, color=color, visible=visible, layer=0)
+            self.add_shape(shape=element, color=color, visible=visible, layer=0, offsets=offsets)
 
     def plot(self, visible=None, kind=None, plot_tool=None):
         """
@@ -3118,10 +3044,11 @@ class GeometryObject(FlatCAMObj, Geometry):
                 # plot solid geometry that may be an direct attribute of the geometry object
                 # for SingleGeo
                 if self.solid_geometry:
-                    solid_geometry = self.solid_geometry
+                    # a panel plots its source once, at the offsets of the copies
+                    solid_geometry, offsets = self.plot_instances(self.solid_geometry)
                     color = self.app.defaults["geometry_plot_line"]
 
-                    self.plot_element(solid_geometry, visible=visible, color=color)
+                    self.plot_element(solid_geometry, visible=visible, color=color, offsets=offsets)
 
             # self.plot_element(self.solid_geometry, visible=self.options['plot'])
 
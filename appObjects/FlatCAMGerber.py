@@ -887,8 +887,10 @@ class GerberObject(FlatCAMObj, Gerber):
         # if the Follow Geometry checkbox is checked then plot only the follow geometry
         if self.ui.follow_cb.get_value():
             geometry = self.follow_geometry
+            offsets = None
         else:
-            geometry = self.solid_geometry
+            # a panel plots its source once, at the offsets of the copies
+            geometry, offsets = self.plot_instances(self.solid_geometry)
 
         # Make sure geometry is iterable.
         try:
@@ -923,7 +925,7 @@ class GerberObject(FlatCAMObj, Gerber):
                     if type(g) == Polygon or type(g) == LineString:
                         self.add_shape(shape=g, color=color,
                                        face_color=random_color() if self.options['multicolored']
-                                       else face_color, visible=visible)
+                                       else face_color, visible=visible, offsets=offsets)
                     elif type(g) == Point:
                         pass
                     else:
@@ -931,22 +933,22 @@ class GerberObject(FlatCAMObj, Gerber):
                             for el in g:
                                 self.add_shape(shape=el, color=color,
                                                face_color=random_color() if self.options['multicolored']
-                                               else face_color, visible=visible)
+                                               else face_color, visible=visible, offsets=offsets)
                         except TypeError:
                             self.add_shape(shape=g, color=color,
                                            face_color=random_color() if self.options['multicolored']
-                                           else face_color, visible=visible)
+                                           else face_color, visible=visible, offsets=offsets)
             else:
                 for g in geometry:
                     if type(g) == Polygon or type(g) == LineString:
                         self.add_shape(shape=g, color=random_color() if self.options['multicolored'] else 'black',
-                                       visible=visible)
+                                       visible=visible, offsets=offsets)
                     elif type(g) == Point:
                         pass
                     else:
                         for el in g:
                             self.add_shape(shape=el, color=random_color() if self.options['multicolored'] else 'black',
-                                           visible=visible)
+                                           visible=visible, offsets=offsets)
             self.shapes.redraw(
                 # update_colors=(self.fill_color, self.outline_color),
                 # indexes=self.app.plotcanvas.shape_collection.data.keys()
@@ -15,11 +15,11 @@ import inspect  # TODO: For debugging only.
 from appGUI.ObjectUI import *
 
 from appCommon.Common import LoudDict
-from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
-from appGUI.VisPyVisuals import ShapeCollection
+from appCommon.ProjectArchive import ProjectArchive
 
 from shapely.ops import unary_union
 from shapely.geometry import Polygon, MultiPolygon
+from shapely import affinity
 
 from copy import deepcopy
 import sys
@@ -57,6 +57,16 @@ class FlatCAMObj(QtCore.QObject):
     # The app should set this value.
     app = None
 
+    # the options of the FlatCAM Tools that the objects of each kind keep, as they are in the application options
+    tool_option_prefixes = {
+        'excellon': ('tools_drill_', 'tools_mill_'),
+        'gerber': ('tools_iso_', ),
+        'geometry': ('tools_mill_', )
+    }
+
+    # the options that only change the view of the object; their change alone does not ask to save the project
+    view_options = ('plot', 'solid', 'multicolored')
+
     # signal to plot a single object
     plot_single_object = QtCore.pyqtSignal()
 
@@ -93,15 +103,28 @@ class FlatCAMObj(QtCore.QObject):
         self.kind = None  # Override with proper name
 
         if self.app.is_legacy is False:
+            from appGUI.VisPyVisuals import ShapeCollection
             self.shapes = self.app.plotcanvas.new_shape_group()
             self.mark_shapes = ShapeCollection(parent=self.app.plotcanvas.view.scene, layers=1)
             # self.shapes = ShapeCollection(parent=self.app.plotcanvas.view.scene, pool=self.app.pool, layers=2)
         else:
+            from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
             self.shapes = ShapeCollectionLegacy(obj=self, app=self.app, name=name)
             self.mark_shapes = ShapeCollectionLegacy(obj=self, app=self.app, name=name + "_mark_shapes")
 
         self.item = None  # Link with project view item
 
+        # the step and repeat of a panel: its geometry is the copies of the source, one after the other; while it is
+        # not changed the source is plotted once and drawn at the offsets of the copies (set_step_repeat())
+        self.step_repeat = None
+        self.step_repeat_version = None
+
+        # the entry of the object in the last project snapshot and the geometry_version it was taken at; it is reused
+        # by the next project save while the object is not changed (dirty)
+        self.dirty = True
+        self.snapshot_entry = None
+        self.snapshot_version = None
+
         self.muted_ui = False
         self.deleted = False
 
@@ -162,6 +185,30 @@ class FlatCAMObj(QtCore.QObject):
                               "have all attributes in the latest application version." % str(attr))
                     pass
 
+    def copy_app_options(self, app_options, kind=None):
+        """
+        Copies the application defaults related to the object to the object OPTIONS.
+
+        The key names in defaults and options dictionary's are not random: they have to have in name first the type
+        of the object (geometry, excellon, cncjob and gerber), the 'kind' followed by an underline. The name of the
+        object and the underline are stripped (if the original key was let's say "excellon_toolchange", in the
+        object options the key will become "toolchange"). The options of the FlatCAM Tools used by the object are
+        copied with their names.
+
+        :param app_options:     the application options
+        :param kind:            the kind of the object; self.kind if None
+        :return: None
+        """
+        kind = self.kind if kind is None else kind
+        prefixes = self.tool_option_prefixes.get(kind, ())
+
+        for option in app_options:
+            if option.find(kind + "_") == 0:
+                oname = option[len(kind) + 1:]
+                self.options[oname] = app_options[option]
+            elif option.startswith(prefixes):
+                self.options[option] = app_options[option]
+
     def on_options_change(self, key):
         # Update form on programmatically options change
         self.set_form_item(key)
@@ -170,6 +217,11 @@ class FlatCAMObj(QtCore.QObject):
         if key == 'plot':
             self.visible = self.options['plot']
 
+        # the changed object has to be saved
+        self.dirty = True
+        if key not in self.view_options:
+            self.app.should_we_save = True
+
         self.optionChanged.emit(key)
 
     def set_ui(self, ui):
@@ -219,6 +271,9 @@ class FlatCAMObj(QtCore.QObject):
         self.muted_ui = True
         log.debug(str(inspect.stack()[1][3]) + "--> FlatCAMObj.build_ui()")
 
+        # the tools of the object can be changed in place from its UI
+        self.dirty = True
+
         try:
             # HACK: disconnect the scale entry signal since on focus out event will trigger an undesired scale()
             # it seems that the takewidget() does generate a focus out event for the QDoubleSpinbox ...
@@ -399,7 +454,7 @@ class FlatCAMObj(QtCore.QObject):
                 self.plot()
             self.app.app_obj.object_changed.emit(self)
 
-        self.app.worker_task.emit({'fcn': plot_task, 'params': []})
+        self.app.worker_task.emit({'fcn': plot_task, 'params': [], 'priority': 'interactive'})
 
     def serialize(self):
         """
@@ -425,9 +480,50 @@ class FlatCAMObj(QtCore.QObject):
         if self.deleted:
             raise ObjectDeleted()
         else:
+            if self.app.is_legacy is True:
+                # the legacy canvas draws the copies
+                offsets = kwargs.pop('offsets', None)
+                if offsets is not None:
+                    kwargs['shape'] = [affinity.translate(kwargs['shape'], xoff, yoff) for xoff, yoff in offsets]
             key = self.shapes.add(tolerance=self.drawing_tolerance, **kwargs)
         return key
 
+    def project_entry(self):
+        """
+        :return:    the entry of the object in a project snapshot (ProjectArchive.snapshot()); the one of the last
+                    snapshot while the object is not changed, so it is not encoded again
+        """
+        version = getattr(self, 'geometry_version', None)
+        if self.dirty or self.snapshot_entry is None or self.snapshot_version != version:
+            self.snapshot_entry = ProjectArchive.snapshot([self.to_dict()])[0]
+            self.snapshot_version = version
+            self.dirty = False
+        return self.snapshot_entry
+
+    def set_step_repeat(self, step_repeat):
+        """
+        Marks the object as a step and repeat panel: its solid_geometry is a list with the copies of the source, one
+        after the other, in the order of the offsets. The mark is dropped when the geometry changes.
+
+        :param step_repeat:     appCommon.StepRepeat.StepRepeat
+        :return:                None
+        """
+        self.step_repeat = step_repeat
+        self.step_repeat_version = self.geometry_version
+
+    def plot_instances(self, geometry):
+        """
+        :param geometry:    the solid_geometry of the object
+        :return:            (geometry, offsets) to plot: for a panel whose geometry is not changed since it was made,
+                            the copy of the source at the origin and the offsets of all the copies; else the geometry
+                            as it is and None
+        """
+        step_repeat = self.step_repeat
+        if step_repeat is None or self.step_repeat_version != getattr(self, 'geometry_version', None) or \
+                not isinstance(geometry, list) or not len(step_repeat) or len(geometry) % len(step_repeat) != 0:
+            return geometry, None
+        return geometry[:len(geometry) // len(step_repeat)], step_repeat.offsets
+
     def add_mark_shape(self, **kwargs):
         if self.deleted:
             raise ObjectDeleted()
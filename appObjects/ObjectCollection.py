@@ -694,6 +694,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
                 "delete_active() --> Could not remove the old object name from auto-completer model list. %s" % str(e))
 
         self.app.object_status_changed.emit(active.obj, 'delete', name)
+        self.app.buffer_cache.invalidate(active.obj)
 
         # ############ OBJECT DELETION FROM MODEL STARTS HERE ####################
         self.beginRemoveRows(self.index(group.row(), 0, QtCore.QModelIndex()), active.row(), active.row())
@@ -747,6 +748,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
                 "delete_by_name() --> Could not remove the old object name from auto-completer model list. %s" % str(e))
 
         self.app.object_status_changed.emit(deleted.obj, 'delete', name)
+        self.app.buffer_cache.invalidate(deleted.obj)
 
         # ############ OBJECT DELETION FROM MODEL STARTS HERE ####################
         self.beginRemoveRows(self.index(group.row(), 0, QtCore.QModelIndex()), deleted.row(), deleted.row())
@@ -778,6 +780,7 @@ class ObjectCollection(QtCore.QAbstractItemModel):
         log.debug(str(inspect.stack()[1][3]) + "--> OC.delete_all()")
 
         self.app.object_status_changed.emit(None, 'delete_all', '')
+        self.app.buffer_cache.clear()
 
         try:
             self.app.all_objects_list.clear()
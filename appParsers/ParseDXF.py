@@ -7,11 +7,6 @@
 
 from shapely.geometry import LineString, Point
 from shapely.affinity import rotate
-# Vector was an older name for Vec3; try both for backward compatibility:
-try:
-    from ezdxf.math import Vec3 as ezdxf_vector
-except ImportError:
-    from ezdxf.math import Vector as ezdxf_vector
 
 from appParsers.ParseFont import *
 from appParsers.ParseDXF_Spline import *
@@ -335,8 +330,15 @@ def get_geo_from_insert(dxf_object, insert):
         if phi != 0:
             if isinstance(tr, str) and tr.lower() == 'c':
                 tr = 'center'
-            elif isinstance(tr, ezdxf_vector):
-                tr = list(tr)
+            else:
+                # ezdxf is loaded by now, the file was read with it
+                # Vector was an older name for Vec3; try both for backward compatibility:
+                try:
+                    from ezdxf.math import Vec3 as ezdxf_vector
+                except ImportError:
+                    from ezdxf.math import Vector as ezdxf_vector
+                if isinstance(tr, ezdxf_vector):
+                    tr = list(tr)
             geo = rotate(geo, phi, origin=tr)
 
         geo_block_transformed.append(geo)
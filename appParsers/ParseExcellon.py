@@ -7,6 +7,8 @@
 # ########################################################## ##
 
 from camlib import Geometry, grace
+from appCommon.GeometryBatch import scale_matrix, translate_matrix, rotate_matrix, skew_matrix
+from appCommon.PointArray import PointArray, SlotArray
 
 import shapely.affinity as affinity
 from shapely.geometry import Point, LineString
@@ -545,16 +547,13 @@ class Excellon(Geometry):
                             )
 
                             # ----------  add a slot  ------------ #
-                            slot = (
-                                Point(slot_start_x, slot_start_y),
-                                Point(slot_stop_x, slot_stop_y)
-                            )
+                            slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                             if current_tool not in self.tools:
                                 self.tools[current_tool] = {}
                             if 'slots' in self.tools[current_tool]:
                                 self.tools[current_tool]['slots'].append(slot)
                             else:
-                                self.tools[current_tool]['slots'] = [slot]
+                                self.tools[current_tool]['slots'] = SlotArray([slot])
                             continue
 
                         # Slot coordinates with period: Use literally. ###
@@ -619,16 +618,13 @@ class Excellon(Geometry):
                             )
 
                             # ----------  add a Slot  ------------ #
-                            slot = (
-                                Point(slot_start_x, slot_start_y),
-                                Point(slot_stop_x, slot_stop_y)
-                            )
+                            slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                             if current_tool not in self.tools:
                                 self.tools[current_tool] = {}
                             if 'slots' in self.tools[current_tool]:
                                 self.tools[current_tool]['slots'].append(slot)
                             else:
-                                self.tools[current_tool]['slots'] = [slot]
+                                self.tools[current_tool]['slots'] = SlotArray([slot])
                         continue
 
                     # ## Coordinates without period # ##
@@ -661,9 +657,9 @@ class Excellon(Geometry):
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'drills' in self.tools[current_tool]:
-                                    self.tools[current_tool]['drills'].append(Point((coordx, coordy)))
+                                    self.tools[current_tool]['drills'].append((coordx, coordy))
                                 else:
-                                    self.tools[current_tool]['drills'] = [Point((coordx, coordy))]
+                                    self.tools[current_tool]['drills'] = PointArray([(coordx, coordy)])
 
                                 repeat -= 1
                             current_x = coordx
@@ -715,16 +711,13 @@ class Excellon(Geometry):
                                     slot_stop_y = y
 
                                     # ----------  add a Slot  ------------ #
-                                    slot = (
-                                        Point(slot_start_x, slot_start_y),
-                                        Point(slot_stop_x, slot_stop_y)
-                                    )
+                                    slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                                     if current_tool not in self.tools:
                                         self.tools[current_tool] = {}
                                     if 'slots' in self.tools[current_tool]:
                                         self.tools[current_tool]['slots'].append(slot)
                                     else:
-                                        self.tools[current_tool]['slots'] = [slot]
+                                        self.tools[current_tool]['slots'] = SlotArray([slot])
                                     continue
 
                             if self.match_routing_start is None and self.match_routing_stop is None:
@@ -735,9 +728,9 @@ class Excellon(Geometry):
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'drills' in self.tools[current_tool]:
-                                    self.tools[current_tool]['drills'].append(Point((x, y)))
+                                    self.tools[current_tool]['drills'].append((x, y))
                                 else:
-                                    self.tools[current_tool]['drills'] = [Point((x, y))]
+                                    self.tools[current_tool]['drills'] = PointArray([(x, y)])
                                 # log.debug("{:15} {:8} {:8}".format(eline, x, y))
                                 continue
 
@@ -795,16 +788,13 @@ class Excellon(Geometry):
                                 slot_stop_y = y
 
                                 # ----------  add a Slot  ------------ #
-                                slot = (
-                                    Point(slot_start_x, slot_start_y),
-                                    Point(slot_stop_x, slot_stop_y)
-                                )
+                                slot = (slot_start_x, slot_start_y, slot_stop_x, slot_stop_y)
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'slots' in self.tools[current_tool]:
                                     self.tools[current_tool]['slots'].append(slot)
                                 else:
-                                    self.tools[current_tool]['slots'] = [slot]
+                                    self.tools[current_tool]['slots'] = SlotArray([slot])
                                 continue
 
                         if self.match_routing_start is None and self.match_routing_stop is None:
@@ -817,9 +807,9 @@ class Excellon(Geometry):
                                 if current_tool not in self.tools:
                                     self.tools[current_tool] = {}
                                 if 'drills' in self.tools[current_tool]:
-                                    self.tools[current_tool]['drills'].append(Point((x, y)))
+                                    self.tools[current_tool]['drills'].append((x, y))
                                 else:
-                                    self.tools[current_tool]['drills'] = [Point((x, y))]
+                                    self.tools[current_tool]['drills'] = PointArray([(x, y)])
                             else:
                                 coordx = x
                                 coordy = y
@@ -833,9 +823,9 @@ class Excellon(Geometry):
                                     if current_tool not in self.tools:
                                         self.tools[current_tool] = {}
                                     if 'drills' in self.tools[current_tool]:
-                                        self.tools[current_tool]['drills'].append(Point((coordx, coordy)))
+                                        self.tools[current_tool]['drills'].append((coordx, coordy))
                                     else:
-                                        self.tools[current_tool]['drills'] = [Point((coordx, coordy))]
+                                        self.tools[current_tool]['drills'] = PointArray([(coordx, coordy)])
 
                                     repeat -= 1
                             repeating_x = repeating_y = 0
@@ -962,9 +952,9 @@ class Excellon(Geometry):
             # Even if there are not drills or slots I just add the storage there with an empty list
             for tool in self.tools:
                 if 'drills' not in self.tools[tool]:
-                    self.tools[tool]['drills'] = []
+                    self.tools[tool]['drills'] = PointArray()
                 if 'slots' not in self.tools[tool]:
-                    self.tools[tool]['slots'] = []
+                    self.tools[tool]['slots'] = SlotArray()
 
             log.info("Zeros: %s, Units %s." % (self.zeros, self.units))
         except Exception:
@@ -1054,31 +1044,20 @@ class Excellon(Geometry):
             for tool in self.tools:
                 tooldia = self.tools[tool]['tooldia']
 
-                if 'drills' in self.tools[tool]:
-                    for drill in self.tools[tool]['drills']:
-                        poly = drill.buffer(tooldia / 2.0, int(int(self.geo_steps_per_circle) / 4))
-
-                        # add poly in the tools geometry
-                        self.tools[tool]['solid_geometry'].append(poly)
-                        self.tools[tool]['data'] = deepcopy(self.default_data)
-
-                        # add poly to the total solid geometry
-                        self.solid_geometry.append(poly)
-
-                if 'slots' in self.tools[tool]:
-                    for slot in self.tools[tool]['slots']:
-                        start = slot[0]
-                        stop = slot[1]
-
-                        lines_string = LineString([start, stop])
-                        poly = lines_string.buffer(tooldia / 2.0, int(int(self.geo_steps_per_circle) / 4))
+                # the drills and the slots of the Excellon objects made from lists are kept in arrays from now on
+                for key, array_class in (('drills', PointArray), ('slots', SlotArray)):
+                    if key not in self.tools[tool]:
+                        continue
 
-                        # add poly in the tools geometry
-                        self.tools[tool]['solid_geometry'].append(poly)
+                    self.tools[tool][key] = array_class.of(self.tools[tool][key])
+                    polys = self.tools[tool][key].buffer(tooldia / 2.0, int(int(self.geo_steps_per_circle) / 4))
+                    if polys:
+                        # add polys in the tools geometry
+                        self.tools[tool]['solid_geometry'] += polys
                         self.tools[tool]['data'] = deepcopy(self.default_data)
 
-                        # add poly to the total solid geometry
-                        self.solid_geometry.append(poly)
+                        # add polys to the total solid geometry
+                        self.solid_geometry += polys
 
         except Exception as e:
             log.debug("appParsers.ParseExcellon.Excellon.create_geometry() -> "
@@ -1180,6 +1159,30 @@ class Excellon(Geometry):
         self.create_geometry()
         return factor
 
+    def transform_all(self, transform):
+        """
+        Transforms, all at once, the drills and the slots of all the tools. The solid geometry is not transformed,
+        it is made again from the drills and the slots by create_geometry().
+
+        :param transform:   function that transforms the geometry gathered in a GeometryBatch
+        :return:            None
+        """
+        batch = self.geometry_batch()
+
+        tools_idx = {}
+        for tool in self.tools:
+            arrays = {}
+            if 'drills' in self.tools[tool]:
+                arrays['drills'] = PointArray.of(self.tools[tool]['drills'])
+            if 'slots' in self.tools[tool]:
+                arrays['slots'] = SlotArray.of(self.tools[tool]['slots'])
+            tools_idx[tool] = batch.add(arrays)
+
+        transform(batch)
+
+        for tool, tool_idx in tools_idx.items():
+            self.tools[tool].update(batch.result(tool_idx))
+
     def scale(self, xfactor, yfactor=None, point=None):
         """
         Scales geometry on the XY plane in the object by a given factor.
@@ -1207,54 +1210,8 @@ class Excellon(Geometry):
         if xfactor == 0 and yfactor == 0:
             return
 
-        def scale_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(scale_geom(g))
-                return new_obj
-            else:
-                try:
-                    return affinity.scale(obj, xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for tool in self.tools:
-            # Scale Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.scale(drill, xfactor, yfactor, origin=(px, py)))
-                self.tools[tool]['drills'] = new_drills
-
-            # Scale Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.scale(slot[0], xfactor, yfactor, origin=(px, py))
-                    new_stop = affinity.scale(slot[1], xfactor, yfactor, origin=(px, py))
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Scale solid_geometry
-            self.tools[tool]['solid_geometry'] = scale_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+        # Scale Drills, Slots and solid_geometry
+        self.transform_all(lambda batch: batch.affine(scale_matrix(xfactor, yfactor, (px, py))))
 
         self.create_geometry()
         self.app.proc_container.new_text = ''
@@ -1274,54 +1231,8 @@ class Excellon(Geometry):
         if dx == 0 and dy == 0:
             return
 
-        def offset_geom(obj):
-            try:
-                new_obj = []
-                for geo in obj:
-                    new_obj.append(offset_geom(geo))
-                return new_obj
-            except TypeError:
-                try:
-                    return affinity.translate(obj, xoff=dx, yoff=dy)
-                except AttributeError:
-                    return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.translate(drill, xoff=dx, yoff=dy))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.translate(slot[0], xoff=dx, yoff=dy)
-                    new_stop = affinity.translate(slot[1], xoff=dx, yoff=dy)
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = offset_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+        # Offset Drills, Slots and solid_geometry
+        self.transform_all(lambda batch: batch.affine(translate_matrix(dx, dy)))
 
         # Recreate geometry
         self.create_geometry()
@@ -1341,56 +1252,8 @@ class Excellon(Geometry):
         px, py = point
         xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
 
-        def mirror_geom(obj):
-            try:
-                new_obj = []
-                for geo in obj:
-                    new_obj.append(mirror_geom(geo))
-                return new_obj
-            except TypeError:
-                try:
-                    return affinity.scale(obj, xscale, yscale, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        # Modify data
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.scale(drill, xscale, yscale, origin=(px, py)))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.scale(slot[0], xscale, yscale, origin=(px, py))
-                    new_stop = affinity.scale(slot[1], xscale, yscale, origin=(px, py))
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = mirror_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+        # Mirror Drills, Slots and solid_geometry
+        self.transform_all(lambda batch: batch.affine(scale_matrix(xscale, yscale, (px, py))))
 
         # Recreate geometry
         self.create_geometry()
@@ -1422,59 +1285,13 @@ class Excellon(Geometry):
         if angle_x == 0 and angle_y == 0:
             return
 
-        def skew_geom(obj):
-            try:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(skew_geom(g))
-                return new_obj
-            except TypeError:
-                try:
-                    return affinity.skew(obj, angle_x, angle_y, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
         if point is None:
             px, py = 0, 0
         else:
             px, py = point
 
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.skew(drill, angle_x, angle_y, origin=(px, py)))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.skew(slot[0], angle_x, angle_y, origin=(px, py))
-                    new_stop = affinity.skew(slot[1], angle_x, angle_y, origin=(px, py))
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = skew_geom(self.tools[tool]['solid_geometry'])
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+        # Skew Drills, Slots and solid_geometry
+        self.transform_all(lambda batch: batch.affine(skew_matrix(angle_x, angle_y, (px, py))))
 
         self.create_geometry()
         self.app.proc_container.new_text = ''
@@ -1492,65 +1309,12 @@ class Excellon(Geometry):
         if angle == 0:
             return
 
-        def rotate_geom(obj, origin=None):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(rotate_geom(g))
-                return new_obj
-            else:
-                if origin:
-                    try:
-                        return affinity.rotate(obj, angle, origin=origin)
-                    except AttributeError:
-                        return obj
-                else:
-                    try:
-                        return affinity.rotate(obj, angle, origin=orig)
-                    except AttributeError:
-                        return obj
-
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.tools)
-        except TypeError:
-            self.geo_len = 1
-        self.old_disp_number = 0
-        self.el_count = 0
-
         if point is None:
-            orig = 'center'
+            # each geometry is rotated around its own center
+            self.transform_all(lambda batch: batch.map(lambda geo: affinity.rotate(geo, angle, origin='center')))
         else:
-            orig = point
-
-        for tool in self.tools:
-            # Offset Drills
-            if 'drills' in self.tools[tool]:
-                new_drills = []
-                for drill in self.tools[tool]['drills']:
-                    new_drills.append(affinity.rotate(drill, angle, origin=orig))
-                self.tools[tool]['drills'] = new_drills
-
-            # Offset Slots
-            if 'slots' in self.tools[tool]:
-                new_slots = []
-                for slot in self.tools[tool]['slots']:
-                    new_start = affinity.rotate(slot[0], angle, origin=orig)
-                    new_stop = affinity.rotate(slot[1], angle, origin=orig)
-                    new_slot = (new_start, new_stop)
-                    new_slots.append(new_slot)
-                self.tools[tool]['slots'] = new_slots
-
-            # Offset solid_geometry
-            self.tools[tool]['solid_geometry'] = rotate_geom(self.tools[tool]['solid_geometry'], origin=orig)
-
-            # update status display
-            self.el_count += 1
-            disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-            if self.old_disp_number < disp_number <= 100:
-                self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                self.old_disp_number = disp_number
+            # Rotate Drills, Slots and solid_geometry
+            self.transform_all(lambda batch: batch.affine(rotate_matrix(angle, point)))
 
         self.create_geometry()
         self.app.proc_container.new_text = ''
@@ -1,5 +1,7 @@
 from PyQt5 import QtWidgets
 from camlib import Geometry, arc, arc_angle, ApertureMacro, grace
+from appCommon.GeometryBatch import scale_matrix, translate_matrix, rotate_matrix, skew_matrix
+from appCommon.StepRepeat import StepRepeat
 
 import numpy as np
 import traceback
@@ -11,7 +13,6 @@ from shapely.geometry import box as shply_box
 from shapely.geometry import Point
 
 from lxml import etree as ET
-import ezdxf
 
 from appParsers.ParseDXF import *
 from appParsers.ParseSVG import svgparselength, getsvggeo, svgparse_viewbox
@@ -137,6 +138,9 @@ class Gerber(Geometry):
         # it allows adding data into the clear_geometry key of the self.apertures[aperture] dict
         self.is_lpc = False
 
+        # the current aperture, position, interpolation and quadrant mode at the end of the parsing
+        self.graphics_state = None
+
         self.source_file = ''
 
         # ### Parser patterns ## ##
@@ -209,6 +213,10 @@ class Gerber(Geometry):
         # LP - Level polarity
         self.lpol_re = re.compile(r'^%LP([DC])\*%$')
 
+        # SR - Step and repeat, the block opens with the number of copies on X and Y and the steps; it closes with an
+        # empty SR statement
+        self.sr_re = re.compile(r'^%SR(?:X(\d+)Y(\d+)I([\+-]?[\d\.]+)J([\+-]?[\d\.]+))?\*%$')
+
         # Units (OBSOLETE)
         self.units_re = re.compile(r'^G7([01])\*$')
 
@@ -219,6 +227,22 @@ class Gerber(Geometry):
         self.am1_re = re.compile(r'^%AM([^\*]+)\*([^%]+)?(%)?$')
         self.am2_re = re.compile(r'(.*)%$')
 
+        # Statement dispatch table. Maps the leading character of a statement to the parsing steps whose patterns can
+        # match it, so each statement is tested only against those patterns. Statements with a leading character that
+        # is not in the table can match only the Number format patterns, which are selected by the 'FS' they contain.
+        # Coordinate statements (X, Y) are the vast majority of a Gerber file and for them the linear
+        # interpolation step tries first a parser that does not use regular expressions.
+        self.stat_dispatch = {
+            'G': frozenset(['comm', 'units', 'absrel', 'tool', 'region', 'interp', 'lin', 'quad', 'circ']),
+            '%': frozenset(['lpol', 'sr', 'mode', 'am', 'ad']),
+            'D': frozenset(['opcode', 'tool']),
+            'X': frozenset(['lin', 'circ']),
+            'Y': frozenset(['lin', 'circ']),
+            'I': frozenset(['circ']),
+            'J': frozenset(['circ']),
+            'M': frozenset(['mode', 'eof']),
+        }
+
         # flag to store if a conversion was done. It is needed because multiple units declarations can be found
         # in a Gerber file (normal or obsolete ones)
         self.conversion_done = False
@@ -322,42 +346,50 @@ class Gerber(Geometry):
         """
 
         with open(filename, 'r') as gfile:
+            # the statements are fed to the parser as they are read from the file, without loading the whole file
+            self.parse_lines(self.gerber_statements(gfile))
 
-            def line_generator():
-                for line in gfile:
-                    line = line.strip(' \r\n')
-                    while len(line) > 0:
+    @staticmethod
+    def gerber_statements(lines):
+        """
+        Generator of Gerber statements. Will split the lines if multiple statements are found in a single
+        original line. Lines that end with '%' (extended commands) are yielded as they are.
 
-                        # If ends with '%' leave as is.
-                        if line[-1] == '%':
-                            yield line
-                            break
+        :param lines:   iterable of Gerber source lines (a file object works)
+        :return:        yields one Gerber statement at a time
+        """
+        for line in lines:
+            line = line.strip(' \r\n')
+            if not line:
+                continue
 
-                        # Split after '*' if any.
-                        starpos = line.find('*')
-                        if starpos > -1:
-                            cleanline = line[:starpos + 1]
-                            yield cleanline
-                            line = line[starpos + 1:]
+            # If ends with '%' leave as is.
+            if line[-1] == '%':
+                yield line
+                continue
 
-                        # Otherwise leave as is.
-                        else:
-                            # yield clean line
-                            yield line
-                            break
+            # Split after '*' if any.
+            statements = line.split('*')
+            for stat in statements[:-1]:
+                yield stat + '*'
 
-            processed_lines = list(line_generator())
-            self.parse_lines(processed_lines)
+            # Otherwise leave as is.
+            if statements[-1]:
+                yield statements[-1]
 
     # @profile
-    def parse_lines(self, glines):
+    def parse_lines(self, glines, state=None):
         """
         Main Gerber parser. Reads Gerber and populates ``self.paths``, ``self.apertures``,
         ``self.flashes``, ``self.regions`` and ``self.units``.
-
-        :param glines: Gerber code as list of strings, each element being
-            one line of the source file.
-        :type glines: list
+        The graphics state at the end is left in ``self.graphics_state``.
+
+        :param glines: Gerber code as an iterable of strings (a list or a generator),
+            each element being one line (statement) of the source file.
+        :type glines: iterable
+        :param state: the graphics state the parsing starts with, as ``self.graphics_state``; e.g. the state before
+            a step and repeat block. If None the parsing starts with the initial graphics state.
+        :type state: dict
         :return: None
         :rtype: None
         """
@@ -415,13 +447,38 @@ class Gerber(Geometry):
         # If a region is being defined
         making_region = False
 
+        # The step and repeat block being read, its statements and the graphics state before it
+        step_repeat = None
+        step_repeat_lines = []
+        step_repeat_state = None
+
+        if state is not None:
+            current_aperture = state['aperture']
+            current_x = previous_x = state['x']
+            current_y = previous_y = state['y']
+            current_interpolation_mode = state['interpolation']
+            quadrant_mode = state['quadrant']
+
         # ### Parsing starts here ## ##
         line_num = 0
         gline = ""
 
+        # the parsing steps for statements with a leading character not found in the dispatch table
+        no_steps = frozenset()
+
         s_tol = float(self.app.defaults["gerber_simp_tolerance"])
 
-        self.app.inform.emit('%s %d %s.' % (_("Gerber processing. Parsing"), len(glines), _("Lines").lower()))
+        # the source lines are collected in small lists that are joined into text blocks as they fill up, such that
+        # the source text is never copied as a whole while parsing and there are no millions of small strings alive
+        source_blocks = []
+        source_chunk = []
+
+        try:
+            self.app.inform.emit('%s %d %s.' % (_("Gerber processing. Parsing"), len(glines), _("Lines").lower()))
+        except TypeError:
+            # glines is a generator, the number of lines is not known in advance
+            self.app.inform.emit('%s ...' % _("Gerber processing. Parsing"))
+
         try:
             for gline in glines:
                 if self.app.abort_flag:
@@ -429,18 +486,61 @@ class Gerber(Geometry):
                     raise grace
 
                 line_num += 1
-                self.source_file += gline + '\n'
+                source_chunk.append(gline)
+                if len(source_chunk) == 4096:
+                    source_chunk.append('')
+                    source_blocks.append('\n'.join(source_chunk))
+                    source_chunk = []
 
                 # Cleanup #
                 gline = gline.strip(' \r\n')
                 # log.debug("Line=%3s %s" % (line_num, gline))
 
+                # the parsing steps that can match this statement
+                steps = self.stat_dispatch.get(gline[:1], no_steps)
+
                 # ###############################################################
                 # ################   Ignored lines   ############################
                 # ################     Comments      ############################
                 # ###############################################################
-                match = self.comm_re.search(gline)
+                if 'comm' in steps and self.comm_re.search(gline):
+                    continue
+
+                # ###############################################################
+                # ################  Step and repeat  ############################
+                # ########   Example: %SRX3Y2I5.0J4.0*% ... %SR*%    ###########
+                # ########   The statements of the block are collected and  ###
+                # ########   the block is parsed once when it closes, then  ###
+                # ########   its geometry is copied to each step.           ###
+                # ###############################################################
+                match = self.sr_re.search(gline) if 'sr' in steps else None
+                if step_repeat is not None and (match or ('eof' in steps and self.eof_re.search(gline))):
+                    block_state = self.parse_step_repeat(step_repeat, step_repeat_lines, poly_buffer, follow_buffer,
+                                                         step_repeat_state)
+                    step_repeat = None
+                    # the graphics state goes on from the end of the block
+                    if block_state is not None:
+                        current_aperture = block_state['aperture']
+                        current_x = previous_x = block_state['x']
+                        current_y = previous_y = block_state['y']
+                        current_interpolation_mode = block_state['interpolation']
+                        quadrant_mode = block_state['quadrant']
                 if match:
+                    if match.group(1) is not None:
+                        step_repeat = StepRepeat(int(match.group(1)), int(match.group(2)),
+                                                 float(match.group(3)), float(match.group(4)))
+                        step_repeat_lines = []
+                        # the block starts with the graphics state before it
+                        step_repeat_state = {
+                            'aperture': current_aperture,
+                            'x': current_x,
+                            'y': current_y,
+                            'interpolation': current_interpolation_mode,
+                            'quadrant': quadrant_mode
+                        }
+                    continue
+                if step_repeat is not None:
+                    step_repeat_lines.append(gline)
                     continue
 
                 # ###############################################################
@@ -449,7 +549,7 @@ class Gerber(Geometry):
                 # ########   If polarity changes, creates geometry from current #
                 # ########    buffer, then adds or subtracts accordingly.       #
                 # ###############################################################
-                match = self.lpol_re.search(gline)
+                match = self.lpol_re.search(gline) if 'lpol' in steps else None
                 if match:
                     new_polarity = match.group(1)
                     # log.info("Polarity CHANGE, LPC = %s, poly_buff = %s" % (self.is_lpc, poly_buffer))
@@ -517,7 +617,8 @@ class Gerber(Geometry):
                 # #####################  Example: %FSLAX24Y24*%  #################
                 # ################################################################
 
-                match = self.fmt_re.search(gline)
+                fmt_stat = 'FS' in gline
+                match = self.fmt_re.search(gline) if fmt_stat else None
                 if match:
                     absolute = {'A': 'Absolute', 'I': 'Relative'}[match.group(2)]
                     if match.group(1) is not None:
@@ -536,7 +637,7 @@ class Gerber(Geometry):
                 # ######################## Mode (IN/MM)    #######################
                 # #####################    Example: %MOIN*%  #####################
                 # ################################################################
-                match = self.mode_re.search(gline)
+                match = self.mode_re.search(gline) if 'mode' in steps else None
                 if match:
                     self.units = match.group(1)
                     log.debug("Gerber units found = %s" % self.units)
@@ -548,7 +649,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # Combined Number format and Mode --- Allegro does this ##########
                 # ################################################################
-                match = self.fmt_re_alt.search(gline)
+                match = self.fmt_re_alt.search(gline) if fmt_stat else None
                 if match:
                     absolute = {'A': 'Absolute', 'I': 'Relative'}[match.group(2)]
                     if match.group(1) is not None:
@@ -571,7 +672,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ####     Search for OrCAD way for having Number format  ########
                 # ################################################################
-                match = self.fmt_re_orcad.search(gline)
+                match = self.fmt_re_orcad.search(gline) if fmt_stat else None
                 if match:
                     if match.group(1) is not None:
                         if match.group(1) == 'G74':
@@ -600,7 +701,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ############     Units (G70/1) OBSOLETE   ######################
                 # ################################################################
-                match = self.units_re.search(gline)
+                match = self.units_re.search(gline) if 'units' in steps else None
                 if match:
                     obs_gerber_units = {'0': 'IN', '1': 'MM'}[match.group(1)]
                     self.units = obs_gerber_units
@@ -613,7 +714,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # #####   Absolute/relative coordinates G90/1 OBSOLETE ###########
                 # ################################################################
-                match = self.absrel_re.search(gline)
+                match = self.absrel_re.search(gline) if 'absrel' in steps else None
                 if match:
                     absolute = {'0': "Absolute", '1': "Relative"}[match.group(1)]
                     log.warning("Gerber obsolete coordinates type found = %s (Absolute or Relative) " % absolute)
@@ -626,7 +727,7 @@ class Gerber(Geometry):
                 # be caught by other patterns.
                 # ################################################################
                 if current_macro is None:  # No macro started yet
-                    match = self.am1_re.search(gline)
+                    match = self.am1_re.search(gline) if 'am' in steps else None
                     # Start macro if match, else not an AM, carry on.
                     if match:
                         log.debug("Starting macro. Line %d: %s" % (line_num, gline))
@@ -654,7 +755,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ##############   Aperture definitions %ADD...  #################
                 # ################################################################
-                match = self.ad_re.search(gline)
+                match = self.ad_re.search(gline) if 'ad' in steps else None
                 if match:
                     # log.info("Found aperture definition. Line %d: %s" % (line_num, gline))
                     self.aperture_parse(match.group(1), match.group(2), match.group(3))
@@ -665,7 +766,7 @@ class Gerber(Geometry):
                 # ###########   Operation code alone, usually just D03 (Flash) ###
                 # self.opcode_re = re.compile(r'^D0?([123])\*$')
                 # ################################################################
-                match = self.opcode_re.search(gline)
+                match = self.opcode_re.search(gline) if 'opcode' in steps else None
                 if match:
                     current_operation_code = int(match.group(1))
                     current_d = current_operation_code
@@ -707,7 +808,7 @@ class Gerber(Geometry):
                 # ################  Tool/aperture change  ########################
                 # ################  Example: D12*         ########################
                 # ################################################################
-                match = self.tool_re.search(gline)
+                match = self.tool_re.search(gline) if 'tool' in steps else None
                 if match:
                     current_aperture = match.group(1)
                     # log.debug("Line %d: Aperture change to (%s)" % (line_num, current_aperture))
@@ -763,7 +864,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ################  G36* - Begin region   ########################
                 # ################################################################
-                if self.regionon_re.search(gline):
+                if 'region' in steps and self.regionon_re.search(gline):
                     try:
                         path_length = len(path)
                     except TypeError:
@@ -805,7 +906,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ################  G37* - End region     ########################
                 # ################################################################
-                if self.regionoff_re.search(gline):
+                if 'region' in steps and self.regionoff_re.search(gline):
                     making_region = False
 
                     if '0' not in self.apertures:
@@ -901,7 +1002,7 @@ class Gerber(Geometry):
                 # ####  sometimes by itself (handled here).  #####################
                 # ####  Example: G01*                        #####################
                 # ################################################################
-                match = self.interp_re.search(gline)
+                match = self.interp_re.search(gline) if 'interp' in steps else None
                 if match:
                     current_interpolation_mode = int(match.group(1))
                     continue
@@ -911,8 +1012,16 @@ class Gerber(Geometry):
                 # ######### Operation code (D0x) missing is deprecated   #########
                 # REGEX: r'^(?:G0?(1))?(?:X(-?\d+))?(?:Y(-?\d+))?(?:D0([123]))?\*$'
                 # ################################################################
-                match = self.lin_re.search(gline)
-                if match:
+                lin_groups = None
+                if 'lin' in steps:
+                    # fast path for the plain coordinate statements, the regex is used only if it can't parse them
+                    if gline[0] != 'G':
+                        lin_groups = parse_gerber_coordinates(gline)
+                    if lin_groups is None:
+                        match = self.lin_re.search(gline)
+                        if match:
+                            lin_groups = match.groups()
+                if lin_groups:
                     # Dxx alone?
                     # if match.group(1) is None and match.group(2) is None and match.group(3) is None:
                     #     try:
@@ -924,22 +1033,22 @@ class Gerber(Geometry):
                     #       operation code.
 
                     # Parse coordinates
-                    if match.group(2) is not None:
-                        linear_x = parse_gerber_number(match.group(2),
+                    if lin_groups[1] is not None:
+                        linear_x = parse_gerber_number(lin_groups[1],
                                                        self.int_digits, self.frac_digits, self.gerber_zeros)
                         current_x = linear_x
                     else:
                         linear_x = current_x
-                    if match.group(3) is not None:
-                        linear_y = parse_gerber_number(match.group(3),
+                    if lin_groups[2] is not None:
+                        linear_y = parse_gerber_number(lin_groups[2],
                                                        self.int_digits, self.frac_digits, self.gerber_zeros)
                         current_y = linear_y
                     else:
                         linear_y = current_y
 
                     # Parse operation code
-                    if match.group(4) is not None:
-                        current_operation_code = int(match.group(4))
+                    if lin_groups[3] is not None:
+                        current_operation_code = int(lin_groups[3])
 
                     # Pen down: add segment
                     if current_operation_code == 1:
@@ -1244,7 +1353,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ######### G74/75* - Single or multiple quadrant arcs  ##########
                 # ################################################################
-                match = self.quad_re.search(gline)
+                match = self.quad_re.search(gline) if 'quad' in steps else None
                 if match:
                     if match.group(1) == '4':
                         quadrant_mode = 'SINGLE'
@@ -1258,7 +1367,7 @@ class Gerber(Geometry):
                 # ######### Ex. format: G03 X0 Y50 I-50 J0 where the     #########
                 # ######### X, Y coords are the coords of the End Point  #########
                 # ################################################################
-                match = self.circ_re.search(gline)
+                match = self.circ_re.search(gline) if 'circ' in steps else None
                 if match:
                     arcdir = [None, None, "cw", "ccw"]
 
@@ -1446,8 +1555,7 @@ class Gerber(Geometry):
                 # ################################################################
                 # ######### EOF - END OF FILE ####################################
                 # ################################################################
-                match = self.eof_re.search(gline)
-                if match:
+                if 'eof' in steps and self.eof_re.search(gline):
                     continue
 
                 # ################################################################
@@ -1457,6 +1565,14 @@ class Gerber(Geometry):
                 # provide the app with a way to process the GUI events when in a blocking loop
                 QtWidgets.QApplication.processEvents()
 
+            self.graphics_state = {
+                'aperture': current_aperture,
+                'x': current_x,
+                'y': current_y,
+                'interpolation': current_interpolation_mode,
+                'quadrant': quadrant_mode
+            }
+
             try:
                 path_length = len(path)
             except TypeError:
@@ -1604,6 +1720,69 @@ class Gerber(Geometry):
             loc = '%s #%d %s: %s\n' % (_("Gerber Line"), line_num, _("Gerber Line Content"), gline) + repr(err)
             self.app.inform.emit('[ERROR] %s\n%s:' %
                                  (_("Gerber Parser ERROR"), loc))
+        finally:
+            if source_chunk:
+                source_chunk.append('')
+                source_blocks.append('\n'.join(source_chunk))
+            self.source_file += ''.join(source_blocks)
+
+    def parse_step_repeat(self, step_repeat, glines, poly_buffer, follow_buffer, state=None):
+        """
+        Parses the statements of a step and repeat block once, with a Gerber object that has the number format and
+        the apertures of this one, and adds the geometry of each copy of the block.
+
+        :param step_repeat:     the copies of the block
+        :type step_repeat:      appCommon.StepRepeat.StepRepeat
+        :param glines:          the Gerber statements of the block
+        :param poly_buffer:     the polygons buffer of parse_lines(), where the polygons of the copies are added
+        :param follow_buffer:   the follow geometry of parse_lines(), where the follow geometry of the copies is added
+        :param state:           the graphics state before the block, as Gerber.graphics_state
+        :type state:            dict
+        :return:                the graphics state at the end of the block or None if the parsing failed
+        :rtype:                 dict
+        """
+        block = type(self)()
+        block.int_digits = self.int_digits
+        block.frac_digits = self.frac_digits
+        block.gerber_zeros = self.gerber_zeros
+        block.units = self.units
+        block.is_lpc = self.is_lpc
+        block.aperture_macros = self.aperture_macros
+        for apid, ap in self.apertures.items():
+            block.apertures[apid] = {k: v for k, v in ap.items() if k != 'geometry'}
+
+        if block.parse_lines(glines, state=state) == 'fail':
+            # a block without geometry still moves the current point
+            return block.graphics_state
+
+        solid = block.solid_geometry if isinstance(block.solid_geometry, list) else [block.solid_geometry]
+        polygons = []
+        for geo in solid:
+            if isinstance(geo, MultiPolygon):
+                polygons += list(geo.geoms)
+            elif isinstance(geo, Polygon) and not geo.is_empty:
+                polygons.append(geo)
+
+        source = {
+            'solid': polygons,
+            'follow': block.follow_geometry,
+            'apertures': {apid: ap['geometry'] for apid, ap in block.apertures.items() if 'geometry' in ap}
+        }
+        for copy in step_repeat.instances(source):
+            if self.app.abort_flag:
+                # graceful abort requested by the user
+                raise grace
+
+            poly_buffer += copy['solid']
+            follow_buffer += copy['follow']
+            for apid, geometry in copy['apertures'].items():
+                if apid not in self.apertures:
+                    self.apertures[apid] = {k: v for k, v in block.apertures[apid].items() if k != 'geometry'}
+                if 'geometry' not in self.apertures[apid]:
+                    self.apertures[apid]['geometry'] = []
+                self.apertures[apid]['geometry'] += geometry
+
+        return block.graphics_state
 
     @staticmethod
     def create_flash_geometry(location, aperture, steps_per_circle=None):
@@ -1853,6 +2032,7 @@ class Gerber(Geometry):
         else:
             if type(self.solid_geometry) == list:
                 self.solid_geometry.append(geos)
+                self.geometry_changed()
             else:
                 self.solid_geometry = [self.solid_geometry, geos]
 
@@ -1886,6 +2066,9 @@ class Gerber(Geometry):
         """
 
         log.debug("Parsing DXF file geometry into a Gerber object geometry.")
+        # ezdxf is imported when needed, it is slow to load
+        import ezdxf
+
         # Parse into list of shapely objects
         dxf = ezdxf.readfile(filename)
         geos = getdxfgeo(dxf)
@@ -1901,6 +2084,7 @@ class Gerber(Geometry):
                 self.solid_geometry += geos
             else:
                 self.solid_geometry.append(geos)
+                self.geometry_changed()
         else:  # It's shapely geometry
             self.solid_geometry = [self.solid_geometry, geos]
 
@@ -1924,6 +2108,39 @@ class Gerber(Geometry):
             new_el = {'solid': pol, 'follow': pol}
             self.apertures['0']['geometry'].append(deepcopy(new_el))
 
+    def transform_all(self, transform, follow=True):
+        """
+        Transforms, all at once, the solid geometry, the follow geometry and the geometry stored in the apertures.
+
+        :param transform:   function that transforms the geometry gathered in a GeometryBatch
+        :param follow:      if False the follow geometry is kept as it is
+        :return:            None
+        """
+        batch = self.geometry_batch()
+
+        solid_idx = batch.add(self.solid_geometry)
+        follow_idx = batch.add(self.follow_geometry) if follow else None
+        apertures_idx = {}
+        for apid in self.apertures:
+            if 'geometry' in self.apertures[apid]:
+                apertures_idx[apid] = batch.add([
+                    {key: geo for key, geo in geo_el.items() if follow or key != 'follow'}
+                    for geo_el in self.apertures[apid]['geometry']
+                ])
+
+        transform(batch)
+
+        self.solid_geometry = batch.result(solid_idx)
+        if follow:
+            self.follow_geometry = batch.result(follow_idx)
+        for apid, aperture_idx in apertures_idx.items():
+            new_geometry = batch.result(aperture_idx)
+            if not follow:
+                for new_geo_el, geo_el in zip(new_geometry, self.apertures[apid]['geometry']):
+                    if 'follow' in geo_el:
+                        new_geo_el['follow'] = geo_el['follow']
+            self.apertures[apid]['geometry'] = new_geometry
+
     def scale(self, xfactor, yfactor=None, point=None):
         """
         Scales the objects' geometry on the XY plane by a given factor.
@@ -1974,54 +2191,11 @@ class Gerber(Geometry):
         else:
             px, py = point
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
+        self.transform_all(lambda batch: batch.affine(scale_matrix(xfactor, yfactor, (px, py))))
 
-        def scale_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(scale_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 99]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.scale(obj, xfactor, yfactor, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = scale_geom(self.solid_geometry)
-        self.follow_geometry = scale_geom(self.follow_geometry)
-
-        # we need to scale the geometry stored in the Gerber apertures, too
+        # we need to scale the sizes of the Gerber apertures, too
         try:
             for apid in self.apertures:
-                new_geometry = []
-                if 'geometry' in self.apertures[apid]:
-                    for geo_el in self.apertures[apid]['geometry']:
-                        new_geo_el = {}
-                        if 'solid' in geo_el:
-                            new_geo_el['solid'] = scale_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            new_geo_el['follow'] = scale_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            new_geo_el['clear'] = scale_geom(geo_el['clear'])
-                        new_geometry.append(new_geo_el)
-
-                self.apertures[apid]['geometry'] = deepcopy(new_geometry)
-
                 try:
                     if str(self.apertures[apid]['type']) == 'R' or str(self.apertures[apid]['type']) == 'O':
                         self.apertures[apid]['width'] *= xfactor
@@ -2085,50 +2259,9 @@ class Gerber(Geometry):
         if dx == 0 and dy == 0:
             return
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
+        # the solid and the follow geometry and the geometry stored in the Gerber apertures
         try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def offset_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(offset_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 99]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.translate(obj, xoff=dx, yoff=dy)
-                except AttributeError:
-                    return obj
-
-        # ## Solid geometry
-        self.solid_geometry = offset_geom(self.solid_geometry)
-        self.follow_geometry = offset_geom(self.follow_geometry)
-
-        # we need to offset the geometry stored in the Gerber apertures, too
-        try:
-            for apid in self.apertures:
-                if 'geometry' in self.apertures[apid]:
-                    for geo_el in self.apertures[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = offset_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = offset_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = offset_geom(geo_el['clear'])
-
+            self.transform_all(lambda batch: batch.affine(translate_matrix(dx, dy)))
         except Exception as e:
             log.debug('camlib.Gerber.offset() Exception --> %s' % str(e))
             return 'fail'
@@ -2162,48 +2295,9 @@ class Gerber(Geometry):
         px, py = point
         xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
+        # the solid and the follow geometry and the geometry stored in the Gerber apertures
         try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def mirror_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(mirror_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 99]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.scale(obj, xscale, yscale, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = mirror_geom(self.solid_geometry)
-        self.follow_geometry = mirror_geom(self.follow_geometry)
-
-        # we need to mirror the geometry stored in the Gerber apertures, too
-        try:
-            for apid in self.apertures:
-                if 'geometry' in self.apertures[apid]:
-                    for geo_el in self.apertures[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = mirror_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = mirror_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = mirror_geom(geo_el['clear'])
+            self.transform_all(lambda batch: batch.affine(scale_matrix(xscale, yscale, (px, py))))
         except Exception as e:
             log.debug('camlib.Gerber.mirror() Exception --> %s' % str(e))
             return 'fail'
@@ -2236,48 +2330,9 @@ class Gerber(Geometry):
         if angle_x == 0 and angle_y == 0:
             return
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def skew_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(skew_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.skew(obj, angle_x, angle_y, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = skew_geom(self.solid_geometry)
-        self.follow_geometry = skew_geom(self.follow_geometry)
-
-        # we need to skew the geometry stored in the Gerber apertures, too
+        # the solid and the follow geometry and the geometry stored in the Gerber apertures
         try:
-            for apid in self.apertures:
-                if 'geometry' in self.apertures[apid]:
-                    for geo_el in self.apertures[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = skew_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = skew_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = skew_geom(geo_el['clear'])
+            self.transform_all(lambda batch: batch.affine(skew_matrix(angle_x, angle_y, (px, py))))
         except Exception as e:
             log.debug('camlib.Gerber.skew() Exception --> %s' % str(e))
             return 'fail'
@@ -2299,48 +2354,9 @@ class Gerber(Geometry):
         if angle == 0:
             return
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
+        # the solid and the follow geometry and the geometry stored in the Gerber apertures
         try:
-            self.geo_len = len(self.solid_geometry)
-        except TypeError:
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
-        def rotate_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(rotate_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.rotate(obj, angle, origin=(px, py))
-                except AttributeError:
-                    return obj
-
-        self.solid_geometry = rotate_geom(self.solid_geometry)
-        self.follow_geometry = rotate_geom(self.follow_geometry)
-
-        # we need to rotate the geometry stored in the Gerber apertures, too
-        try:
-            for apid in self.apertures:
-                if 'geometry' in self.apertures[apid]:
-                    for geo_el in self.apertures[apid]['geometry']:
-                        if 'solid' in geo_el:
-                            geo_el['solid'] = rotate_geom(geo_el['solid'])
-                        if 'follow' in geo_el:
-                            geo_el['follow'] = rotate_geom(geo_el['follow'])
-                        if 'clear' in geo_el:
-                            geo_el['clear'] = rotate_geom(geo_el['clear'])
+            self.transform_all(lambda batch: batch.affine(rotate_matrix(angle, (px, py))))
         except Exception as e:
             log.debug('camlib.Gerber.rotate() Exception --> %s' % str(e))
             return 'fail'
@@ -2360,60 +2376,19 @@ class Gerber(Geometry):
         if distance == 0:
             return
 
-        # variables to display the percentage of work done
-        self.geo_len = 0
-        try:
-            self.geo_len = len(self.solid_geometry)
-        except (TypeError, ValueError):
-            self.geo_len = 1
-
-        self.old_disp_number = 0
-        self.el_count = 0
-
         if factor is None:
-            def buffer_geom(obj):
-                if type(obj) is list:
-                    new_obj = []
-                    for g in obj:
-                        new_obj.append(buffer_geom(g))
-                    return new_obj
-                else:
-                    try:
-                        self.el_count += 1
-                        disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                        if self.old_disp_number < disp_number <= 100:
-                            self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                            self.old_disp_number = disp_number
-
-                        return obj.buffer(distance, resolution=int(self.steps_per_circle), join_style=join)
-
-                    except AttributeError:
-                        return obj
-
-            res = buffer_geom(self.solid_geometry)
+            # the solid geometry and the geometry stored in the Gerber apertures, but not the follow geometry
+            self.transform_all(
+                lambda batch: batch.buffer(distance, resolution=int(self.steps_per_circle), join_style=join),
+                follow=False)
             try:
-                __ = iter(res)
-                self.solid_geometry = res
+                __ = iter(self.solid_geometry)
             except TypeError:
-                self.solid_geometry = [res]
+                self.solid_geometry = [self.solid_geometry]
 
-            # we need to buffer the geometry stored in the Gerber apertures, too
+            # we need to buffer the sizes of the Gerber apertures, too
             try:
                 for apid in self.apertures:
-                    new_geometry = []
-                    if 'geometry' in self.apertures[apid]:
-                        for geo_el in self.apertures[apid]['geometry']:
-                            new_geo_el = {}
-                            if 'solid' in geo_el:
-                                new_geo_el['solid'] = buffer_geom(geo_el['solid'])
-                            if 'follow' in geo_el:
-                                new_geo_el['follow'] = geo_el['follow']
-                            if 'clear' in geo_el:
-                                new_geo_el['clear'] = buffer_geom(geo_el['clear'])
-                            new_geometry.append(new_geo_el)
-
-                    self.apertures[apid]['geometry'] = deepcopy(new_geometry)
-
                     try:
                         if str(self.apertures[apid]['type']) == 'R' or str(self.apertures[apid]['type']) == 'O':
                             self.apertures[apid]['width'] += (distance * 2)
@@ -2505,6 +2480,57 @@ class Gerber(Geometry):
         self.app.proc_container.new_text = ''
 
 
+def parse_gerber_coordinates(gline):
+    """
+    Parse a plain linear interpolation statement like X12345Y-6789D01* without using regular expressions.
+    It returns the same groups as Gerber.lin_re: (interpolation, X, Y, operation code) but only for the statements made
+    only of the X and Y coordinates and an optional D01/D02/D03 operation code. For anything else it returns None
+    and the statement has to be parsed with the regex.
+
+    :param gline:   a Gerber statement
+    :type gline:    str
+    :return:        tuple of strings (or None for the missing ones) or None if the statement is not a plain one
+    :rtype:         tuple
+    """
+
+    if gline[-1:] != '*':
+        return None
+
+    body = gline[:-1]
+    op_code = None
+    dpos = body.find('D')
+    if dpos != -1:
+        op_code = body[dpos + 1:]
+        if op_code in ('1', '2', '3', '01', '02', '03'):
+            op_code = op_code[-1]
+        else:
+            return None
+        body = body[:dpos]
+
+    if body[:1] == 'X':
+        ypos = body.find('Y')
+        if ypos == -1:
+            x_str, y_str = body[1:], None
+        else:
+            x_str, y_str = body[1:ypos], body[ypos + 1:]
+    elif body[:1] == 'Y':
+        xpos = body.find('X')
+        if xpos == -1:
+            x_str, y_str = None, body[1:]
+        else:
+            x_str, y_str = body[xpos + 1:], body[1:xpos]
+    else:
+        return None
+
+    for num in (x_str, y_str):
+        if num is not None:
+            digits = num[1:] if num[:1] in ('+', '-') else num
+            if not digits.isdecimal():
+                return None
+
+    return None, x_str, y_str, op_code
+
+
 def parse_gerber_number(strnumber, int_digits, frac_digits, zeros):
     """
     Parse a single number of Gerber coordinates.
@@ -734,7 +734,7 @@ class CutOut(AppTool):
                         object_geo = cutout_obj.tools[t_first]['solid_geometry']
 
                 if kind == 'single':
-                    object_geo = unary_union(object_geo)
+                    object_geo = self.app.buffer_cache.union(object_geo)
 
                     # for geo in object_geo:
                     if cutout_obj.kind == 'gerber':
@@ -785,7 +785,7 @@ class CutOut(AppTool):
                     gapsize -= dia / 2
                     mb_object_geo = deepcopy(object_geo)
                     if kind == 'single':
-                        mb_object_geo = unary_union(mb_object_geo)
+                        mb_object_geo = self.app.buffer_cache.union(mb_object_geo)
 
                         # for geo in object_geo:
                         if cutout_obj.kind == 'gerber':
@@ -1063,7 +1063,7 @@ class CutOut(AppTool):
 
                 if kind == 'single':
                     # fuse the lines
-                    object_geo = unary_union(object_geo)
+                    object_geo = self.app.buffer_cache.union(object_geo)
 
                     xmin, ymin, xmax, ymax = object_geo.bounds
                     geo = box(xmin, ymin, xmax, ymax)
@@ -1136,7 +1136,7 @@ class CutOut(AppTool):
 
                     if kind == 'single':
                         # fuse the lines
-                        mb_object_geo = unary_union(mb_object_geo)
+                        mb_object_geo = self.app.buffer_cache.union(mb_object_geo)
 
                         xmin, ymin, xmax, ymax = mb_object_geo.bounds
                         mb_geo = box(xmin, ymin, xmax, ymax)
@@ -1454,7 +1454,7 @@ class CutOut(AppTool):
         convex_box = self.ui.convex_box_cb.get_value()
 
         def geo_init(geo_obj, app_obj):
-            geo_union = unary_union(cutout_obj.solid_geometry)
+            geo_union = self.app.buffer_cache.union(cutout_obj)
 
             if convex_box:
                 geo = geo_union.convex_hull
@@ -472,9 +472,9 @@ class Film(AppTool):
                         flat_geo += box.flatten(box.tools[tool]['solid_geometry'])
                     box_geo = unary_union(flat_geo)
                 else:
-                    box_geo = unary_union(box.flatten())
+                    box_geo = self.app.buffer_cache.union(box)
             else:
-                box_geo = unary_union(box.flatten())
+                box_geo = self.app.buffer_cache.union(box)
 
             skew_ref = 'center'
             if skew_reference != 'center':
@@ -731,9 +731,9 @@ class Film(AppTool):
                         flat_geo += box.flatten(box.tools[tool]['solid_geometry'])
                     box_geo = unary_union(flat_geo)
                 else:
-                    box_geo = unary_union(box.flatten())
+                    box_geo = self.app.buffer_cache.union(box)
             else:
-                box_geo = unary_union(box.flatten())
+                box_geo = self.app.buffer_cache.union(box)
 
             skew_ref = 'center'
             if skew_reference != 'center':
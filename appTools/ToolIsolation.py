@@ -1621,13 +1621,11 @@ class ToolIsolation(AppTool, Gerber):
         else:
             prog_plot = self.app.defaults["tools_iso_plotting"]
 
+            envelopes = self.generate_envelopes(isolated_obj, geometry, tools_storage, sorted_tools,
+                                                negative_dia=negative_dia, prog_plot=prog_plot)
+
             for tool in sorted_tools:
                 tool_data = tools_storage[tool]['data']
-                to_follow = tool_data['tools_iso_follow']
-
-                work_geo = geometry
-                if work_geo is None:
-                    work_geo = isolated_obj.follow_geometry if to_follow else isolated_obj.solid_geometry
 
                 iso_t = {
                     'ext': 0,
@@ -1636,10 +1634,6 @@ class ToolIsolation(AppTool, Gerber):
                 }[tool_data['tools_iso_isotype']]
 
                 passes = tool_data['tools_iso_passes']
-                overlap = tool_data['tools_iso_overlap']
-                overlap /= 100.0
-
-                milling_type = tool_data['tools_iso_milling_type']
 
                 iso_except = self.ui.except_cb.get_value()
 
@@ -1647,10 +1641,6 @@ class ToolIsolation(AppTool, Gerber):
                     tool_dia = tools_storage[tool]['tooldia']
                     tool_type = tools_storage[tool]['tool_type']
 
-                    iso_offset = tool_dia * ((2 * i + 1) / 2.0000001) - (i * overlap * tool_dia)
-                    if negative_dia:
-                        iso_offset = -iso_offset
-
                     outname = "%s_%.*f" % (isolated_obj.options["name"], self.decimals, float(tool_dia))
 
                     if passes > 1:
@@ -1666,11 +1656,7 @@ class ToolIsolation(AppTool, Gerber):
                         elif iso_t == 1:
                             iso_name = outname + "_int_iso"
 
-                    # if milling type is climb then the move is counter-clockwise around features
-                    mill_dir = 1 if milling_type == 'cl' else 0
-
-                    iso_geo = self.generate_envelope(iso_offset, mill_dir, geometry=work_geo, env_iso_type=iso_t,
-                                                     follow=to_follow, nr_passes=i, prog_plot=prog_plot)
+                    iso_geo = envelopes[(tool, i)]
                     if iso_geo == 'fail':
                         self.app.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
                         continue
@@ -1988,6 +1974,9 @@ class ToolIsolation(AppTool, Gerber):
             self.app.inform.emit('[ERROR_NOTCL] %s' % _("There are no tools selected in the Tool Table."))
             return 'fail'
 
+        envelopes = self.generate_envelopes(iso_obj, geometry, tools_storage, sorted_tools, negative_dia=negative_dia,
+                                            prog_plot=prog_plot)
+
         for tool in sorted_tools:
             tool_dia = tools_storage[tool]['tooldia']
             tool_has_offset = tools_storage[tool]['offset']
@@ -1998,12 +1987,6 @@ class ToolIsolation(AppTool, Gerber):
 
             to_follow = tool_data['tools_iso_follow']
 
-            # TODO what to do when the iso2geo param is not None but the Follow cb is checked
-            # for the case when limited area is used .... the follow geo should be clipped too
-            work_geo = geometry
-            if work_geo is None:
-                work_geo = iso_obj.follow_geometry if to_follow else iso_obj.solid_geometry
-
             iso_t = {
                 'ext': 0,
                 'int': 1,
@@ -2011,10 +1994,6 @@ class ToolIsolation(AppTool, Gerber):
             }[tool_data['tools_iso_isotype']]
 
             passes = tool_data['tools_iso_passes']
-            overlap = tool_data['tools_iso_overlap']
-            overlap /= 100.0
-
-            milling_type = tool_data['tools_iso_milling_type']
 
             iso_except = self.ui.except_cb.get_value()
 
@@ -2032,15 +2011,7 @@ class ToolIsolation(AppTool, Gerber):
 
             solid_geo = []
             for nr_pass in range(passes):
-                iso_offset = tool_dia * ((2 * nr_pass + 1) / 2.0000001) - (nr_pass * overlap * tool_dia)
-                if negative_dia:
-                    iso_offset = -iso_offset
-
-                # if milling type is climb then the move is counter-clockwise around features
-                mill_dir = 1 if milling_type == 'cl' else 0
-
-                iso_geo = self.generate_envelope(iso_offset, mill_dir, geometry=work_geo, env_iso_type=iso_t,
-                                                 follow=to_follow, nr_passes=nr_pass, prog_plot=prog_plot)
+                iso_geo = envelopes[(tool, nr_pass)]
                 if iso_geo == 'fail':
                     self.app.inform.emit('[ERROR_NOTCL] %s' % _("Isolation geometry could not be generated."))
                     continue
@@ -2829,26 +2800,141 @@ class ToolIsolation(AppTool, Gerber):
                 return 'fail'
 
         if invert:
-            try:
-                pl = []
-                for p in geom:
-                    if p is not None:
-                        if isinstance(p, Polygon):
-                            pl.append(Polygon(p.exterior.coords[::-1], p.interiors))
-                        elif isinstance(p, LinearRing):
-                            pl.append(Polygon(p.coords[::-1]))
-                geom = MultiPolygon(pl)
-            except TypeError:
-                if isinstance(geom, Polygon) and geom is not None:
-                    geom = Polygon(geom.exterior.coords[::-1], geom.interiors)
-                elif isinstance(geom, LinearRing) and geom is not None:
-                    geom = Polygon(geom.coords[::-1])
+            geom = self.invert_envelope(geom)
+        return geom
+
+    def generate_envelopes(self, iso_obj, geometry, tools_storage, sorted_tools, negative_dia=None, prog_plot=False):
+        """
+        Makes the envelopes of all the isolation passes of the tools, as generate_envelope() does for each of them.
+        The envelopes are made in parallel in the application pool, from one union of the geometry that is shared by
+        all the tools and passes (see Geometry.isolation_geometry_pool()). The union and the envelopes are kept in the
+        App.buffer_cache, for the next runs. The followed geometry and the progressive plotting are done here, one
+        envelope after the other.
+
+        :param iso_obj:         the isolated Gerber object
+        :type iso_obj:          AppObjects.FlatCAMGerber.GerberObject
+        :param geometry:        specific geometry to isolate; if None the geometry of the iso_obj is isolated
+        :type geometry:         list of Shapely Polygon
+        :param tools_storage:   a dictionary that holds the tools and geometry
+        :type tools_storage:    dict
+        :param sorted_tools:    the tools for which to make the envelopes
+        :type sorted_tools:     list
+        :param negative_dia:    isolate the geometry with a negative value for the tool diameter
+        :type negative_dia:     bool
+        :param prog_plot:       Type of plotting: "normal" or "progressive"
+        :type prog_plot:        str
+        :return:                The envelope (or 'fail') of each pass of each tool, with (tool, pass) keys
+        :rtype:                 dict
+        """
+        envelopes = {}
+        pool_keys = []
+        pool_envelopes = []
+
+        for tool in sorted_tools:
+            tool_dia = tools_storage[tool]['tooldia']
+            tool_data = tools_storage[tool]['data']
+            to_follow = tool_data['tools_iso_follow']
+
+            # TODO what to do when the iso2geo param is not None but the Follow cb is checked
+            # for the case when limited area is used .... the follow geo should be clipped too
+            work_geo = geometry
+            if work_geo is None:
+                work_geo = iso_obj.follow_geometry if to_follow else iso_obj.solid_geometry
+
+            iso_t = {
+                'ext': 0,
+                'int': 1,
+                'full': 2
+            }[tool_data['tools_iso_isotype']]
+
+            overlap = tool_data['tools_iso_overlap'] / 100.0
+
+            # if milling type is climb then the move is counter-clockwise around features
+            mill_dir = 1 if tool_data['tools_iso_milling_type'] == 'cl' else 0
+
+            for nr_pass in range(tool_data['tools_iso_passes']):
+                iso_offset = tool_dia * ((2 * nr_pass + 1) / 2.0000001) - (nr_pass * overlap * tool_dia)
+                if negative_dia:
+                    iso_offset = -iso_offset
+
+                if to_follow or prog_plot == 'progressive':
+                    envelopes[(tool, nr_pass)] = self.generate_envelope(iso_offset, mill_dir, geometry=work_geo,
+                                                                        env_iso_type=iso_t, follow=to_follow,
+                                                                        nr_passes=nr_pass, prog_plot=prog_plot)
                 else:
-                    log.debug("ToolIsolation.generate_envelope() Error --> Unexpected Geometry %s" %
-                              type(geom))
+                    pool_keys.append((tool, nr_pass, mill_dir))
+                    pool_envelopes.append((iso_offset, iso_t))
+
+        # the envelopes made in a previous run, for the same geometry and offsets, are in the buffer cache
+        cache = self.app.buffer_cache
+        cache_owner = iso_obj if geometry is None else geometry
+        steps = int(iso_obj.geo_steps_per_circle)
+
+        made_keys = []
+        made_envelopes = []
+        for (tool, nr_pass, mill_dir), (iso_offset, iso_t) in zip(pool_keys, pool_envelopes):
+            geom = cache.lookup(cache_owner, ('isolation', iso_offset, iso_t, steps))
+            if geom is None:
+                made_keys.append((tool, nr_pass))
+                made_envelopes.append((iso_offset, iso_t))
+            else:
+                envelopes[(tool, nr_pass)] = geom
+
+        if made_envelopes:
+            work_geo = iso_obj.solid_geometry if geometry is None else geometry
+            try:
+                union = None
+                if any(iso_offset >= 0 for iso_offset, iso_t in made_envelopes):
+                    self.app.proc_container.update_view_text(' %s' % _("Buffering"))
+                    union = cache.union(cache_owner)
+                pool_res = iso_obj.isolation_geometry_pool(work_geo, made_envelopes, union=union)
+            except grace:
+                raise grace
             except Exception as e:
-                log.debug("ToolIsolation.generate_envelope() Error --> %s" % str(e))
-                return 'fail'
+                log.debug('ToolIsolation.generate_envelopes() --> %s' % str(e))
+                pool_res = ['fail'] * len(made_envelopes)
+
+            for key, (iso_offset, iso_t), geom in zip(made_keys, made_envelopes, pool_res):
+                if geom != 'fail':
+                    cache.store(cache_owner, ('isolation', iso_offset, iso_t, steps), geom)
+                envelopes[key] = geom
+
+        for tool, nr_pass, mill_dir in pool_keys:
+            if envelopes[(tool, nr_pass)] != 'fail' and mill_dir:
+                envelopes[(tool, nr_pass)] = self.invert_envelope(envelopes[(tool, nr_pass)])
+
+        return envelopes
+
+    @staticmethod
+    def invert_envelope(geom):
+        """
+        Inverts the direction of the envelope made by generate_envelope().
+
+        :param geom:    the envelope
+        :type geom:     MultiPolygon, Polygon, LinearRing or a list of them
+        :return:        The envelope with the inverted direction or 'fail'
+        :rtype:         MultiPolygon or Polygon
+        """
+        try:
+            pl = []
+            for p in geom:
+                if p is not None:
+                    if isinstance(p, Polygon):
+                        pl.append(Polygon(p.exterior.coords[::-1], p.interiors))
+                    elif isinstance(p, LinearRing):
+                        pl.append(Polygon(p.coords[::-1]))
+            geom = MultiPolygon(pl)
+        except TypeError:
+            if isinstance(geom, Polygon) and geom is not None:
+                geom = Polygon(geom.exterior.coords[::-1], geom.interiors)
+            elif isinstance(geom, LinearRing) and geom is not None:
+                geom = Polygon(geom.coords[::-1])
+            else:
+                log.debug("ToolIsolation.generate_envelope() Error --> Unexpected Geometry %s" %
+                          type(geom))
+        except Exception as e:
+            log.debug("ToolIsolation.generate_envelope() Error --> %s" % str(e))
+            return 'fail'
         return geom
 
     @staticmethod
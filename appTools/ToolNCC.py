@@ -42,6 +42,14 @@ class NonCopperClear(AppTool, Gerber):
 
     optimal_found_sig = QtCore.pyqtSignal(float)
 
+    # the NCC methods that are done in the application pool, with the name of the clearing method
+    pool_ncc_methods = {
+        0: 'standard',
+        1: 'seed',
+        2: 'lines',
+        3: 'combo'
+    }
+
     def __init__(self, app):
         self.app = app
         self.decimals = self.app.decimals
@@ -1894,7 +1902,7 @@ class NonCopperClear(AppTool, Gerber):
             sol_geo = work_geo
             if has_offset is True:
                 self.app.inform.emit('[WARNING_NOTCL] %s ...' % _("Buffering"))
-                sol_geo = sol_geo.buffer(distance=ncc_offset)
+                sol_geo = self.app.buffer_cache.buffer(sol_geo, ncc_offset)
                 self.app.inform.emit('[success] %s ...' % _("Buffering finished"))
             empty = self.get_ncc_empty_area(target=sol_geo, boundary=bounding_box)
 
@@ -1914,16 +1922,15 @@ class NonCopperClear(AppTool, Gerber):
         if ncc_obj.kind == 'gerber' and not isotooldia:
             # unfortunately for this function to work time efficient,
             # if the Gerber was loaded without buffering then it require the buffering now.
+            # the buffers are kept in the buffer cache for the next runs
             if self.app.defaults['gerber_buffering'] == 'no':
-                sol_geo = ncc_obj.solid_geometry.buffer(0)
+                sol_geo = self.app.buffer_cache.buffer(ncc_obj, 0)
             else:
                 sol_geo = ncc_obj.solid_geometry
 
             if has_offset is True:
                 self.app.inform.emit('[WARNING_NOTCL] %s ...' % _("Buffering"))
-                if isinstance(sol_geo, list):
-                    sol_geo = MultiPolygon(sol_geo)
-                sol_geo = sol_geo.buffer(distance=ncc_offset)
+                sol_geo = self.app.buffer_cache.buffer(ncc_obj, ncc_offset)
                 self.app.inform.emit('[success] %s ...' % _("Buffering finished"))
 
             empty = self.get_ncc_empty_area(target=sol_geo, boundary=bounding_box)
@@ -1939,7 +1946,7 @@ class NonCopperClear(AppTool, Gerber):
             # if the Gerber was loaded without buffering then it require the buffering now.
             # TODO 'buffering status' should be a property of the object not the project property
             if self.app.defaults['gerber_buffering'] == 'no':
-                self.solid_geometry = ncc_obj.solid_geometry.buffer(0)
+                self.solid_geometry = self.app.buffer_cache.buffer(ncc_obj, 0)
             else:
                 self.solid_geometry = ncc_obj.solid_geometry
 
@@ -2039,10 +2046,10 @@ class NonCopperClear(AppTool, Gerber):
                 return 'fail'
 
         elif ncc_obj.kind == 'geometry':
-            sol_geo = unary_union(ncc_obj.solid_geometry)
+            sol_geo = self.app.buffer_cache.union(ncc_obj)
             if has_offset is True:
                 self.app.inform.emit('[WARNING_NOTCL] %s ...' % _("Buffering"))
-                sol_geo = sol_geo.buffer(distance=ncc_offset)
+                sol_geo = self.app.buffer_cache.buffer(ncc_obj, ncc_offset)
                 self.app.inform.emit('[success] %s ...' % _("Buffering finished"))
             empty = self.get_ncc_empty_area(target=sol_geo, boundary=bounding_box)
             if empty == 'fail' or empty.is_empty:
@@ -2291,7 +2298,36 @@ class NonCopperClear(AppTool, Gerber):
                 if area.geoms:
                     if len(area.geoms) > 0:
                         pol_nr = 0
-                        for p in area.geoms:
+                        area_geoms = area.geoms
+
+                        if ncc_method in self.pool_ncc_methods and not prog_plot:
+                            # the polygons are independent, each is cleared in a process of the application pool
+                            pool_polygons = []
+                            for p in area.geoms:
+                                # clean the polygon
+                                p = p.buffer(0)
+                                if p is not None and p.is_valid:
+                                    for pol in (p.geoms if isinstance(p, MultiPolygon) else [p]):
+                                        if isinstance(pol, Polygon):
+                                            pool_polygons.append(pol)
+                                        else:
+                                            log.warning("Expected geo is a Polygon. Instead got a %s" % str(type(pol)))
+
+                            pool_res = self.clear_polygons_pool(pool_polygons, method=self.pool_ncc_methods[ncc_method],
+                                                                tooldia=tool, steps_per_circle=self.circle_steps,
+                                                                overlap=ncc_overlap, connect=ncc_connect,
+                                                                contour=ncc_contour)
+                            for pol, res in zip(pool_polygons, pool_res):
+                                if res is not None:
+                                    cleared_geo += res
+                                else:
+                                    app_obj.poly_not_cleared = True
+                                    pt = pol.representative_point()
+                                    self.app.inform_shell.emit('%s %s' % (_('Polygon could not be cleared. Location:'),
+                                                                          str((pt.x, pt.y))))
+                            area_geoms = []
+
+                        for p in area_geoms:
                             # provide the app with a way to process the GUI events when in a blocking loop
                             if not run_threaded:
                                 QtWidgets.QApplication.processEvents()
@@ -2716,7 +2752,7 @@ class NonCopperClear(AppTool, Gerber):
             self.app.collection.promise(name)
 
             # Background
-            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app]})
+            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app], 'priority': 'batch'})
         else:
             job_thread(app_obj=self.app)
 
@@ -3705,7 +3741,7 @@ class NonCopperClear(AppTool, Gerber):
             self.app.collection.promise(name)
 
             # Background
-            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app]})
+            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app], 'priority': 'batch'})
         else:
             job_thread(app_obj=self.app)
 
@@ -41,6 +41,14 @@ log = logging.getLogger('base')
 
 class ToolPaint(AppTool, Gerber):
 
+    # the Paint methods that are done in the application pool, with the name of the clearing method
+    pool_paint_methods = {
+        0: 'standard',  # _("Standard")
+        1: 'seed',      # _("Seed")
+        2: 'lines',     # _("Lines")
+        4: 'combo'      # _("Combo")
+    }
+
     def __init__(self, app):
         self.app = app
         self.decimals = self.app.decimals
@@ -1792,11 +1800,12 @@ class ToolPaint(AppTool, Gerber):
 
                 paint_offset = float(tools_storage[current_uid]['data']['tools_paint_offset'])
 
-                poly_buf = []
-                for pol in geometry:
-                    buffered_pol = pol.buffer(-paint_offset)
-                    if buffered_pol and not buffered_pol.is_empty:
-                        poly_buf.append(buffered_pol)
+                def offset_polygons():
+                    buffered = [pol.buffer(-paint_offset) for pol in geometry]
+                    return [pol for pol in buffered if pol and not pol.is_empty]
+
+                # the buffered polygons are kept in the buffer cache for the next runs
+                poly_buf = list(self.app.buffer_cache.get(geometry, ('paint_offset', paint_offset), offset_polygons))
 
                 if not poly_buf:
                     self.app.inform.emit('[WARNING_NOTCL] %s' % _("Margin parameter too big. Tool is not used"))
@@ -1815,6 +1824,19 @@ class ToolPaint(AppTool, Gerber):
                 try:
                     cp = []
                     try:
+                        if paint_method in self.pool_paint_methods and not prog_plot:
+                            # the polygons are independent, each is painted in a process of the application pool
+                            pool_res = self.clear_polygons_pool(poly_buf, method=self.pool_paint_methods[paint_method],
+                                                                tooldia=tool_dia, steps_per_circle=self.circle_steps,
+                                                                overlap=over, connect=conn, contour=cont)
+                            for geo_res in pool_res:
+                                if geo_res:
+                                    cp.append(geo_res)
+                                else:
+                                    self.app.inform.emit('[ERROR_NOTCL] %s' %
+                                                         _('Geometry could not be painted completely'))
+                            poly_buf = []
+
                         for pp in poly_buf:
                             # provide the app with a way to process the GUI events when in a blocking loop
                             QtWidgets.QApplication.processEvents()
@@ -1849,7 +1871,8 @@ class ToolPaint(AppTool, Gerber):
                     total_geometry = []
                     if cp:
                         for x in cp:
-                            total_geometry += list(x.get_objects())
+                            # the pool results are lists of toolpaths
+                            total_geometry += x if isinstance(x, list) else list(x.get_objects())
 
                         # clean the geometry
                         new_geo = [g for g in total_geometry if g and not g.is_empty]
@@ -2197,7 +2220,7 @@ class ToolPaint(AppTool, Gerber):
 
         if run_threaded:
             # Background
-            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app]})
+            self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app], 'priority': 'batch'})
         else:
             job_thread(app_obj=self.app)
 
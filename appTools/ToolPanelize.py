@@ -11,11 +11,12 @@ from appTool import AppTool
 from appGUI.GUIElements import FCSpinner, FCDoubleSpinner, RadioSet, FCCheckBox, OptionalInputSection, FCComboBox, \
     FCButton, FCLabel
 from camlib import grace
+from appCommon.StepRepeat import StepRepeat
+from appCommon.PointArray import PointArray, SlotArray
 
 from copy import deepcopy
 import numpy as np
 
-import shapely.affinity as affinity
 from shapely.ops import unary_union, linemerge, snap
 from shapely.geometry import LineString, MultiLineString
 
@@ -271,12 +272,24 @@ class Panelize(AppTool):
 
         to_optimize = self.ui.optimization_cb.get_value()
 
+        # the panel is the source object repeated at the offsets of the columns and rows
+        step_repeat = StepRepeat(columns, rows, lenghtx, lenghty)
+
+        def update_progress(element):
+            disp_number = int(np.interp(element, [0, len(step_repeat)], [0, 100]))
+            self.app.proc_container.update_view_text(' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
+
+        def add_copy(storage, geo):
+            if isinstance(geo, list):
+                storage += geo
+            else:
+                storage.append(geo)
+
         def panelize_worker():
             if panel_source_obj is not None:
                 self.app.inform.emit(_("Generating panel ... "))
 
                 def job_init_excellon(obj_fin, app_obj):
-                    currenty = 0.0
                     # init the storage for drills and for slots
                     for tool in copied_tools:
                         copied_tools[tool]['drills'] = []
@@ -291,71 +304,30 @@ class Panelize(AppTool):
                             except KeyError:
                                 log.warning("Failed to copy option. %s" % str(option))
 
-                    # calculate the total number of drills and slots
-                    geo_len_drills = 0
-                    geo_len_slots = 0
-                    for tool in copied_tools:
-                        geo_len_drills += len(copied_tools[tool]['drills'])
-                        geo_len_slots += len(copied_tools[tool]['slots'])
+                    # the drills and the slots of the source are translated together for each copy
+                    source = {}
+                    for tool in panel_source_obj.tools:
+                        source[tool] = {
+                            'drills': panel_source_obj.tools[tool]['drills'],
+                            'slots': panel_source_obj.tools[tool]['slots']
+                        }
 
-                    # panelization
-                    element = 0
-                    for row in range(rows):
-                        currentx = 0.0
-                        for col in range(columns):
-                            element += 1
-                            old_disp_number = 0
+                    # panelization; the copies of each tool are stacked once, at the end
+                    copies = {tool: {'drills': [], 'slots': []} for tool in source}
+                    for element, copy in enumerate(step_repeat.instances(source), 1):
+                        # graceful abort requested by the user
+                        if self.app.abort_flag:
+                            raise grace
 
-                            for tool in panel_source_obj.tools:
-                                if panel_source_obj.tools[tool]['drills']:
-                                    drill_nr = 0
-                                    for drill in panel_source_obj.tools[tool]['drills']:
-                                        # graceful abort requested by the user
-                                        if self.app.abort_flag:
-                                            raise grace
-
-                                        # offset / panelization
-                                        point_offseted = affinity.translate(drill, currentx, currenty)
-                                        obj_fin.tools[tool]['drills'].append(point_offseted)
-
-                                        # update progress
-                                        drill_nr += 1
-                                        disp_number = int(np.interp(drill_nr, [0, geo_len_drills], [0, 100]))
-                                        if old_disp_number < disp_number <= 100:
-                                            self.app.proc_container.update_view_text(' %s: %d D:%d%%' %
-                                                                                     (_("Copy"),
-                                                                                      int(element),
-                                                                                      disp_number))
-                                            old_disp_number = disp_number
-
-                                if panel_source_obj.tools[tool]['slots']:
-                                    slot_nr = 0
-                                    for slot in panel_source_obj.tools[tool]['slots']:
-                                        # graceful abort requested by the user
-                                        if self.app.abort_flag:
-                                            raise grace
-
-                                        # offset / panelization
-                                        start_offseted = affinity.translate(slot[0], currentx, currenty)
-                                        stop_offseted = affinity.translate(slot[1], currentx, currenty)
-                                        offseted_slot = (
-                                            start_offseted,
-                                            stop_offseted
-                                        )
-                                        obj_fin.tools[tool]['slots'].append(offseted_slot)
-
-                                        # update progress
-                                        slot_nr += 1
-                                        disp_number = int(np.interp(slot_nr, [0, geo_len_slots], [0, 100]))
-                                        if old_disp_number < disp_number <= 100:
-                                            self.app.proc_container.update_view_text(' %s: %d S:%d%%' %
-                                                                                     (_("Copy"),
-                                                                                      int(element),
-                                                                                      disp_number))
-                                            old_disp_number = disp_number
-
-                            currentx += lenghtx
-                        currenty += lenghty
+                        for tool in copy:
+                            copies[tool]['drills'].append(copy[tool]['drills'])
+                            copies[tool]['slots'].append(copy[tool]['slots'])
+
+                        update_progress(element)
+
+                    for tool in copies:
+                        obj_fin.tools[tool]['drills'] = PointArray.concatenate(copies[tool]['drills'])
+                        obj_fin.tools[tool]['slots'] = SlotArray.concatenate(copies[tool]['slots'])
 
                     obj_fin.create_geometry()
                     obj_fin.zeros = panel_source_obj.zeros
@@ -366,22 +338,6 @@ class Panelize(AppTool):
                     app_obj.proc_container.update_view_text('')
 
                 def job_init_geometry(obj_fin, app_obj):
-                    currentx = 0.0
-                    currenty = 0.0
-
-                    def translate_recursion(geom):
-                        if type(geom) == list:
-                            geoms = []
-                            for local_geom in geom:
-                                res_geo = translate_recursion(local_geom)
-                                try:
-                                    geoms += res_geo
-                                except TypeError:
-                                    geoms.append(res_geo)
-                            return geoms
-                        else:
-                            return affinity.translate(geom, xoff=currentx, yoff=currenty)
-
                     obj_fin.solid_geometry = []
 
                     # create the initial structure on which to create the panel
@@ -396,151 +352,43 @@ class Panelize(AppTool):
                         for ap in obj_fin.apertures:
                             obj_fin.apertures[ap]['geometry'] = []
 
-                    # find the number of polygons in the source solid_geometry
-                    geo_len = 0
+                    # the geometry of the source, translated all at once for each copy
                     if panel_source_obj.kind == 'geometry':
                         if panel_source_obj.multigeo is True:
+                            source = {'tools': {}}
                             for tool in panel_source_obj.tools:
-                                try:
-                                    geo_len += len(panel_source_obj.tools[tool]['solid_geometry'])
-                                except TypeError:
-                                    geo_len += 1
-                    elif panel_source_obj.kind == 'gerber':
-                        for ap in panel_source_obj.apertures:
-                            if 'geometry' in panel_source_obj.apertures[ap]:
-                                try:
-                                    geo_len += len(panel_source_obj.apertures[ap]['geometry'])
-                                except TypeError:
-                                    geo_len += 1
-
-                    element = 0
-                    for row in range(rows):
-                        currentx = 0.0
-
-                        for col in range(columns):
-                            element += 1
-                            old_disp_number = 0
-
-                            # Will panelize a Geometry Object
-                            if panel_source_obj.kind == 'geometry':
-                                if panel_source_obj.multigeo is True:
-                                    for tool in panel_source_obj.tools:
-                                        # graceful abort requested by the user
-                                        if app_obj.abort_flag:
-                                            raise grace
-
-                                        # calculate the number of polygons
-                                        try:
-                                            geo_len = len(panel_source_obj.tools[tool]['solid_geometry'])
-                                        except TypeError:
-                                            geo_len = 1
-
-                                        # panelization
-                                        pol_nr = 0
-                                        for geo_el in panel_source_obj.tools[tool]['solid_geometry']:
-                                            trans_geo = translate_recursion(geo_el)
-                                            obj_fin.tools[tool]['solid_geometry'].append(trans_geo)
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-                                else:
-                                    # graceful abort requested by the user
-                                    if app_obj.abort_flag:
-                                        raise grace
-
-                                    # calculate the number of polygons
-                                    try:
-                                        geo_len = len(panel_source_obj.solid_geometry)
-                                    except TypeError:
-                                        geo_len = 1
-
-                                    # panelization
-                                    pol_nr = 0
-                                    try:
-                                        for geo_el in panel_source_obj.solid_geometry:
-                                            if app_obj.abort_flag:
-                                                # graceful abort requested by the user
-                                                raise grace
-
-                                            trans_geo = translate_recursion(geo_el)
-                                            obj_fin.solid_geometry.append(trans_geo)
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-
-                                    except TypeError:
-                                        trans_geo = translate_recursion(panel_source_obj.solid_geometry)
-                                        obj_fin.solid_geometry.append(trans_geo)
-                            # Will panelize a Gerber Object
-                            else:
-                                # graceful abort requested by the user
-                                if self.app.abort_flag:
-                                    raise grace
-
-                                # panelization solid_geometry
-                                try:
-                                    for geo_el in panel_source_obj.solid_geometry:
-                                        # graceful abort requested by the user
-                                        if app_obj.abort_flag:
-                                            raise grace
-
-                                        trans_geo = translate_recursion(geo_el)
-                                        obj_fin.solid_geometry.append(trans_geo)
-                                except TypeError:
-                                    trans_geo = translate_recursion(panel_source_obj.solid_geometry)
-                                    obj_fin.solid_geometry.append(trans_geo)
-
-                                for apid in panel_source_obj.apertures:
-                                    # graceful abort requested by the user
-                                    if app_obj.abort_flag:
-                                        raise grace
-
-                                    if 'geometry' in panel_source_obj.apertures[apid]:
-                                        # calculate the number of polygons
-                                        try:
-                                            geo_len = len(panel_source_obj.apertures[apid]['geometry'])
-                                        except TypeError:
-                                            geo_len = 1
-
-                                        # panelization -> tools
-                                        pol_nr = 0
-                                        for el in panel_source_obj.apertures[apid]['geometry']:
-                                            if app_obj.abort_flag:
-                                                # graceful abort requested by the user
-                                                raise grace
-
-                                            new_el = {}
-                                            if 'solid' in el:
-                                                geo_aper = translate_recursion(el['solid'])
-                                                new_el['solid'] = geo_aper
-                                            if 'clear' in el:
-                                                geo_aper = translate_recursion(el['clear'])
-                                                new_el['clear'] = geo_aper
-                                            if 'follow' in el:
-                                                geo_aper = translate_recursion(el['follow'])
-                                                new_el['follow'] = geo_aper
-                                            obj_fin.apertures[apid]['geometry'].append(deepcopy(new_el))
-
-                                            # update progress
-                                            pol_nr += 1
-                                            disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
-                                            if old_disp_number < disp_number <= 100:
-                                                app_obj.proc_container.update_view_text(
-                                                    ' %s: %d %d%%' % (_("Copy"), int(element), disp_number))
-                                                old_disp_number = disp_number
-
-                            currentx += lenghtx
-                        currenty += lenghty
+                                source['tools'][tool] = panel_source_obj.tools[tool]['solid_geometry']
+                        else:
+                            source = {'solid': panel_source_obj.solid_geometry}
+                    else:
+                        source = {
+                            'solid': panel_source_obj.solid_geometry,
+                            'apertures': {}
+                        }
+                        for apid in panel_source_obj.apertures:
+                            if 'geometry' in panel_source_obj.apertures[apid]:
+                                source['apertures'][apid] = panel_source_obj.apertures[apid]['geometry']
+
+                    # panelization
+                    for element, copy in enumerate(step_repeat.instances(source), 1):
+                        # graceful abort requested by the user
+                        if app_obj.abort_flag:
+                            raise grace
+
+                        if 'tools' in copy:
+                            for tool in copy['tools']:
+                                add_copy(obj_fin.tools[tool]['solid_geometry'], copy['tools'][tool])
+                        if 'solid' in copy:
+                            add_copy(obj_fin.solid_geometry, copy['solid'])
+                        if 'apertures' in copy:
+                            for apid in copy['apertures']:
+                                obj_fin.apertures[apid]['geometry'] += copy['apertures'][apid]
+
+                        update_progress(element)
+
+                    if panel_source_obj.kind != 'geometry' or panel_source_obj.multigeo is False:
+                        # the copies are kept one after the other so the source is plotted once for all of them
+                        obj_fin.set_step_repeat(step_repeat)
 
                     if panel_source_obj.kind == 'geometry' and panel_source_obj.multigeo is True:
                         # I'm going to do this only here as a fix for panelizing cutouts
@@ -583,7 +431,13 @@ class Panelize(AppTool):
                             app_obj.inform.emit('%s' % _("Optimization complete."))
 
                     app_obj.inform.emit('%s' % _("Generating panel ... Adding the source code."))
-                    if panel_type == 'gerber':
+                    if panel_type == 'gerber' and panel_source_obj.kind == 'gerber':
+                        # the Gerber code of the source object is written once, in a step and repeat block
+                        obj_fin.source_file = self.app.f_handlers.export_gerber(obj_name=self.outname, filename=None,
+                                                                                local_use=panel_source_obj,
+                                                                                use_thread=False,
+                                                                                step_repeat=step_repeat)
+                    elif panel_type == 'gerber':
                         obj_fin.source_file = self.app.f_handlers.export_gerber(obj_name=self.outname, filename=None,
                                                                                 local_use=obj_fin, use_thread=False)
                     if panel_type == 'geometry':
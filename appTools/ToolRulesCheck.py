@@ -10,11 +10,14 @@ from PyQt5 import QtWidgets, QtGui
 from appTool import AppTool
 from appGUI.GUIElements import FCDoubleSpinner, FCCheckBox, OptionalInputSection, FCComboBox, FCLabel, FCButton
 from copy import deepcopy
+import queue
+import time
 
 from appPool import *
 # from os import getpid
 from shapely.ops import nearest_points
 from shapely.geometry import MultiPolygon, Polygon
+from rtree import index as rtindex
 
 import logging
 import gettext
@@ -31,6 +34,7 @@ log = logging.getLogger('base')
 class RulesCheck(AppTool):
 
     tool_finished = QtCore.pyqtSignal(list)
+    rule_finished = QtCore.pyqtSignal(object, float)
 
     def __init__(self, app):
         self.decimals = app.decimals
@@ -68,6 +72,8 @@ class RulesCheck(AppTool):
         
         # Custom Signals
         self.tool_finished.connect(self.on_tool_finished)
+        self.rule_finished.connect(self.on_rule_finished)
+        self.app.pool_recreated.connect(self.pool_recreated)
 
         # list to hold the temporary objects
         self.objs = []
@@ -81,6 +87,8 @@ class RulesCheck(AppTool):
         # Multiprocessing Process Pool
         self.pool = self.app.pool
         self.results = None
+        # the rules results are put here by the pool, in the order the rules finish
+        self.results_queue = queue.Queue()
 
         self.decimals = 4
 
@@ -157,6 +165,68 @@ class RulesCheck(AppTool):
 
         self.reset_fields()
 
+    @staticmethod
+    def clearance_candidates(geo_list, size, target_list=None):
+        """
+        Generator of the geometry pairs that may be closer than the clearance value.
+        The target geometries are bulk loaded into an R-tree and for each geometry in geo_list only the targets whose
+        bounding boxes intersect its bounding box expanded by the clearance value are returned.
+
+        :param geo_list:        list of Shapely geometries
+        :param size:            clearance value
+        :param target_list:     list of Shapely geometries checked against geo_list. If None, the geo_list elements
+                                are checked against each other and each pair is yielded only once.
+        :return:                yields (geo, target_geo) tuples
+        """
+        size = float(size)
+        same_set = target_list is None
+        if same_set:
+            target_list = geo_list
+
+        stream = [(t_idx, t_geo.bounds, None) for t_idx, t_geo in enumerate(target_list)
+                  if t_geo is not None and not t_geo.is_empty]
+        if not stream:
+            return
+
+        # bulk loading (STR packing) is much faster than inserting the elements one by one
+        rt_idx = rtindex.Index(iter(stream))
+
+        for idx, geo in enumerate(geo_list):
+            if geo is None or geo.is_empty:
+                continue
+
+            minx, miny, maxx, maxy = geo.bounds
+            for t_idx in rt_idx.intersection((minx - size, miny - size, maxx + size, maxy + size)):
+                if same_set and t_idx <= idx:
+                    continue
+                yield geo, target_list[t_idx]
+
+    @staticmethod
+    def clearance_violations(geo_list, size, target_list=None):
+        """
+        Find the locations where geometries are closer than the clearance value.
+
+        :param geo_list:        list of Shapely geometries
+        :param size:            clearance value
+        :param target_list:     list of Shapely geometries checked against geo_list. If None, the geo_list elements
+                                are checked against each other.
+        :return:                set of (x, y) tuples; the middle of the segment between the nearest points of each
+                                offending pair
+        """
+        points_list = set()
+
+        for geo, s_geo in RulesCheck.clearance_candidates(geo_list, size, target_list):
+            dist = geo.distance(s_geo)
+            if float(dist) < float(size):
+                loc_1, loc_2 = nearest_points(geo, s_geo)
+
+                dx = loc_1.x - loc_2.x
+                dy = loc_1.y - loc_2.y
+                loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
+                points_list.add(loc)
+
+        return points_list
+
     @staticmethod
     def check_inside_gerber_clearance(gerber_obj, size, rule):
         log.debug("RulesCheck.check_inside_gerber_clearance()")
@@ -199,33 +269,11 @@ class RulesCheck(AppTool):
         if isinstance(total_geo, Polygon):
             obj_violations['points'] = ['Failed. Only one polygon.']
             return rule_title, [obj_violations]
-        else:
-            iterations = len(total_geo)
-            iterations = (iterations * (iterations - 1)) / 2
-        log.debug("RulesCheck.check_gerber_clearance(). Iterations: %s" % str(iterations))
-
-        min_dict = {}
-        idx = 1
-        for geo in total_geo:
-            for s_geo in total_geo[idx:]:
-                # minimize the number of distances by not taking into considerations those that are too small
-                dist = geo.distance(s_geo)
-                if float(dist) < float(size):
-                    loc_1, loc_2 = nearest_points(geo, s_geo)
+        elif isinstance(total_geo, MultiPolygon):
+            total_geo = list(total_geo.geoms)
+        log.debug("RulesCheck.check_inside_gerber_clearance(). Geometries: %s" % str(len(total_geo)))
 
-                    dx = loc_1.x - loc_2.x
-                    dy = loc_1.y - loc_2.y
-                    loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                    if dist in min_dict:
-                        min_dict[dist].append(loc)
-                    else:
-                        min_dict[dist] = [loc]
-            idx += 1
-        points_list = set()
-        for dist in min_dict.keys():
-            for location in min_dict[dist]:
-                points_list.add(location)
+        points_list = RulesCheck.clearance_violations(total_geo, size)
 
         obj_violations['points'] = list(points_list)
         violations.append(deepcopy(obj_violations))
@@ -289,41 +337,19 @@ class RulesCheck(AppTool):
         total_geo_grb_3 = total_geo_grb_3.buffer(0)
 
         if isinstance(total_geo_grb_1, Polygon):
-            len_1 = 1
             total_geo_grb_1 = [total_geo_grb_1]
         else:
-            len_1 = len(total_geo_grb_1)
+            total_geo_grb_1 = list(total_geo_grb_1.geoms)
 
         if isinstance(total_geo_grb_3, Polygon):
-            len_3 = 1
             total_geo_grb_3 = [total_geo_grb_3]
         else:
-            len_3 = len(total_geo_grb_3)
-
-        iterations = len_1 * len_3
-        log.debug("RulesCheck.check_gerber_clearance(). Iterations: %s" % str(iterations))
+            total_geo_grb_3 = list(total_geo_grb_3.geoms)
 
-        min_dict = {}
-        for geo in total_geo_grb_1:
-            for s_geo in total_geo_grb_3:
-                # minimize the number of distances by not taking into considerations those that are too small
-                dist = geo.distance(s_geo)
-                if float(dist) < float(size):
-                    loc_1, loc_2 = nearest_points(geo, s_geo)
+        log.debug("RulesCheck.check_gerber_clearance(). Geometries: %s x %s" %
+                  (str(len(total_geo_grb_1)), str(len(total_geo_grb_3))))
 
-                    dx = loc_1.x - loc_2.x
-                    dy = loc_1.y - loc_2.y
-                    loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                    if dist in min_dict:
-                        min_dict[dist].append(loc)
-                    else:
-                        min_dict[dist] = [loc]
-
-        points_list = set()
-        for dist in min_dict.keys():
-            for location in min_dict[dist]:
-                points_list.add(location)
+        points_list = RulesCheck.clearance_violations(total_geo_grb_1, size, target_list=total_geo_grb_3)
 
         name_list = []
         if gerber_1:
@@ -386,30 +412,7 @@ class RulesCheck(AppTool):
                     for geo in geometry:
                         total_geo.append(geo)
 
-        min_dict = {}
-        idx = 1
-        for geo in total_geo:
-            for s_geo in total_geo[idx:]:
-
-                # minimize the number of distances by not taking into considerations those that are too small
-                dist = geo.distance(s_geo)
-                loc_1, loc_2 = nearest_points(geo, s_geo)
-
-                dx = loc_1.x - loc_2.x
-                dy = loc_1.y - loc_2.y
-                loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
-
-                if dist in min_dict:
-                    min_dict[dist].append(loc)
-                else:
-                    min_dict[dist] = [loc]
-            idx += 1
-
-        points_list = set()
-        for dist in min_dict.keys():
-            if float(dist) < size:
-                for location in min_dict[dist]:
-                    points_list.add(location)
+        points_list = RulesCheck.clearance_violations(total_geo, size)
 
         name_list = []
         for elem in elements:
@@ -541,47 +544,40 @@ class RulesCheck(AppTool):
                         total_geo_exc.append(geo)
 
         if isinstance(total_geo_grb, Polygon):
-            len_1 = 1
             total_geo_grb = [total_geo_grb]
         else:
-            len_1 = len(total_geo_grb)
+            total_geo_grb = list(total_geo_grb.geoms)
 
-        if isinstance(total_geo_exc, Polygon):
-            len_2 = 1
-            total_geo_exc = [total_geo_exc]
-        else:
-            len_2 = len(total_geo_exc)
-
-        iterations = len_1 * len_2
-        log.debug("RulesCheck.check_gerber_annular_ring(). Iterations: %s" % str(iterations))
+        log.debug("RulesCheck.check_gerber_annular_ring(). Geometries: %s x %s" %
+                  (str(len(total_geo_grb)), str(len(total_geo_exc))))
 
         min_dict = {}
-        dist = None
-        for geo in total_geo_grb:
-            for s_geo in total_geo_exc:
-                try:
-                    # minimize the number of distances by not taking into considerations those that are too small
-                    dist = abs(geo.exterior.distance(s_geo))
-                except Exception as e:
-                    log.debug("RulesCheck.check_gerber_annular_ring() --> %s" % str(e))
+        # only the holes that are near enough to a copper feature can violate the annular ring rule
+        for geo, s_geo in RulesCheck.clearance_candidates(total_geo_grb, size, target_list=total_geo_exc):
+            try:
+                # minimize the number of distances by not taking into considerations those that are too small
+                dist = abs(geo.exterior.distance(s_geo))
+            except Exception as e:
+                log.debug("RulesCheck.check_gerber_annular_ring() --> %s" % str(e))
+                continue
 
-                if dist > 0:
-                    if float(dist) < float(size):
-                        loc_1, loc_2 = nearest_points(geo.exterior, s_geo)
+            if dist > 0:
+                if float(dist) < float(size):
+                    loc_1, loc_2 = nearest_points(geo.exterior, s_geo)
 
-                        dx = loc_1.x - loc_2.x
-                        dy = loc_1.y - loc_2.y
-                        loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
+                    dx = loc_1.x - loc_2.x
+                    dy = loc_1.y - loc_2.y
+                    loc = min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)
 
-                        if dist in min_dict:
-                            min_dict[dist].append(loc)
-                        else:
-                            min_dict[dist] = [loc]
-                else:
                     if dist in min_dict:
-                        min_dict[dist].append(s_geo.representative_point())
+                        min_dict[dist].append(loc)
                     else:
-                        min_dict[dist] = [s_geo.representative_point()]
+                        min_dict[dist] = [loc]
+            else:
+                if dist in min_dict:
+                    min_dict[dist].append(s_geo.representative_point())
+                else:
+                    min_dict[dist] = [s_geo.representative_point()]
 
         points_list = []
         for dist in min_dict.keys():
@@ -617,8 +613,32 @@ class RulesCheck(AppTool):
         violations.append(deepcopy(obj_violations))
         return rule_title, violations
 
+    def add_rule_job(self, fcn, args):
+        """
+        Dispatch a rule check to the application process pool. When the rule check finishes, its result and the
+        elapsed time are put in the results queue.
+
+        :param fcn:     a (picklable) static method that does the rule check
+        :param args:    the arguments of the rule check
+        :return:        None
+        """
+        results_queue = self.results_queue
+        start_time = time.time()
+
+        def on_result(res):
+            results_queue.put((res, time.time() - start_time))
+
+        def on_error(err):
+            log.debug("RulesCheck.add_rule_job() --> %s" % str(err))
+            results_queue.put(('Fail. %s' % str(err), time.time() - start_time))
+
+        self.results.append(self.pool.apply_async(fcn, args=args, callback=on_result, error_callback=on_error))
+
     def execute(self):
         self.results = []
+        # a new queue for each run such that the late results of an aborted run are not mixed with the current ones
+        self.results_queue = queue.Queue()
+        results_queue = self.results_queue
 
         log.debug("RuleCheck() executing")
 
@@ -646,7 +666,7 @@ class RulesCheck(AppTool):
                     copper_list.append(elem_dict)
 
                 trace_size = float(self.ui.trace_size_entry.get_value())
-                self.results.append(self.pool.apply_async(self.check_traces_size, args=(copper_list, trace_size)))
+                self.add_rule_job(self.check_traces_size, args=(copper_list, trace_size))
 
             # RULE: Check Copper to Copper Clearance
             if self.ui.clearance_copper2copper_cb.get_value():
@@ -660,7 +680,7 @@ class RulesCheck(AppTool):
                         _("Value is not valid.")))
                     return
 
-                if self.copper_t_cb.get_value():
+                if self.ui.copper_t_cb.get_value():
                     copper_t_obj = self.ui.copper_t_object.currentText()
                     copper_t_dict = {}
 
@@ -668,10 +688,10 @@ class RulesCheck(AppTool):
                         copper_t_dict['name'] = deepcopy(copper_t_obj)
                         copper_t_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(copper_t_obj).apertures)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(copper_t_dict,
-                                                                        copper_copper_clearance,
-                                                                        _("TOP -> Copper to Copper clearance"))))
+                        self.add_rule_job(self.check_inside_gerber_clearance,
+                                          args=(copper_t_dict,
+                                                copper_copper_clearance,
+                                                _("TOP -> Copper to Copper clearance")))
                 if self.ui.copper_b_cb.get_value():
                     copper_b_obj = self.ui.copper_b_object.currentText()
                     copper_b_dict = {}
@@ -679,10 +699,10 @@ class RulesCheck(AppTool):
                         copper_b_dict['name'] = deepcopy(copper_b_obj)
                         copper_b_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(copper_b_obj).apertures)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(copper_b_dict,
-                                                                        copper_copper_clearance,
-                                                                        _("BOTTOM -> Copper to Copper clearance"))))
+                        self.add_rule_job(self.check_inside_gerber_clearance,
+                                          args=(copper_b_dict,
+                                                copper_copper_clearance,
+                                                _("BOTTOM -> Copper to Copper clearance")))
 
                 if self.ui.copper_t_cb.get_value() is False and self.ui.copper_b_cb.get_value() is False:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -739,10 +759,8 @@ class RulesCheck(AppTool):
                         _("Outline Gerber object presence is mandatory for this rule but it is not selected.")))
                     return
 
-                self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                          args=(objs,
-                                                                copper_outline_clearance,
-                                                                _("Copper to Outline clearance"))))
+                self.add_rule_job(self.check_gerber_clearance,
+                                  args=(objs, copper_outline_clearance, _("Copper to Outline clearance")))
 
             # RULE: Check Silk to Silk Clearance
             if self.ui.clearance_silk2silk_cb.get_value():
@@ -757,26 +775,23 @@ class RulesCheck(AppTool):
                         _("Value is not valid.")))
                     return
 
-                if self.ss_t_cb.get_value():
+                if self.ui.ss_t_cb.get_value():
                     silk_obj = self.ui.ss_t_object.currentText()
                     if silk_obj != '':
                         silk_dict['name'] = deepcopy(silk_obj)
                         silk_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(silk_obj).apertures)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(silk_dict,
-                                                                        silk_silk_clearance,
-                                                                        _("TOP -> Silk to Silk clearance"))))
+                        self.add_rule_job(self.check_inside_gerber_clearance,
+                                          args=(silk_dict, silk_silk_clearance, _("TOP -> Silk to Silk clearance")))
                 if self.ui.ss_b_cb.get_value():
                     silk_obj = self.ui.ss_b_object.currentText()
                     if silk_obj != '':
+                        silk_dict = {}
                         silk_dict['name'] = deepcopy(silk_obj)
                         silk_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(silk_obj).apertures)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(silk_dict,
-                                                                        silk_silk_clearance,
-                                                                        _("BOTTOM -> Silk to Silk clearance"))))
+                        self.add_rule_job(self.check_inside_gerber_clearance,
+                                          args=(silk_dict, silk_silk_clearance, _("BOTTOM -> Silk to Silk clearance")))
 
                 if self.ui.ss_t_cb.get_value() is False and self.ui.ss_b_cb.get_value() is False:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -837,16 +852,12 @@ class RulesCheck(AppTool):
 
                 if top_ss is True and top_sm is True:
                     objs = [silk_t_dict, sm_t_dict]
-                    self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                              args=(objs,
-                                                                    silk_sm_clearance,
-                                                                    _("TOP -> Silk to Solder Mask Clearance"))))
+                    self.add_rule_job(self.check_gerber_clearance,
+                                      args=(objs, silk_sm_clearance, _("TOP -> Silk to Solder Mask Clearance")))
                 elif bottom_ss is True and bottom_sm is True:
                     objs = [silk_b_dict, sm_b_dict]
-                    self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                              args=(objs,
-                                                                    silk_sm_clearance,
-                                                                    _("BOTTOM -> Silk to Solder Mask Clearance"))))
+                    self.add_rule_job(self.check_gerber_clearance,
+                                      args=(objs, silk_sm_clearance, _("BOTTOM -> Silk to Solder Mask Clearance")))
                 else:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
                         _("Silk to Solder Mask Clearance"),
@@ -875,7 +886,7 @@ class RulesCheck(AppTool):
                     outline_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(copper_outline).apertures)
 
                 try:
-                    copper_outline_clearance = float(self.ui.clearance_copper2ol_entry.get_value())
+                    silk_outline_clearance = float(self.ui.clearance_silk2ol_entry.get_value())
                 except Exception as e:
                     log.debug("RulesCheck.execute.worker_job() --> %s" % str(e))
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -903,13 +914,11 @@ class RulesCheck(AppTool):
                         _("Outline Gerber object presence is mandatory for this rule but it is not selected.")))
                     return
 
-                self.results.append(self.pool.apply_async(self.check_gerber_clearance,
-                                                          args=(objs,
-                                                                copper_outline_clearance,
-                                                                _("Silk to Outline Clearance"))))
+                self.add_rule_job(self.check_gerber_clearance,
+                                  args=(objs, silk_outline_clearance, _("Silk to Outline Clearance")))
 
             # RULE: Check Minimum Solder Mask Sliver
-            if self.ui.clearance_silk2silk_cb.get_value():
+            if self.ui.clearance_sm2sm_cb.get_value():
                 sm_dict = {}
 
                 try:
@@ -927,20 +936,17 @@ class RulesCheck(AppTool):
                         sm_dict['name'] = deepcopy(solder_obj)
                         sm_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(solder_obj).apertures)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(sm_dict,
-                                                                        sm_sm_clearance,
-                                                                        _("TOP -> Minimum Solder Mask Sliver"))))
+                        self.add_rule_job(self.check_inside_gerber_clearance,
+                                          args=(sm_dict, sm_sm_clearance, _("TOP -> Minimum Solder Mask Sliver")))
                 if self.ui.sm_b_cb.get_value():
                     solder_obj = self.ui.sm_b_object.currentText()
                     if solder_obj != '':
+                        sm_dict = {}
                         sm_dict['name'] = deepcopy(solder_obj)
                         sm_dict['apertures'] = deepcopy(app_obj.collection.get_by_name(solder_obj).apertures)
 
-                        self.results.append(self.pool.apply_async(self.check_inside_gerber_clearance,
-                                                                  args=(sm_dict,
-                                                                        sm_sm_clearance,
-                                                                        _("BOTTOM -> Minimum Solder Mask Sliver"))))
+                        self.add_rule_job(self.check_inside_gerber_clearance,
+                                          args=(sm_dict, sm_sm_clearance, _("BOTTOM -> Minimum Solder Mask Sliver")))
 
                 if self.ui.sm_t_cb.get_value() is False and self.ui.sm_b_cb.get_value() is False:
                     app_obj.inform.emit('[ERROR_NOTCL] %s. %s' % (
@@ -1008,10 +1014,7 @@ class RulesCheck(AppTool):
                         _("Excellon object presence is mandatory for this rule but none is selected.")))
                     return
 
-                self.results.append(self.pool.apply_async(self.check_gerber_annular_ring,
-                                                          args=(objs,
-                                                                ring_val,
-                                                                _("Minimum Annular Ring"))))
+                self.add_rule_job(self.check_gerber_annular_ring, args=(objs, ring_val, _("Minimum Annular Ring")))
 
             # RULE: Check Hole to Hole Clearance
             if self.ui.clearance_d2d_cb.get_value():
@@ -1033,7 +1036,7 @@ class RulesCheck(AppTool):
                     exc_list.append(elem_dict)
 
                 hole_clearance = float(self.ui.clearance_d2d_entry.get_value())
-                self.results.append(self.pool.apply_async(self.check_holes_clearance, args=(exc_list, hole_clearance)))
+                self.add_rule_job(self.check_holes_clearance, args=(exc_list, hole_clearance))
 
             # RULE: Check Holes Size
             if self.ui.drill_size_cb.get_value():
@@ -1055,12 +1058,29 @@ class RulesCheck(AppTool):
                     exc_list.append(elem_dict)
 
                 drill_size = float(self.ui.drill_size_entry.get_value())
-                self.results.append(self.pool.apply_async(self.check_holes_size, args=(exc_list, drill_size)))
+                self.add_rule_job(self.check_holes_size, args=(exc_list, drill_size))
 
+            # the rules run in parallel in the process pool; collect the results in the order they finish so each
+            # rule is reported as soon as it is done and the total time is the time of the slowest rule
             output = []
-            for p in self.results:
-                output.append(p.get())
+            while len(output) < len(self.results):
+                if self.app.abort_flag:
+                    # graceful abort requested by the user
+                    app_obj.proc_container.view.set_idle()
+                    app_obj.inform.emit('[WARNING_NOTCL] %s' % _("Cancelled."))
+                    log.debug("RuleCheck() aborted")
+                    return
+
+                try:
+                    res, elapsed = results_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                output.append(res)
+                self.rule_finished.emit(res, elapsed)
+                app_obj.proc_container.update_view_text(' %d/%d' % (len(output), len(self.results)))
 
+            app_obj.proc_container.update_view_text('')
             self.tool_finished.emit(output)
             app_obj.proc_container.view.set_idle()
 
@@ -1068,10 +1088,37 @@ class RulesCheck(AppTool):
 
         self.app.worker_task.emit({'fcn': worker_job, 'params': [self.app]})
 
+    def on_rule_finished(self, res, elapsed):
+        """
+        Report in the Shell the status of a rule check as soon as it finishes.
+
+        :param res:         the result of a rule check: a tuple (rule title, violations) or a failure message
+        :param elapsed:     the time in seconds the rule check took
+        :return:            None
+        """
+        if not isinstance(res, tuple):
+            self.app.inform_shell.emit('%s: %s' % (_("Rules Check"), str(res)))
+            return
+
+        rule_title, violations = res
+        failed = False
+        for viol in violations:
+            if viol.get('points') or viol.get('dia'):
+                failed = True
+                break
+
+        status = _("FAILED") if failed else _("PASSED")
+        self.app.inform_shell.emit('%s: %s -> %s (%.2f s)' % (_("Rules Check"), str(rule_title), status, elapsed))
+
     def on_tool_finished(self, res):
         def init(new_obj, app_obj):
             txt = ''
             for el in res:
+                if not isinstance(el, tuple):
+                    # the rule check could not be done; the result is a failure message
+                    txt += '%s<BR><BR>' % str(el)
+                    continue
+
                 txt += '<b>RULE NAME:</b>&nbsp;&nbsp;&nbsp;&nbsp;%s<BR>' % str(el[0]).upper()
                 if isinstance(el[1][0]['name'], list):
                     for name in el[1][0]['name']:
@@ -1134,6 +1181,9 @@ class RulesCheck(AppTool):
 
         self.app.app_obj.new_object('document', name='Rules_check_results', initialize=init, plot=False)
 
+    def pool_recreated(self, pool):
+        self.pool = pool
+
     def reset_fields(self):
         # self.object_combo.setRootModelIndex(self.app.collection.index(0, 0, QtCore.QModelIndex()))
         # self.box_combo.setRootModelIndex(self.app.collection.index(0, 0, QtCore.QModelIndex()))
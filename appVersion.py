@@ -0,0 +1,15 @@
+# ##########################################################
+# FlatCAM: 2D Post-processing for Manufacturing            #
+# http://flatcam.org                                       #
+# MIT Licence                                              #
+# ##########################################################
+
+# ###################################################################################################################
+# ################################### Version and VERSION DATE ######################################################
+# ###################################################################################################################
+# Used by the App and by the parts of FlatCAM that run without it (appHeadless); this module imports nothing.
+
+# version = "Unstable Version"
+version = 8.994
+version_date = "2020/11/7"
+beta = True
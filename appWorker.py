@@ -19,12 +19,18 @@ class Worker(QtCore.QObject):
     # avoid multiple tests  for debug availability
     pydevd_failed = False
     task_completed = QtCore.pyqtSignal(str)
+    # the tasks sent to this worker by the WorkerStack
+    task_ready = QtCore.pyqtSignal(dict)
 
     def __init__(self, app, name=None):
         super(Worker, self).__init__()
         self.app = app
         self.name = name
 
+        # Tasks are queued in the event listener of the worker thread, also when the next task is sent from this
+        # thread as the previous one completes. It is connected here so no task sent before the thread starts is lost.
+        self.task_ready.connect(self.do_worker_task, QtCore.Qt.QueuedConnection)
+
     def allow_debug(self):
         """
          allow debuging/breakpoints in this threads
@@ -45,9 +51,7 @@ class Worker(QtCore.QObject):
 
         self.allow_debug()
 
-        # Tasks are queued in the event listener.
-        self.app.worker_task.connect(self.do_worker_task)
-
+    @QtCore.pyqtSlot(dict)
     def do_worker_task(self, task):
 
         # self.app.log.debug("Running task: %s" % str(task))
@@ -57,9 +61,19 @@ class Worker(QtCore.QObject):
         if ('worker_name' in task and task['worker_name'] == self.name) or \
                 ('worker_name' not in task and self.name is None):
 
+            scheduled = task.get('task')
+            if scheduled is not None and not scheduled.start():
+                # cancelled before it started
+                self.task_completed.emit(self.name)
+                return
+
             try:
-                task['fcn'](*task['params'])
+                result = task['fcn'](*task['params'])
+                if scheduled is not None:
+                    scheduled.finish(result=result)
             except Exception as e:
+                if scheduled is not None:
+                    scheduled.finish(exception=e)
                 self.app.thread_exception.emit(e)
                 print(traceback.format_exc())
                 # raise e
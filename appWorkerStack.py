@@ -1,19 +1,111 @@
 from PyQt5 import QtCore
 from appWorker import Worker
-import multiprocessing
+from concurrent.futures import Future
+import threading
+import itertools
+import heapq
+
+# the task that runs in each worker thread
+current = threading.local()
+
+
+def task_cancelled():
+    """
+    :return:    True when the task that runs in the current thread was cancelled by its token
+    """
+    task = getattr(current, 'task', None)
+    return task is not None and task.token.cancelled
+
+
+class CancelToken:
+    """
+    Cancels one task (or a group of tasks that share the token), queued or running. The running tasks see it as the
+    app.abort_flag, that they already check, and return at the first occasion.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class TaskFuture(Future):
+    """
+    The result of a task added to the WorkerStack. Cancelling it cancels the token of the task, so a task that is
+    already running is aborted, too.
+    """
+
+    def __init__(self, token):
+        super(TaskFuture, self).__init__()
+        self.token = token
+
+    def cancel(self):
+        self.token.cancel()
+        return super(TaskFuture, self).cancel()
+
+
+class Task:
+
+    def __init__(self, fcn, params, priority, token, dependencies):
+        self.fcn = fcn
+        self.params = params
+        self.priority = priority
+        self.token = token
+        self.dependencies = dependencies
+        self.future = TaskFuture(token)
+
+    def start(self):
+        """
+        :return:    False if the task was cancelled and it must not run
+        """
+        if self.token.cancelled:
+            self.future.cancel()
+        if not self.future.set_running_or_notify_cancel():
+            return False
+        current.task = self
+        return True
+
+    def finish(self, result=None, exception=None):
+        current.task = None
+        if exception is not None:
+            self.future.set_exception(exception)
+        else:
+            self.future.set_result(result)
 
 
 class WorkerStack(QtCore.QObject):
+    """
+    Runs the tasks in a crew of worker threads. The tasks wait in a priority queue and each one is sent to an idle
+    worker, in the order of their lanes (interactive, like the plotting, then normal and then batch, like the CAM
+    jobs) and, in a lane, in the order they were added. The batch tasks never take the last idle worker so an
+    interactive task does not wait for them.
+
+    submit() returns a TaskFuture. A task can have a CancelToken and it can wait for other tasks (futures) to finish
+    before it is queued; it is cancelled if one of them fails or is cancelled.
+    """
 
-    worker_task = QtCore.pyqtSignal(dict)               # 'worker_name', 'func', 'params'
     thread_exception = QtCore.pyqtSignal(object)
 
+    lanes = {'interactive': 0, 'normal': 1, 'batch': 2}
+
     def __init__(self, workers_number):
         super(WorkerStack, self).__init__()
 
         self.workers = []
         self.threads = []
         self.load = {}                                  # {'worker_name': tasks_count}
+        self.running = {}                               # {'worker_name': Task}
+
+        self.lock = threading.RLock()
+        self.queue = []                                 # heap of (lane, sequence, Task)
+        self.sequence = itertools.count()
+        self.waiting = []                               # the tasks that wait for their dependencies
+        self.counters = {'completed': 0, 'failed': 0, 'cancelled': 0}
 
         # Create workers crew
         for i in range(0, workers_number):
@@ -23,7 +115,8 @@ class WorkerStack(QtCore.QObject):
             worker.moveToThread(thread)
             # worker.connect(thread, QtCore.SIGNAL("started()"), worker.run)
             thread.started.connect(worker.run)
-            worker.task_completed.connect(self.on_task_completed)
+            # the next task is sent from the worker thread, without waiting for the main event loop
+            worker.task_completed.connect(self.on_task_completed, QtCore.Qt.DirectConnection)
 
             thread.start(QtCore.QThread.NormalPriority)
 
@@ -31,14 +124,134 @@ class WorkerStack(QtCore.QObject):
             self.threads.append(thread)
             self.load[worker.name] = 0
 
+        # the batch tasks leave a worker for the interactive ones
+        self.batch_workers = max(len(self.workers) - 1, 1)
+
     def __del__(self):
         for thread in self.threads:
             thread.terminate()
 
     def add_task(self, task):
-        worker_name = min(self.load, key=self.load.get)
-        self.load[worker_name] += 1
-        self.worker_task.emit({'worker_name': worker_name, 'fcn': task['fcn'], 'params': task['params']})
+        """
+        The App.worker_task slot.
+
+        :param task:    dictionary with 'fcn' and 'params' and optionally 'priority' (a lane name), 'token' (a
+                        CancelToken) and 'after' (a list of futures the task waits for)
+        :return:        the TaskFuture of the task
+        """
+        return self.submit(task['fcn'], *task['params'], priority=task.get('priority', 'normal'),
+                           token=task.get('token'), after=task.get('after'))
+
+    def submit(self, fcn, *params, priority='normal', token=None, after=None):
+        """
+        :param fcn:         the function that is run in a worker thread
+        :param params:      the parameters of fcn
+        :param priority:    the lane: 'interactive', 'normal' or 'batch'
+        :param token:       CancelToken of the task; one is made if it is None
+        :param after:       futures that must be done before the task is queued
+        :return:            TaskFuture with the result of fcn
+        :rtype:             TaskFuture
+        """
+        task = Task(fcn, params, self.lanes[priority], token if token is not None else CancelToken(),
+                    list(after) if after else [])
+
+        with self.lock:
+            if task.dependencies:
+                self.waiting.append(task)
+                for dependency in task.dependencies:
+                    dependency.add_done_callback(lambda __, waiting_task=task: self.release(waiting_task))
+            else:
+                self.enqueue(task)
+        task.future.add_done_callback(self.on_future_done)
+        self.dispatch()
+        return task.future
+
+    def enqueue(self, task):
+        heapq.heappush(self.queue, (task.priority, next(self.sequence), task))
+
+    def release(self, task):
+        """
+        Queues a task when all its dependencies are done.
+        """
+        with self.lock:
+            if task not in self.waiting or not all(dependency.done() for dependency in task.dependencies):
+                return
+            self.waiting.remove(task)
+
+            if any(dependency.cancelled() or dependency.exception() is not None for dependency in task.dependencies):
+                task.future.cancel()
+            else:
+                self.enqueue(task)
+        self.dispatch()
+
+    def dispatch(self):
+        """
+        Sends the queued tasks to the idle workers.
+        """
+        with self.lock:
+            while self.queue:
+                idle = [worker for worker in self.workers if self.load[worker.name] == 0]
+                if not idle:
+                    break
+
+                priority, __, task = self.queue[0]
+                if task.future.cancelled():
+                    heapq.heappop(self.queue)
+                    continue
+                # the lanes are in order so only batch tasks are left in the queue
+                if priority == self.lanes['batch'] and \
+                        sum(1 for t in self.running.values() if t.priority == priority) >= self.batch_workers:
+                    break
+
+                heapq.heappop(self.queue)
+                worker = idle[0]
+                self.load[worker.name] += 1
+                self.running[worker.name] = task
+                worker.task_ready.emit({'worker_name': worker.name, 'fcn': task.fcn, 'params': task.params,
+                                        'task': task})
 
     def on_task_completed(self, worker_name):
-        self.load[str(worker_name)] -= 1
+        with self.lock:
+            self.load[str(worker_name)] -= 1
+            self.running.pop(str(worker_name), None)
+        self.dispatch()
+
+    def on_future_done(self, future):
+        with self.lock:
+            if future.cancelled():
+                self.counters['cancelled'] += 1
+            elif future.exception() is not None:
+                self.counters['failed'] += 1
+            else:
+                self.counters['completed'] += 1
+
+    def cancel_all(self):
+        """
+        Cancels all the queued, waiting and running tasks.
+        """
+        with self.lock:
+            tasks = [task for __, __, task in self.queue] + self.waiting + list(self.running.values())
+        for task in tasks:
+            task.future.cancel()
+
+    def stats(self):
+        """
+        :return:    the number of the queued tasks in each lane, of the tasks that wait for their dependencies, of
+                    the running ones and of the finished ones
+        :rtype:     dict
+        """
+        with self.lock:
+            queued = {lane: 0 for lane in self.lanes}
+            lane_names = {priority: lane for lane, priority in self.lanes.items()}
+            for priority, __, task in self.queue:
+                if not task.future.cancelled():
+                    queued[lane_names[priority]] += 1
+
+            stats = {
+                'queued': queued,
+                'queue_depth': sum(queued.values()),
+                'waiting': len(self.waiting),
+                'running': len(self.running),
+            }
+            stats.update(self.counters)
+            return stats
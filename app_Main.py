@@ -15,7 +15,6 @@ import getopt
 import random
 import simplejson as json
 import shutil
-import lzma
 from datetime import datetime
 import time
 import ctypes
@@ -35,8 +34,9 @@ import gc
 
 from xml.dom.minidom import parseString as parse_xml_string
 
-from multiprocessing.connection import Listener, Client
+from multiprocessing.connection import Listener, Client, AuthenticationError
 from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
 import socket
 
 # ####################################################################################################################
@@ -47,6 +47,8 @@ import socket
 from appCommon.Common import LoudDict
 from appCommon.Common import color_variant
 from appCommon.Common import ExclusionAreas
+from appCommon.ProjectArchive import ProjectArchive
+from appCommon.BufferCache import BufferCache
 
 from Bookmark import BookmarkManager
 from appDatabase import ToolsDB2
@@ -54,6 +56,9 @@ from appDatabase import ToolsDB2
 from vispy.gloo.util import _screenshot
 from vispy.io import write_png
 
+# FlatCAM version
+import appVersion
+
 # FlatCAM defaults (preferences)
 from defaults import FlatCAMDefaults
 
@@ -88,7 +93,8 @@ from appParsers.ParseHPGL2 import HPGL2
 
 # FlatCAM Workers
 from appProcess import *
-from appWorkerStack import WorkerStack
+from appWorkerStack import WorkerStack, task_cancelled
+from appJobServer import JobServer, server_address, server_authkey
 
 # FlatCAM Tools
 from appTools import *
@@ -133,15 +139,18 @@ class App(QtCore.QObject):
     cmd_line_shellfile = ''
     cmd_line_shellvar = ''
     cmd_line_headless = None
+    cmd_line_job_server = None
 
     cmd_line_help = "FlatCam.py --shellfile=<cmd_line_shellfile>\n" \
                     "FlatCam.py --shellvar=<1,'C:\\path',23>\n" \
-                    "FlatCam.py --headless=1"
+                    "FlatCam.py --headless=1\n" \
+                    "FlatCam.py --job_server=<processes>"
     try:
         # Multiprocessing pool will spawn additional processes with 'multiprocessing-fork' flag
         cmd_line_options, args = getopt.getopt(sys.argv[1:], "h:", ["shellfile=",
                                                                     "shellvar=",
                                                                     "headless=",
+                                                                    "job_server=",
                                                                     "multiprocessing-fork="])
     except getopt.GetoptError:
         print(cmd_line_help)
@@ -160,14 +169,18 @@ class App(QtCore.QObject):
                 cmd_line_headless = eval(arg)
             except NameError:
                 pass
+        elif opt == '--job_server':
+            try:
+                cmd_line_job_server = int(arg)
+            except ValueError:
+                cmd_line_job_server = 0
 
     # ###############################################################################################################
     # ################################### Version and VERSION DATE ##################################################
     # ###############################################################################################################
-    # version = "Unstable Version"
-    version = 8.994
-    version_date = "2020/11/7"
-    beta = True
+    version = appVersion.version
+    version_date = appVersion.version_date
+    beta = appVersion.beta
 
     engine = '3D'
 
@@ -289,12 +302,17 @@ class App(QtCore.QObject):
         # ############################################################################################################
         # ################# Setup the listening thread for another instance launching with args ######################
         # ############################################################################################################
+        # the jobs sent by the clients to the listener run in worker processes; 0 processes is one for each CPU
+        self.job_server = None
+        if self.cmd_line_job_server is not None:
+            self.job_server = JobServer(processes=self.cmd_line_job_server if self.cmd_line_job_server > 0 else None)
+
         if sys.platform == 'win32' or sys.platform == 'linux':
             # make sure the thread is stored by using a self. otherwise it's garbage collected
             self.listen_th = QtCore.QThread()
             self.listen_th.start(priority=QtCore.QThread.LowestPriority)
 
-            self.new_launch = ArgsThread()
+            self.new_launch = ArgsThread(job_server=self.job_server)
             self.new_launch.open_signal[list].connect(self.on_startup_args)
             self.new_launch.moveToThread(self.listen_th)
             self.new_launch.start.emit()
@@ -461,6 +479,12 @@ class App(QtCore.QObject):
         # ###########################################################################################################
         self.pool = Pool()
 
+        # ###########################################################################################################
+        # ###################################### CREATE THE BUFFER CACHE ############################################
+        # ###########################################################################################################
+        # the buffers and the unions of the objects geometry, reused when the tools are run again
+        self.buffer_cache = BufferCache()
+
         # ###########################################################################################################
         # ###################################### Clear GUI Settings - once at first start ###########################
         # ###########################################################################################################
@@ -541,6 +565,8 @@ class App(QtCore.QObject):
         # ###########################################################################################################
 
         self.block_autosave = False
+        # the blobs of the objects as they were last saved; only the changed objects are encoded again
+        self.project_journal = {}
         self.autosave_timer = QtCore.QTimer(self)
         self.save_project_auto_update()
         self.autosave_timer.timeout.connect(self.save_project_auto)
@@ -3655,6 +3681,10 @@ class App(QtCore.QObject):
         except Exception as e:
             self.log.debug("App.quit_application() --> %s" % str(e))
 
+        # stop the worker processes of the job server
+        if self.job_server is not None:
+            self.job_server.shutdown(wait=False)
+
         # terminate workers
         # self.workers.__del__()
         self.clear_pool()
@@ -5700,6 +5730,18 @@ class App(QtCore.QObject):
             except Exception as e:
                 return "Operation failed: %s" % str(e)
 
+    @property
+    def abort_flag(self):
+        """
+        True when the task that checks it has to return: after the user aborted all the tasks or when its own
+        CancelToken was cancelled.
+        """
+        return self.abort_all_flag or task_cancelled()
+
+    @abort_flag.setter
+    def abort_flag(self, value):
+        self.abort_all_flag = value
+
     def abort_all_tasks(self):
         """
         Executed when a certain key combo is pressed (Ctrl+Alt+X). Will abort current task
@@ -7318,7 +7360,7 @@ class App(QtCore.QObject):
 
             if use_thread is True:
                 # Send to worker
-                self.worker_task.emit({'fcn': worker_task, 'params': [plot_obj]})
+                self.worker_task.emit({'fcn': worker_task, 'params': [plot_obj], 'priority': 'interactive'})
             else:
                 worker_task(plot_obj)
 
@@ -8206,64 +8248,85 @@ class ArgsThread(QtCore.QObject):
     start = pyqtSignal()
     stop = pyqtSignal()
 
-    if sys.platform == 'win32':
-        address = (r'\\.\pipe\NPtest', 'AF_PIPE')
-    else:
-        address = ('/tmp/testipc', 'AF_UNIX')
-
-    def __init__(self):
+    def __init__(self, job_server=None):
+        """
+        :param job_server:  the JobServer of the App; if there is one, the clients of the listener send it jobs
+        """
         super().__init__()
         self.listener = None
+        self.address = None
+        self.authkey = None
         self.thread_exit = False
+        self.job_server = job_server
 
         self.start.connect(self.run)
         self.stop.connect(self.close_listener)
 
-    def my_loop(self, address):
+    def my_loop(self, address, authkey):
+        self.address, self.authkey = address, authkey
         try:
-            self.listener = Listener(*address)
-            while self.thread_exit is False:
-                conn = self.listener.accept()
-                self.serve(conn)
+            self.listener = Listener(*address, authkey=authkey)
         except socket.error:
             try:
-                conn = Client(*address)
+                conn = Client(*address, authkey=authkey)
                 conn.send(sys.argv)
                 conn.send('close')
                 # close the current instance only if there are args
                 if len(sys.argv) > 1:
-                    try:
-                        self.listener.close()
-                    except Exception:
-                        pass
                     sys.exit()
+                return
             except ConnectionRefusedError:
                 if sys.platform == 'win32':
-                    pass
-                else:
-                    os.system('rm /tmp/testipc')
-                    self.listener = Listener(*address)
-                    while True:
-                        conn = self.listener.accept()
-                        self.serve(conn)
+                    return
+                # the socket of an instance that is gone
+                os.remove(address[0])
+                self.listener = Listener(*address, authkey=authkey)
 
-    def serve(self, conn):
         while self.thread_exit is False:
-            msg = conn.recv()
-            if msg == 'close':
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                # a client with a wrong key or one gone in the handshake; the listener is closed on stop
+                App.log.debug("ArgsThread.my_loop() --> %s" % str(e))
+                continue
+            if self.thread_exit:
+                conn.close()
                 break
-            self.open_signal.emit(msg)
+            self.serve(conn)
+
+    def serve(self, conn):
+        if self.job_server is not None:
+            # each client in its own thread, so it can wait for its jobs while other clients connect
+            self.job_server.accept(conn, on_args=self.open_signal.emit)
+            return
+
+        try:
+            while self.thread_exit is False:
+                msg = conn.recv()
+                if msg == 'close':
+                    break
+                self.open_signal.emit(msg)
+        except (EOFError, OSError) as e:
+            App.log.debug("ArgsThread.serve() --> %s" % str(e))
         conn.close()
 
     # the decorator is a must; without it this technique will not work unless the start signal is connected
     # in the main thread (where this class is instantiated) after the instance is moved o the new thread
     @pyqtSlot()
     def run(self):
-        self.my_loop(self.address)
+        self.my_loop(server_address(), server_authkey())
 
     @pyqtSlot()
     def close_listener(self):
         self.thread_exit = True
+        if self.listener is None:
+            return
+
+        # closing the listener does not wake up the accept() of the loop; a connection does
+        try:
+            Client(*self.address, authkey=self.authkey).close()
+        except Exception as e:
+            App.log.debug("ArgsThread.close_listener() --> %s" % str(e))
         self.listener.close()
 
 
@@ -9076,6 +9139,7 @@ class MenuFileHandlers(QtCore.QObject):
 
         # Clear project filename
         self.app.project_filename = None
+        self.app.project_journal.clear()
 
         # Load the application defaults
         self.defaults.load(filename=os.path.join(self.app.data_path, 'current_defaults.FlatConfig'), inform=self.inform)
@@ -9261,7 +9325,11 @@ class MenuFileHandlers(QtCore.QObject):
         if self.app.project_filename is None:
             self.on_file_saveprojectas()
         else:
-            self.worker_task.emit({'fcn': self.save_project, 'params': [self.app.project_filename, silent]})
+            # the project is saved in the worker thread from a snapshot of the objects taken here
+            snapshot = self.project_snapshot()
+            self.app.save_in_progress = True
+            self.worker_task.emit({'fcn': self.save_project,
+                                   'params': [self.app.project_filename, False, silent, False, snapshot]})
             if self.defaults["global_open_style"] is False:
                 self.app.file_opened.emit("project", self.app.project_filename)
             self.app.file_saved.emit("project", self.app.project_filename)
@@ -9305,10 +9373,14 @@ class MenuFileHandlers(QtCore.QObject):
             self.inform.emit('[WARNING_NOTCL] %s' % _("Cancelled."))
             return
 
+        # the project is saved from a snapshot of the objects taken here, in the GUI thread
+        snapshot = self.project_snapshot()
         if use_thread is True:
-            self.worker_task.emit({'fcn': self.save_project, 'params': [filename, quit_action]})
+            self.app.save_in_progress = True
+            self.worker_task.emit({'fcn': self.save_project,
+                                   'params': [filename, quit_action, False, False, snapshot]})
         else:
-            self.save_project(filename, quit_action)
+            self.save_project(filename, quit_action, snapshot=snapshot)
 
         # self.save_project(filename)
         if self.defaults["global_open_style"] is False:
@@ -9560,35 +9632,7 @@ class MenuFileHandlers(QtCore.QObject):
             return 'fail'
 
         with self.app.proc_container.new(_("Exporting ...")):
-            exported_svg = obj.export_svg(scale_stroke_factor=scale_stroke_factor)
-
-            # Determine bounding area for svg export
-            bounds = obj.bounds()
-            size = obj.size()
-
-            # Convert everything to strings for use in the xml doc
-            svgwidth = str(size[0])
-            svgheight = str(size[1])
-            minx = str(bounds[0])
-            miny = str(bounds[1] - size[1])
-            uom = obj.units.lower()
-
-            # Add a SVG Header and footer to the svg output from shapely
-            # The transform flips the Y Axis so that everything renders
-            # properly within svg apps such as inkscape
-            svg_header = '<svg xmlns="http://www.w3.org/2000/svg" ' \
-                         'version="1.1" xmlns:xlink="http://www.w3.org/1999/xlink" '
-            svg_header += 'width="' + svgwidth + uom + '" '
-            svg_header += 'height="' + svgheight + uom + '" '
-            svg_header += 'viewBox="' + minx + ' ' + miny + ' ' + svgwidth + ' ' + svgheight + '">'
-            svg_header += '<g transform="scale(1,-1)">'
-            svg_footer = '</g> </svg>'
-            svg_elem = svg_header + exported_svg + svg_footer
-
-            # Parse the xml through a xml parser just to add line feeds
-            # and to make it look more pretty for the output
-            svgcode = parse_xml_string(svg_elem)
-            svgcode = svgcode.toprettyxml()
+            svgcode = obj.export_svg_document(scale_stroke_factor=scale_stroke_factor)
 
             try:
                 with open(filename, 'w') as fp:
@@ -9836,7 +9880,7 @@ class MenuFileHandlers(QtCore.QObject):
             if local_use is not None:
                 return eret
 
-    def export_gerber(self, obj_name, filename, local_use=None, use_thread=True):
+    def export_gerber(self, obj_name, filename, local_use=None, use_thread=True, step_repeat=None):
         """
         Exports a Gerber Object to an Gerber file.
 
@@ -9846,6 +9890,8 @@ class MenuFileHandlers(QtCore.QObject):
                             When not None, the value will be the actual Gerber object for which to create
                             the Gerber code
         :param use_thread:  if to be run in a separate thread
+        :param step_repeat: appCommon.StepRepeat.StepRepeat; when not None the Gerber code of the object is
+                            repeated in a step and repeat block, as the copies of a panel
         :return:
         """
         if filename is None:
@@ -9927,6 +9973,8 @@ class MenuFileHandlers(QtCore.QObject):
                 footer = 'M02*\n'
 
                 gerber_code = obj.export_gerber(gwhole, gfract, g_zeros=gzeros, factor=factor)
+                if step_repeat is not None:
+                    gerber_code = step_repeat.gerber_block(gerber_code, factor=factor)
 
                 exported_gerber = header
                 exported_gerber += gerber_code
@@ -10505,7 +10553,7 @@ class MenuFileHandlers(QtCore.QObject):
         """
         Loads a project from the specified file.
 
-        1) Loads and parses file
+        1) Loads and parses file: a Project archive (only its manifest) or a JSON project, plain or LZMA compressed
         2) Registers the file as recently opened.
         3) Calls on_file_new()
         4) Updates options
@@ -10537,7 +10585,7 @@ class MenuFileHandlers(QtCore.QObject):
                                     alignment=Qt.AlignBottom | Qt.AlignLeft,
                                     color=QtGui.QColor("gray"))
 
-        # Open and parse an uncompressed Project file
+        # Check that the Project file can be opened
         try:
             f = open(filename, 'r')
         except IOError:
@@ -10554,24 +10602,24 @@ class MenuFileHandlers(QtCore.QObject):
                 self.app.log.error("Failed to open project file: %s" % filename)
                 self.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open project file"), filename))
                 return
+        f.close()
 
+        # the objects of a Project archive are decoded in parallel and each one is waited for only when it is
+        # restored, while the previous ones are created and plotted
+        executor = None
+        if ProjectArchive.is_archive(filename):
+            executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+        # Parse the Project file; of a Project archive only the manifest is parsed now, the objects are decoded when
+        # restored
         try:
-            d = json.load(f, object_hook=dict2obj)
+            project_options, objs = ProjectArchive.read(filename, executor)
         except Exception as e:
-            self.app.log.error(
-                "Failed to parse project file, trying to see if it loads as an LZMA archive: %s because %s" %
-                (filename, str(e)))
-            f.close()
-
-            # Open and parse a compressed Project file
-            try:
-                with lzma.open(filename) as f:
-                    file_content = f.read().decode('utf-8')
-                    d = json.loads(file_content, object_hook=dict2obj)
-            except Exception as e:
-                self.app.log.error("Failed to open project file: %s with error: %s" % (filename, str(e)))
-                self.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open project file"), filename))
-                return
+            self.app.log.error("Failed to open project file: %s with error: %s" % (filename, str(e)))
+            self.inform.emit('[ERROR_NOTCL] %s: %s' % (_("Failed to open project file"), filename))
+            if executor is not None:
+                executor.shutdown(wait=False)
+            return
 
         # Clear the current project
         # # NOT THREAD SAFE # ##
@@ -10583,7 +10631,7 @@ class MenuFileHandlers(QtCore.QObject):
             self.on_file_new()
 
         # Project options
-        self.app.options.update(d['options'])
+        self.app.options.update(project_options)
 
         self.app.project_filename = filename
 
@@ -10595,24 +10643,28 @@ class MenuFileHandlers(QtCore.QObject):
         # Re create objects
         self.app.log.debug(" **************** Started PROEJCT loading... **************** ")
 
-        for obj in d['objs']:
+        for obj_kind, obj_name, obj_data in objs:
             def obj_init(obj_inst, app_inst):
                 try:
-                    obj_inst.from_dict(obj)
+                    obj_inst.from_dict(obj_data())
                 except Exception as erro:
-                    app_inst.log('MenuFileHandlers.open_project() --> ' + str(erro))
+                    app_inst.log.error('MenuFileHandlers.open_project() --> ' + str(erro))
                     return 'fail'
 
-            self.app.log.debug(
-                "Recreating from opened project an %s object: %s" % (obj['kind'].capitalize(), obj['options']['name']))
+            self.app.log.debug("Recreating from opened project an %s object: %s" % (obj_kind.capitalize(), obj_name))
 
             # for some reason, setting ui_title does not work when this method is called from Tcl Shell
             # it's because the TclCommand is run in another thread (it inherit TclCommandSignaled)
             if cli is None:
                 self.app.ui.set_ui_title(name="{} {}: {}".format(
-                    _("Loading Project ... restoring"), obj['kind'].upper(), obj['options']['name']))
+                    _("Loading Project ... restoring"), obj_kind.upper(), obj_name))
 
-            self.app.app_obj.new_object(obj['kind'], obj['options']['name'], obj_init, plot=plot)
+            self.app.app_obj.new_object(obj_kind, obj_name, obj_init, plot=plot)
+
+        if executor is not None:
+            # the objects that failed to be created were not waited for
+            ProjectArchive.cancel(objs)
+            executor.shutdown(wait=False)
 
         self.inform.emit('[success] %s: %s' % (_("Project loaded from"), filename))
 
@@ -10629,85 +10681,98 @@ class MenuFileHandlers(QtCore.QObject):
 
         self.app.log.debug(" **************** Finished PROJECT loading... **************** ")
 
-    def save_project(self, filename, quit_action=False, silent=False, from_tcl=False):
+    def project_snapshot(self):
+        """
+        Captures the latest changes of the current object and takes a snapshot of the project that can be saved in
+        another thread.
+
+        :return:    Dictionary with the snapshot of the objects (ProjectArchive.snapshot()) and of the project options
+        :rtype:     dict
+        """
+        # Capture the latest changes
+        # Current object
+        try:
+            current_object = self.app.collection.get_active()
+            if current_object:
+                current_object.read_form()
+        except Exception as e:
+            self.app.log.debug("project_snapshot() --> There was no active object. Skipping read_form. %s" % str(e))
+
+        # only the changed objects are copied, the entries of the others are the ones of the last snapshot
+        return {
+            "objs":     [obj.project_entry() for obj in self.app.collection.get_list()],
+            "options":  deepcopy(dict(self.app.options))
+        }
+
+    def save_project(self, filename, quit_action=False, silent=False, from_tcl=False, snapshot=None):
         """
         Saves the current project to the specified file.
+        Only the objects that changed since the last save are encoded again.
 
         :param filename:        Name of the file in which to save.
         :type filename:         str
         :param quit_action:     if the project saving will be followed by an app quit; boolean
         :param silent:          if True will not display status messages
         :param from_tcl         True is run from Tcl Shell
+        :param snapshot:        snapshot of the project made by project_snapshot(); if None it is made now
+        :type snapshot:         dict
         :return:                None
         """
         self.app.log.debug("save_project()")
         self.app.save_in_progress = True
 
-        if from_tcl:
-            log.debug("MenuFileHandlers.save_project() -> Project saved from TCL command.")
+        # the save is over however it ends, so the autosave and the quit are not blocked by a failed save
+        try:
+            if from_tcl:
+                log.debug("MenuFileHandlers.save_project() -> Project saved from TCL command.")
 
-        with self.app.proc_container.new(_("Saving Project ...")):
-            # Capture the latest changes
-            # Current object
-            try:
-                current_object = self.app.collection.get_active()
-                if current_object:
-                    current_object.read_form()
-            except Exception as e:
-                self.app.log.debug("save_project() --> There was no active object. Skipping read_form. %s" % str(e))
+            with self.app.proc_container.new(_("Saving Project ...")):
+                if snapshot is None:
+                    snapshot = self.project_snapshot()
 
-            # Serialize the whole project
-            d = {
-                "objs":     [obj.to_dict() for obj in self.app.collection.get_list()],
-                "options":  self.app.options,
-                "version":  self.app.version
-            }
+                # Serialize the project, the geometry of each object goes in a compressed binary blob
+                if self.defaults["global_save_compressed"] is True:
+                    compression = ProjectArchive.default_compression()
+                else:
+                    compression = 'none'
 
-            if self.defaults["global_save_compressed"] is True:
-                with lzma.open(filename, "w", preset=int(self.defaults['global_compression_level'])) as f:
-                    g = json.dumps(d, default=to_dict, indent=2, sort_keys=True).encode('utf-8')
-                    # # Write
-                    f.write(g)
-                self.inform.emit('[success] %s: %s' % (_("Project saved to"), filename))
-            else:
-                # Open file
                 try:
-                    f = open(filename, 'w')
+                    encoded_nr, copied_nr = ProjectArchive.save(filename,
+                                                                objs=snapshot['objs'],
+                                                                options=snapshot['options'],
+                                                                version=self.app.version,
+                                                                compression=compression,
+                                                                level=int(self.defaults['global_compression_level']),
+                                                                journal=self.app.project_journal)
                 except IOError:
                     self.app.log.error("Failed to open file for saving: %s", filename)
                     self.inform.emit('[ERROR_NOTCL] %s' % _("The object is used by another application."))
                     return
-
-                # Write
-                json.dump(d, f, default=to_dict, indent=2, sort_keys=True)
-                f.close()
-
-                # verification of the saved project
-                # Open and parse
-                try:
-                    saved_f = open(filename, 'r')
-                except IOError:
-                    if silent is False:
-                        self.inform.emit('[ERROR_NOTCL] %s: %s %s' %
-                                         (_("Failed to verify project file"), filename, _("Retry to save it.")))
+                except Exception as e:
+                    self.app.log.error("MenuFileHandlers.save_project() --> %s" % str(e))
+                    self.inform.emit('[ERROR_NOTCL] %s: %s %s' %
+                                     (_("Failed to save project file"), filename, _("Retry to save it.")))
                     return
+                self.app.log.debug("save_project() --> %d objects encoded, %d unchanged objects copied" %
+                                   (encoded_nr, copied_nr))
 
+                # verification of the saved project: the manifest is parsed and the checksums of the blobs are checked
                 try:
-                    saved_d = json.load(saved_f, object_hook=dict2obj)
-                except Exception:
+                    saved_archive = ProjectArchive(filename)
+                    verified = saved_archive.verify()
+                except Exception as e:
+                    self.app.log.debug("MenuFileHandlers.save_project() --> %s" % str(e))
                     if silent is False:
                         self.inform.emit('[ERROR_NOTCL] %s: %s %s' %
                                          (_("Failed to parse saved project file"), filename, _("Retry to save it.")))
-                    f.close()
                     return
-                saved_f.close()
 
                 if silent is False:
-                    if 'version' in saved_d:
+                    if verified and 'version' in saved_archive.manifest:
                         self.inform.emit('[success] %s: %s' % (_("Project saved to"), filename))
                     else:
                         self.inform.emit('[ERROR_NOTCL] %s: %s %s' %
-                                         (_("Failed to parse saved project file"), filename, _("Retry to save it.")))
+                                         (_("Failed to verify project file"), filename, _("Retry to save it.")))
 
                 tb_settings = QSettings("Open Source", "FlatCAM")
                 lock_state = self.app.ui.lock_action.isChecked()
@@ -10716,10 +10781,12 @@ class MenuFileHandlers(QtCore.QObject):
                 # This will write the setting to the platform specific storage.
                 del tb_settings
 
-            # if quit:
-            # t = threading.Thread(target=lambda: self.check_project_file_size(1, filename=filename))
-            # t.start()
-            self.app.start_delayed_quit(delay=500, filename=filename, should_quit=quit_action)
+                # if quit:
+                # t = threading.Thread(target=lambda: self.check_project_file_size(1, filename=filename))
+                # t.start()
+                self.app.start_delayed_quit(delay=500, filename=filename, should_quit=quit_action)
+        finally:
+            self.app.save_in_progress = False
 
     def save_source_file(self, obj_name, filename):
         """
@@ -13,13 +13,20 @@ from io import StringIO
 from numpy.linalg import solve, norm
 
 import platform
+import math
+import time
+import multiprocessing
 from copy import deepcopy
+from collections import deque
+from itertools import count
 
 import traceback
 from decimal import Decimal
+from ast import literal_eval
 
-from rtree import index as rtindex
+from array import array
 from lxml import etree as ET
+from xml.dom.minidom import parseString as parse_xml_string
 
 # See: http://toblerity.org/shapely/manual.html
 from shapely.geometry import Polygon, Point, LinearRing
@@ -29,24 +36,19 @@ from shapely.ops import unary_union, substring, linemerge
 import shapely.affinity as affinity
 from shapely.wkt import loads as sloads
 from shapely.wkt import dumps as sdumps
+from shapely.wkb import loads as wkb_loads
 from shapely.geometry.base import BaseGeometry
 from shapely.geometry import shape
 
-# ---------------------------------------
-# NEEDED for Legacy mode
-# Used for solid polygons in Matplotlib
-from descartes.patch import PolygonPatch
-# ---------------------------------------
 # Fix for python 3.10
 try:
     from collections import Iterable
 except ImportError:
     from collections.abc import Iterable
-import rasterio
-from rasterio.features import shapes
-import ezdxf
 
 from appCommon.Common import GracefulException as grace
+from appCommon.GeometryBatch import GeometryBatch, scale_matrix, rotate_matrix, skew_matrix
+from appCommon.PointArray import PointArray, SlotArray
 
 # Commented for FlatCAM packaging with cx_freeze
 # from scipy.spatial import KDTree, Delaunay
@@ -83,6 +85,15 @@ class ParseError(Exception):
     pass
 
 
+def process_gui_events():
+    """
+    Provides the app with a way to process the GUI events when in a blocking loop.
+    The processes of the application pool have no GUI, even when forked from the app process.
+    """
+    if multiprocessing.parent_process() is None:
+        QtWidgets.QApplication.processEvents()
+
+
 class ApertureMacro:
     """
     Syntax of aperture macros.
@@ -517,10 +528,27 @@ class Geometry(object):
         # "geo_steps_per_circle": 128
     }
 
-    def __init__(self, geo_steps_per_circle=None):
+    # each change of the solid_geometry of an object takes the next version, such that the results made from the
+    # previous geometry (e.g. the buffers in App.buffer_cache) are not used anymore
+    geometry_versions = count(1)
+
+    # Instance of the application to which these are related.
+    # The app should set this value.
+    app = None
+
+    def __init__(self, geo_steps_per_circle=None, detached=False):
+        """
+        :param geo_steps_per_circle:    number of linear segments to be used to approximate a circle
+        :param detached:                if True the geometry does not use the application, e.g. in the processes of
+                                        the application pool: it has no temporary shapes to plot, it shows no
+                                        progress and it is not aborted (the application stops dispatching its jobs)
+        """
+        if detached:
+            self.app = None
+
         # Units (in or mm)
-        self.units = self.app.defaults["units"]
-        self.decimals = self.app.decimals
+        self.units = self.app.defaults["units"] if self.app is not None else self.defaults["units"].upper()
+        self.decimals = self.app.decimals if self.app is not None else 4
 
         self.drawing_tolerance = 0.0
         self.tools = None
@@ -547,7 +575,9 @@ class Geometry(object):
         self.old_disp_number = 0
         self.el_count = 0
 
-        if self.app.is_legacy is False:
+        if self.app is None:
+            self.temp_shapes = None
+        elif self.app.is_legacy is False:
             self.temp_shapes = self.app.plotcanvas.new_shape_collection(layers=1)
         else:
             from appGUI.PlotCanvasLegacy import ShapeCollectionLegacy
@@ -556,6 +586,40 @@ class Geometry(object):
         # Attributes to be included in serialization
         self.ser_attrs = ["units", 'solid_geometry', 'follow_geometry', 'tools']
 
+    @property
+    def solid_geometry(self):
+        return self._solid_geometry
+
+    @solid_geometry.setter
+    def solid_geometry(self, geometry):
+        self._solid_geometry = geometry
+        self.geometry_changed()
+
+    def geometry_changed(self):
+        """
+        Gives a new version to the solid_geometry. It is done when the solid_geometry is set; the changes made in
+        place, e.g. appending to the solid_geometry list, have to call it.
+
+        :return:    None
+        """
+        self.geometry_version = next(Geometry.geometry_versions)
+
+    def aborted(self):
+        """
+        :return:    True if the user asked to stop the work; never for a detached geometry
+        """
+        return self.app is not None and self.app.abort_flag
+
+    def update_view_text(self, text):
+        """
+        Shows the progress of the work in the activity view of the application, if the geometry is not detached.
+
+        :param text:    the progress text
+        :return:        None
+        """
+        if self.app is not None:
+            self.app.proc_container.update_view_text(text)
+
     def plot_temp_shapes(self, element, color='red'):
 
         try:
@@ -593,6 +657,7 @@ class Geometry(object):
         # add to the solid_geometry
         try:
             self.solid_geometry.append(new_circle)
+            self.geometry_changed()
         except TypeError:
             try:
                 self.solid_geometry = self.solid_geometry.union(new_circle)
@@ -634,6 +699,7 @@ class Geometry(object):
         # add to the solid_geometry
         if type(self.solid_geometry) is list:
             self.solid_geometry.append(new_poly)
+            self.geometry_changed()
         else:
             try:
                 self.solid_geometry = self.solid_geometry.union(Polygon(points))
@@ -675,6 +741,7 @@ class Geometry(object):
         # add to the solid_geometry
         if type(self.solid_geometry) is list:
             self.solid_geometry.append(new_line)
+            self.geometry_changed()
         else:
             try:
                 self.solid_geometry = self.solid_geometry.union(new_line)
@@ -1057,7 +1124,7 @@ class Geometry(object):
         :rtype:             Shapely.MultiPolygon or Shapely.Polygon
         """
 
-        if self.app.abort_flag:
+        if self.aborted():
             # graceful abort requested by the user
             raise grace
 
@@ -1081,7 +1148,7 @@ class Geometry(object):
         # yet, it can be done by issuing an unary_union in the end, thus getting rid of the overlapping geo
         try:
             for pol in working_geo:
-                if self.app.abort_flag:
+                if self.aborted():
                     # graceful abort requested by the user
                     raise grace
                 if offset == 0:
@@ -1098,8 +1165,7 @@ class Geometry(object):
                 disp_number = int(np.interp(pol_nr, [0, geo_len], [0, 100]))
 
                 if old_disp_number < disp_number <= 100:
-                    self.app.proc_container.update_view_text(' %s %d: %d%%' %
-                                                             (_("Pass"), int(passes + 1), int(disp_number)))
+                    self.update_view_text(' %s %d: %d%%' % (_("Pass"), int(passes + 1), int(disp_number)))
                     old_disp_number = disp_number
         except TypeError:
             # taking care of the case when the self.solid_geometry is just a single Polygon, not a list or a
@@ -1112,19 +1178,19 @@ class Geometry(object):
 
             geo_iso.append(temp_geo)
 
-        self.app.proc_container.update_view_text(' %s' % _("Buffering"))
+        self.update_view_text(' %s' % _("Buffering"))
         geo_iso = unary_union(geo_iso)
 
-        self.app.proc_container.update_view_text('')
+        self.update_view_text('')
         # end of replaced block
 
         if iso_type == 2:
             ret_geo = geo_iso
         elif iso_type == 0:
-            self.app.proc_container.update_view_text(' %s' % _("Get Exteriors"))
+            self.update_view_text(' %s' % _("Get Exteriors"))
             ret_geo = self.get_exteriors(geo_iso)
         elif iso_type == 1:
-            self.app.proc_container.update_view_text(' %s' % _("Get Interiors"))
+            self.update_view_text(' %s' % _("Get Interiors"))
             ret_geo =  self.get_interiors(geo_iso)
         else:
             log.debug("Geometry.isolation_geometry() --> Type of isolation not supported")
@@ -1136,6 +1202,92 @@ class Geometry(object):
 
         return ret_geo
 
+    @staticmethod
+    def isolation_geometry_job(geometry_wkb, offset, iso_type, steps_per_circle):
+        """
+        Makes the isolation envelope of one pass in a process of the application pool (see isolation_geometry()).
+        The geometry and the envelope are passed as WKB.
+
+        :param geometry_wkb:        list with the WKB of the polygons to isolate
+        :param offset:              Offset distance
+        :param iso_type:            type of isolation, can be 0 = exteriors or 1 = interiors or 2 = both (complete)
+        :param steps_per_circle:    number of linear segments to be used to approximate a circle
+        :return:                    the WKB of the envelope for the complete isolation, the list with the WKB of the
+                                    rings for the others; None if the envelope could not be made
+        """
+        geometry = [wkb_loads(geo) for geo in geometry_wkb]
+        if not geometry:
+            return None
+
+        # there is no app in the pool processes; the app aborts the isolation by not dispatching the remaining jobs
+        iso = Geometry(geo_steps_per_circle=steps_per_circle, detached=True)
+
+        try:
+            envelope = iso.isolation_geometry(offset, geometry=geometry, iso_type=iso_type)
+        except Exception as e:
+            log.debug("camlib.Geometry.isolation_geometry_job() --> %s" % str(e))
+            return None
+
+        if envelope == 'fail':
+            return None
+        if iso_type == 2:
+            return envelope.wkb
+        return [ring.wkb for ring in envelope]
+
+    def isolation_geometry_pool(self, geometry, envelopes, union=None):
+        """
+        Makes the isolation envelopes of several passes, of one or more tools, in parallel in the processes of the
+        application pool (see isolation_geometry_job()).
+        The union of the geometry is made once: each envelope with a positive offset is the buffer of it, which is the
+        same as the union of the buffered polygons that isolation_geometry() makes. A negative offset can separate
+        touching polygons, so those envelopes are made from the polygons.
+
+        :param geometry:    the geometry to isolate; Polygon, MultiPolygon or a list of them
+        :param envelopes:   list of (offset, iso_type) tuples, one for each envelope
+        :param union:       the union of the geometry, if it is already made
+        :return:            list with the envelope, as isolation_geometry() returns it, or 'fail', in the order of
+                            envelopes
+        """
+        if not isinstance(geometry, list):
+            geometry = [geometry]
+
+        polygons = []
+        for geo in self.flatten_list(geometry):
+            if isinstance(geo, MultiPolygon):
+                polygons += list(geo.geoms)
+            elif isinstance(geo, Polygon) and not geo.is_empty:
+                polygons.append(geo)
+
+        polygons_wkb = None
+        union_wkb = None
+        if union is not None:
+            union_wkb = [union.wkb] if not union.is_empty else []
+
+        jobs_args = []
+        for offset, iso_type in envelopes:
+            if offset >= 0:
+                if union_wkb is None:
+                    self.update_view_text(' %s' % _("Buffering"))
+                    union_wkb = [unary_union(polygons).wkb] if polygons else []
+                work_wkb = union_wkb
+            else:
+                if polygons_wkb is None:
+                    polygons_wkb = [pol.wkb for pol in polygons]
+                work_wkb = polygons_wkb
+            jobs_args.append((work_wkb, offset, iso_type, int(self.geo_steps_per_circle)))
+
+        results = []
+        for (offset, iso_type), envelope in zip(envelopes, self.run_pool_jobs(Geometry.isolation_geometry_job,
+                                                                              jobs_args)):
+            if envelope is None:
+                results.append('fail')
+            elif iso_type == 2:
+                results.append(wkb_loads(envelope))
+            else:
+                # WKB has no rings, they come back as LineStrings
+                results.append([LinearRing(wkb_loads(ring).coords) for ring in envelope])
+        return results
+
     def flatten_list(self, obj_list):
         for item in obj_list:
             if isinstance(item, Iterable) and not isinstance(item, (str, bytes)):
@@ -1202,6 +1354,7 @@ class Geometry(object):
                 self.solid_geometry += geos
             else:
                 self.solid_geometry.append(geos)
+                self.geometry_changed()
         else:  # It's shapely geometry
             self.solid_geometry = [self.solid_geometry, geos]
 
@@ -1250,6 +1403,9 @@ class Geometry(object):
         """
         log.debug("Parsing DXF file geometry into a Geometry object solid geometry.")
 
+        # ezdxf is imported when needed, it is slow to load
+        import ezdxf
+
         # Parse into list of shapely objects
         dxf = ezdxf.readfile(filename)
         geos = getdxfgeo(dxf)
@@ -1278,6 +1434,7 @@ class Geometry(object):
                 self.solid_geometry += geos
             else:
                 self.solid_geometry.append(geos)
+                self.geometry_changed()
         else:  # It's shapely geometry
             self.solid_geometry = [self.solid_geometry, geos]
 
@@ -1327,6 +1484,10 @@ class Geometry(object):
 
         scale_factor = 25.4 / dpi if units.lower() == 'mm' else 1 / dpi
 
+        # rasterio is imported when needed, it is slow to load
+        import rasterio
+        from rasterio.features import shapes
+
         geos = []
         unscaled_geos = []
 
@@ -1383,6 +1544,7 @@ class Geometry(object):
                 self.solid_geometry += geos
             else:
                 self.solid_geometry.append(geos)
+                self.geometry_changed()
         else:  # It's shapely geometry
             self.solid_geometry = [self.solid_geometry, geos]
 
@@ -1448,63 +1610,43 @@ class Geometry(object):
         geoms = FlatCAMRTreeStorage()
         geoms.get_points = get_pts
 
-        # Can only result in a Polygon or MultiPolygon
-        # NOTE: The resulting polygon can be "empty".
-        current = polygon.buffer((-tooldia / 1.999999), int(steps_per_circle))
-        if current.area == 0:
-            # Otherwise, trying to to insert current.exterior == None
-            # into the FlatCAMStorage will fail.
-            # print("Area is None")
-            return None
-
-        # current can be a MultiPolygon
-        try:
-            for p in current:
-                geoms.insert(p.exterior)
-                for i in p.interiors:
-                    geoms.insert(i)
-
-        # Not a Multipolygon. Must be a Polygon
-        except TypeError:
-            geoms.insert(current.exterior)
-            for i in current.interiors:
-                geoms.insert(i)
+        # The offset levels. The erosion by a disc is additive so each level is the polygon shrunk by the total
+        # offset, which is faster than shrinking the previous level again, as it gets more vertices on each level
+        first_offset = tooldia / 1.999999
+        step = tooldia * (1 - overlap)
 
+        rings = []
+        level = 0
         while True:
-            if self.app.abort_flag:
+            if self.aborted():
                 # graceful abort requested by the user
                 raise grace
 
             # provide the app with a way to process the GUI events when in a blocking loop
-            QtWidgets.QApplication.processEvents()
+            process_gui_events()
 
             # Can only result in a Polygon or MultiPolygon
-            current = current.buffer(-tooldia * (1 - overlap), int(steps_per_circle))
-            if current.area > 0:
-
-                # current can be a MultiPolygon
-                try:
-                    for p in current:
-                        geoms.insert(p.exterior)
-                        for i in p.interiors:
-                            geoms.insert(i)
-                            if prog_plot:
-                                self.plot_temp_shapes(p)
-
-                # Not a Multipolygon. Must be a Polygon
-                except TypeError:
-                    geoms.insert(current.exterior)
-                    if prog_plot:
-                        self.plot_temp_shapes(current.exterior)
-                    for i in current.interiors:
-                        geoms.insert(i)
-                        if prog_plot:
-                            self.plot_temp_shapes(i)
-            else:
+            # NOTE: The resulting polygon can be "empty".
+            current = polygon.buffer(-(first_offset + level * step), int(steps_per_circle))
+            if current.area == 0:
+                if level == 0:
+                    # Otherwise, trying to to insert current.exterior == None
+                    # into the FlatCAMStorage will fail.
+                    return None
                 log.debug("camlib.Geometry.clear_polygon() --> Current Area is zero")
                 break
 
+            # current can be a MultiPolygon
+            for p in (current.geoms if isinstance(current, MultiPolygon) else [current]):
+                rings.append(p.exterior)
+                rings += list(p.interiors)
+            level += 1
+
+        geoms.insert_many(rings)
+
         if prog_plot:
+            for ring in rings:
+                self.plot_temp_shapes(ring)
             self.temp_shapes.redraw()
 
         # Optimization: Reduce lifts
@@ -1563,12 +1705,12 @@ class Geometry(object):
         # Grow from seed until outside the box. The polygons will
         # never have an interior, so take the exterior LinearRing.
         while True:
-            if self.app.abort_flag:
+            if self.aborted():
                 # graceful abort requested by the user
                 raise grace
 
             # provide the app with a way to process the GUI events when in a blocking loop
-            QtWidgets.QApplication.processEvents()
+            process_gui_events()
 
             path = Point(seedpoint).buffer(radius, int(steps_per_circle)).exterior
             path = path.intersection(path_margin)
@@ -1677,12 +1819,12 @@ class Geometry(object):
             try:
                 y = top - tooldia / 1.99999999
                 while y > bot + tooldia / 1.999999999:
-                    if self.app.abort_flag:
+                    if self.aborted():
                         # graceful abort requested by the user
                         raise grace
 
                     # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
+                    process_gui_events()
 
                     line = LineString([(left, y), (right, y)])
                     line = line.intersection(margin_poly)
@@ -1714,12 +1856,12 @@ class Geometry(object):
             try:
                 x = left + tooldia / 1.99999999
                 while x < right - tooldia / 1.999999999:
-                    if self.app.abort_flag:
+                    if self.aborted():
                         # graceful abort requested by the user
                         raise grace
 
                     # provide the app with a way to process the GUI events when in a blocking loop
-                    QtWidgets.QApplication.processEvents()
+                    process_gui_events()
 
                     line = LineString([(x, top), (x, bot)])
                     line = line.intersection(margin_poly)
@@ -1800,6 +1942,116 @@ class Geometry(object):
 
         return geoms
 
+    # the methods of clear_polygon_job(), by name
+    clearing_methods = ['standard', 'seed', 'lines', 'combo']
+
+    @staticmethod
+    def clear_polygon_job(method, polygon_wkb, tooldia, steps_per_circle, overlap, connect, contour):
+        """
+        Clears a polygon in a process of the application pool. The polygon and the toolpaths are passed as WKB.
+
+        :param method:              one of Geometry.clearing_methods: 'standard' (clear_polygon()), 'seed'
+                                    (clear_polygon2()), 'lines' (clear_polygon3()) or 'combo' (the first of 'lines',
+                                    'seed' and 'standard' that clears the polygon)
+        :param polygon_wkb:         WKB of the Polygon to clear
+        :param tooldia:             Diameter of the tool
+        :param steps_per_circle:    number of linear segments to be used to approximate a circle
+        :param overlap:             Overlap of toolpasses
+        :param connect:             Draw lines between disjoint segments to minimize tool lifts
+        :param contour:             Paint around the edges
+        :return:                    List with the WKB of the toolpaths or None if the polygon could not be cleared
+        :rtype:                     list
+        """
+        polygon = wkb_loads(polygon_wkb)
+
+        # there is no app in the pool processes; the app aborts the clearing by not dispatching the remaining jobs
+        clearing = Geometry(detached=True)
+
+        methods = {
+            'standard': [clearing.clear_polygon],
+            'seed':     [clearing.clear_polygon2],
+            'lines':    [clearing.clear_polygon3],
+            'combo':    [clearing.clear_polygon3, clearing.clear_polygon2, clearing.clear_polygon]
+        }
+
+        for clear_method in methods[method]:
+            try:
+                cp = clear_method(polygon, tooldia, steps_per_circle, overlap=overlap, contour=contour,
+                                  connect=connect, prog_plot=False)
+            except Exception as e:
+                log.debug("camlib.Geometry.clear_polygon_job() %s --> %s" % (method, str(e)))
+                cp = None
+            if cp and cp.objects:
+                return [geo.wkb for geo in cp.get_objects() if geo and not geo.is_empty]
+        return None
+
+    def clear_polygons_pool(self, polygons, method, tooldia, steps_per_circle, overlap=0.15, connect=True,
+                            contour=True):
+        """
+        Clears the polygons in parallel, in the processes of the application pool (see clear_polygon_job()).
+        A limited number of polygons are dispatched at once such that an abort stops the clearing after the
+        dispatched ones. The progress is displayed as percentage of the cleared polygons.
+
+        :param polygons:            list of the Polygons to clear
+        :param method:              one of Geometry.clearing_methods
+        :param tooldia:             Diameter of the tool
+        :param steps_per_circle:    number of linear segments to be used to approximate a circle
+        :param overlap:             Overlap of toolpasses
+        :param connect:             Draw lines between disjoint segments to minimize tool lifts
+        :param contour:             Paint around the edges
+        :return:                    For each polygon, in order, the list of the toolpaths or None if the polygon
+                                    could not be cleared
+        :rtype:                     list
+        """
+        jobs_args = [(method, pol.wkb, tooldia, int(steps_per_circle), overlap, connect, contour)
+                     for pol in polygons]
+
+        results = []
+        for paths in self.run_pool_jobs(Geometry.clear_polygon_job, jobs_args):
+            results.append([wkb_loads(path) for path in paths] if paths is not None else None)
+        return results
+
+    def run_pool_jobs(self, function, jobs_args):
+        """
+        Runs function for each of the arguments in the processes of the application pool and yields the results in
+        order. A limited number of jobs are dispatched at once such that an abort stops the work after the dispatched
+        ones. The progress is displayed as percentage of the finished jobs.
+
+        :param function:    picklable function (a static method or a module function)
+        :param jobs_args:   list with the tuple of arguments of each job
+        :return:            generator of the results of the jobs, in the order of jobs_args
+        """
+        pool = self.app.pool
+        jobs_len = len(jobs_args)
+        max_pending = 4 * multiprocessing.cpu_count()
+
+        pending = deque()
+        next_job = 0
+        old_disp_number = 0
+
+        for job_nr in range(jobs_len):
+            while next_job < jobs_len and len(pending) < max_pending:
+                pending.append(pool.apply_async(function, args=jobs_args[next_job]))
+                next_job += 1
+
+            job = pending.popleft()
+            while True:
+                if self.app.abort_flag:
+                    # graceful abort requested by the user
+                    raise grace
+                try:
+                    result = job.get(timeout=0.1)
+                    break
+                except multiprocessing.TimeoutError:
+                    pass
+
+            disp_number = int(np.interp(job_nr + 1, [0, jobs_len], [0, 100]))
+            if old_disp_number < disp_number <= 100:
+                self.app.proc_container.update_view_text(' %d%%' % disp_number)
+                old_disp_number = disp_number
+
+            yield result
+
     def fill_with_lines(self, line, aperture_size, tooldia, steps_per_circle, overlap=0.15, connect=True, contour=True,
                         prog_plot=False):
         """
@@ -2085,14 +2337,113 @@ class Geometry(object):
         return optimized_paths
 
     @staticmethod
-    def path_connect(storage, origin=(0, 0)):
+    def connect_paths(paths, tolerance=0.0, origin=None):
+        """
+        Joins the paths that touch on their endpoints into longer paths. The endpoints are hashed in a dictionary,
+        the chains of paths are built as lists of path indexes and each joined path is made only once, at the end,
+        so the time is linear in the number of coordinates. Only the LineStrings are joined, the linear rings and
+        the other geometry are kept as they are.
+
+        :param paths:       list of LineString and LinearRing
+        :type paths:        list
+        :param tolerance:   the endpoints are matched after they are rounded to a multiple of the tolerance;
+                            if 0 they have to be equal
+        :type tolerance:    float
+        :param origin:      tuple; if not None the chain of the path with the endpoint nearest to it is made first
+        :return:            list with the joined paths and the geometry that was not joined
+        :rtype:             list
+        """
+        paths = [p for p in paths if p is not None and not p.is_empty]
+        coords = [list(p.coords) if type(p) == LineString else None for p in paths]
+
+        if tolerance > 0:
+            def key(pt):
+                return round(pt[0] / tolerance), round(pt[1] / tolerance)
+        else:
+            def key(pt):
+                return pt[0], pt[1]
+
+        # endpoint -> paths with an end there; the paths are in reverse order so the first path is taken first
+        ends = {}
+        for idx in reversed(range(len(paths))):
+            if coords[idx] is not None:
+                ends.setdefault(key(coords[idx][0]), []).append(idx)
+                ends.setdefault(key(coords[idx][-1]), []).append(idx)
+
+        used = [False] * len(paths)
+
+        def next_path(end_key):
+            end_paths = ends.get(end_key)
+            while end_paths and used[end_paths[-1]]:
+                end_paths.pop()
+            return end_paths[-1] if end_paths else None
+
+        seeds = range(len(paths))
+        lines = [i for i in seeds if coords[i] is not None]
+        if origin is not None and lines:
+            first = min(lines, key=lambda i: min(distance_euclidian(origin[0], origin[1], pt[0], pt[1])
+                                                 for pt in (coords[i][0], coords[i][-1])))
+            seeds = [first] + [i for i in seeds if i != first]
+
+        connected = []
+        for seed in seeds:
+            if used[seed]:
+                continue
+            used[seed] = True
+
+            if coords[seed] is None:
+                connected.append(paths[seed])
+                continue
+
+            # chain of (path index, reversed)
+            chain = deque([(seed, False)])
+
+            end_key = key(coords[seed][-1])
+            idx = next_path(end_key)
+            while idx is not None:
+                used[idx] = True
+                if key(coords[idx][0]) == end_key:
+                    chain.append((idx, False))
+                    end_key = key(coords[idx][-1])
+                else:
+                    chain.append((idx, True))
+                    end_key = key(coords[idx][0])
+                idx = next_path(end_key)
+
+            start_key = key(coords[seed][0])
+            idx = next_path(start_key)
+            while idx is not None:
+                used[idx] = True
+                if key(coords[idx][-1]) == start_key:
+                    chain.appendleft((idx, False))
+                    start_key = key(coords[idx][0])
+                else:
+                    chain.appendleft((idx, True))
+                    start_key = key(coords[idx][-1])
+                idx = next_path(start_key)
+
+            if len(chain) == 1:
+                connected.append(paths[seed])
+                continue
+
+            # the first point of each path, after the first one, is the last point of the previous path
+            chain_coords = coords[chain[0][0]][::-1] if chain[0][1] else list(coords[chain[0][0]])
+            for idx, is_reversed in list(chain)[1:]:
+                chain_coords += coords[idx][-2::-1] if is_reversed else coords[idx][1:]
+            connected.append(LineString(chain_coords))
+
+        return connected
+
+    @staticmethod
+    def path_connect(storage, origin=(0, 0), tolerance=0.0):
         """
         Simplifies paths in the FlatCAMRTreeStorage storage by
         connecting paths that touch on their endpoints.
 
         :param storage:     Storage containing the initial paths.
         :rtype storage:     FlatCAMRTreeStorage
-        :param origin:      tuple; point from which to calculate the nearest point
+        :param origin:      tuple; point from which to start connecting the paths
+        :param tolerance:   the endpoints closer than this are connected; see connect_paths()
         :return:            Simplified storage.
         :rtype:             FlatCAMRTreeStorage
         """
@@ -2103,101 +2454,14 @@ class Geometry(object):
         def get_pts(o):
             return [o.coords[0], o.coords[-1]]
 
-        #
-        # storage = FlatCAMRTreeStorage()
-        # storage.get_points = get_pts
-        #
-        # for shape in pathlist:
-        #     if shape is not None:
-        #         storage.insert(shape)
+        connected = Geometry.connect_paths(list(storage.get_objects()), tolerance=tolerance, origin=origin)
 
-        path_count = 0
-        pt, geo = storage.nearest(origin)
-        storage.remove(geo)
-        # optimized_geometry = [geo]
         optimized_geometry = FlatCAMRTreeStorage()
         optimized_geometry.get_points = get_pts
-        # optimized_geometry.insert(geo)
-        try:
-            while True:
-                path_count += 1
-                _, left = storage.nearest(geo.coords[0])
-
-                # If left touches geo, remove left from original
-                # storage and append to geo.
-                if type(left) == LineString:
-                    if left.coords[0] == geo.coords[0]:
-                        storage.remove(left)
-                        # geo.coords = list(geo.coords)[::-1] + list(left.coords)   # Shapely 2.0
-                        geo = LineString(list(geo.coords)[::-1] + list(left.coords))
-                        continue
-
-                    if left.coords[-1] == geo.coords[0]:
-                        storage.remove(left)
-                        # geo.coords = list(left.coords) + list(geo.coords)  # Shapely 2.0
-                        geo = LineString(list(geo.coords)[::-1] + list(left.coords))
-                        continue
-
-                    if left.coords[0] == geo.coords[-1]:
-                        storage.remove(left)
-                        # geo.coords = list(geo.coords) + list(left.coords) # Shapely 2.0
-                        geo = LineString(list(geo.coords) + list(left.coords))
-                        continue
-
-                    if left.coords[-1] == geo.coords[-1]:
-                        storage.remove(left)
-                        # geo.coords = list(geo.coords) + list(left.coords)[::-1] # Shapely 2.0
-                        geo = LineString(list(geo.coords) + list(left.coords)[::-1])
-                        continue
-
-                _, right = storage.nearest(geo.coords[-1])
-
-                # If right touches geo, remove left from original
-                # storage and append to geo.
-                if type(right) == LineString:
-                    if right.coords[0] == geo.coords[-1]:
-                        storage.remove(right)
-                        # geo.coords = list(geo.coords) + list(right.coords)  # Shapely 2.0
-                        geo = LineString(list(geo.coords) + list(right.coords))
-                        continue
-
-                    if right.coords[-1] == geo.coords[-1]:
-                        storage.remove(right)
-                        # geo.coords = list(geo.coords) + list(right.coords)[::-1]    # Shapely 2.0
-                        geo = LineString(list(geo.coords) + list(right.coords)[::-1])
-                        continue
-
-                    if right.coords[0] == geo.coords[0]:
-                        storage.remove(right)
-                        # geo.coords = list(geo.coords)[::-1] + list(right.coords)    # Shapely 2.0
-                        geo = LineString(list(geo.coords)[::-1] + list(right.coords))
-                        continue
-
-                    if right.coords[-1] == geo.coords[0]:
-                        storage.remove(right)
-                        # geo.coords = list(left.coords) + list(geo.coords)   # Shapely 2.0
-                        geo = LineString(list(left.coords) + list(geo.coords))
-                        continue
-
-                # right is either a LinearRing or it does not connect
-                # to geo (nothing left to connect to geo), so we continue
-                # with right as geo.
-                storage.remove(right)
-
-                if type(right) == LinearRing:
-                    optimized_geometry.insert(right)
-                else:
-                    # Cannot extend geo any further. Put it away.
-                    optimized_geometry.insert(geo)
-
-                    # Continue with right.
-                    geo = right
-
-        except StopIteration:  # Nothing found in storage.
-            optimized_geometry.insert(geo)
+        optimized_geometry.insert_many(connected)
 
         # print path_count
-        log.debug("path_count = %d" % path_count)
+        log.debug("path_count = %d" % len(connected))
 
         return optimized_geometry
 
@@ -2290,9 +2554,9 @@ class Geometry(object):
                     flat_geo += self.flatten(self.tools[tool]['solid_geometry'])
                 geom_svg = unary_union(flat_geo)
             else:
-                geom_svg = unary_union(self.flatten())
+                geom_svg = self.app.buffer_cache.union(self)
         else:
-            geom_svg = unary_union(self.flatten())
+            geom_svg = self.app.buffer_cache.union(self)
 
         skew_ref = 'center'
         if skew_reference != 'center':
@@ -2342,6 +2606,71 @@ class Geometry(object):
         svg_elem = geom.svg(scale_factor=scale_stroke_factor)
         return svg_elem
 
+    def export_svg_document(self, scale_stroke_factor=0.00):
+        """
+        Exports the Geometry Object as a SVG document, the content of a SVG file.
+
+        :param scale_stroke_factor: factor by which to change/scale the thickness of the features
+        :return:                    the SVG code, with line feeds
+        """
+        exported_svg = self.export_svg(scale_stroke_factor=scale_stroke_factor)
+
+        # Determine bounding area for svg export
+        bounds = self.bounds()
+        size = self.size()
+
+        # Convert everything to strings for use in the xml doc
+        svgwidth = str(size[0])
+        svgheight = str(size[1])
+        minx = str(bounds[0])
+        miny = str(bounds[1] - size[1])
+        uom = self.units.lower()
+
+        # Add a SVG Header and footer to the svg output from shapely
+        # The transform flips the Y Axis so that everything renders
+        # properly within svg apps such as inkscape
+        svg_header = '<svg xmlns="http://www.w3.org/2000/svg" ' \
+                     'version="1.1" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        svg_header += 'width="' + svgwidth + uom + '" '
+        svg_header += 'height="' + svgheight + uom + '" '
+        svg_header += 'viewBox="' + minx + ' ' + miny + ' ' + svgwidth + ' ' + svgheight + '">'
+        svg_header += '<g transform="scale(1,-1)">'
+        svg_footer = '</g> </svg>'
+        svg_elem = svg_header + exported_svg + svg_footer
+
+        # Parse the xml through a xml parser just to add line feeds
+        # and to make it look more pretty for the output
+        return parse_xml_string(svg_elem).toprettyxml()
+
+    def geometry_batch(self):
+        """
+        :return:    a GeometryBatch that shows the percentage of the transformed geometry in the status bar
+        :rtype:     GeometryBatch
+        """
+        return GeometryBatch(progress=lambda disp_number: self.app.proc_container.update_view_text(
+            ' %d%%' % disp_number))
+
+    def transform_all(self, transform):
+        """
+        Transforms, all at once, the solid geometry and, for a multi-geometry object, the geometry of the tools.
+
+        :param transform:   function that transforms the geometry gathered in a GeometryBatch
+        :return:            None
+        """
+        batch = self.geometry_batch()
+
+        tools_idx = {}
+        if self.multigeo is True:
+            for tool in self.tools:
+                tools_idx[tool] = batch.add(self.tools[tool]['solid_geometry'])
+        solid_idx = batch.add(self.solid_geometry)
+
+        transform(batch)
+
+        for tool, tool_idx in tools_idx.items():
+            self.tools[tool]['solid_geometry'] = batch.result(tool_idx)
+        self.solid_geometry = batch.result(solid_idx)
+
     def mirror(self, axis, point):
         """
         Mirrors the object around a specified axis passign through
@@ -2358,48 +2687,8 @@ class Geometry(object):
         px, py = point
         xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
 
-        def mirror_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(mirror_geom(g))
-                return new_obj
-            else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.scale(obj, xscale, yscale, origin=(px, py))
-                except AttributeError:
-                    return obj
-
         try:
-            if self.multigeo is True:
-                for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
-                    try:
-                        self.geo_len = len(self.tools[tool]['solid_geometry'])
-                    except TypeError:
-                        self.geo_len = 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    self.tools[tool]['solid_geometry'] = mirror_geom(self.tools[tool]['solid_geometry'])
-            else:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.solid_geometry)
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.solid_geometry = mirror_geom(self.solid_geometry)
+            self.transform_all(lambda batch: batch.affine(scale_matrix(xscale, yscale, (px, py))))
             self.app.inform.emit('[success] %s...' % _('Object was mirrored'))
         except AttributeError:
             self.app.inform.emit('[ERROR_NOTCL] %s %s' % (_("Failed."), _("No object is selected.")))
@@ -2426,48 +2715,8 @@ class Geometry(object):
 
         px, py = point
 
-        def rotate_geom(obj):
-            try:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(rotate_geom(g))
-                return new_obj
-            except TypeError:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.rotate(obj, angle, origin=(px, py))
-                except AttributeError:
-                    return obj
-
         try:
-            if self.multigeo is True:
-                for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
-                    try:
-                        self.geo_len = len(self.tools[tool]['solid_geometry'])
-                    except TypeError:
-                        self.geo_len = 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    self.tools[tool]['solid_geometry'] = rotate_geom(self.tools[tool]['solid_geometry'])
-            else:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.solid_geometry)
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.solid_geometry = rotate_geom(self.solid_geometry)
+            self.transform_all(lambda batch: batch.affine(rotate_matrix(angle, (px, py))))
             self.app.inform.emit('[success] %s...' % _('Object was rotated'))
         except AttributeError:
             self.app.inform.emit('[ERROR_NOTCL] %s %s' % (_("Failed."), _("No object is selected.")))
@@ -2494,48 +2743,8 @@ class Geometry(object):
 
         px, py = point
 
-        def skew_geom(obj):
-            try:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(skew_geom(g))
-                return new_obj
-            except TypeError:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    return affinity.skew(obj, angle_x, angle_y, origin=(px, py))
-                except AttributeError:
-                    return obj
-
         try:
-            if self.multigeo is True:
-                for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
-                    try:
-                        self.geo_len = len(self.tools[tool]['solid_geometry'])
-                    except TypeError:
-                        self.geo_len = 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    self.tools[tool]['solid_geometry'] = skew_geom(self.tools[tool]['solid_geometry'])
-            else:
-                # variables to display the percentage of work done
-                self.geo_len = 0
-                try:
-                    self.geo_len = len(self.solid_geometry)
-                except TypeError:
-                    self.geo_len = 1
-                self.old_disp_number = 0
-                self.el_count = 0
-
-                self.solid_geometry = skew_geom(self.solid_geometry)
+            self.transform_all(lambda batch: batch.affine(skew_matrix(angle_x, angle_y, (px, py))))
             self.app.inform.emit('[success] %s...' % _('Object was skewed'))
         except AttributeError:
             self.app.inform.emit('[ERROR_NOTCL] %s %s' % (_("Failed."), _("No object is selected.")))
@@ -2563,56 +2772,21 @@ class Geometry(object):
         if distance == 0:
             return
 
-        def buffer_geom(obj):
-            if type(obj) is list:
-                new_obj = []
-                for g in obj:
-                    new_obj.append(buffer_geom(g))
-                return new_obj
+        def buffer_all(batch):
+            if factor is None:
+                batch.buffer(distance, resolution=self.geo_steps_per_circle, join_style=join)
             else:
-                try:
-                    self.el_count += 1
-                    disp_number = int(np.interp(self.el_count, [0, self.geo_len], [0, 100]))
-                    if self.old_disp_number < disp_number <= 100:
-                        self.app.proc_container.update_view_text(' %d%%' % disp_number)
-                        self.old_disp_number = disp_number
-
-                    if factor is None:
-                        return obj.buffer(distance, resolution=self.geo_steps_per_circle, join_style=join)
-                    else:
-                        return affinity.scale(obj, xfact=distance, yfact=distance, origin='center')
-                except AttributeError:
-                    return obj
+                batch.map(lambda geo: affinity.scale(geo, xfact=distance, yfact=distance, origin='center'))
 
         try:
+            self.transform_all(buffer_all)
+
             if self.multigeo is True:
                 for tool in self.tools:
-                    # variables to display the percentage of work done
-                    self.geo_len = 0
                     try:
-                        self.geo_len += len(self.tools[tool]['solid_geometry'])
+                        __ = iter(self.tools[tool]['solid_geometry'])
                     except TypeError:
-                        self.geo_len += 1
-                    self.old_disp_number = 0
-                    self.el_count = 0
-
-                    res = buffer_geom(self.tools[tool]['solid_geometry'])
-                    try:
-                        __ = iter(res)
-                        self.tools[tool]['solid_geometry'] = res
-                    except TypeError:
-                        self.tools[tool]['solid_geometry'] = [res]
-
-            # variables to display the percentage of work done
-            self.geo_len = 0
-            try:
-                self.geo_len = len(self.solid_geometry)
-            except TypeError:
-                self.geo_len = 1
-            self.old_disp_number = 0
-            self.el_count = 0
-
-            self.solid_geometry = buffer_geom(self.solid_geometry)
+                        self.tools[tool]['solid_geometry'] = [self.tools[tool]['solid_geometry']]
 
             self.app.inform.emit('[success] %s...' % _('Object was buffered'))
         except AttributeError:
@@ -2651,6 +2825,31 @@ class CNCjob(Geometry):
         "excellon_optimization_type": "B",
     }
 
+    # flags of the kind of the parsed G-Code moves; no flag is a cut ("C") with feedrate ("F")
+    MOVE_TRAVEL = 1
+    MOVE_SLOW = 2
+    MOVE_HOLE = 4
+
+    # the codes in the table made by the G-Code tokenizers, gcode_codes_table()
+    gcode_table_codes = 'GXYZIJT'
+
+    gcode_moves_dtype = np.dtype([
+        ('x', 'f8'), ('y', 'f8'), ('z', 'f8'), ('kind', 'u1'), ('tool', 'i4'), ('path', 'i4')
+    ])
+
+    # ## Regular expressions for the G-Code dialects
+    # G-Code words, like: G01 X1234 Y987
+    gcode_words_re = re.compile(r'^(?:\s*[A-Z]\s*[\+\-\.\d\s]+)+')
+    gcode_word_re = re.compile(r'([A-Z])\s*([\+\-\.\d\s]+)')
+    # from the first character that is not part of a G-Code word to the end of the line
+    gcode_not_words_re = re.compile(r'[^A-Z\d \t\.\+\-\n][^\n]*')
+    roland_z_re = re.compile(r"^Z(\s*-?\d+\.\d+?),(\s*\s*-?\d+\.\d+?),(\s*\s*-?\d+\.\d+?)*;$")
+    hpgl_pa_re = re.compile(r"^PA(\s*-?\d+\.\d+?),(\s*\s*-?\d+\.\d+?)*;$")
+    hpgl_pen_re = re.compile(r"^(P[U|D])")
+    laser_xy_re = re.compile(r"X([\+-]?\d+.[\+-]?\d+)\s*Y([\+-]?\d+.[\+-]?\d+)")
+    laser_pos_re = re.compile(r"^(M0?[3-5])")
+    laser_pos_2_re = re.compile(r"^(M10[6|7])")
+
     settings = QtCore.QSettings("Open Source", "FlatCAM")
     if settings.contains("machinist"):
         machinist_setting = settings.value('machinist', type=int)
@@ -2722,6 +2921,8 @@ class CNCjob(Geometry):
 
         self.gcode = ""
         self.gcode_parsed = None
+        # the moves parsed from self.gcode, see gcode_parse_moves()
+        self.gcode_moves = None
 
         self.pp_geometry_name = pp_geometry_name
         self.pp_geometry = self.app.preprocessors[self.pp_geometry_name]
@@ -2905,7 +3106,9 @@ class CNCjob(Geometry):
     @staticmethod
     def create_tool_data_array(points):
         # Create the data.
-        return [(pt.coords.xy[0][0], pt.coords.xy[1][0]) for pt in points]
+        if isinstance(points, PointArray):
+            return [tuple(coords) for coords in points.coords.tolist()]
+        return [(pt.x, pt.y) for pt in points]
 
     def optimized_ortools_meta(self, locations, start=None, opt_time=0):
         optimized_path = []
@@ -3024,39 +3227,394 @@ class CNCjob(Geometry):
         return optimized_path
         # ############################################# ##
 
-    def optimized_travelling_salesman(self, points, start=None):
-        """
-        As solving the problem in the brute force way is too slow,
-        this function implements a simple heuristic: always
-        go to the nearest city.
+    def optimized_travelling_salesman(self, points, start=None):
+        """
+        As solving the problem in the brute force way is too slow,
+        this function implements a simple heuristic: always
+        go to the nearest city.
+
+        Even if this algorithm is extremely simple, it works pretty well
+        giving a solution only about 25%% longer than the optimal one (cit. Wikipedia),
+        and runs very fast in O(N^2) time complexity.
+
+        >>> optimized_travelling_salesman([[i,j] for i in range(5) for j in range(5)])
+        [[0, 0], [0, 1], [0, 2], [0, 3], [0, 4], [1, 4], [1, 3], [1, 2], [1, 1], [1, 0], [2, 0], [2, 1], [2, 2],
+        [2, 3], [2, 4], [3, 4], [3, 3], [3, 2], [3, 1], [3, 0], [4, 0], [4, 1], [4, 2], [4, 3], [4, 4]]
+        >>> optimized_travelling_salesman([[0,0],[10,0],[6,0]])
+        [[0, 0], [6, 0], [10, 0]]
+
+        :param points:  List of tuples with x, y coordinates
+        :type points:   list
+        :param start:   a tuple with a x,y coordinates of the start point
+        :type start:    tuple
+        :return:        List of points ordered in a optimized way
+        :rtype:         list
+        """
+
+        if start is None:
+            start = points[0]
+        must_visit = points
+        path = [start]
+        # must_visit.remove(start)
+        while must_visit:
+            nearest = min(must_visit, key=lambda x: distance(path[-1], x))
+            path.append(nearest)
+            must_visit.remove(nearest)
+        return path
+
+    def optimized_nearest_neighbour(self, locations, start=None, opt_time=0):
+        """
+        Greedy nearest neighbour path through the locations, like optimized_travelling_salesman(), where the
+        nearest location is searched in a grid hash, in O(N log N) time complexity instead of O(N^2).
+        The path is then improved with 2-opt moves for opt_time seconds.
+
+        :param locations:   List of tuples with x, y coordinates
+        :type locations:    list
+        :param start:       a tuple with a x,y coordinates of the start point; the path starts with the location
+                            nearest to it. If None, the path starts with the first location
+        :type start:        tuple
+        :param opt_time:    the time in seconds for the 2-opt improvement; 0 to skip it
+        :type opt_time:     float
+        :return:            List of the indexes of the locations, in the optimized order
+        :rtype:             list
+        """
+        if not locations:
+            return []
+
+        pts = np.asarray(locations, dtype=float)
+        grid = self.LocationsGrid(pts)
+        optimized_path = grid.nearest_path(start, abort=lambda: self.app.abort_flag)
+
+        if float(opt_time) > 0 and len(optimized_path) > 3:
+            optimized_path = self.two_opt_path(pts, optimized_path, grid.neighbours(), float(opt_time),
+                                               abort=lambda: self.app.abort_flag)
+        return optimized_path
+
+    class LocationsGrid:
+        """
+        Grid hash of the locations, with about two locations in each cell.
+        """
+
+        def __init__(self, pts):
+            self.pts = pts
+            self.xs = pts[:, 0].tolist()
+            self.ys = pts[:, 1].tolist()
+
+            self.min_x, self.min_y = pts.min(axis=0)
+            self.cell = self.cell_size(pts)
+
+            self.cells = {}
+            cols, rows = self.cell_of(pts[:, 0], pts[:, 1])
+            for idx, key in enumerate(zip(cols, rows)):
+                self.cells.setdefault(key, []).append(idx)
+
+            # the locations sorted by cell, with the start and the count of the locations of each occupied cell, for
+            # the searches of many points at once
+            cols, rows = np.array(cols, dtype=np.int64), np.array(rows, dtype=np.int64)
+            self.max_col, self.max_row = int(cols.max()), int(rows.max())
+            keys = cols * (self.max_row + 1) + rows
+            self.cell_order = np.argsort(keys, kind='stable')
+            self.cell_keys, self.cell_starts, self.cell_counts = np.unique(keys[self.cell_order],
+                                                                           return_index=True, return_counts=True)
+
+        @staticmethod
+        def cell_size(pts, refine=8):
+            """
+            The cell size for about two locations in each cell. The size for the bounding box is made smaller while the
+            locations fill only a part of the cells, as for the clusters of locations far apart.
+
+            :param pts:     array of the x, y coordinates of the locations
+            :param refine:  the most times the cell size is made smaller
+            :return:        the cell size
+            """
+            min_xy = pts.min(axis=0)
+            span_x, span_y = pts.max(axis=0) - min_xy
+            cell = max(np.sqrt(span_x * span_y * 2 / len(pts)), max(span_x, span_y) * 2 / len(pts), 1e-9)
+
+            for __ in range(refine):
+                # the area of the occupied cells, shared by the locations
+                occupied = len(np.unique(np.floor((pts - min_xy) / cell).astype(np.int64), axis=0))
+                density_cell = max(np.sqrt(occupied * cell * cell * 2 / len(pts)), 1e-9)
+                if density_cell > cell / 2:
+                    break
+                cell = density_cell
+            return float(cell)
+
+        def cell_of(self, x, y):
+            return (np.floor((x - self.min_x) / self.cell).astype(int).tolist(),
+                    np.floor((y - self.min_y) / self.cell).astype(int).tolist())
+
+        @staticmethod
+        def ring(col, row, radius):
+            if radius == 0:
+                return [(col, row)]
+            cells = []
+            for i in range(col - radius, col + radius + 1):
+                cells.append((i, row - radius))
+                cells.append((i, row + radius))
+            for j in range(row - radius + 1, row + radius):
+                cells.append((col - radius, j))
+                cells.append((col + radius, j))
+            return cells
+
+        def nearest_path(self, start=None, abort=None, max_radius=4):
+            """
+            :param start:       a tuple with a x,y coordinates of the start point or None to start with the first
+            :param abort:       function that returns True when the search has to be aborted
+            :param max_radius:  over this ring of cells around the current location the nearest location is found
+                                by a search in all the remaining locations
+            :return:            List of the indexes of the locations, in the order of the greedy path
+            """
+            xs, ys, cells, cell = self.xs, self.ys, self.cells, self.cell
+            remaining = np.ones(len(xs), dtype=bool)
+            path = []
+
+            if start is None:
+                cur_x, cur_y = xs[0], ys[0]
+            else:
+                cur_x, cur_y = float(start[0]), float(start[1])
+
+            for __ in range(len(xs)):
+                if abort is not None and len(path) % 1000 == 0 and abort():
+                    # graceful abort requested by the user
+                    raise grace
+
+                col = int(np.floor((cur_x - self.min_x) / cell))
+                row = int(np.floor((cur_y - self.min_y) / cell))
+                best, best_dist = -1, np.inf
+                radius = 0
+                while True:
+                    for key in self.ring(col, row, radius):
+                        for idx in cells.get(key, ()):
+                            dist = (xs[idx] - cur_x) ** 2 + (ys[idx] - cur_y) ** 2
+                            if dist < best_dist:
+                                best, best_dist = idx, dist
+                    # the locations in the next rings are farther than radius * cell
+                    if best >= 0 and best_dist <= (radius * cell) ** 2:
+                        break
+                    radius += 1
+                    if radius > max_radius:
+                        left = np.flatnonzero(remaining)
+                        left_dist = (self.pts[left, 0] - cur_x) ** 2 + (self.pts[left, 1] - cur_y) ** 2
+                        best = int(left[np.argmin(left_dist)])
+                        break
+
+                path.append(best)
+                remaining[best] = False
+                key = (int(np.floor((xs[best] - self.min_x) / cell)), int(np.floor((ys[best] - self.min_y) / cell)))
+                cells[key].remove(best)
+                cur_x, cur_y = xs[best], ys[best]
+
+            return path
+
+        def block_distances(self, xy):
+            """
+            The squared distances from the points xy to the locations in the block of 3 x 3 cells around the cell of
+            each point. The points out of the grid are searched in the cells of the grid nearest to them.
 
-        Even if this algorithm is extremely simple, it works pretty well
-        giving a solution only about 25%% longer than the optimal one (cit. Wikipedia),
-        and runs very fast in O(N^2) time complexity.
+            :param xy:  array of the x, y coordinates of the points
+            :return:    the indexes of the locations, the squared distances to them (infinite where there is no
+                        location), both arrays with a row for each point, and for each point the distance to the
+                        outside of its block; a location nearer than this is the nearest of all
+            """
+            cols = np.clip(np.floor((xy[:, 0] - self.min_x) / self.cell), 0, self.max_col).astype(np.int64)
+            rows = np.clip(np.floor((xy[:, 1] - self.min_y) / self.cell), 0, self.max_row).astype(np.int64)
+
+            block_cols = cols[:, None] + np.array([-1, -1, -1, 0, 0, 0, 1, 1, 1])
+            block_rows = rows[:, None] + np.array([-1, 0, 1, -1, 0, 1, -1, 0, 1])
+            keys = block_cols * (self.max_row + 1) + block_rows
+            pos = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+            inside = (self.cell_keys[pos] == keys) & (block_rows >= 0) & (block_rows <= self.max_row)
+            counts = np.where(inside, self.cell_counts[pos], 0)
+
+            slots = np.arange(int(self.cell_counts.max()))
+            sorted_idx = np.minimum(self.cell_starts[pos][:, :, None] + slots, len(self.cell_order) - 1)
+            idx = self.cell_order[sorted_idx].reshape(len(xy), -1)
+            dist = ((self.pts[idx] - xy[:, None, :]) ** 2).sum(axis=2)
+            dist[~(slots < counts[:, :, None]).reshape(len(xy), -1)] = np.inf
+
+            margin = np.minimum.reduce([
+                xy[:, 0] - (self.min_x + (cols - 1) * self.cell), self.min_x + (cols + 2) * self.cell - xy[:, 0],
+                xy[:, 1] - (self.min_y + (rows - 1) * self.cell), self.min_y + (rows + 2) * self.cell - xy[:, 1]
+            ])
+            return idx, dist, margin
+
+        def nearest(self, xy, block_size=4 * 1024 * 1024):
+            """
+            :param xy:          array of the x, y coordinates of the points
+            :param block_size:  the most distances computed at once
+            :return:            for each point the index of the nearest location
+            """
+            # with few locations the search in all of them is faster than the search in the cells
+            if len(self.pts) <= 64 * int(self.cell_counts.max()):
+                return self.nearest_of_all(xy, block_size=block_size)
+
+            result = np.empty(len(xy), dtype=np.int64)
+            chunk = max(1, block_size // (9 * int(self.cell_counts.max())))
+            for start in range(0, len(xy), chunk):
+                block_xy = xy[start:start + chunk]
+                idx, dist, margin = self.block_distances(block_xy)
+                best = np.argmin(dist, axis=1)
+                best_dist = dist[np.arange(len(block_xy)), best]
+                result[start:start + chunk] = idx[np.arange(len(block_xy)), best]
+
+                # the points with no location in their block nearer than the cells out of it are searched in all
+                far = np.flatnonzero(~((margin > 0) & (best_dist <= margin ** 2)))
+                if len(far):
+                    result[start + far] = self.nearest_of_all(block_xy[far], block_size=block_size)
+            return result
+
+        def nearest_of_all(self, xy, block_size=4 * 1024 * 1024):
+            """
+            :param xy:          array of the x, y coordinates of the points
+            :param block_size:  the most distances computed at once
+            :return:            for each point the index of the nearest location, searched in all the locations
+            """
+            # |p - q|^2 = |q|^2 - 2 p.q + |p|^2 and |p|^2 is the same for all the locations q
+            sq = (self.pts ** 2).sum(axis=1)
+            result = np.empty(len(xy), dtype=np.int64)
+            chunk = max(1, block_size // len(self.pts))
+            for start in range(0, len(xy), chunk):
+                result[start:start + chunk] = np.argmin(sq - 2.0 * (xy[start:start + chunk] @ self.pts.T), axis=1)
+            return result
+
+        def spacing(self, block_size=4 * 1024 * 1024):
+            """
+            :param block_size:  the most distances computed at once
+            :return:            the smallest distance between two locations, not counting the duplicates; infinite
+                                with less than two distinct locations
+            """
+            step = np.inf
+            chunk = max(1, block_size // (9 * int(self.cell_counts.max())))
+            for start in range(0, len(self.pts), chunk):
+                __, dist, __ = self.block_distances(self.pts[start:start + chunk])
+                dist[dist == 0] = np.inf
+                step = min(step, float(dist.min()))
+            step = np.sqrt(step)
+
+            # a nearer pair than the cell size is in next cells; else all the pairs are searched
+            if step > self.cell:
+                step = np.inf
+                chunk = max(1, block_size // len(self.pts))
+                for start in range(0, len(self.pts), chunk):
+                    dist = np.hypot(*(self.pts[start:start + chunk, None, :] - self.pts[None, :, :]).transpose(2, 0, 1))
+                    dist[dist == 0] = np.inf
+                    step = min(step, float(dist.min()))
+            return step
+
+        def neighbours(self, count=8):
+            """
+            :param count:   the maximum number of neighbours of each location
+            :return:        For each location, the list of the indexes of the nearest locations, the nearest first,
+                            searched in the cells next to the location cell
+            """
+            xs, ys = self.xs, self.ys
+            cells = {}
+            for idx, key in enumerate(zip(*self.cell_of(self.pts[:, 0], self.pts[:, 1]))):
+                cells.setdefault(key, []).append(idx)
+
+            neighbours = [[] for __ in xs]
+            for (col, row), cell_locations in cells.items():
+                near = [idx for i in (col - 1, col, col + 1) for j in (row - 1, row, row + 1)
+                        for idx in cells.get((i, j), ())]
+                for idx in cell_locations:
+                    near_dist = sorted(((xs[n] - xs[idx]) ** 2 + (ys[n] - ys[idx]) ** 2, n) for n in near if n != idx)
+                    neighbours[idx] = [n for __, n in near_dist[:count]]
+            return neighbours
 
-        >>> optimized_travelling_salesman([[i,j] for i in range(5) for j in range(5)])
-        [[0, 0], [0, 1], [0, 2], [0, 3], [0, 4], [1, 4], [1, 3], [1, 2], [1, 1], [1, 0], [2, 0], [2, 1], [2, 2],
-        [2, 3], [2, 4], [3, 4], [3, 3], [3, 2], [3, 1], [3, 0], [4, 0], [4, 1], [4, 2], [4, 3], [4, 4]]
-        >>> optimized_travelling_salesman([[0,0],[10,0],[6,0]])
-        [[0, 0], [6, 0], [10, 0]]
+    @staticmethod
+    def two_opt_path(pts, path, neighbours, opt_time, abort=None):
+        """
+        Improves the open path with 2-opt moves, looking only at the moves that link a location with one of its
+        neighbours. The first location of the path stays the first.
+
+        :param pts:         array of the x, y coordinates of the locations
+        :param path:        List of the indexes of the locations
+        :param neighbours:  For each location, the list of its nearest locations, the nearest first
+        :param opt_time:    the maximum time for the improvement, in seconds
+        :param abort:       function that returns True when the improvement has to be aborted
+        :return:            List of the indexes of the locations, in the improved order
+        """
+        deadline = time.time() + opt_time
+        xs, ys = pts[:, 0].tolist(), pts[:, 1].tolist()
+        last = len(path) - 1
+
+        path = list(path)
+        pos = [0] * len(path)
+        for k, idx in enumerate(path):
+            pos[idx] = k
+
+        def dist(a, b):
+            # the missing link at the end of the path has no length
+            if a is None or b is None:
+                return 0.0
+            return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+        def reverse(i, j):
+            # reverse the path from position i to position j, inclusive
+            path[i:j + 1] = path[i:j + 1][::-1]
+            for k in range(i, j + 1):
+                pos[path[k]] = k
+
+        # the locations for which an improving move can still be found
+        queue = deque(path)
+        queued = [True] * len(path)
+
+        moves = 0
+        while queue:
+            moves += 1
+            if moves % 256 == 0:
+                if time.time() > deadline:
+                    break
+                if abort is not None and abort():
+                    # graceful abort requested by the user
+                    raise grace
 
-        :param points:  List of tuples with x, y coordinates
-        :type points:   list
-        :param start:   a tuple with a x,y coordinates of the start point
-        :type start:    tuple
-        :return:        List of points ordered in a optimized way
-        :rtype:         list
-        """
+            a = queue.popleft()
+            queued[a] = False
+
+            pos_a = pos[a]
+            succ_a = path[pos_a + 1] if pos_a < last else None
+            pred_a = path[pos_a - 1] if pos_a > 0 else None
+            changed = None
+
+            for c in neighbours[a]:
+                # links a - succ(a) and c - succ(c) are replaced by a - c and succ(a) - succ(c)
+                d_ac = dist(a, c)
+                if d_ac >= dist(a, succ_a):
+                    break
+                i, j = sorted((pos_a, pos[c]))
+                if j - i < 2:
+                    continue
+                succ_j = path[j + 1] if j < last else None
+                gain = dist(path[i], path[i + 1]) + dist(path[j], succ_j) - d_ac - dist(path[i + 1], succ_j)
+                if gain > 1e-9:
+                    changed = (path[i], path[i + 1], path[j], succ_j)
+                    reverse(i + 1, j)
+                    break
+
+            if changed is None and pred_a is not None:
+                for c in neighbours[a]:
+                    # links pred(a) - a and pred(c) - c are replaced by pred(a) - pred(c) and a - c
+                    d_ac = dist(a, c)
+                    if d_ac >= dist(pred_a, a):
+                        break
+                    i, j = sorted((pos_a, pos[c]))
+                    if i == 0 or j - i < 2:
+                        continue
+                    gain = dist(path[i - 1], path[i]) + dist(path[j - 1], path[j]) - d_ac - \
+                        dist(path[i - 1], path[j - 1])
+                    if gain > 1e-9:
+                        changed = (path[i - 1], path[i], path[j - 1], path[j])
+                        reverse(i, j - 1)
+                        break
+
+            if changed is not None:
+                for idx in changed:
+                    if idx is not None and not queued[idx]:
+                        queued[idx] = True
+                        queue.append(idx)
 
-        if start is None:
-            start = points[0]
-        must_visit = points
-        path = [start]
-        # must_visit.remove(start)
-        while must_visit:
-            nearest = min(must_visit, key=lambda x: distance(path[-1], x))
-            path.append(nearest)
-            must_visit.remove(nearest)
         return path
 
     def geo_optimized_rtree(self, geometry):
@@ -3147,6 +3705,8 @@ class CNCjob(Geometry):
             log.debug("Using OR-Tools Basic drill path optimization.")
         elif opt_type == 'T':
             log.debug("Using Travelling Salesman drill path optimization.")
+        elif opt_type == 'N':
+            log.debug("Using Nearest Neighbour with 2-opt drill path optimization.")
         else:
             log.debug("Using no path optimization.")
 
@@ -3212,7 +3772,7 @@ class CNCjob(Geometry):
 
                 # and now, xy_toolchange is made into a list of floats in format [x, y]
                 if self.xy_toolchange:
-                    self.xy_toolchange = [float(eval(a)) for a in self.xy_toolchange.split(",")]
+                    self.xy_toolchange = [float(a) for a in self.xy_toolchange.split(",")]
 
                 if self.xy_toolchange and len(self.xy_toolchange) != 2:
                     self.app.inform.emit('[ERROR] %s' % _("The Toolchange X,Y format has to be (x, y)."))
@@ -3237,7 +3797,7 @@ class CNCjob(Geometry):
 
                 # and now, xy_end is made into a list of floats in format [x, y]
                 if self.xy_end:
-                    self.xy_end = [float(eval(a)) for a in self.xy_end.split(",")]
+                    self.xy_end = [float(a) for a in self.xy_end.split(",")]
 
                 if self.xy_end and len(self.xy_end) != 2:
                     self.app.inform.emit('[ERROR] %s' % _("The End X,Y format has to be (x, y)."))
@@ -3277,6 +3837,13 @@ class CNCjob(Geometry):
             if not locations:
                 return 'fail'
             optimized_path = self.optimized_travelling_salesman(locations)
+        elif opt_type == 'N':
+            locations = self.create_tool_data_array(points=points)
+            # if there are no locations then go to the next tool
+            if not locations:
+                return 'fail'
+            opt_time = self.app.defaults["excellon_search_time"]
+            optimized_path = self.optimized_nearest_neighbour(locations, start=first_pt, opt_time=opt_time)
         else:
             # it's actually not optimized path but here we build a list of (x,y) coordinates
             # out of the tool's drills
@@ -3542,6 +4109,11 @@ class CNCjob(Geometry):
         else:
             temp_solid_geometry = flat_geometry
 
+        # ## Join the paths that touch on their endpoints so they are cut without lifting the tool
+        if self.app.defaults["geometry_connect_paths"] is True:
+            temp_solid_geometry = self.connect_paths(temp_solid_geometry)
+            log.debug("%d paths after joining the paths that touch" % len(temp_solid_geometry))
+
         if self.z_cut is None:
             if 'laser' not in self.pp_geometry_name:
                 self.app.inform.emit(
@@ -3622,7 +4194,7 @@ class CNCjob(Geometry):
 
                 # and now, xy_end is made into a list of floats in format [x, y]
                 if self.xy_end:
-                    self.xy_end = [float(eval(a)) for a in self.xy_end.split(",")]
+                    self.xy_end = [float(a) for a in self.xy_end.split(",")]
 
                 if self.xy_end and len(self.xy_end) != 2:
                     self.app.inform.emit('[ERROR]%s' % _("The End X,Y format has to be (x, y)."))
@@ -3642,7 +4214,7 @@ class CNCjob(Geometry):
 
                 # and now, xy_toolchange is made into a list of floats in format [x, y]
                 if self.xy_toolchange:
-                    self.xy_toolchange = [float(eval(a)) for a in self.xy_toolchange.split(",")]
+                    self.xy_toolchange = [float(a) for a in self.xy_toolchange.split(",")]
 
                 if self.xy_toolchange and len(self.xy_toolchange) != 2:
                     self.app.inform.emit('[ERROR] %s' % _("The Toolchange X,Y format has to be (x, y)."))
@@ -3876,7 +4448,7 @@ class CNCjob(Geometry):
                 self.xy_toolchange = re.sub('[()\[\]]', '', str(self.xy_toolchange)) if self.xy_toolchange else None
 
                 if self.xy_toolchange:
-                    self.xy_toolchange = [float(eval(a)) for a in self.xy_toolchange.split(",")]
+                    self.xy_toolchange = [float(a) for a in self.xy_toolchange.split(",")]
 
                 if self.xy_toolchange and len(self.xy_toolchange) != 2:
                     self.app.inform.emit('[ERROR]%s' %
@@ -3890,7 +4462,12 @@ class CNCjob(Geometry):
         # XY_end parameter
         self.xy_end = re.sub('[()\[\]]', '', str(self.xy_end)) if self.xy_end else None
         if self.xy_end and self.xy_end != '':
-            self.xy_end = [float(eval(a)) for a in self.xy_end.split(",")]
+            try:
+                self.xy_end = [float(a) for a in self.xy_end.split(",")]
+            except ValueError:
+                self.app.inform.emit('[ERROR]  %s' % _("The End Move X,Y field in Edit -> Preferences has to be "
+                                                       "in the format (x, y) but now there is only one value, not two."))
+                return 'fail'
         if self.xy_end and len(self.xy_end) < 2:
             self.app.inform.emit('[ERROR]  %s' % _("The End Move X,Y field in Edit -> Preferences has to be "
                                                    "in the format (x, y) but now there is only one value, not two."))
@@ -3923,7 +4500,14 @@ class CNCjob(Geometry):
         if tools == "all":
             selected_tools = [i[0] for i in all_tools]  # we get a array of ordered tools
         else:
-            selected_tools = eval(tools)
+            try:
+                selected_tools = literal_eval(tools.strip())
+            except (ValueError, SyntaxError) as e:
+                log.debug("camlib.CNCJob.generate_from_excellon_by_tool() tools --> %s" % str(e))
+                self.app.inform.emit('[ERROR_NOTCL] %s' % _("Wrong value format entered, use a number."))
+                return 'fail'
+            if not isinstance(selected_tools, (list, tuple)):
+                selected_tools = [selected_tools]
 
         # Create a sorted list of selected tools from the sorted_tools list
         tools = [i for i, j in sorted_tools for k in selected_tools if i == k]
@@ -4013,11 +4597,7 @@ class CNCjob(Geometry):
                     raise grace
 
                 if 'drills' in tool_dict and tool_dict['drills']:
-                    for drill_pt in tool_dict['drills']:
-                        try:
-                            points[tool].append(drill_pt)
-                        except KeyError:
-                            points[tool] = [drill_pt]
+                    points[tool] = PointArray(tool_dict['drills'])
         log.debug("Found %d TOOLS with drills." % len(points))
 
         # check if there are drill points in the exclusion areas.
@@ -4083,10 +4663,10 @@ class CNCjob(Geometry):
             self.app.inform.emit('[ERROR_NOTCL] %s...' % _('The loaded Excellon file has no drills'))
             return 'fail'
 
+        used_excellon_optimization_type = self.excellon_optimization_type
+        # modes 'M' or 'B' are not allowed when the app is running in 32bit platform; 'N' needs no OR-Tools
         current_platform = platform.architecture()[0]
-        if current_platform == '64bit':
-            used_excellon_optimization_type = self.excellon_optimization_type
-        else:
+        if current_platform != '64bit' and used_excellon_optimization_type != 'N':
             used_excellon_optimization_type = 'T'
 
         # #############################################################################################################
@@ -4100,6 +4680,8 @@ class CNCjob(Geometry):
             log.debug("Using OR-Tools Basic drill path optimization.")
         elif used_excellon_optimization_type == 'T':
             log.debug("Using Travelling Salesman drill path optimization.")
+        elif used_excellon_optimization_type == 'N':
+            log.debug("Using Nearest Neighbour with 2-opt drill path optimization.")
         else:
             log.debug("Using no path optimization.")
 
@@ -4178,6 +4760,15 @@ class CNCjob(Geometry):
                     for point in points[tool]:
                         altPoints.append((point.coords.xy[0][0], point.coords.xy[1][0]))
                     optimized_path = self.optimized_travelling_salesman(altPoints)
+                elif used_excellon_optimization_type == 'N':
+                    if tool in points:
+                        locations = self.create_tool_data_array(points=points[tool])
+                    # if there are no locations then go to the next tool
+                    if not locations:
+                        continue
+                    opt_time = self.app.defaults["excellon_search_time"]
+                    optimized_path = self.optimized_nearest_neighbour(locations, start=(self.oldx, self.oldy),
+                                                                      opt_time=opt_time)
                 else:
                     # it's actually not optimized path but here we build a list of (x,y) coordinates
                     # out of the tool's drills
@@ -4338,7 +4929,7 @@ class CNCjob(Geometry):
             # We are not using Toolchange therefore we need to decide which tool properties to use
             one_tool = 1
 
-            all_points = []
+            all_points = PointArray()
             for tool in points:
                 # check if it has drills
                 if not points[tool]:
@@ -4414,6 +5005,15 @@ class CNCjob(Geometry):
                 for point in all_points:
                     altPoints.append((point.coords.xy[0][0], point.coords.xy[1][0]))
                 optimized_path = self.optimized_travelling_salesman(altPoints)
+            elif used_excellon_optimization_type == 'N':
+                if all_points:
+                    locations = self.create_tool_data_array(points=all_points)
+                # if there are no locations then go to the next tool
+                if not locations:
+                    return 'fail'
+                opt_time = self.app.defaults["excellon_search_time"]
+                optimized_path = self.optimized_nearest_neighbour(locations, start=(self.oldx, self.oldy),
+                                                                  opt_time=opt_time)
             else:
                 # it's actually not optimized path but here we build a list of (x,y) coordinates
                 # out of the tool's drills
@@ -4574,6 +5174,8 @@ class CNCjob(Geometry):
             log.debug("The total travel distance with OR-TOOLS Basic Algorithm is: %s" % str(measured_distance))
         elif used_excellon_optimization_type == 'T':
             log.debug("The total travel distance with Travelling Salesman Algorithm is: %s" % str(measured_distance))
+        elif used_excellon_optimization_type == 'N':
+            log.debug("The total travel distance with Nearest Neighbour and 2-opt is: %s" % str(measured_distance))
         else:
             log.debug("The total travel distance with with no optimization is: %s" % str(measured_distance))
 
@@ -5285,6 +5887,11 @@ class CNCjob(Geometry):
         flat_geometry = self.flatten(temp_solid_geometry, pathonly=True)
         log.debug("%d paths" % len(flat_geometry))
 
+        # ## Join the paths that touch on their endpoints so they are cut without lifting the tool
+        if self.app.defaults["geometry_connect_paths"] is True:
+            flat_geometry = self.connect_paths(flat_geometry)
+            log.debug("%d paths after joining the paths that touch" % len(flat_geometry))
+
         try:
             self.tooldia = float(tooldia)
         except Exception as e:
@@ -5309,7 +5916,12 @@ class CNCjob(Geometry):
         self.xy_end = re.sub('[()\[\]]', '', str(endxy)) if endxy else  self.app.defaults["geometry_endxy"]
 
         if self.xy_end and self.xy_end != '':
-            self.xy_end = [float(eval(a)) for a in self.xy_end.split(",")]
+            try:
+                self.xy_end = [float(a) for a in self.xy_end.split(",")]
+            except ValueError:
+                self.app.inform.emit('[ERROR]  %s' % _("The End Move X,Y field in Edit -> Preferences has to be "
+                                                       "in the format (x, y) but now there is only one value, not two."))
+                return 'fail'
 
         if self.xy_end and len(self.xy_end) < 2:
             self.app.inform.emit('[ERROR]  %s' % _("The End Move X,Y field in Edit -> Preferences has to be "
@@ -5332,7 +5944,7 @@ class CNCjob(Geometry):
                     if toolchangexy else self.app.defaults["geometry_toolchangexy"]
 
                 if self.xy_toolchange and self.xy_toolchange != '':
-                    self.xy_toolchange = [float(eval(a)) for a in self.xy_toolchange.split(",")]
+                    self.xy_toolchange = [float(a) for a in self.xy_toolchange.split(",")]
 
                 if len(self.xy_toolchange) < 2:
                     self.app.inform.emit('[ERROR]  %s' % _("The Toolchange X,Y field in Edit -> Preferences has to be "
@@ -5667,13 +6279,18 @@ class CNCjob(Geometry):
         flat_geometry = self.flatten(temp_solid_geometry, pathonly=True)
         log.debug("%d paths" % len(flat_geometry))
 
+        # ## Join the paths that touch on their endpoints so they are cut without lifting the tool
+        if self.app.defaults["geometry_connect_paths"] is True:
+            flat_geometry = self.connect_paths(flat_geometry)
+            log.debug("%d paths after joining the paths that touch" % len(flat_geometry))
+
         default_dia = None
         if isinstance(self.app.defaults["geometry_cnctooldia"], float):
             default_dia = self.app.defaults["geometry_cnctooldia"]
         else:
             try:
                 tools_string = self.app.defaults["geometry_cnctooldia"].split(",")
-                tools_diameters = [eval(a) for a in tools_string if a != '']
+                tools_diameters = [float(a) for a in tools_string if a != '']
                 default_dia = tools_diameters[0] if tools_diameters else 0.0
             except Exception as e:
                 self.app.log.debug("camlib.CNCJob.generate_from_geometry_2() --> %s" % str(e))
@@ -5708,7 +6325,12 @@ class CNCjob(Geometry):
         self.xy_end = re.sub('[()\[\]]', '', str(self.xy_end)) if self.xy_end else None
 
         if self.xy_end is not None and self.xy_end != '':
-            self.xy_end = [float(eval(a)) for a in self.xy_end.split(",")]
+            try:
+                self.xy_end = [float(a) for a in self.xy_end.split(",")]
+            except ValueError:
+                self.app.inform.emit('[ERROR]  %s' % _("The End Move X,Y field in Edit -> Preferences has to be "
+                                                       "in the format (x, y) but now there is only one value, not two."))
+                return 'fail'
 
         if self.xy_end and len(self.xy_end) < 2:
             self.app.inform.emit('[ERROR]  %s' % _("The End Move X,Y field in Edit -> Preferences has to be "
@@ -5728,7 +6350,7 @@ class CNCjob(Geometry):
                 self.xy_toolchange = re.sub('[()\[\]]', '', str(toolchangexy)) if self.xy_toolchange else None
 
                 if self.xy_toolchange and self.xy_toolchange != '':
-                    self.xy_toolchange = [float(eval(a)) for a in self.xy_toolchange.split(",")]
+                    self.xy_toolchange = [float(a) for a in self.xy_toolchange.split(",")]
 
                 if len(self.xy_toolchange) < 2:
                     self.app.inform.emit('[ERROR] %s' % _("The Toolchange X,Y format has to be (x, y)."))
@@ -6275,6 +6897,26 @@ class CNCjob(Geometry):
         gcode_multi_pass += self.doformat(p.lift_code, x=old_point[0], y=old_point[1])
         return gcode_multi_pass, geometry
 
+    def gcode_tokenizer(self):
+        """
+        Chooses the tokenizer for the G-Code dialect of the preprocessors used. It is done once for the whole G-Code
+        and not for each line.
+
+        :return:    Function that parses a G-Code line such as "G01 X1234 Y987" into
+                    a dictionary: {'G': 1.0, 'X': 1234.0, 'Y': 987.0}
+        :rtype:     function
+        """
+        pp_names = (self.pp_excellon_name, self.pp_geometry_name)
+
+        if any('Roland' in name for name in pp_names):
+            return self.roland_codes_split
+        if any('hpgl' in name for name in pp_names):
+            return self.hpgl_codes_split
+        if any('laser' in name.lower() for name in pp_names) or \
+                (self.pp_solderpaste_name is not None and 'paste' in self.pp_solderpaste_name.lower()):
+            return self.laser_codes_split
+        return self.gcode_codes_split
+
     def codes_split(self, gline):
         """
         Parses a line of G-Code such as "G01 X1234 Y987" into
@@ -6285,73 +6927,309 @@ class CNCjob(Geometry):
         :return:            Dictionary with parsed line.
         :rtype:             dict
         """
+        return self.gcode_tokenizer()(gline)
 
+    def gcode_codes_split(self, gline):
+        # the line is parsed up to the first item that is not a letter followed by a number
+        match = self.gcode_words_re.match(gline)
+        if match is None:
+            return {}
+        return {code: float(value.replace(" ", "")) for code, value in self.gcode_word_re.findall(match.group())}
+
+    def roland_codes_split(self, gline):
         command = {}
 
-        if 'Roland' in self.pp_excellon_name or 'Roland' in self.pp_geometry_name:
-            match_z = re.search(r"^Z(\s*-?\d+\.\d+?),(\s*\s*-?\d+\.\d+?),(\s*\s*-?\d+\.\d+?)*;$", gline)
-            if match_z:
-                command['G'] = 0
-                command['X'] = float(match_z.group(1).replace(" ", "")) * 0.025
-                command['Y'] = float(match_z.group(2).replace(" ", "")) * 0.025
-                command['Z'] = float(match_z.group(3).replace(" ", "")) * 0.025
-
-        elif 'hpgl' in self.pp_excellon_name or 'hpgl' in self.pp_geometry_name:
-            match_pa = re.search(r"^PA(\s*-?\d+\.\d+?),(\s*\s*-?\d+\.\d+?)*;$", gline)
-            if match_pa:
-                command['G'] = 0
-                command['X'] = float(match_pa.group(1).replace(" ", "")) / 40
-                command['Y'] = float(match_pa.group(2).replace(" ", "")) / 40
-            match_pen = re.search(r"^(P[U|D])", gline)
-            if match_pen:
-                if match_pen.group(1) == 'PU':
-                    # the value does not matter, only that it is positive so the gcode_parse() know it is > 0,
-                    # therefore the move is of kind T (travel)
-                    command['Z'] = 1
-                else:
-                    command['Z'] = 0
+        match_z = self.roland_z_re.match(gline)
+        if match_z:
+            command['G'] = 0
+            command['X'] = float(match_z.group(1).replace(" ", "")) * 0.025
+            command['Y'] = float(match_z.group(2).replace(" ", "")) * 0.025
+            command['Z'] = float(match_z.group(3).replace(" ", "")) * 0.025
+        return command
 
-        elif 'laser' in self.pp_excellon_name.lower() or 'laser' in self.pp_geometry_name.lower() or \
-                (self.pp_solderpaste_name is not None and 'paste' in self.pp_solderpaste_name.lower()):
-            match_lsr = re.search(r"X([\+-]?\d+.[\+-]?\d+)\s*Y([\+-]?\d+.[\+-]?\d+)", gline)
-            if match_lsr:
-                command['X'] = float(match_lsr.group(1).replace(" ", ""))
-                command['Y'] = float(match_lsr.group(2).replace(" ", ""))
-
-            match_lsr_pos = re.search(r"^(M0?[3-5])", gline)
-            if match_lsr_pos:
-                if 'M05' in match_lsr_pos.group(1) or 'M5' in match_lsr_pos.group(1):
-                    # the value does not matter, only that it is positive so the gcode_parse() know it is > 0,
-                    # therefore the move is of kind T (travel)
-                    command['Z'] = 1
-                else:
-                    command['Z'] = 0
+    def hpgl_codes_split(self, gline):
+        command = {}
 
-            match_lsr_pos_2 = re.search(r"^(M10[6|7])", gline)
-            if match_lsr_pos_2:
-                if 'M107' in match_lsr_pos_2.group(1):
-                    command['Z'] = 1
-                else:
-                    command['Z'] = 0
-        elif self.pp_solderpaste_name is not None:
-            if 'Paste' in self.pp_solderpaste_name:
-                match_paste = re.search(r"X([\+-]?\d+.[\+-]?\d+)\s*Y([\+-]?\d+.[\+-]?\d+)", gline)
-                if match_paste:
-                    command['X'] = float(match_paste.group(1).replace(" ", ""))
-                    command['Y'] = float(match_paste.group(2).replace(" ", ""))
-        else:
-            match = re.search(r'^\s*([A-Z])\s*([\+\-\.\d\s]+)', gline)
-            while match:
-                command[match.group(1)] = float(match.group(2).replace(" ", ""))
-                gline = gline[match.end():]
-                match = re.search(r'^\s*([A-Z])\s*([\+\-\.\d\s]+)', gline)
+        match_pa = self.hpgl_pa_re.match(gline)
+        if match_pa:
+            command['G'] = 0
+            command['X'] = float(match_pa.group(1).replace(" ", "")) / 40
+            command['Y'] = float(match_pa.group(2).replace(" ", "")) / 40
+        match_pen = self.hpgl_pen_re.match(gline)
+        if match_pen:
+            if match_pen.group(1) == 'PU':
+                # the value does not matter, only that it is positive so the gcode_parse() know it is > 0,
+                # therefore the move is of kind T (travel)
+                command['Z'] = 1
+            else:
+                command['Z'] = 0
+        return command
+
+    def laser_codes_split(self, gline):
+        command = {}
+
+        match_lsr = self.laser_xy_re.search(gline)
+        if match_lsr:
+            command['X'] = float(match_lsr.group(1).replace(" ", ""))
+            command['Y'] = float(match_lsr.group(2).replace(" ", ""))
+
+        match_lsr_pos = self.laser_pos_re.match(gline)
+        if match_lsr_pos:
+            if 'M05' in match_lsr_pos.group(1) or 'M5' in match_lsr_pos.group(1):
+                # the value does not matter, only that it is positive so the gcode_parse() know it is > 0,
+                # therefore the move is of kind T (travel)
+                command['Z'] = 1
+            else:
+                command['Z'] = 0
+
+        match_lsr_pos_2 = self.laser_pos_2_re.match(gline)
+        if match_lsr_pos_2:
+            if 'M107' in match_lsr_pos_2.group(1):
+                command['Z'] = 1
+            else:
+                command['Z'] = 0
         return command
 
+    def gcode_codes_table(self, gcode):
+        """
+        Tokenizes the G-Code into a table with a row for each G-Code line and a column for each of the codes in
+        CNCjob.gcode_table_codes. The codes that are not in a line are NaN.
+
+        :param gcode:   G-Code
+        :type gcode:    str
+        :return:        Table of the G-Code codes
+        :rtype:         numpy.ndarray
+        """
+        codes_split = self.gcode_tokenizer()
+        if codes_split == self.gcode_codes_split:
+            table = self.gcode_words_table(gcode)
+            if table is not None:
+                return table
+
+        gcode_lines_list = gcode.splitlines()
+        table = np.full((len(gcode_lines_list), len(self.gcode_table_codes)), np.nan)
+        columns = {code: col for col, code in enumerate(self.gcode_table_codes)}
+        for line_nr, line in enumerate(gcode_lines_list):
+            for code, value in codes_split(line).items():
+                if code in columns:
+                    table[line_nr, columns[code]] = value
+        return table
+
+    def gcode_words_table(self, gcode):
+        """
+        Tokenizes all the G-Code at once, as gcode_codes_split() does for each of the lines.
+
+        :param gcode:   G-Code
+        :type gcode:    str
+        :return:        Table of the G-Code codes, like gcode_codes_table(), or None for the G-Code that can be
+                        parsed only line by line
+        :rtype:         numpy.ndarray
+        """
+        # a line is parsed up to the first character that can't be part of a word; the spaces are dropped
+        text = self.gcode_not_words_re.sub('', gcode)
+        chars = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        chars = chars[(chars != ord(' ')) & (chars != ord('\t'))]
+
+        letters = (chars >= ord('A')) & (chars <= ord('Z'))
+        separators = letters | (chars == ord('\n'))
+        # the parsing of a line stops also at a letter without a number
+        if np.any(letters & np.append(separators[1:], True)):
+            return None
+
+        values_chars = chars.copy()
+        values_chars[separators] = ord(' ')
+        values = np.fromstring(values_chars.tobytes(), sep=' ')
+        if len(values) != np.count_nonzero(letters):
+            return None
+
+        codes = chars[separators]
+        new_line = codes == ord('\n')
+        line_nr = np.cumsum(new_line)[~new_line]
+
+        columns = np.full(256, -1)
+        columns[[ord(code) for code in self.gcode_table_codes]] = np.arange(len(self.gcode_table_codes))
+        code_col = columns[codes[~new_line]]
+
+        table = np.full((np.count_nonzero(new_line) + 1, len(self.gcode_table_codes)), np.nan)
+        used = code_col >= 0
+        table[line_nr[used], code_col[used]] = values[used]
+        return table
+
+    def gcode_parse_moves(self, gcode, start_pt=(0, 0)):
+        """
+        Parses the G-Code into a NumPy array of moves (dtype CNCjob.gcode_moves_dtype). There is a row for
+        each point of the tool paths and for each plunge below zero (holes). The tool paths are split where the
+        tool height changes and each starts with the last point of the previous one.
+
+        :param gcode:       G-Code
+        :type gcode:        str
+        :param start_pt:    the point coordinates from where to start the parsing
+        :type start_pt:     tuple
+        :return:            Array with the fields: x, y, z, kind (CNCjob.MOVE_* flags), tool, path
+        :rtype:             numpy.ndarray
+        """
+
+        table = self.gcode_codes_table(gcode)
+
+        # ## Units; the lines that set the units are not used otherwise
+        units = (table[:, 0] == 20.0) | (table[:, 0] == 21.0)
+        if units.any():
+            self.units = {20.0: "IN", 21.0: "MM"}[table[units, 0][-1]]
+            table = table[~units]
+
+        lines_nr = len(table)
+        if lines_nr == 0:
+            return np.zeros(0, dtype=self.gcode_moves_dtype)
+
+        g_code, x_code, y_code, z_code, i_code, j_code, t_code = table.T
+        has_xy = ~(np.isnan(x_code) & np.isnan(y_code))
+        has_z = ~np.isnan(z_code)
+
+        # the modal values, after each of the lines
+        def modal(code):
+            last = np.where(np.isnan(code), 0, np.arange(1, lines_nr + 1))
+            np.maximum.accumulate(last, out=last)
+            return np.append(0.0, code)[last]
+
+        cur_g, cur_x, cur_y, cur_z, tool = modal(g_code), modal(x_code), modal(y_code), modal(z_code), modal(t_code)
+        prev_x, prev_y, prev_z = np.append(0.0, cur_x[:-1]), np.append(0.0, cur_y[:-1]), np.append(0.0, cur_z[:-1])
+
+        if self.gcode_tokenizer() == self.gcode_codes_split and \
+                'line_xyz' not in (self.pp_geometry_name, self.pp_excellon_name):
+            for line_nr in np.flatnonzero(has_xy & has_z & (z_code != prev_z)):
+                current = {'X': prev_x[line_nr], 'Y': prev_y[line_nr], 'Z': prev_z[line_nr]}
+                log.warning("Non-orthogonal motion: From %s" % str(current))
+                log.warning("  To: %s" % str({code: value for code, value in zip(self.gcode_table_codes,
+                                                                                     table[line_nr])
+                                                  if not np.isnan(value)}))
+
+        # ## The points of the tool paths: one for each line move, many for each arc
+        points_nr = (has_xy & ((cur_g == 0) | (cur_g == 1))).astype(int)
+        arcs = {}
+        arcdir = [None, None, "cw", "ccw"]
+        for line_nr in np.flatnonzero(has_xy & ((cur_g == 2) | (cur_g == 3))):
+            x, y = cur_x[line_nr], cur_y[line_nr]
+            i, j = i_code[line_nr], j_code[line_nr]
+            center = [i + prev_x[line_nr], j + prev_y[line_nr]]
+            radius = np.sqrt(i ** 2 + j ** 2)
+            start = np.arctan2(-j, -i)
+            stop = np.arctan2(-center[1] + y, -center[0] + x)
+            arcs[line_nr] = arc(center, radius, start, stop, arcdir[int(cur_g[line_nr])], int(self.steps_per_circle))
+            points_nr[line_nr] = len(arcs[line_nr])
+
+        points_line = np.repeat(np.arange(lines_nr), points_nr)
+        points = np.column_stack((cur_x[points_line], cur_y[points_line]))
+        points_start = np.cumsum(points_nr) - points_nr
+        for line_nr, arc_points in arcs.items():
+            points[points_start[line_nr]:points_start[line_nr] + len(arc_points)] = arc_points
+
+        # ## Tool paths: a change in height ends a tool path, if it has points
+        z_lines = np.flatnonzero(has_z)
+        line_path = np.cumsum(has_z)
+        points_path = line_path[points_line]
+        path_start = np.flatnonzero(np.diff(points_path, prepend=-1))
+        path_size = np.diff(np.append(path_start, len(points)))
+        path_ids = points_path[path_start]
+        path_end_line = np.append(z_lines, lines_nr)[path_ids]
+
+        # the kind of a tool path is the kind of the last move
+        move_lines = np.flatnonzero(has_xy)
+        last_move = move_lines[np.searchsorted(line_path[move_lines], path_ids, side='right') - 1]
+        path_kind = np.where(cur_z[last_move] > 0, self.MOVE_TRAVEL, 0) | \
+            np.where(cur_g[last_move] > 0, self.MOVE_SLOW, 0)
+
+        # ## Holes: each plunge below zero
+        hole_lines = z_lines[z_code[z_lines] < 0]
+
+        # the tool paths and the holes, in order; a tool path is stored before the hole of the plunge that ends it
+        item_line = np.concatenate((path_end_line, hole_lines))
+        item_order = np.lexsort((np.repeat([0, 1], [len(path_ids), len(hole_lines)]), item_line))
+        item_size = np.concatenate((path_size + 1, np.ones(len(hole_lines), dtype=int)))[item_order]
+        item_start = np.cumsum(item_size) - item_size
+        tool_end = np.append(tool, tool[-1])
+        item_z = np.concatenate((cur_z[points_line[path_start]], z_code[hole_lines]))[item_order]
+        item_kind = np.concatenate((path_kind, np.full(len(hole_lines), self.MOVE_HOLE)))[item_order]
+        item_tool = np.concatenate((tool_end[path_end_line], tool[hole_lines]))[item_order]
+
+        moves = np.zeros(int(item_size.sum()), dtype=self.gcode_moves_dtype)
+        moves['z'] = np.repeat(item_z, item_size)
+        moves['kind'] = np.repeat(item_kind, item_size)
+        moves['tool'] = np.repeat(item_tool, item_size)
+        moves['path'] = np.repeat(np.arange(len(item_size)), item_size)
+
+        # each tool path starts with the last point of the previous one
+        item_rank = np.empty(len(item_order), dtype=int)
+        item_rank[item_order] = np.arange(len(item_order))
+        path_row = item_start[item_rank[:len(path_ids)]]
+        path_first = np.vstack((np.asarray(start_pt, dtype=float)[:2], points[path_start[1:] - 1]))[:len(path_ids)]
+        points_row = np.repeat(path_row + 1 - path_start, path_size) + np.arange(len(points))
+        hole_row = item_start[item_rank[len(path_ids):]]
+
+        for field, col in (('x', 0), ('y', 1)):
+            moves[field][path_row] = path_first[:, col]
+            moves[field][points_row] = points[:, col]
+        moves['x'][hole_row] = prev_x[hole_lines]
+        moves['y'][hole_row] = prev_y[hole_lines]
+        return moves
+
+    def gcode_moves_geometry(self, moves, hole_dia=None):
+        """
+        Makes the geometry of the moves parsed from the G-Code: a LineString for each tool path and the exterior of
+        the drilled hole for each of the plunges for which hole_dia() returns a diameter.
+
+        Will return a list of dict in the format:
+        {
+            "geom": LineString(path),
+            "kind": kind
+        }
+        where kind can be either ["C", "F"]  # T=travel, C=cut, F=fast, S=slow
+
+        :param moves:       Array of moves made by gcode_parse_moves()
+        :type moves:        numpy.ndarray
+        :param hole_dia:    Function that takes the hole location (x, y) and returns its diameter or None
+        :type hole_dia:     function
+        :return:            Geometry as a list of dictionaries
+        :rtype:             list
+        """
+        geometry = []
+        if len(moves) == 0:
+            return geometry
+
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(moves['path'])) + 1, [len(moves)]))
+        xy = np.column_stack((moves['x'], moves['y']))
+
+        for start, stop, kind in zip(bounds[:-1].tolist(), bounds[1:].tolist(), moves['kind'][bounds[:-1]].tolist()):
+            if kind & self.MOVE_HOLE:
+                if hole_dia is None:
+                    continue
+
+                # create the geometry for the holes created when drilling Excellon drills
+                drill_point_coords = (
+                    float('%.*f' % (self.decimals, xy[start, 0])),
+                    float('%.*f' % (self.decimals, xy[start, 1]))
+                )
+                dia = hole_dia(drill_point_coords)
+                if dia is not None:
+                    geometry.append(
+                        {
+                            "geom": Point(drill_point_coords).buffer(dia / 2.0).exterior,
+                            "kind": ['C', 'F']
+                        }
+                    )
+            else:
+                geometry.append(
+                    {
+                        "geom": LineString(xy[start:stop]),
+                        "kind": ['T' if kind & self.MOVE_TRAVEL else 'C', 'S' if kind & self.MOVE_SLOW else 'F']
+                    }
+                )
+        return geometry
+
     def gcode_parse(self, force_parsing=None):
         """
         G-Code parser (from self.gcode). Generates dictionary with
         single-segment LineString's and "kind" indicating cut or travel,
-        fast or feedrate speed.
+        fast or feedrate speed. The parsed moves are stored in self.gcode_moves.
 
         Will return a list of dict in the format:
         {
@@ -6366,13 +7244,9 @@ class CNCjob(Geometry):
         :rtype:                 dict
         """
 
-        kind = ["C", "F"]  # T=travel, C=cut, F=fast, S=slow
-
-        # Results go here
-        geometry = []
-
-        # Last known instruction
-        current = {'X': 0.0, 'Y': 0.0, 'Z': 0.0, 'G': 0}
+        if force_parsing is False or force_parsing is None:
+            if '%' in self.gcode or 'MOIN' in self.gcode or 'MOMM' in self.gcode:
+                return "fail"
 
         # Current path: temporary storage until tool is
         # lifted or lowered.
@@ -6383,7 +7257,7 @@ class CNCjob(Geometry):
             else:
                 pos_xy = self.app.defaults["tools_drill_toolchangexy"]
                 try:
-                    pos_xy = [float(eval(a)) for a in pos_xy.split(",")]
+                    pos_xy = [float(a) for a in pos_xy.split(",")]
                 except Exception:
                     if len(pos_xy) != 2:
                         pos_xy = (0, 0)
@@ -6393,138 +7267,32 @@ class CNCjob(Geometry):
             else:
                 pos_xy = self.app.defaults["geometry_toolchangexy"]
                 try:
-                    pos_xy = [float(eval(a)) for a in pos_xy.split(",")]
+                    pos_xy = [float(a) for a in pos_xy.split(",")]
                 except Exception:
                     if len(pos_xy) != 2:
                         pos_xy = (0, 0)
 
-        path = [pos_xy]
-        # path = [(0, 0)]
-
         gcode_lines_list = self.gcode.splitlines()
         self.app.inform.emit('%s: %d' % (_("Parsing GCode file. Number of lines"), len(gcode_lines_list)))
 
-        # Process every instruction
-        for line in gcode_lines_list:
-            if force_parsing is False or force_parsing is None:
-                if '%MO' in line or '%' in line or 'MOIN' in line or 'MOMM' in line:
-                    return "fail"
-
-            gobj = self.codes_split(line)
-
-            # ## Units
-            if 'G' in gobj and (gobj['G'] == 20.0 or gobj['G'] == 21.0):
-                self.units = {20.0: "IN", 21.0: "MM"}[gobj['G']]
-                continue
-
-            # TODO take into consideration the tools and update the travel line thickness
-            if 'T' in gobj:
-                pass
-
-            # ## Changing height
-            if 'Z' in gobj:
-                if 'Roland' in self.pp_excellon_name or 'Roland' in self.pp_geometry_name:
-                    pass
-                elif 'hpgl' in self.pp_excellon_name or 'hpgl' in self.pp_geometry_name:
-                    pass
-                elif 'laser' in self.pp_excellon_name or 'laser' in self.pp_geometry_name:
-                    pass
-                elif ('X' in gobj or 'Y' in gobj) and gobj['Z'] != current['Z']:
-                    if self.pp_geometry_name == 'line_xyz' or self.pp_excellon_name == 'line_xyz':
-                        pass
-                    else:
-                        log.warning("Non-orthogonal motion: From %s" % str(current))
-                        log.warning("  To: %s" % str(gobj))
+        self.gcode_moves = self.gcode_parse_moves(self.gcode, start_pt=pos_xy)
 
-                current['Z'] = gobj['Z']
-                # Store the path into geometry and reset path
-                if len(path) > 1:
-                    geometry.append({"geom": LineString(path),
-                                     "kind": kind})
-                    path = [path[-1]]  # Start with the last point of last path.
-
-                # create the geometry for the holes created when drilling Excellon drills
-                if self.origin_kind == 'excellon':
-                    if current['Z'] < 0:
-                        current_drill_point_coords = (
-                            float('%.*f' % (self.decimals, current['X'])),
-                            float('%.*f' % (self.decimals, current['Y']))
+        # find the drill diameter knowing the drill coordinates
+        hole_dia = None
+        if self.origin_kind == 'excellon':
+            drills_dia = {}
+            for tool, tool_dict in self.exc_tools.items():
+                if 'drills' in tool_dict:
+                    for drill_pt in tool_dict['drills']:
+                        point_in_dict_coords = (
+                            float('%.*f' % (self.decimals, drill_pt.x)),
+                            float('%.*f' % (self.decimals, drill_pt.y))
                         )
-
-                        # find the drill diameter knowing the drill coordinates
-                        break_loop = False
-                        for tool, tool_dict in self.exc_tools.items():
-                            if 'drills' in tool_dict:
-                                for drill_pt in tool_dict['drills']:
-                                    point_in_dict_coords = (
-                                        float('%.*f' % (self.decimals, drill_pt.x)),
-                                        float('%.*f' % (self.decimals, drill_pt.y))
-                                    )
-                                    if point_in_dict_coords == current_drill_point_coords:
-                                        dia = self.exc_tools[tool]['tooldia']
-                                        kind = ['C', 'F']
-                                        geometry.append(
-                                            {
-                                                "geom": Point(current_drill_point_coords).buffer(dia / 2.0).exterior,
-                                                "kind": kind
-                                            }
-                                        )
-                                        break_loop = True
-                                        break
-                                if break_loop:
-                                    break
-
-            if 'G' in gobj:
-                current['G'] = int(gobj['G'])
-
-            if 'X' in gobj or 'Y' in gobj:
-                if 'X' in gobj:
-                    x = gobj['X']
-                    # current['X'] = x
-                else:
-                    x = current['X']
-
-                if 'Y' in gobj:
-                    y = gobj['Y']
-                else:
-                    y = current['Y']
-
-                kind = ["C", "F"]  # T=travel, C=cut, F=fast, S=slow
-
-                if current['Z'] > 0:
-                    kind[0] = 'T'
-                if current['G'] > 0:
-                    kind[1] = 'S'
-
-                if current['G'] in [0, 1]:  # line
-                    path.append((x, y))
-
-                arcdir = [None, None, "cw", "ccw"]
-                if current['G'] in [2, 3]:  # arc
-                    center = [gobj['I'] + current['X'], gobj['J'] + current['Y']]
-                    radius = np.sqrt(gobj['I'] ** 2 + gobj['J'] ** 2)
-                    start = np.arctan2(-gobj['J'], -gobj['I'])
-                    stop = np.arctan2(-center[1] + y, -center[0] + x)
-                    path += arc(center, radius, start, stop, arcdir[current['G']], int(self.steps_per_circle))
-
-                current['X'] = x
-                current['Y'] = y
-
-            # Update current instruction
-            for code in gobj:
-                current[code] = gobj[code]
+                        drills_dia.setdefault(point_in_dict_coords, self.exc_tools[tool]['tooldia'])
+            hole_dia = drills_dia.get
 
         self.app.inform.emit('%s...' % _("Creating Geometry from the parsed GCode file. "))
-        # There might not be a change in height at the
-        # end, therefore, see here too if there is
-        # a final path.
-        if len(path) > 1:
-            geometry.append(
-                {
-                    "geom": LineString(path),
-                    "kind": kind
-                }
-            )
+        geometry = self.gcode_moves_geometry(self.gcode_moves, hole_dia=hole_dia)
 
         self.gcode_parsed = geometry
         return geometry
@@ -6554,20 +7322,9 @@ class CNCjob(Geometry):
         :rtype:                 list
         """
 
-        kind = ["C", "F"]  # T=travel, C=cut, F=fast, S=slow
-
-        # Results go here
-        geometry = []
-
-        # Last known instruction
-        current = {'X': 0.0, 'Y': 0.0, 'Z': 0.0, 'G': 0}
-
-        # Current path: temporary storage until tool is
-        # lifted or lowered.
-        pos_xy = start_pt
-
-        path = [pos_xy]
-        # path = [(0, 0)]
+        if force_parsing is False or force_parsing is None:
+            if '%' in gcode or 'MOIN' in gcode or 'MOMM' in gcode:
+                return "fail"
 
         gcode_lines_list = gcode.splitlines()
         self.app.inform.emit(
@@ -6576,101 +7333,10 @@ class CNCjob(Geometry):
                                 len(gcode_lines_list))
         )
 
-        # Process every instruction
-        for line in gcode_lines_list:
-            if force_parsing is False or force_parsing is None:
-                if '%MO' in line or '%' in line or 'MOIN' in line or 'MOMM' in line:
-                    return "fail"
-
-            gobj = self.codes_split(line)
-
-            # ## Units
-            if 'G' in gobj and (gobj['G'] == 20.0 or gobj['G'] == 21.0):
-                self.units = {20.0: "IN", 21.0: "MM"}[gobj['G']]
-                continue
-
-            # TODO take into consideration the tools and update the travel line thickness
-            if 'T' in gobj:
-                pass
-
-            # ## Changing height
-            if 'Z' in gobj:
-                if 'Roland' in self.pp_excellon_name or 'Roland' in self.pp_geometry_name:
-                    pass
-                elif 'hpgl' in self.pp_excellon_name or 'hpgl' in self.pp_geometry_name:
-                    pass
-                elif 'laser' in self.pp_excellon_name or 'laser' in self.pp_geometry_name:
-                    pass
-                elif ('X' in gobj or 'Y' in gobj) and gobj['Z'] != current['Z']:
-                    if self.pp_geometry_name == 'line_xyz' or self.pp_excellon_name == 'line_xyz':
-                        pass
-                    else:
-                        log.warning("Non-orthogonal motion: From %s" % str(current))
-                        log.warning("  To: %s" % str(gobj))
-
-                current['Z'] = gobj['Z']
-                # Store the path into geometry and reset path
-                if len(path) > 1:
-                    geometry.append({"geom": LineString(path),
-                                     "kind": kind})
-                    path = [path[-1]]  # Start with the last point of last path.
-
-                # create the geometry for the holes created when drilling Excellon drills
-                if current['Z'] < 0:
-                    current_drill_point_coords = (
-                        float('%.*f' % (self.decimals, current['X'])),
-                        float('%.*f' % (self.decimals, current['Y']))
-                    )
-
-                    kind = ['C', 'F']
-                    geometry.append(
-                        {
-                            "geom": Point(current_drill_point_coords).buffer(dia/2.0).exterior,
-                            "kind": kind
-                        }
-                    )
-
-            if 'G' in gobj:
-                current['G'] = int(gobj['G'])
-
-            if 'X' in gobj or 'Y' in gobj:
-                x = gobj['X'] if 'X' in gobj else current['X']
-                y = gobj['Y'] if 'Y' in gobj else current['Y']
-
-                kind = ["C", "F"]  # T=travel, C=cut, F=fast, S=slow
-
-                if current['Z'] > 0:
-                    kind[0] = 'T'
-                if current['G'] > 0:
-                    kind[1] = 'S'
-                if current['G'] in [0, 1]:  # line
-                    path.append((x, y))
-
-                arcdir = [None, None, "cw", "ccw"]
-                if current['G'] in [2, 3]:  # arc
-                    center = [gobj['I'] + current['X'], gobj['J'] + current['Y']]
-                    radius = np.sqrt(gobj['I'] ** 2 + gobj['J'] ** 2)
-                    start = np.arctan2(-gobj['J'], -gobj['I'])
-                    stop = np.arctan2(-center[1] + y, -center[0] + x)
-                    path += arc(center, radius, start, stop, arcdir[current['G']], int(self.steps_per_circle))
-
-                current['X'] = x
-                current['Y'] = y
-
-            # Update current instruction
-            for code in gobj:
-                current[code] = gobj[code]
+        moves = self.gcode_parse_moves(gcode, start_pt=start_pt)
 
         self.app.inform.emit('%s: %s' % (_("Creating Geometry from the parsed GCode file for tool diameter"), str(dia)))
-        # There might not be a change in height at the end, therefore, see here too if there is a final path.
-        if len(path) > 1:
-            geometry.append(
-                {
-                    "geom": LineString(path),
-                    "kind": kind
-                }
-            )
-        return geometry
+        return self.gcode_moves_geometry(moves, hole_dia=lambda drill_point_coords: dia)
 
     # def plot(self, tooldia=None, dpi=75, margin=0.1,
     #          color={"T": ["#F0E24D", "#B5AB3A"], "C": ["#5E6CFF", "#4650BD"]},
@@ -7017,7 +7683,7 @@ class CNCjob(Geometry):
         else:
             target_linear = linear
 
-        gcode = ""
+        gcode = []
 
         # path = list(target_linear.coords)
         path = self.segment(target_linear.coords)
@@ -7047,26 +7713,26 @@ class CNCjob(Geometry):
 
                 if travel[0] is not None:
                     # move to next point
-                    gcode += self.doformat(p.rapid_code, x=locx, y=locy)
+                    gcode.append(self.doformat(p.rapid_code, x=locx, y=locy))
 
                     # raise to safe Z (travel[0]) each time because safe Z may be different
                     self.z_move = travel[0]
-                    gcode += self.doformat(p.lift_code, x=locx, y=locy)
+                    gcode.append(self.doformat(p.lift_code, x=locx, y=locy))
 
                     # restore z_move
                     self.z_move = z_move
                 else:
                     if prev_z is not None:
                         # move to next point
-                        gcode += self.doformat(p.rapid_code, x=locx, y=locy)
+                        gcode.append(self.doformat(p.rapid_code, x=locx, y=locy))
 
                         # we assume that previously the z_move was altered therefore raise to
                         # the travel_z (z_move)
                         self.z_move = z_move
-                        gcode += self.doformat(p.lift_code, x=locx, y=locy)
+                        gcode.append(self.doformat(p.lift_code, x=locx, y=locy))
                     else:
                         # move to next point
-                        gcode += self.doformat(p.rapid_code, x=locx, y=locy)
+                        gcode.append(self.doformat(p.rapid_code, x=locx, y=locy))
 
                 # store prev_z
                 prev_z = travel[0]
@@ -7076,10 +7742,10 @@ class CNCjob(Geometry):
         # Move down to cutting depth
         if down:
             # Different feedrate for vertical cut?
-            gcode += self.doformat(p.z_feedrate_code)
+            gcode.append(self.doformat(p.z_feedrate_code))
             # gcode += self.doformat(p.feedrate_code)
-            gcode += self.doformat(p.down_code, x=first_x, y=first_y, z_cut=z_cut)
-            gcode += self.doformat(p.feedrate_code, feedrate=feedrate)
+            gcode.append(self.doformat(p.down_code, x=first_x, y=first_y, z_cut=z_cut))
+            gcode.append(self.doformat(p.feedrate_code, feedrate=feedrate))
 
         # Cutting...
         prev_x = first_x
@@ -7101,14 +7767,14 @@ class CNCjob(Geometry):
                 next_x = pt[0]
                 next_y = pt[1]
 
-            gcode += self.doformat(p.linear_code, x=next_x, y=next_y, z=z_cut)  # Linear motion to point
+            gcode.append(self.doformat(p.linear_code, x=next_x, y=next_y, z=z_cut))  # Linear motion to point
             prev_x = pt[0]
             prev_y = pt[1]
 
         # Up to travelling height.
         if up:
-            gcode += self.doformat(p.lift_code, x=prev_x, y=prev_y, z_move=z_move)  # Stop cutting
-        return gcode
+            gcode.append(self.doformat(p.lift_code, x=prev_x, y=prev_y, z_move=z_move))  # Stop cutting
+        return ''.join(gcode)
 
     def linear2gcode_extra(self, linear, dia, extracut_length, tolerance=0, down=True, up=True,
                            z_cut=None, z_move=None, zdownrate=None,
@@ -7163,7 +7829,7 @@ class CNCjob(Geometry):
         else:
             target_linear = linear
 
-        gcode = ""
+        gcode = []
 
         path = list(target_linear.coords)
         p = self.pp_geometry
@@ -7191,26 +7857,26 @@ class CNCjob(Geometry):
 
                 if travel[0] is not None:
                     # move to next point
-                    gcode += self.doformat(p.rapid_code, x=locx, y=locy)
+                    gcode.append(self.doformat(p.rapid_code, x=locx, y=locy))
 
                     # raise to safe Z (travel[0]) each time because safe Z may be different
                     self.z_move = travel[0]
-                    gcode += self.doformat(p.lift_code, x=locx, y=locy)
+                    gcode.append(self.doformat(p.lift_code, x=locx, y=locy))
 
                     # restore z_move
                     self.z_move = z_move
                 else:
                     if prev_z is not None:
                         # move to next point
-                        gcode += self.doformat(p.rapid_code, x=locx, y=locy)
+                        gcode.append(self.doformat(p.rapid_code, x=locx, y=locy))
 
                         # we assume that previously the z_move was altered therefore raise to
                         # the travel_z (z_move)
                         self.z_move = z_move
-                        gcode += self.doformat(p.lift_code, x=locx, y=locy)
+                        gcode.append(self.doformat(p.lift_code, x=locx, y=locy))
                     else:
                         # move to next point
-                        gcode += self.doformat(p.rapid_code, x=locx, y=locy)
+                        gcode.append(self.doformat(p.rapid_code, x=locx, y=locy))
 
                 # store prev_z
                 prev_z = travel[0]
@@ -7221,12 +7887,12 @@ class CNCjob(Geometry):
         if down:
             # Different feedrate for vertical cut?
             if self.z_feedrate is not None:
-                gcode += self.doformat(p.z_feedrate_code)
+                gcode.append(self.doformat(p.z_feedrate_code))
                 # gcode += self.doformat(p.feedrate_code)
-                gcode += self.doformat(p.down_code, x=first_x, y=first_y, z_cut=z_cut)
-                gcode += self.doformat(p.feedrate_code, feedrate=feedrate)
+                gcode.append(self.doformat(p.down_code, x=first_x, y=first_y, z_cut=z_cut))
+                gcode.append(self.doformat(p.feedrate_code, feedrate=feedrate))
             else:
-                gcode += self.doformat(p.down_code, x=first_x, y=first_y, z_cut=z_cut)  # Start cutting
+                gcode.append(self.doformat(p.down_code, x=first_x, y=first_y, z_cut=z_cut))  # Start cutting
 
         # Cutting...
         prev_x = first_x
@@ -7249,7 +7915,7 @@ class CNCjob(Geometry):
                 next_x = pt[0]
                 next_y = pt[1]
 
-            gcode += self.doformat(p.linear_code, x=next_x, y=next_y, z=z_cut)  # Linear motion to point
+            gcode.append(self.doformat(p.linear_code, x=next_x, y=next_y, z=z_cut))  # Linear motion to point
             prev_x = next_x
             prev_y = next_y
 
@@ -7276,28 +7942,28 @@ class CNCjob(Geometry):
             new_y = extra_path[0][1]
 
             # this is an extra line therefore lift the milling bit
-            gcode += self.doformat(p.lift_code, x=prev_x, y=prev_y, z_move=z_move)  # lift
+            gcode.append(self.doformat(p.lift_code, x=prev_x, y=prev_y, z_move=z_move))  # lift
 
             # move fast to the new first point
-            gcode += self.doformat(p.rapid_code, x=new_x, y=new_y)
+            gcode.append(self.doformat(p.rapid_code, x=new_x, y=new_y))
 
             # lower the milling bit
             # Different feedrate for vertical cut?
             if self.z_feedrate is not None:
-                gcode += self.doformat(p.z_feedrate_code)
-                gcode += self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut)
-                gcode += self.doformat(p.feedrate_code, feedrate=feedrate)
+                gcode.append(self.doformat(p.z_feedrate_code))
+                gcode.append(self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut))
+                gcode.append(self.doformat(p.feedrate_code, feedrate=feedrate))
             else:
-                gcode += self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut)  # Start cutting
+                gcode.append(self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut))  # Start cutting
 
             # start cutting the extra line
             last_pt = extra_path[0]
             for pt in extra_path[1:]:
-                gcode += self.doformat(p.linear_code, x=pt[0], y=pt[1])
+                gcode.append(self.doformat(p.linear_code, x=pt[0], y=pt[1]))
                 last_pt = pt
 
             # go back to the original point
-            gcode += self.doformat(p.linear_code, x=path[0][0], y=path[0][1])
+            gcode.append(self.doformat(p.linear_code, x=path[0][0], y=path[0][1]))
             last_pt = path[0]
         else:
             # go to the point that is 5% in length before the end (therefore 95% length from start of the line),
@@ -7315,23 +7981,23 @@ class CNCjob(Geometry):
             new_y = extra_path[0][1]
 
             # this is an extra line therefore lift the milling bit
-            gcode += self.doformat(p.lift_code, x=prev_x, y=prev_y, z_move=z_move)  # lift
+            gcode.append(self.doformat(p.lift_code, x=prev_x, y=prev_y, z_move=z_move))  # lift
 
             # move fast to the new first point
-            gcode += self.doformat(p.rapid_code, x=new_x, y=new_y)
+            gcode.append(self.doformat(p.rapid_code, x=new_x, y=new_y))
 
             # lower the milling bit
             # Different feedrate for vertical cut?
             if self.z_feedrate is not None:
-                gcode += self.doformat(p.z_feedrate_code)
-                gcode += self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut)
-                gcode += self.doformat(p.feedrate_code, feedrate=feedrate)
+                gcode.append(self.doformat(p.z_feedrate_code))
+                gcode.append(self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut))
+                gcode.append(self.doformat(p.feedrate_code, feedrate=feedrate))
             else:
-                gcode += self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut)  # Start cutting
+                gcode.append(self.doformat(p.down_code, x=new_x, y=new_y, z_cut=z_cut))  # Start cutting
 
             # start cutting the extra line
             for pt in extra_path[1:]:
-                gcode += self.doformat(p.linear_code, x=pt[0], y=pt[1])
+                gcode.append(self.doformat(p.linear_code, x=pt[0], y=pt[1]))
 
             # ---------------------------------------------
             # second half
@@ -7342,7 +8008,7 @@ class CNCjob(Geometry):
             # start cutting the extra line
             last_pt = extra_path[0]
             for pt in extra_path[1:]:
-                gcode += self.doformat(p.linear_code, x=pt[0], y=pt[1])
+                gcode.append(self.doformat(p.linear_code, x=pt[0], y=pt[1]))
                 last_pt = pt
 
             # ---------------------------------------------
@@ -7354,7 +8020,7 @@ class CNCjob(Geometry):
             # start cutting the extra line
             last_pt = extra_path[0]
             for pt in extra_path[1:]:
-                gcode += self.doformat(p.linear_code, x=pt[0], y=pt[1])
+                gcode.append(self.doformat(p.linear_code, x=pt[0], y=pt[1]))
                 last_pt = pt
 
         # if extracut_length == 0.0:
@@ -7377,9 +8043,9 @@ class CNCjob(Geometry):
 
         # Up to travelling height.
         if up:
-            gcode += self.doformat(p.lift_code, x=last_pt[0], y=last_pt[1], z_move=z_move)  # Stop cutting
+            gcode.append(self.doformat(p.lift_code, x=last_pt[0], y=last_pt[1], z_move=z_move))  # Stop cutting
 
-        return gcode
+        return ''.join(gcode)
 
     def point2gcode(self, point, dia, z_move=None, old_point=(0, 0)):
         """
@@ -8151,11 +8817,12 @@ def to_dict(obj):
 
     * ApertureMacro
     * BaseGeometry
+    * PointArray, SlotArray
 
     :param obj:     Shapely geometry.
     :type obj:      BaseGeometry
     :return:        Dictionary with serializable form if ``obj`` was
-                    BaseGeometry or ApertureMacro, otherwise returns ``obj``.
+                    BaseGeometry, ApertureMacro or PointArray, otherwise returns ``obj``.
     """
     if isinstance(obj, ApertureMacro):
         return {
@@ -8167,6 +8834,11 @@ def to_dict(obj):
             "__class__": "Shply",
             "__inst__": sdumps(obj)
         }
+    if isinstance(obj, PointArray):
+        return {
+            "__class__": type(obj).__name__,
+            "__inst__": obj.to_list()
+        }
     return obj
 
 
@@ -8185,6 +8857,10 @@ def dict2obj(d):
             am = ApertureMacro()
             am.from_dict(d['__inst__'])
             return am
+        if d['__class__'] == "PointArray":
+            return PointArray(np.array(d['__inst__'], dtype=float))
+        if d['__class__'] == "SlotArray":
+            return SlotArray(np.array(d['__inst__'], dtype=float))
         return d
     else:
         return d
@@ -8553,21 +9229,40 @@ class FlatCAMRTree(object):
     Indexes geometry (Any object with "cooords" property containing
     a list of tuples with x, y values). Objects are indexed by
     all their points by default. To index by arbitrary points,
-    override self.points2obj.
+    override self.get_points.
+
+    The points are kept in coordinate arrays and indexed in a grid hash, with about two points in each cell.
+    A removed point is only marked as deleted, in a mask, and it is dropped from its cell the next time the cell
+    is searched. The grid is bulk loaded again, from the points that are left, when the number of points doubled
+    or when most of them were removed, so the cells keep about the same number of points.
     """
 
-    def __init__(self):
-        # Python RTree Index
-        self.rti = rtindex.Index()
+    # over this ring of cells around the query point the nearest point is searched in all the points
+    max_radius = 4
 
+    def __init__(self):
         # ## Track object-point relationship
         # Each is list of points in object.
         self.obj2points = []
 
-        # Index is index in rtree, value is index of
+        # Index is the point id, value is index of
         # object in obj2points.
         self.points2obj = []
 
+        # coordinates of the points and the mask of the points that were not removed
+        self.xs = array('d')
+        self.ys = array('d')
+        self.alive = bytearray()
+        self.alive_nr = 0
+
+        # grid hash: (column, row) -> list of point ids
+        self.cells = None
+        self.cell = 1.0
+        self.origin = (0.0, 0.0)
+        # the number of points and of the not removed points when the grid was loaded
+        self.loaded_nr = 0
+        self.loaded_alive_nr = 0
+
         self.get_points = lambda go: go.coords
 
     def grow_obj2points(self, idx):
@@ -8592,35 +9287,144 @@ class FlatCAMRTree(object):
         self.obj2points[objid] = []
 
         for pt in self.get_points(obj):
-            self.rti.insert(len(self.points2obj), (pt[0], pt[1], pt[0], pt[1]), obj=objid)
-            self.obj2points[objid].append(len(self.points2obj))
+            ptid = len(self.points2obj)
+            x, y = float(pt[0]), float(pt[1])
+            self.xs.append(x)
+            self.ys.append(y)
+            self.alive.append(1)
+            self.alive_nr += 1
+            self.obj2points[objid].append(ptid)
             self.points2obj.append(objid)
 
+            if self.cells is not None:
+                self.cells.setdefault(self.cell_of(x, y), []).append(ptid)
+
+    def insert_points(self, objids, points):
+        """
+        Adds many points at once and loads the grid again, from all the points.
+
+        :param objids:  for each object, its index in obj2points. Objects already indexed are indexed again
+        :param points:  for each object, the list of its points
+        :return:        None
+        """
+        for objid, obj_points in zip(objids, points):
+            self.grow_obj2points(objid)
+            first = len(self.points2obj)
+            self.obj2points[objid] = list(range(first, first + len(obj_points)))
+            self.points2obj += [objid] * len(obj_points)
+            self.xs.extend(float(pt[0]) for pt in obj_points)
+            self.ys.extend(float(pt[1]) for pt in obj_points)
+            self.alive.extend(b'\x01' * len(obj_points))
+            self.alive_nr += len(obj_points)
+
+        self.load_grid()
+
     def remove_obj(self, objid, obj):
-        # Use all ptids to delete from index
-        for i, pt in enumerate(self.get_points(obj)):
-            try:
-                self.rti.delete(self.obj2points[objid][i], (pt[0], pt[1], pt[0], pt[1]))
-            except IndexError:
-                pass
+        # the points are only marked as removed
+        for ptid in self.obj2points[objid]:
+            if self.alive[ptid]:
+                self.alive[ptid] = 0
+                self.alive_nr -= 1
+
+    def cell_of(self, x, y):
+        return math.floor((x - self.origin[0]) / self.cell), math.floor((y - self.origin[1]) / self.cell)
+
+    def load_grid(self):
+        """
+        Bulk loads the grid hash with the points that were not removed. The cell size is chosen for about two points
+        in each cell.
+
+        :return: None
+        """
+        ptids = np.flatnonzero(np.frombuffer(bytes(self.alive), dtype=np.uint8))
+        self.loaded_nr = len(self.points2obj)
+        self.loaded_alive_nr = len(ptids)
+        if len(ptids) == 0:
+            self.cells = None
+            return
+
+        xs = np.array(self.xs)[ptids]
+        ys = np.array(self.ys)[ptids]
+        min_x, min_y = xs.min(), ys.min()
+        self.origin = (float(min_x), float(min_y))
+        self.cell = CNCjob.LocationsGrid.cell_size(np.column_stack((xs, ys)))
+
+        cols = np.floor((xs - min_x) / self.cell).astype(int).tolist()
+        rows = np.floor((ys - min_y) / self.cell).astype(int).tolist()
+        self.cells = {}
+        for ptid, key in zip(ptids.tolist(), zip(cols, rows)):
+            self.cells.setdefault(key, []).append(ptid)
+
+    def nearest_point(self, pt):
+        """
+        :param pt:  Query point, a tuple with x, y coordinates
+        :return:    the id of the nearest point that was not removed
+        """
+        if self.alive_nr == 0:
+            raise StopIteration
+
+        # load the grid again if the points doubled or if most of them were removed
+        if self.cells is None or len(self.points2obj) >= 2 * self.loaded_nr or \
+                self.alive_nr * 4 < self.loaded_alive_nr:
+            self.load_grid()
+
+        x, y = float(pt[0]), float(pt[1])
+        xs, ys, alive, cells, cell = self.xs, self.ys, self.alive, self.cells, self.cell
+        col, row = self.cell_of(x, y)
+
+        best, best_dist = -1, np.inf
+        for radius in range(self.max_radius + 1):
+            for key in CNCjob.LocationsGrid.ring(col, row, radius):
+                cell_points = cells.get(key)
+                if not cell_points:
+                    continue
+
+                if not all(alive[ptid] for ptid in cell_points):
+                    cell_points = [ptid for ptid in cell_points if alive[ptid]]
+                    if cell_points:
+                        cells[key] = cell_points
+                    else:
+                        del cells[key]
+
+                for ptid in cell_points:
+                    dist = (xs[ptid] - x) ** 2 + (ys[ptid] - y) ** 2
+                    if dist < best_dist:
+                        best, best_dist = ptid, dist
+            # the points in the next rings are farther than radius * cell
+            if best >= 0 and best_dist <= (radius * cell) ** 2:
+                return best
+
+        # search in all the points
+        dist = (np.array(xs) - x) ** 2 + (np.array(ys) - y) ** 2
+        dist[np.frombuffer(bytes(alive), dtype=np.uint8) == 0] = np.inf
+        return int(np.argmin(dist))
 
     def nearest(self, pt):
         """
         Will raise StopIteration if no items are found.
 
-        :param pt:
-        :return:
+        :param pt:  Query point
+        :return:    (x, y) of the nearest point, index of the object of the point
+        :rtype:     tuple
         """
-        return next(self.rti.nearest(pt, objects=True))
+        ptid = self.nearest_point(pt)
+        return (self.xs[ptid], self.ys[ptid]), self.points2obj[ptid]
 
     def intersection(self, pt):
         """
         Will raise StopIteration if no items are found.
 
-        :param pt:
-        :return:
+        :param pt:  Query point or bounds (minx, miny, maxx, maxy)
+        :return:    (x, y) of a point in the bounds, index of the object of the point
+        :rtype:     tuple
         """
-        return next(self.rti.intersection(pt, objects=True))
+        min_x, min_y, max_x, max_y = (pt[0], pt[1], pt[0], pt[1]) if len(pt) == 2 else pt
+        xs, ys = np.array(self.xs), np.array(self.ys)
+        found = np.flatnonzero((np.frombuffer(bytes(self.alive), dtype=np.uint8) != 0) &
+                               (xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y))
+        if len(found) == 0:
+            raise StopIteration
+        return (self.xs[found[0]], self.ys[found[0]]), self.points2obj[found[0]]
 
 
 class FlatCAMRTreeStorage(FlatCAMRTree):
@@ -8666,6 +9470,22 @@ class FlatCAMRTreeStorage(FlatCAMRTree):
         # Remove from index
         self.remove_obj(objidx, obj)
 
+    def insert_many(self, objs):
+        """
+        Inserts many objects at once. The points of the objects are added to the coordinate arrays and the grid is
+        bulk loaded, which is much faster than inserting the objects one by one.
+
+        :param objs:    list of objects
+        :return:        None
+        """
+        objs = list(objs)
+        first = len(self.objects)
+        self.objects += objs
+        for idx, obj in enumerate(objs, start=first):
+            self.indexes[id(obj)] = idx
+
+        self.insert_points(range(first, len(self.objects)), [self.get_points(obj) for obj in objs])
+
     def get_objects(self):
         return (o for o in self.objects if o is not None)
 
@@ -8679,8 +9499,8 @@ class FlatCAMRTreeStorage(FlatCAMRTree):
           matching point.
         :rtype: tuple
         """
-        tidx = super(FlatCAMRTreeStorage, self).nearest(pt)
-        return (tidx.bbox[0], tidx.bbox[1]), self.objects[tidx.object]
+        match_pt, objidx = super(FlatCAMRTreeStorage, self).nearest(pt)
+        return match_pt, self.objects[objidx]
 
 # class myO:
 #     def __init__(self, coords):
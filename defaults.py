@@ -306,6 +306,7 @@ class FlatCAMDefaults:
         "geometry_plot_line": "#FF0000",
         "geometry_optimization_type": 'R',
         "geometry_search_time": 3,
+        "geometry_connect_paths": False,
 
         # Geometry Options
         "geometry_cutz": -2.4,
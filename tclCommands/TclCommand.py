@@ -1,6 +1,5 @@
 import sys
 import re
-import app_Main
 import abc
 import collections
 from PyQt5 import QtCore
@@ -53,8 +52,11 @@ class TclCommand(object):
         if self.app is None:
             raise TypeError('Expected app to be FlatCAMApp instance.')
 
-        if not isinstance(self.app, app_Main.App):
-            raise TypeError('Expected FlatCAMApp, got %s.' % type(app))
+        # app_Main is imported only for the GUI app, the headless engine runs without it
+        if not getattr(self.app, 'cmd_line_headless_engine', False):
+            import app_Main
+            if not isinstance(self.app, app_Main.App):
+                raise TypeError('Expected FlatCAMApp, got %s.' % type(app))
 
         self.log = self.app.log
         self.error_info = None
@@ -200,6 +202,26 @@ class TclCommand(object):
 
         return arguments, options
 
+    def parse_bool(self, value, option_name=None):
+        """
+        Converts the value of a boolean option: True/False, 1/0, Yes/No and On/Off, in any case. Anything else is
+        an error of the command; the value is never evaluated.
+
+        :param value:           the value of the option, from the command or from the defaults
+        :param option_name:     the option, for the error message
+        :return:                bool
+        """
+        if isinstance(value, bool):
+            return value
+
+        par = str(value).strip().lower()
+        if par in ('1', 'true', 'yes', 'on'):
+            return True
+        if par in ('0', 'false', 'no', 'off'):
+            return False
+        self.raise_tcl_error("Expected a boolean value (True or False, 1 or 0) for '-%s', got '%s'." %
+                             (option_name, value))
+
     def check_args(self, args):
         """
         Check arguments and options for right types
@@ -347,6 +369,26 @@ class TclCommandSignaled(TclCommand):
         finally:
             self.app.shell_command_finished.emit(self)
 
+    def execute_direct(self, *args):
+        """
+        Runs the command at once, in the calling thread. The timeout is not used.
+
+        :param args: arguments passed from tcl command console
+        :return: None, output text or exception
+        """
+
+        try:
+            self.log.debug("TCL command '%s' executed." % str(type(self).__name__))
+            self.original_args = args
+            args, unnamed_args = self.check_args(args)
+            args.pop('timeout', None)
+            return self.execute(args, unnamed_args)
+        except Exception as unknown:
+            error_info = sys.exc_info()
+            self.log.error("TCL command '%s' failed. Error text: %s" % (str(self), str(unknown)))
+            self.app.shell.display_tcl_error(unknown, error_info)
+            self.raise_tcl_unknown_error(unknown)
+
     def execute_wrapper(self, *args):
         """
         Command which is called by tcl console when current commands aliases are hit.
@@ -403,6 +445,10 @@ class TclCommandSignaled(TclCommand):
                                                        "'-timeout <miliseconds>' for command or "
                                                        "'set_sys global_background_timeout <miliseconds>'.")
 
+        # the headless engine runs the commands in the calling thread, without the Qt event loop
+        if getattr(self.app, 'cmd_line_headless_engine', False):
+            return self.execute_direct(*args)
+
         try:
             self.log.debug("TCL command '%s' executed." % str(type(self).__name__))
             self.original_args = args
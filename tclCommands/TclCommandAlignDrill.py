@@ -1,4 +1,5 @@
 import collections
+from ast import literal_eval
 from tclCommands.TclCommand import TclCommandSignaled
 
 from shapely.geometry import Point
@@ -102,8 +103,8 @@ class TclCommandAlignDrill(TclCommandSignaled):
 
         if 'holes' in args:
             try:
-                holes = eval("[" + args['holes'] + "]")
-            except KeyError:
+                holes = literal_eval("[" + args['holes'].strip() + "]")
+            except (KeyError, ValueError, SyntaxError):
                 return "ERROR: Wrong -holes format (X1,Y1),(X2,Y2)"
 
         xscale, yscale = {"X": (1.0, -1.0), "Y": (-1.0, 1.0)}[axis]
@@ -79,13 +79,9 @@ class TclCommandBbox(TclCommand):
         margin = args['margin']
 
         if 'rounded' in args:
-            try:
-                par = args['rounded'].capitalize()
-            except AttributeError:
-                par = args['rounded']
-            rounded = bool(eval(par))
+            rounded = self.parse_bool(args['rounded'], 'rounded')
         else:
-            rounded = bool(eval(self.app.defaults["gerber_bboxrounded"]))
+            rounded = self.parse_bool(self.app.defaults["gerber_bboxrounded"])
 
         del args['name']
 
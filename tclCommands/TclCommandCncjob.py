@@ -1,6 +1,7 @@
 from tclCommands.TclCommand import TclCommandSignaled
 
 import collections
+from ast import literal_eval
 from copy import deepcopy
 
 
@@ -95,11 +96,7 @@ class TclCommandCncjob(TclCommandSignaled):
         name = ''
 
         if 'muted' in args:
-            try:
-                par = args['muted'].capitalize()
-            except AttributeError:
-                par = args['muted']
-            muted = bool(eval(par))
+            muted = self.parse_bool(args['muted'], 'muted')
         else:
             muted = False
 
@@ -172,7 +169,11 @@ class TclCommandCncjob(TclCommandSignaled):
                 args["endxy"] = str(self.app.defaults["geometry_endxy"])
             else:
                 args["endxy"] = '0, 0'
-        if len(eval(args["endxy"])) != 2:
+        try:
+            endxy_len = len(literal_eval(args["endxy"].strip()))
+        except (ValueError, SyntaxError, TypeError):
+            endxy_len = None
+        if endxy_len != 2:
             self.raise_tcl_error("The entered value for 'endxy' needs to have the format x,y or "
                                  "in format (x, y) - no spaces allowed. But always two comma separated values.")
 
@@ -207,7 +208,11 @@ class TclCommandCncjob(TclCommandSignaled):
                 args["toolchangexy"] = str(self.app.defaults["geometry_toolchangexy"])
             else:
                 args["toolchangexy"] = '0, 0'
-        if len(eval(args["toolchangexy"])) != 2:
+        try:
+            toolchangexy_len = len(literal_eval(args["toolchangexy"].strip()))
+        except (ValueError, SyntaxError, TypeError):
+            toolchangexy_len = None
+        if toolchangexy_len != 2:
             self.raise_tcl_error("The entered value for 'toolchangexy' needs to have the format x,y or "
                                  "in format (x, y) - no spaces allowed. But always two comma separated values.")
 
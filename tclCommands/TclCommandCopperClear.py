@@ -133,22 +133,14 @@ class TclCommandCopperClear(TclCommand):
             method_data = method
 
         if 'connect' in args:
-            try:
-                par = args['connect'].capitalize()
-            except AttributeError:
-                par = args['connect']
-            connect = bool(eval(par))
+            connect = self.parse_bool(args['connect'], 'connect')
         else:
-            connect = bool(eval(str(self.app.defaults["tools_ncc_connect"])))
+            connect = self.parse_bool(self.app.defaults["tools_ncc_connect"])
 
         if 'contour' in args:
-            try:
-                par = args['contour'].capitalize()
-            except AttributeError:
-                par = args['contour']
-            contour = bool(eval(par))
+            contour = self.parse_bool(args['contour'], 'contour')
         else:
-            contour = bool(eval(str(self.app.defaults["tools_ncc_contour"])))
+            contour = self.parse_bool(self.app.defaults["tools_ncc_contour"])
 
         offset = 0.0
         if 'offset' in args:
@@ -158,18 +150,18 @@ class TclCommandCopperClear(TclCommand):
             has_offset = False
 
         try:
-            tools = [float(eval(dia)) for dia in tooldia.split(",") if dia != '']
+            tools = [float(dia) for dia in tooldia.split(",") if dia != '']
         except AttributeError:
             tools = [float(tooldia)]
+        except ValueError:
+            self.raise_tcl_error('%s Got: %s' % (_("Expected a list of tool diameters like -tooldia 0.1,0.2."),
+                                                 str(tooldia)))
+            return 'fail'
 
         if 'rest' in args:
-            try:
-                par = args['rest'].capitalize()
-            except AttributeError:
-                par = args['rest']
-            rest = bool(eval(par))
+            rest = self.parse_bool(args['rest'], 'rest')
         else:
-            rest = bool(eval(str(self.app.defaults["tools_ncc_rest"])))
+            rest = self.parse_bool(self.app.defaults["tools_ncc_rest"])
 
         if 'outname' in args:
             outname = args['outname']
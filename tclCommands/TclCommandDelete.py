@@ -65,11 +65,7 @@ class TclCommandDelete(TclCommand):
                 if args['f'] is None:
                     is_forced = True
                 else:
-                    try:
-                        par = args['f'].capitalize()
-                    except AttributeError:
-                        par = args['f']
-                    is_forced = bool(eval(par))
+                    is_forced = self.parse_bool(args['f'], 'f')
             except KeyError:
                 is_forced = True
 
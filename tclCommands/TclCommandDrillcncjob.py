@@ -1,6 +1,7 @@
 from tclCommands.TclCommand import TclCommandSignaled
 
 import collections
+from ast import literal_eval
 import math
 
 import gettext
@@ -78,8 +79,8 @@ class TclCommandDrillcncjob(TclCommandSignaled):
                           'If it is not used in command then it will not be included'),
             ('pp', 'This is the Excellon preprocessor name: case_sensitive, no_quotes'),
             ('opt_type', 'Name of move optimization type. B by default for Basic OR-Tools, M for Metaheuristic OR-Tools'
-                         'T from Travelling Salesman Algorithm. B and M works only for 64bit version of FlatCAM and '
-                         'T works only for 32bit version of FlatCAM'),
+                         'T from Travelling Salesman Algorithm, N for Nearest Neighbour with 2-opt. B and M works '
+                         'only for 64bit version of FlatCAM and T works only for 32bit version of FlatCAM'),
             ('diatol', 'Tolerance. Percentange (0.0 ... 100.0) within which dias in drilled_dias will be judged to be '
                        'the same as the ones in the tools from the Excellon object. E.g: if in drill_dias we have a '
                        'diameter with value 1.0, in the Excellon we have a tool with dia = 1.05 and we set a tolerance '
@@ -112,11 +113,7 @@ class TclCommandDrillcncjob(TclCommandSignaled):
             args['outname'] = name + "_cnc"
 
         if 'muted' in args:
-            try:
-                par = args['muted'].capitalize()
-            except AttributeError:
-                par = args['muted']
-            muted = bool(eval(par))
+            muted = self.parse_bool(args['muted'], 'muted')
         else:
             muted = False
 
@@ -240,7 +237,11 @@ class TclCommandDrillcncjob(TclCommandSignaled):
                     xy_toolchange = str(self.app.defaults["tools_drill_toolchangexy"])
                 else:
                     xy_toolchange = '0, 0'
-            if len(eval(xy_toolchange)) != 2:
+            try:
+                xy_toolchange_len = len(literal_eval(xy_toolchange.strip()))
+            except (ValueError, SyntaxError, TypeError):
+                xy_toolchange_len = None
+            if xy_toolchange_len != 2:
                 self.raise_tcl_error("The entered value for 'toolchangexy' needs to have the format x,y or "
                                      "in format (x, y) - no spaces allowed. But always two comma separated values.")
 
@@ -255,7 +256,11 @@ class TclCommandDrillcncjob(TclCommandSignaled):
                 else:
                     xy_end = '0, 0'
 
-            if len(eval(xy_end)) != 2:
+            try:
+                xy_end_len = len(literal_eval(xy_end.strip()))
+            except (ValueError, SyntaxError, TypeError):
+                xy_end_len = None
+            if xy_end_len != 2:
                 self.raise_tcl_error("The entered value for 'xy_end' needs to have the format x,y or "
                                      "in format (x, y) - no spaces allowed. But always two comma separated values.")
 
@@ -27,7 +27,7 @@ class TclCommandExportDXF(TclCommand):
     ])
 
     # array of mandatory options for current Tcl command: required = ['name','outname']
-    required = ['obj_name']
+    required = ['name']
 
     # structured help for current command, args needs to be ordered
     help = {
@@ -49,4 +49,4 @@ class TclCommandExportDXF(TclCommand):
         """
         if 'filename' not in args:
             args['filename'] = self.app.defaults["global_last_save_folder"] + '/' + args['name']
-        self.app.f_handlers.export_dxf(use_thread=False, local_use=None, **args)
+        self.app.f_handlers.export_dxf(args['name'], args['filename'], use_thread=False, local_use=None)
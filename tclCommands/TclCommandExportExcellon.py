@@ -49,4 +49,4 @@ class TclCommandExportExcellon(TclCommand):
         """
         if 'filename' not in args:
             args['filename'] = self.app.defaults["global_last_save_folder"] + '/' + args['name']
-        self.app.f_handlers.export_excellon(use_thread=False, **args)
+        self.app.f_handlers.export_excellon(obj_name=args['name'], filename=args['filename'], use_thread=False)
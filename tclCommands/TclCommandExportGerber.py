@@ -27,7 +27,7 @@ class TclCommandExportGerber(TclCommand):
     ])
 
     # array of mandatory options for current Tcl command: required = ['name','outname']
-    required = ['obj_name']
+    required = ['name']
 
     # structured help for current command, args needs to be ordered
     help = {
@@ -49,4 +49,4 @@ class TclCommandExportGerber(TclCommand):
         """
         if 'filename' not in args:
             args['filename'] = self.app.defaults["global_last_save_folder"] + '/' + args['name']
-        self.app.f_handlers.export_gerber(use_thread=False, **args)
+        self.app.f_handlers.export_gerber(obj_name=args['name'], filename=args['filename'], use_thread=False)
@@ -51,4 +51,5 @@ class TclCommandExportSVG(TclCommand):
         :return:
         """
 
-        self.app.f_handlers.export_svg(**args)
+        self.app.f_handlers.export_svg(args['name'], args.get('filename'),
+                                       scale_stroke_factor=args.get('scale_stroke_factor', 0.00))
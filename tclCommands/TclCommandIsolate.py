@@ -83,13 +83,9 @@ class TclCommandIsolate(TclCommandSignaled):
 
         # evaluate this parameter so True, False, 0 and 1 works
         if 'combine' in args:
-            try:
-                par = args['combine'].capitalize()
-            except AttributeError:
-                par = args['combine']
-            args['combine'] = bool(eval(par))
+            args['combine'] = self.parse_bool(args['combine'], 'combine')
         else:
-            args['combine'] = bool(eval(self.app.defaults["tools_iso_combine_passes"]))
+            args['combine'] = self.parse_bool(self.app.defaults["tools_iso_combine_passes"])
 
         obj = self.app.collection.get_by_name(name)
         if obj is None:
@@ -86,11 +86,7 @@ class TclCommandMillDrills(TclCommandSignaled):
             args['outname'] = name + "_mill_drills"
 
         if 'use_thread' in args:
-            try:
-                par = args['use_thread'].capitalize()
-            except AttributeError:
-                par = args['use_thread']
-            args['use_thread'] = bool(eval(par))
+            args['use_thread'] = self.parse_bool(args['use_thread'], 'use_thread')
         else:
             args['use_thread'] = False
 
@@ -1,6 +1,7 @@
 from tclCommands.TclCommand import TclCommandSignaled
 
 import collections
+from ast import literal_eval
 
 
 class TclCommandMirror(TclCommandSignaled):
@@ -103,12 +104,12 @@ class TclCommandMirror(TclCommandSignaled):
         # Origin
         if 'origin' in args:
             try:
-                origin_val = eval(args['origin'])
+                origin_val = literal_eval(args['origin'].strip())
                 x = float(origin_val[0])
                 y = float(origin_val[1])
             except KeyError:
                 x, y = (0, 0)
-            except ValueError:
+            except (ValueError, SyntaxError, TypeError):
                 return "Invalid distance: %s" % str(args['origin'])
 
             try:
@@ -78,13 +78,9 @@ class TclCommandNregions(TclCommand):
         margin = float(args['margin'])
 
         if 'rounded' in args:
-            try:
-                par = args['rounded'].capitalize()
-            except AttributeError:
-                par = args['rounded']
-            rounded = bool(eval(par))
+            rounded = self.parse_bool(args['rounded'], 'rounded')
         else:
-            rounded = bool(eval(self.app.defaults["gerber_noncopperrounded"]))
+            rounded = self.parse_bool(self.app.defaults["gerber_noncopperrounded"])
 
         del args['name']
 
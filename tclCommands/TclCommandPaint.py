@@ -135,22 +135,14 @@ class TclCommandPaint(TclCommand):
             method = str(self.app.defaults["tools_paint_method"])
 
         if 'connect' in args:
-            try:
-                par = args['connect'].capitalize()
-            except AttributeError:
-                par = args['connect']
-            connect = bool(eval(par))
+            connect = self.parse_bool(args['connect'], 'connect')
         else:
-            connect = bool(eval(str(self.app.defaults["tools_paint_connect"])))
+            connect = self.parse_bool(self.app.defaults["tools_paint_connect"])
 
         if 'contour' in args:
-            try:
-                par = args['contour'].capitalize()
-            except AttributeError:
-                par = args['contour']
-            contour = bool(eval(par))
+            contour = self.parse_bool(args['contour'], 'contour')
         else:
-            contour = bool(eval(str(self.app.defaults["tools_paint_contour"])))
+            contour = self.parse_bool(self.app.defaults["tools_paint_contour"])
 
         if 'outname' in args:
             outname = args['outname']
@@ -166,9 +158,13 @@ class TclCommandPaint(TclCommand):
             select = _("Reference Object")
 
         try:
-            tools = [float(eval(dia)) for dia in tooldia.split(",") if dia != '']
+            tools = [float(dia) for dia in tooldia.split(",") if dia != '']
         except AttributeError:
             tools = [float(tooldia)]
+        except ValueError:
+            self.raise_tcl_error('%s Got: %s' % (_("Expected a list of tool diameters like -tooldia 0.1,0.2."),
+                                                 str(tooldia)))
+            return 'fail'
         # store here the default data for Geometry Data
         default_data = {}
         default_data.update({
@@ -249,7 +245,12 @@ class TclCommandPaint(TclCommand):
                 self.raise_tcl_error('%s Got: %s' %
                                      (_("Expected a tuple value like -single 3.2,0.1."), str(args['single'])))
             else:
-                coords_xy = [float(eval(a)) for a in args['single'].split(",") if a != '']
+                try:
+                    coords_xy = [float(a) for a in args['single'].split(",") if a != '']
+                except ValueError:
+                    self.raise_tcl_error('%s Got: %s' %
+                                         (_("Expected a tuple value like -single 3.2,0.1."), str(args['single'])))
+                    return 'fail'
 
                 if coords_xy and len(coords_xy) != 2:
                     self.raise_tcl_error('%s Got: %s' %
@@ -1,4 +1,5 @@
 from tclCommands.TclCommand import TclCommand
+from appCommon.StepRepeat import StepRepeat
 
 import shapely.affinity as affinity
 
@@ -113,11 +114,7 @@ class TclCommandPanelize(TclCommand):
             outname = name + '_panelized'
 
         if 'use_thread' in args:
-            try:
-                par = args['use_thread'].capitalize()
-            except AttributeError:
-                par = args['use_thread']
-            threaded = bool(eval(par))
+            threaded = self.parse_bool(args['use_thread'], 'use_thread')
         else:
             threaded = False
 
@@ -282,6 +279,10 @@ class TclCommandPanelize(TclCommand):
                             currentx += lenghtx
                         currenty += lenghty
 
+                    if obj.kind != 'geometry' or obj.multigeo is False:
+                        # the copies are one after the other so the source is plotted once for all of them
+                        obj_fin.set_step_repeat(StepRepeat(columns, rows, lenghtx, lenghty))
+
                 if obj.kind == 'excellon':
                     self.app.app_obj.new_object("excellon", outname, job_init_excellon, plot=False, autoselected=True)
                 else:
@@ -293,7 +294,7 @@ class TclCommandPanelize(TclCommand):
             def job_thread(app_obj):
                 try:
                     panelize_2()
-                    app_obj.inform.emit('[success]' % _("Done."))
+                    app_obj.inform.emit('[success] %s' % _("Done."))
                 except Exception as ee:
                     log.debug(str(ee))
                     return
@@ -302,4 +303,4 @@ class TclCommandPanelize(TclCommand):
             self.app.worker_task.emit({'fcn': job_thread, 'params': [self.app]})
         else:
             panelize_2()
-            self.app.inform.emit('[success]' % _("Done."))
+            self.app.inform.emit('[success] %s' % _("Done."))
@@ -49,11 +49,7 @@ class TclCommandPlotAll(TclCommandSignaled):
         """
 
         if 'use_thread' in args:
-            try:
-                par = args['use_thread'].capitalize()
-            except AttributeError:
-                par = args['use_thread']
-            threaded = bool(eval(par))
+            threaded = self.parse_bool(args['use_thread'], 'use_thread')
         else:
             threaded = False
 
@@ -63,11 +59,7 @@ class TclCommandPlotAll(TclCommandSignaled):
                 if args['plot_status'] is None:
                     plot_status = True
                 else:
-                    try:
-                        par = args['plot_status'].capitalize()
-                    except AttributeError:
-                        par = args['plot_status']
-                    plot_status = bool(eval(par))
+                    plot_status = self.parse_bool(args['plot_status'], 'plot_status')
             except KeyError:
                 plot_status = True
 
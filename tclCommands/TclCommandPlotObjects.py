@@ -59,7 +59,7 @@ class TclCommandPlotObjects(TclCommand):
             if args['plot_status'] is None:
                 plot_status = True
             else:
-                plot_status = bool(eval(args['plot_status']))
+                plot_status = self.parse_bool(args['plot_status'], 'plot_status')
         else:
             plot_status = True
 
@@ -1,6 +1,7 @@
 from tclCommands.TclCommand import TclCommand
 
 import collections
+from ast import literal_eval
 import logging
 
 import gettext
@@ -99,7 +100,7 @@ class TclCommandScale(TclCommand):
                 point = (c_x, c_y)
             else:
                 try:
-                    point = eval(args['origin'])
+                    point = literal_eval(args['origin'].strip())
                     if not isinstance(point, tuple):
                         raise Exception
                 except Exception as e:
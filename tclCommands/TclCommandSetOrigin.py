@@ -82,10 +82,13 @@ class TclCommandSetOrigin(TclCommand):
                 loc = [0, 0]
         elif 'loc' in args:
             try:
-                location = [float(eval(coord)) for coord in str(args['loc']).split(",") if coord != '']
+                location = [float(coord) for coord in str(args['loc']).split(",") if coord != '']
             except AttributeError as e:
                 log.debug("TclCommandSetOrigin.execute --> %s" % str(e))
                 location = (0, 0)
+            except ValueError:
+                self.raise_tcl_error('%s: %s' % (_("Expected a pair of (x, y) coordinates. Got"), str(args['loc'])))
+                return 'fail'
 
             loc.append(location[0])
             loc.append(location[1])
@@ -69,11 +69,7 @@ class TclCommandWriteGCode(TclCommandSignaled):
         postamble = args['postamble'] if 'postamble' in args else ''
 
         if 'muted' in args:
-            try:
-                par = args['muted'].capitalize()
-            except AttributeError:
-                par = args['muted']
-            muted = bool(eval(par))
+            muted = self.parse_bool(args['muted'], 'muted')
         else:
             muted = False
 
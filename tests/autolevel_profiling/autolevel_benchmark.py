@@ -0,0 +1,52 @@
+# ##########################################################
+# Times the autolevelling of a large GCode job
+# Usage: python autolevel_benchmark.py [lines_nr]
+# ##########################################################
+
+import sys
+import time
+from io import StringIO
+
+import numpy as np
+
+sys.path.append('../../')
+
+from appObjects.FlatCAMCNCJob import CNCJobObject
+from appCommon.bilinearInterpolator import bilinearInterpolator
+
+
+def make_gcode(lines_nr):
+    # a random walk of short moves, like the isolation paths, and a long move from time to time
+    steps = (np.random.rand(lines_nr, 2) - 0.5) * 2
+    steps[::100] *= 40
+    pts = np.abs(np.cumsum(steps, axis=0)) % 100
+    body = ['G01 X%.4fY%.4f\n' % (x, y) for x, y in pts]
+    return 'G21\nG90\nG94\nG01 F100.00\nG00 Z2.0000\nG00 X0.0000Y0.0000\nG01 Z-0.1000\n' + ''.join(body) + 'M05\n'
+
+
+def probe_grid(rows, cols):
+    xs, ys = np.meshgrid(np.linspace(0, 100, cols), np.linspace(0, 100, rows))
+    heights = 0.05 * np.sin(xs / 20.0) * np.cos(ys / 30.0)
+    return np.column_stack((xs.ravel(), ys.ravel(), heights.ravel()))
+
+
+if __name__ == '__main__':
+    lines_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    gcode = make_gcode(lines_nr)
+    probe_pts = probe_grid(10, 10)
+    step = 100 / 9
+
+    for method in ['bilinear', 'voronoi']:
+        if method == 'bilinear':
+            height_fcn = bilinearInterpolator(probe_pts).interpolate_many
+        else:
+            grid = CNCJobObject.LocationsGrid(probe_pts[:, :2])
+
+            def height_fcn(xy):
+                return CNCJobObject.autolevell_voronoi(probe_pts, xy, grid=grid)
+
+        t0 = time.time()
+        out_lines = 0
+        for block in CNCJobObject.autolevell_gcode_lines(StringIO(gcode), height_fcn=height_fcn, step=step):
+            out_lines += block.count('\n')
+        print("%s: %d lines in, %d lines out, %.2f s" % (method, lines_nr, out_lines, time.time() - t0))
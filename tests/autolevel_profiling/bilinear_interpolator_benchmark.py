@@ -0,0 +1,36 @@
+# ##########################################################
+# Times the loading of a probed grid in the bilinearInterpolator
+# and the interpolation of a large number of points
+# Usage: python bilinear_interpolator_benchmark.py [grid_size] [points_nr]
+# ##########################################################
+
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('../../')
+
+from appCommon.bilinearInterpolator import bilinearInterpolator
+
+
+if __name__ == '__main__':
+    grid_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    points_nr = int(sys.argv[2]) if len(sys.argv) > 2 else 2000000
+
+    xs, ys = np.meshgrid(np.linspace(0, 100, grid_size), np.linspace(0, 100, grid_size))
+    heights = 0.05 * np.sin(xs / 20.0) * np.cos(ys / 30.0)
+    probe_pts = np.column_stack((xs.ravel(), ys.ravel(), heights.ravel()))
+    # the probed locations are never exactly on the grid
+    probe_pts[:, :2] += np.random.uniform(-0.001, 0.001, (len(probe_pts), 2))
+    probe_pts = np.random.permutation(probe_pts)
+
+    t0 = time.time()
+    interp = bilinearInterpolator(probe_pts)
+    print("load: %dx%d grid, %.4f s" % (grid_size, grid_size, time.time() - t0))
+
+    pts = np.random.rand(points_nr, 2) * 110 - 5
+    t0 = time.time()
+    interp.interpolate_many(pts)
+    elapsed = time.time() - t0
+    print("interpolate_many: %d points, %.2f s, %.1fM points/s" % (points_nr, elapsed, points_nr / elapsed / 1e6))
@@ -5,10 +5,12 @@ import matplotlib.pyplot as plt
 import numpy as np
 import io
 from matplotlib.backends.backend_agg import FigureCanvasAgg
-from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 import cProfile
 import sys
+import time
+import tracemalloc
 
 
 def gen_data():
@@ -77,6 +79,84 @@ def small_plot(data):
 
     return img
 
+def gen_shapes():
+    from shapely.geometry import Point, LineString
+
+    N = 5000
+    x = np.random.rand(N) * 100
+    y = np.random.rand(N) * 100
+
+    polygons = [Point(px, py).buffer(0.5 + np.random.rand(), resolution=16) for px, py in zip(x, y)]
+    lines = [LineString(np.random.rand(50, 2) * 100) for _ in range(N)]
+    return polygons, lines
+
+
+def vispy_plot(shapes):
+    """
+    Adds the shapes to a ShapeCollectionVisual and times the buffers build and the redraw.
+    Runs headless, on a fake canvas.
+    """
+    sys.path.append('../../')
+    from vispy.gloo.context import FakeCanvas
+    from appGUI.VisPyVisuals import ShapeCollectionVisual
+
+    canvas = FakeCanvas()
+    polygons, lines = shapes
+
+    collection = ShapeCollectionVisual(layers=2, pool=None)
+
+    tracemalloc.start()
+    t0 = time.time()
+    for geo in polygons:
+        collection.add(geo, color='#000000FF', face_color='#BBF268BF', update=False)
+    for geo in lines:
+        collection.add(geo, color='#4650BDFF', update=False)
+    collection.redraw()
+    t1 = time.time()
+    collection.redraw()
+    t2 = time.time()
+    collection.update_color(new_mesh_color='#FF0000BF', new_line_color='#0000FFFF')
+    t3 = time.time()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print("Add and first redraw: %.3f s" % (t1 - t0))
+    print("Redraw: %.3f s" % (t2 - t1))
+    print("Update colors: %.3f s" % (t3 - t2))
+    print("Peak memory: %.1f MB" % (peak / 1e6))
+
+
+def vispy_toggle():
+    """
+    Times the visibility toggle of one group of shapes for growing collections. The toggle cost has to stay the
+    same whatever the collection size.
+    """
+    sys.path.append('../../')
+    from vispy.gloo.context import FakeCanvas
+    from shapely.geometry import Point
+    from appGUI.VisPyVisuals import ShapeCollectionVisual, ShapeGroup
+
+    canvas = FakeCanvas()
+
+    for groups_nr in [10, 40, 160]:
+        collection = ShapeCollectionVisual(layers=2, pool=None)
+        groups = [ShapeGroup(collection) for _ in range(groups_nr)]
+        for group in groups:
+            for px, py in np.random.rand(100, 2) * 100:
+                group.add(shape=Point(px, py).buffer(0.5, resolution=16), color='#000000FF',
+                          face_color='#BBF268BF')
+        collection.redraw()
+
+        t0 = time.time()
+        groups[0].visible = False
+        groups[0].visible = True
+        t1 = time.time()
+
+        print("%d shapes. Toggle: %.2f ms. Update: %.2f ms, %d rows uploaded" %
+              (groups_nr * 100, (t1 - t0) * 500, collection.update_stats['time'] * 1000,
+               collection.update_stats['rows']))
+
+
 def doit():
     d = gen_data()
     img = large_plot(d)
@@ -85,6 +165,13 @@ def doit():
 
 if __name__ == "__main__":
 
+    if sys.argv[1] == 'vispy':
+        vispy_plot(gen_shapes())
+        sys.exit()
+    if sys.argv[1] == 'vispy_toggle':
+        vispy_toggle()
+        sys.exit()
+
     d = gen_data()
 
     if sys.argv[1] == 'large':
@@ -0,0 +1,49 @@
+# ##########################################################
+# Times the parsing of a large GCode file into the CNCJob geometry
+# Usage: python gcode_parse_benchmark.py [lines_nr]
+# ##########################################################
+
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('../')
+sys.path.append('../../')
+
+from camlib import CNCjob
+from profiling_app import make_object
+
+
+def make_gcode(lines_nr):
+    # a random walk of short cuts, lifting the tool every 50 moves and with an arc from time to time
+    pts = np.abs(np.cumsum((np.random.rand(lines_nr, 2) - 0.5) * 2, axis=0)) % 100
+    gcode = ['G21', 'G90', 'G94', 'G01 F100.00', 'G00 Z2.0000']
+    for nr, (x, y) in enumerate(pts):
+        if nr % 50 == 0:
+            gcode += ['G00 Z2.0000', 'G00 X%.4fY%.4f' % (x, y), 'G01 Z-0.1000']
+        elif nr % 97 == 0:
+            gcode.append('G02 X%.4fY%.4fI0.5000J0.5000' % (x, y))
+        else:
+            gcode.append('G01 X%.4fY%.4f' % (x, y))
+    return '\n'.join(gcode + ['M05']) + '\n'
+
+
+def make_job(gcode):
+    job = make_object(CNCjob, gcode=gcode, toolchange_xy_type='geometry', origin_kind='geometry', exc_tools={},
+                      units='MM', steps_per_circle=16)
+    job.app.defaults.update({'geometry_toolchangexy': '', 'tools_drill_toolchangexy': ''})
+    return job
+
+
+if __name__ == '__main__':
+    lines_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    job = make_job(make_gcode(lines_nr))
+
+    t0 = time.time()
+    moves = job.gcode_parse_moves(job.gcode)
+    t1 = time.time()
+    geometry = job.gcode_moves_geometry(moves)
+    t2 = time.time()
+    print("moves: %d lines, %d moves, %.2f s" % (lines_nr, len(moves), t1 - t0))
+    print("geometry: %d paths, %.2f s" % (len(geometry), t2 - t1))
@@ -0,0 +1,78 @@
+# This script compares the cost of selecting the parsing step of each Gerber statement: the former chain of regex
+# searches (in the order of Gerber.parse_lines()) against the leading character dispatch table and the coordinates
+# fast path. If line_profiler is installed, Gerber.parse_lines() is also profiled line by line.
+# Run: python gerber_dispatch_profile.py [repeats]
+
+import sys
+import time
+import logging
+sys.path.append('../')
+sys.path.append('../../')
+repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+sys.argv = sys.argv[:1]
+
+from profiling_app import install_app
+install_app()
+
+from appParsers.ParseGerber import Gerber, parse_gerber_coordinates
+
+logging.getLogger('base').setLevel(logging.WARNING)
+logging.getLogger('base2').setLevel(logging.WARNING)
+
+g = Gerber()
+with open("gerber1.gbr", 'r') as f:
+    statements = list(Gerber.gerber_statements(f)) * repeats
+
+regex_chain = [g.comm_re, g.lpol_re, g.fmt_re, g.mode_re, g.fmt_re_alt, g.fmt_re_orcad, g.units_re, g.absrel_re,
+               g.am1_re, g.ad_re, g.opcode_re, g.tool_re, g.regionon_re, g.regionoff_re, g.interp_re, g.lin_re,
+               g.quad_re, g.circ_re, g.eof_re]
+step_patterns = [('comm', g.comm_re), ('lpol', g.lpol_re), ('mode', g.mode_re), ('units', g.units_re),
+                 ('absrel', g.absrel_re), ('am', g.am1_re), ('ad', g.ad_re), ('opcode', g.opcode_re),
+                 ('tool', g.tool_re), ('region', g.regionon_re), ('region', g.regionoff_re),
+                 ('interp', g.interp_re), ('lin', g.lin_re), ('quad', g.quad_re), ('circ', g.circ_re),
+                 ('eof', g.eof_re)]
+
+
+def chain_select():
+    searches = 0
+    for stat in statements:
+        for pattern in regex_chain:
+            searches += 1
+            if pattern.search(stat):
+                break
+    return searches
+
+
+def dispatch_select():
+    searches = 0
+    no_steps = frozenset()
+    for stat in statements:
+        steps = g.stat_dispatch.get(stat[:1], no_steps)
+        if 'lin' in steps and stat[0] != 'G' and parse_gerber_coordinates(stat) is not None:
+            continue
+        if 'FS' in stat:
+            searches += 1
+            if g.fmt_re.search(stat):
+                continue
+        for step, pattern in step_patterns:
+            if step in steps:
+                searches += 1
+                if pattern.search(stat):
+                    break
+    return searches
+
+
+print("Statements: %d" % len(statements))
+for name, fcn in (("regex chain", chain_select), ("dispatch table", dispatch_select)):
+    t0 = time.perf_counter()
+    nr_searches = fcn()
+    print("%16s: %8.3f s, %9d regex searches" % (name, time.perf_counter() - t0, nr_searches))
+
+try:
+    from line_profiler import LineProfiler
+except ImportError:
+    print("Install line_profiler for the line by line profile of Gerber.parse_lines()")
+else:
+    lp = LineProfiler(Gerber.parse_lines)
+    lp.runcall(Gerber().parse_file, "gerber1.gbr")
+    lp.print_stats()
@@ -0,0 +1,101 @@
+# This script measures the time and the peak memory of the Gerber parser on gerber1.gbr scaled up to large sizes.
+# The scaled file is made by repeating the body of gerber1.gbr.
+# Run: python gerber_parsing_benchmark.py [repeats ...]
+
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+import logging
+sys.path.append('../')
+sys.path.append('../../')
+sys.argv = sys.argv[:1] + [a for a in sys.argv[1:] if a.isdigit()]
+
+from profiling_app import install_app
+install_app()
+
+from appParsers.ParseGerber import Gerber
+
+logging.getLogger('base').setLevel(logging.WARNING)
+logging.getLogger('base2').setLevel(logging.WARNING)
+
+
+def make_scaled_file(repeats):
+    with open("gerber1.gbr", 'r') as f:
+        lines = f.readlines()
+
+    header = [ln for ln in lines if ln.startswith('%') and ('AD' in ln or 'FS' in ln or 'MO' in ln)]
+    body = [ln for ln in lines if ln not in header and not ln.startswith('M0')]
+
+    fd, path = tempfile.mkstemp(suffix='.gbr')
+    with os.fdopen(fd, 'w') as f:
+        f.writelines(header)
+        for __ in range(repeats):
+            f.writelines(body)
+        f.write('M02*\n')
+    return path
+
+
+def list_tokenizer(path):
+    # the former approach: the whole file is materialized as a list of statements and the source is built with +=
+    source = ''
+    with open(path, 'r') as gfile:
+        lines = list(Gerber.gerber_statements(gfile))
+    for line in lines:
+        source += line + '\n'
+    return source
+
+
+def stream_tokenizer(path):
+    # the Gerber.parse_lines() approach: the statements are streamed and the source is joined in blocks
+    blocks = []
+    chunk = []
+    with open(path, 'r') as gfile:
+        for line in Gerber.gerber_statements(gfile):
+            chunk.append(line)
+            if len(chunk) == 4096:
+                chunk.append('')
+                blocks.append('\n'.join(chunk))
+                chunk = []
+    chunk.append('')
+    blocks.append('\n'.join(chunk))
+    return ''.join(blocks)
+
+
+def measure(fcn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fcn(*args)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def parse(path):
+    g = Gerber()
+    g.parse_file(path)
+
+
+repeats_list = [int(a) for a in sys.argv[1:]] or [1, 10, 100, 1000]
+
+print("Tokenizer")
+print("%10s %10s %14s %14s %14s %14s" % ("repeats", "size [MB]", "list [s]", "list [MB]", "stream [s]", "stream [MB]"))
+for repeats in repeats_list:
+    fpath = make_scaled_file(repeats)
+    size = os.path.getsize(fpath) / 1e6
+    t_list, m_list = measure(list_tokenizer, fpath)
+    t_stream, m_stream = measure(stream_tokenizer, fpath)
+    print("%10d %10.2f %14.3f %14.1f %14.3f %14.1f" % (repeats, size, t_list, m_list, t_stream, m_stream))
+    os.remove(fpath)
+
+print("Full parse (Gerber.parse_file)")
+print("%10s %10s %14s" % ("repeats", "size [MB]", "time [s]"))
+for repeats in repeats_list[:3]:
+    fpath = make_scaled_file(repeats)
+    size = os.path.getsize(fpath) / 1e6
+    t0 = time.perf_counter()
+    parse(fpath)
+    print("%10d %10.2f %14.3f" % (repeats, size, time.perf_counter() - t0))
+    os.remove(fpath)
@@ -0,0 +1,89 @@
+# This script measures Gerber.scale(), offset() and rotate() on a panel of pads and tracks, against the former
+# transform of each element with shapely.affinity while walking the nested lists and the apertures.
+# With Shapely 2 installed the transforms are vectorized (GeometryBatch); with Shapely 1.x they are not.
+# Run: python gerber_transform_benchmark.py [primitives_nr]
+
+import sys
+import time
+import logging
+sys.path.append('../')
+sys.path.append('../../')
+primitives_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+sys.argv = sys.argv[:1]
+
+import numpy as np
+import shapely
+import shapely.affinity as affinity
+from shapely.geometry import Point, LineString
+
+from profiling_app import install_app
+install_app()
+
+from appParsers.ParseGerber import Gerber
+
+logging.getLogger('base').setLevel(logging.WARNING)
+logging.getLogger('base2').setLevel(logging.WARNING)
+
+
+def make_gerber():
+    g = Gerber()
+    pads, tracks = [], []
+    for i in range(primitives_nr // 2):
+        x, y = (i % 500) * 2.0, (i // 500) * 2.0
+        pads.append({'solid': Point(x, y).buffer(0.4, 16), 'follow': Point(x, y)})
+        track = LineString([(x, y), (x + 1.5, y + 0.5)])
+        tracks.append({'solid': track.buffer(0.1, 16), 'follow': track})
+    g.apertures = {
+        '10': {'type': 'C', 'size': 0.8, 'geometry': pads},
+        '11': {'type': 'C', 'size': 0.2, 'geometry': tracks}
+    }
+    g.solid_geometry = [el['solid'] for el in pads + tracks]
+    g.follow_geometry = [el['follow'] for el in pads + tracks]
+    return g
+
+
+def former_transform(g, transform):
+    # each element with shapely.affinity, as the transforms did before
+    el_count = [0]
+    geo_len = len(g.solid_geometry)
+
+    def transform_geom(obj):
+        if type(obj) is list:
+            return [transform_geom(el) for el in obj]
+        el_count[0] += 1
+        int(np.interp(el_count[0], [0, geo_len], [0, 99]))
+        return transform(obj)
+
+    g.solid_geometry = transform_geom(g.solid_geometry)
+    g.follow_geometry = transform_geom(g.follow_geometry)
+    for apid in g.apertures:
+        for geo_el in g.apertures[apid]['geometry']:
+            for key in ('solid', 'follow', 'clear'):
+                if key in geo_el:
+                    geo_el[key] = transform_geom(geo_el[key])
+
+
+print("Shapely %s, %d primitives" % (shapely.__version__, primitives_nr))
+
+cases = [
+    ('scale', lambda g: g.scale(2.0, 2.0, point=(1, 1)),
+     lambda geo: affinity.scale(geo, 2.0, 2.0, origin=(1, 1))),
+    ('offset', lambda g: g.offset((10.0, -5.0)),
+     lambda geo: affinity.translate(geo, xoff=10.0, yoff=-5.0)),
+    ('rotate', lambda g: g.rotate(30, (0, 0)),
+     lambda geo: affinity.rotate(geo, 30, origin=(0, 0))),
+]
+
+for name, new_transform, old_transform in cases:
+    g_old = make_gerber()
+    t0 = time.time()
+    former_transform(g_old, old_transform)
+    old_time = time.time() - t0
+
+    g_new = make_gerber()
+    t0 = time.time()
+    new_transform(g_new)
+    new_time = time.time() - t0
+
+    same = all(a.equals_exact(b, 1e-9) for a, b in zip(g_old.solid_geometry[::997], g_new.solid_geometry[::997]))
+    print("%-7s former: %6.2f s   batch: %6.2f s   same geometry: %s" % (name, old_time, new_time, same))
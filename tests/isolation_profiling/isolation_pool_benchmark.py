@@ -0,0 +1,61 @@
+# ##########################################################
+# Compares the serial isolation of a board, one envelope after the other as the Isolation Tool did, with
+# Geometry.isolation_geometry_pool() for process pools of increasing size
+# Usage: python isolation_pool_benchmark.py [pads_nr] [tools_nr] [passes_nr]
+# ##########################################################
+
+import sys
+import time
+import logging
+from multiprocessing import Pool, cpu_count
+
+from shapely.geometry import Point, LineString, box
+
+sys.path.append('../')
+sys.path.append('../../')
+
+from camlib import Geometry
+from profiling_app import make_object
+
+
+def make_board(pads_nr):
+    # round and rectangular pads, in a grid, with tracks between them
+    copper = []
+    for i in range(pads_nr):
+        x, y = 4.0 * (i % 50), 4.0 * (i // 50)
+        copper.append(Point(x, y).buffer(1.5, 32) if i % 2 else box(x - 1.5, y - 1.0, x + 1.5, y + 1.0))
+        copper.append(LineString([(x, y), (x + 4.0, y + 4.0)]).buffer(0.2, 32))
+    return copper
+
+
+if __name__ == '__main__':
+    logging.getLogger('base2').setLevel(logging.INFO)
+
+    pads_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tools_nr = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    passes_nr = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    copper = make_board(pads_nr)
+    envelopes = []
+    for tool in range(tools_nr):
+        tool_dia = 0.1 * (tool + 1)
+        for nr_pass in range(passes_nr):
+            envelopes.append((tool_dia * ((2 * nr_pass + 1) / 2.0000001) - (nr_pass * 0.1 * tool_dia), 2))
+    print("%d polygons, %d envelopes" % (len(copper), len(envelopes)))
+
+    geo = make_object(Geometry, geo_steps_per_circle=32)
+
+    t0 = time.time()
+    serial = [geo.isolation_geometry(offset, geometry=copper, iso_type=iso_type) for offset, iso_type in envelopes]
+    print("serial:            %.2f s" % (time.time() - t0))
+
+    processes = 1
+    while processes <= cpu_count():
+        geo.app.pool = Pool(processes)
+        t0 = time.time()
+        pooled = geo.isolation_geometry_pool(copper, envelopes)
+        print("pool of %2d:        %.2f s" % (processes, time.time() - t0))
+        geo.app.pool.terminate()
+        processes *= 2
+
+    print("Same envelopes: %s" % all(abs(a.area - b.area) < 1e-6 * a.area for a, b in zip(serial, pooled)))
@@ -3,6 +3,7 @@ from shapely.ops import unary_union
 from matplotlib.pyplot import plot, subplot, show, axes
 from matplotlib.axes import *
 from camlib import *
+from descartes.patch import PolygonPatch
 
 
 def plotg2(geo, solid_poly=False, color="black", linestyle='solid'):
@@ -0,0 +1,64 @@
+# ##########################################################
+# Compares the offset rings of Geometry.clear_polygon(), computed as offsets of the polygon, with the rings made
+# by shrinking each level again, as it was done before, on the tests/test_paint.py geometry and on a copper pour
+# Usage: python clear_polygon_benchmark.py [tooldia]
+# ##########################################################
+
+import sys
+import time
+import logging
+
+from shapely.geometry import Polygon, Point, box
+from shapely.ops import unary_union
+
+sys.path.append('../')
+sys.path.append('../../')
+
+from camlib import Geometry, FlatCAMRTreeStorage
+from profiling_app import make_object
+
+
+def successive_clear_polygon(polygon, tooldia, steps_per_circle, overlap):
+    # the rings made by shrinking the previous level, inserted in the storage one by one
+    def get_pts(o):
+        return [o.coords[0], o.coords[-1]]
+
+    geoms = FlatCAMRTreeStorage()
+    geoms.get_points = get_pts
+
+    current = polygon.buffer(-tooldia / 1.999999, steps_per_circle)
+    while current.area > 0:
+        for p in getattr(current, 'geoms', [current]):
+            geoms.insert(p.exterior)
+            for i in p.interiors:
+                geoms.insert(i)
+        current = current.buffer(-tooldia * (1 - overlap), steps_per_circle)
+    return geoms
+
+
+if __name__ == '__main__':
+    logging.getLogger('base2').setLevel(logging.INFO)
+    tooldia = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+
+    pads = unary_union([Point(5 + 4.3 * i, 5 + 3.7 * j).buffer(0.8, 16) for i in range(20) for j in range(18)])
+    polygons = {
+        'test_paint': Polygon([[0, 0], [0, 5], [5, 5], [5, 0]], [[[2, 1], [3, 1], [3, 4], [2, 4]]]),
+        'pour': box(0, 0, 95, 75).difference(pads),
+    }
+
+    geo = make_object(Geometry)
+
+    for name, polygon in polygons.items():
+        t0 = time.time()
+        before = successive_clear_polygon(polygon, tooldia, 16, 0.15)
+        before_time = time.time() - t0
+
+        t0 = time.time()
+        after = geo.clear_polygon(polygon, tooldia, 16, overlap=0.15, connect=False)
+        after_time = time.time() - t0
+
+        before_rings, after_rings = list(before.get_objects()), list(after.get_objects())
+        before_length, after_length = sum(r.length for r in before_rings), sum(r.length for r in after_rings)
+        print("%-12s successive: %4d rings %8.3fs   offsets: %4d rings %8.3fs   speed-up %.1f   length change %.3f%%" %
+              (name, len(before_rings), before_time, len(after_rings), after_time, before_time / after_time,
+               100.0 * (after_length - before_length) / before_length))
@@ -0,0 +1,60 @@
+# ##########################################################
+# Compares the serial clearing of the polygons, as in the Paint and NCC Tools, with the clearing in process pools
+# of increasing size
+# Usage: python clear_pool_benchmark.py [pads_nr] [method]
+# ##########################################################
+
+import sys
+import time
+import logging
+from multiprocessing import Pool, cpu_count
+
+from shapely.geometry import Point, box
+
+sys.path.append('../')
+sys.path.append('../../')
+
+from camlib import Geometry
+from profiling_app import make_object
+
+
+def make_pads(pads_nr):
+    # round and rectangular pads, in a grid
+    pads = []
+    for i in range(pads_nr):
+        x, y = 4.0 * (i % 50), 4.0 * (i // 50)
+        pads.append(Point(x, y).buffer(1.5, 32) if i % 2 else box(x - 1.5, y - 1.0, x + 1.5, y + 1.0))
+    return pads
+
+
+if __name__ == '__main__':
+    logging.getLogger('base2').setLevel(logging.INFO)
+
+    pads_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    method = sys.argv[2] if len(sys.argv) > 2 else 'standard'
+
+    polygons = make_pads(pads_nr)
+    params = dict(tooldia=0.1, steps_per_circle=32, overlap=0.2, connect=True, contour=True)
+
+    geo = make_object(Geometry)
+    serial_method = {
+        'standard': geo.clear_polygon,
+        'seed': geo.clear_polygon2,
+        'lines': geo.clear_polygon3,
+    }[method]
+
+    t0 = time.time()
+    for polygon in polygons:
+        serial_method(polygon, **params)
+    serial_time = time.time() - t0
+    print("%-10s %8.2fs" % ('serial', serial_time))
+
+    processes = 1
+    while processes <= cpu_count():
+        with Pool(processes) as pool:
+            geo.app.pool = pool
+            t0 = time.time()
+            geo.clear_polygons_pool(polygons, method, **params)
+            pool_time = time.time() - t0
+        print("%-10s %8.2fs  speed-up %.2f" % ('pool %d' % processes, pool_time, serial_time / pool_time))
+        processes *= 2
@@ -0,0 +1,77 @@
+# Minimal stand-in for the FlatCAM App object, used by the tests and the profiling scripts to run the parsers and
+# camlib without starting the GUI. Usage:
+#
+#     from profiling_app import install_app
+#     install_app()
+#
+# or, for an object with an app of its own, that is not installed on its class:
+#
+#     from profiling_app import make_object
+#     geo = make_object(Geometry, geo_steps_per_circle=16)
+
+import os
+import logging
+
+from defaults import FlatCAMDefaults
+
+
+class _Signal:
+    def emit(self, *args):
+        pass
+
+
+class _NoOp:
+    def __getattr__(self, item):
+        return lambda *args, **kwargs: _NoOp()
+
+
+class ProfilingApp:
+    decimals = 4
+    is_legacy = False
+    abort_flag = False
+
+    def __init__(self):
+        from appPreProcessor import load_preprocessors, preprocessors
+
+        self.log = logging.getLogger('base')
+        self.defaults = dict(FlatCAMDefaults.factory_defaults)
+        self.inform = _Signal()
+        self.inform_shell = _Signal()
+        self.proc_container = _NoOp()
+        self.plotcanvas = _NoOp()
+
+        # the preprocessors of the package, loaded once in a process
+        self.data_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        if not preprocessors:
+            load_preprocessors(self)
+        self.preprocessors = preprocessors
+
+
+def install_app():
+    from camlib import Geometry, CNCjob
+    from appParsers.ParseGerber import Gerber
+    from appParsers.ParseExcellon import Excellon
+
+    app = ProfilingApp()
+    for cls in (Geometry, Gerber, Excellon, CNCjob):
+        cls.app = app
+    return app
+
+
+def make_object(cls, *args, app=None, **attributes):
+    """
+    Makes an object with its constructor, on an app of its own: the object is of a subclass of cls that has the app.
+
+    :param cls:         the class of the object, e.g. camlib.Geometry or camlib.CNCjob
+    :param args:        the arguments of the constructor
+    :param app:         the app of the object; a new ProfilingApp if None
+    :param attributes:  attributes set on the object after it is made
+    :return:            the object
+    """
+    if app is None:
+        app = ProfilingApp()
+
+    obj = type(cls.__name__, (cls,), {'app': app})(*args)
+    for name, value in attributes.items():
+        setattr(obj, name, value)
+    return obj
@@ -0,0 +1,52 @@
+# This script compares the R-tree based clearance check of the Rules Check Tool against the all-pairs check.
+# Run: python clearance_benchmark.py
+
+import sys
+import time
+from math import log
+sys.path.append('../../')
+
+from shapely.geometry import box
+from shapely.ops import nearest_points
+
+from appTools.ToolRulesCheck import RulesCheck
+
+
+def make_pads(side):
+    pads = []
+    for col in range(side):
+        for row in range(side):
+            pads.append(box(col * 1.2, row * 1.5, col * 1.2 + 1.0, row * 1.5 + 1.0))
+    return pads
+
+
+def all_pairs(geo_list, size):
+    points_list = set()
+    idx = 1
+    for geo in geo_list:
+        for s_geo in geo_list[idx:]:
+            if geo.distance(s_geo) < size:
+                loc_1, loc_2 = nearest_points(geo, s_geo)
+                points_list.add(((loc_1.x + loc_2.x) / 2, (loc_1.y + loc_2.y) / 2))
+        idx += 1
+    return points_list
+
+
+print("%8s %12s %12s %16s" % ("pads", "rtree [s]", "all-pairs [s]", "rtree / nlogn"))
+for side in (10, 20, 40, 80, 160):
+    pads = make_pads(side)
+    n = len(pads)
+
+    t0 = time.perf_counter()
+    RulesCheck.clearance_violations(pads, 0.25)
+    t_tree = time.perf_counter() - t0
+
+    # the all pairs check gets too slow to be run for the big boards
+    if n <= 1600:
+        t0 = time.perf_counter()
+        all_pairs(pads, 0.25)
+        t_pairs = '%.4f' % (time.perf_counter() - t0)
+    else:
+        t_pairs = '-'
+
+    print("%8d %12.4f %12s %16.3e" % (n, t_tree, t_pairs, t_tree / (n * log(n))))
@@ -0,0 +1,128 @@
+import unittest
+import os
+import re
+import tempfile
+from io import StringIO
+
+import numpy as np
+
+from appObjects.FlatCAMCNCJob import CNCJobObject
+from appCommon.bilinearInterpolator import bilinearInterpolator
+
+
+def plane(xy):
+    return 0.01 * xy[:, 0] - 0.02 * xy[:, 1] + 0.1
+
+
+class AutolevelTest(unittest.TestCase):
+
+    def setUp(self):
+        xs, ys = np.meshgrid(np.linspace(0, 30, 4), np.linspace(0, 20, 3))
+        xy = np.column_stack((xs.ravel(), ys.ravel()))
+        self.probe_pts = np.column_stack((xy, plane(xy)))
+
+    def autolevel(self, gcode, height_fcn, step):
+        return ''.join(CNCJobObject.autolevell_gcode_lines(StringIO(gcode), height_fcn=height_fcn, step=step,
+                                                           block_size=3))
+
+    def test_voronoi_nearest(self):
+        probe_pts = np.random.rand(50, 3) * 10
+        xy = np.random.rand(500, 2) * 10
+        nearest = np.argmin(((xy[:, None, :] - probe_pts[None, :, :2]) ** 2).sum(axis=2), axis=1)
+        np.testing.assert_allclose(CNCJobObject.autolevell_voronoi(probe_pts, xy, block_size=64 * 50),
+                                   probe_pts[nearest, 2])
+        # a budget smaller than a row of distances still searches one location at a time
+        np.testing.assert_allclose(CNCJobObject.autolevell_voronoi(probe_pts, xy, block_size=1), probe_pts[nearest, 2])
+
+    def test_voronoi_grid(self):
+        # two clusters far apart and locations out of the probed area are searched past the cells around them
+        probe_pts = np.vstack((np.random.rand(1000, 3), np.random.rand(1000, 3) + [100, 50, 0]))
+        xy = np.vstack((np.random.rand(500, 2) * 101, np.random.rand(100, 2) * 400 - 200))
+        nearest = np.argmin(((xy[:, None, :] - probe_pts[None, :, :2]) ** 2).sum(axis=2), axis=1)
+
+        grid = CNCJobObject.LocationsGrid(probe_pts[:, :2])
+        np.testing.assert_allclose(CNCJobObject.autolevell_voronoi(probe_pts, xy, grid=grid), probe_pts[nearest, 2])
+        np.testing.assert_allclose(CNCJobObject.autolevell_voronoi(probe_pts, xy, block_size=1), probe_pts[nearest, 2])
+
+    def test_probe_spacing(self):
+        probe_pts = np.vstack((self.probe_pts, self.probe_pts[:1]))
+        for block_size in (None, 1, 7 * len(probe_pts)):
+            self.assertAlmostEqual(CNCJobObject.al_probe_spacing(probe_pts, block_size=block_size), 10.0)
+        self.assertEqual(CNCJobObject.al_probe_spacing(probe_pts[:1]), np.inf)
+        self.assertEqual(CNCJobObject.al_probe_spacing(np.vstack((probe_pts[:1], probe_pts[:1]))), np.inf)
+
+        # the nearest pair of scattered points, and of two points far apart from a cluster
+        probe_pts = np.random.rand(300, 3) * 10
+        dist = np.hypot(*(probe_pts[:, None, :2] - probe_pts[None, :, :2]).transpose(2, 0, 1))
+        self.assertAlmostEqual(CNCJobObject.al_probe_spacing(probe_pts), dist[dist > 0].min())
+        probe_pts = np.vstack((np.random.rand(50, 3) * 0.1, [[500, 0, 0], [500, 3, 0]]))
+        self.assertAlmostEqual(CNCJobObject.al_probe_spacing(probe_pts[50:]), 3.0)
+        dist = np.hypot(*(probe_pts[:, None, :2] - probe_pts[None, :, :2]).transpose(2, 0, 1))
+        self.assertAlmostEqual(CNCJobObject.al_probe_spacing(probe_pts), dist[dist > 0].min())
+
+    def test_gcode(self):
+        height_fcn = bilinearInterpolator(self.probe_pts).interpolate_many
+
+        gcode = '(comment X5Y5)\nG21\nG90\nG00 Z2.0000\nG00 X0.0000Y0.0000\nG01 Z-0.1000 F50.00\n' \
+                'G01 X25.0000Y0.0000\nX25.0000Y1.0000\nG00 Z2.0000\nM05\n'
+        result = self.autolevel(gcode, height_fcn, step=10.0).splitlines()
+
+        self.assertEqual(result[:3], ['(comment X5Y5)', 'G21', 'G90'])
+        self.assertEqual(result[-1], 'M05')
+        # the feedrate stays on the plunge line
+        self.assertEqual(result[5], 'G01 F50.00 X0.0000Y0.0000Z0.0000')
+
+        moves = [line for line in result if 'X' in line and not line.startswith('(')]
+        pts = np.array([[float(v) for v in re.findall(r'[XYZ]([+-]?\d*\.\d+)', line)] for line in moves])
+
+        # the 25 long move is split in 3 segments and each segment end follows the plane
+        np.testing.assert_allclose(pts[2:5, 0], [25 / 3, 50 / 3, 25], atol=1e-4)
+        np.testing.assert_allclose(pts[:, 2], np.where(pts[:, 2] > 1, 2.0, -0.1) + plane(pts[:, :2]), atol=1e-4)
+        self.assertEqual(len(result), 12)
+
+    def test_relative(self):
+        gcode = 'G91\nG01 Z-1.0\nG01 X100.0Y0.0\n'
+        self.assertEqual(self.autolevel(gcode, plane, step=1.0), gcode)
+
+
+class BilinearInterpolatorTest(unittest.TestCase):
+
+    def setUp(self):
+        xs, ys = np.meshgrid(np.linspace(0, 30, 7), np.linspace(-5, 20, 6))
+        xy = np.column_stack((xs.ravel(), ys.ravel()))
+        # probed points are not exactly on the grid
+        xy += np.random.uniform(-0.01, 0.01, xy.shape)
+        self.probe_pts = np.column_stack((xy, plane(xy)))
+
+    def test_grid(self):
+        interp = bilinearInterpolator(np.random.permutation(self.probe_pts))
+        self.assertEqual((interp.xCount, interp.yCount), (7, 6))
+
+        # each grid location holds the probed point that is closest to it
+        xs, ys = np.meshgrid(np.linspace(interp.xMin, interp.xMax, 7), np.linspace(interp.yMin, interp.yMax, 6),
+                             indexing='ij')
+        np.testing.assert_allclose(interp.probedGrid[:, :, 0], xs, atol=0.03)
+        np.testing.assert_allclose(interp.probedGrid[:, :, 1], ys, atol=0.03)
+
+    def test_not_grid(self):
+        # the points on a single line don't make a grid
+        with self.assertRaises(ValueError):
+            bilinearInterpolator([[0.0, 0.0, 0.1], [10.0, 0.0, 0.2], [20.0, 0.0, 0.3]])
+
+    def test_csv_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'points.csv')
+            np.savetxt(path, self.probe_pts, delimiter=',')
+            interp = bilinearInterpolator(path)
+        np.testing.assert_allclose(interp.probedGrid, bilinearInterpolator(self.probe_pts).probedGrid)
+
+    def test_interpolate_many(self):
+        interp = bilinearInterpolator(self.probe_pts)
+        xy = np.random.rand(1000, 2) * [30, 25] - [0, 5]
+        np.testing.assert_allclose(interp.interpolate_many(xy), plane(xy), atol=5e-3)
+        self.assertAlmostEqual(interp.Interpolate(xy[0]), plane(xy[:1])[0], places=2)
+
+        # outside of the grid the interpolation is linear along the edge, or the corner value
+        grid = interp.probedGrid
+        outside = np.array([[-10.0, 40.0], [40.0, grid[-1, 2, 1]]])
+        np.testing.assert_allclose(interp.interpolate_many(outside), [grid[0, -1, 2], grid[-1, 2, 2]])
@@ -0,0 +1,116 @@
+import unittest
+from shapely.geometry import Point, box
+from shapely.ops import unary_union
+
+from appCommon.BufferCache import BufferCache
+from camlib import Geometry
+from tests.profiling_app import make_object
+
+
+def make_geometry(geometry):
+    return make_object(Geometry, solid_geometry=geometry)
+
+
+class BufferCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = BufferCache(max_entries=4)
+        self.pads = [Point(i, 0).buffer(0.6) for i in range(5)]
+
+    def test_buffer(self):
+        obj = make_geometry(self.pads)
+        buffered = self.cache.buffer(obj, 0.2)
+        self.assertAlmostEqual(buffered.area, unary_union(self.pads).buffer(0.2).area)
+
+        # the same result is returned while the geometry is the same
+        self.assertIs(self.cache.buffer(obj, 0.2), buffered)
+        self.assertIsNot(self.cache.buffer(obj, 0.2, join_style=2), buffered)
+        self.assertIsNot(self.cache.buffer(obj, 0.3), buffered)
+        # the union is made for the first buffer only
+        self.assertEqual(self.cache.stats()['misses'], 4)
+        self.assertEqual(self.cache.stats()['hits'], 3)
+
+    def test_geometry_changed(self):
+        obj = make_geometry(self.pads)
+        buffered = self.cache.buffer(obj, 0.2)
+
+        obj.solid_geometry = self.pads[:2]
+        changed = self.cache.buffer(obj, 0.2)
+        self.assertIsNot(changed, buffered)
+        self.assertAlmostEqual(changed.area, unary_union(self.pads[:2]).buffer(0.2).area)
+        # the results made from the previous geometry are dropped
+        self.assertEqual(self.cache.stats()['entries'], 2)
+
+        # changes made in place
+        obj.solid_geometry.append(box(10, 10, 11, 11))
+        obj.geometry_changed()
+        self.assertAlmostEqual(self.cache.buffer(obj, 0.2).area,
+                               unary_union(self.pads[:2] + [box(10, 10, 11, 11)]).buffer(0.2).area)
+
+    def test_changed_in_place(self):
+        obj = make_geometry([box(0, 0, 1, 1)])
+        self.assertAlmostEqual(self.cache.union(obj).area, 1.0)
+
+        # the methods of the object give a new version to the geometry
+        obj.tools = {1: {'solid_geometry': []}}
+        obj.add_polygon([(2, 0), (3, 0), (3, 1), (2, 1)])
+        self.assertAlmostEqual(self.cache.union(obj).area, 2.0)
+
+        # the lists changed by other code are found by their length and their last item
+        obj.solid_geometry.append(box(4, 0, 5, 1))
+        self.assertAlmostEqual(self.cache.union(obj).area, 3.0)
+        obj.solid_geometry.pop()
+        self.assertAlmostEqual(self.cache.union(obj).area, 2.0)
+        self.assertEqual(self.cache.stats()['entries'], 1)
+
+    def test_shapely_owner(self):
+        # the Shapely geometry is keyed by content
+        self.assertIs(self.cache.buffer(box(0, 0, 1, 1), -0.1), self.cache.buffer(box(0, 0, 1, 1), -0.1))
+        self.assertIs(self.cache.union(list(self.pads)), self.cache.union([pad for pad in self.pads]))
+        self.assertIsNot(self.cache.union(self.pads), self.cache.union(self.pads[1:]))
+        self.assertAlmostEqual(self.cache.union([self.pads[:2], [self.pads[2]]]).area,
+                               unary_union(self.pads[:3]).area)
+
+    def test_lru(self):
+        objects = [make_geometry([box(i, 0, i + 1, 1)]) for i in range(6)]
+        for obj in objects:
+            self.cache.buffer(obj, 0.1)
+        self.assertEqual(self.cache.stats()['entries'], 4)
+
+        misses = self.cache.stats()['misses']
+        self.cache.buffer(objects[0], 0.1)
+        self.assertEqual(self.cache.stats()['misses'], misses + 1)
+        self.cache.buffer(objects[-1], 0.1)
+        self.assertEqual(self.cache.stats()['misses'], misses + 1)
+
+    def test_size(self):
+        cache = BufferCache(max_size=3 * len(box(0, 0, 1, 1).wkb))
+        objects = [make_geometry([box(i, 0, i + 1, 1)]) for i in range(5)]
+        for obj in objects:
+            cache.union(obj)
+        self.assertEqual(cache.stats()['entries'], 3)
+        self.assertEqual(cache.stats()['size'], 3 * len(box(0, 0, 1, 1).wkb))
+        self.assertIsNone(cache.lookup(objects[1], ('union', )))
+        self.assertIsNotNone(cache.lookup(objects[4], ('union', )))
+
+        # a result larger than the cache is not kept
+        cache.union(make_geometry([box(0, 0, 1, 1).buffer(1, 64)]))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_invalidate(self):
+        obj = make_geometry(self.pads)
+        other = make_geometry([box(0, 0, 1, 1)])
+        self.cache.union(obj)
+        self.cache.union(other)
+
+        self.cache.invalidate(obj)
+        self.assertEqual(self.cache.stats()['entries'], 1)
+        self.assertIsNone(self.cache.lookup(obj, ('union', )))
+        self.assertIsNotNone(self.cache.lookup(other, ('union', )))
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from shapely.geometry import Polygon, Point, LineString, box
+from shapely.ops import unary_union
+
+from camlib import Geometry, FlatCAMRTreeStorage
+from tests.profiling_app import make_object
+
+
+def successive_rings(polygon, tooldia, steps_per_circle, overlap):
+    # the offset rings made by shrinking each level again
+    current = polygon.buffer(-tooldia / 1.999999, steps_per_circle)
+    rings = []
+    while current.area > 0:
+        for p in getattr(current, 'geoms', [current]):
+            rings += [p.exterior] + list(p.interiors)
+        current = current.buffer(-tooldia * (1 - overlap), steps_per_circle)
+    return rings
+
+
+class ClearPolygonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.geo = make_object(Geometry)
+
+    def test_same_rings(self):
+        polygons = [
+            Polygon([[0, 0], [0, 5], [5, 5], [5, 0]], [[[2, 1], [3, 1], [3, 4], [2, 4]]]),
+            box(0, 0, 20, 10).difference(unary_union([Point(4 * i, 5).buffer(1.5) for i in range(1, 5)])),
+        ]
+        for polygon in polygons:
+            storage = self.geo.clear_polygon(polygon, 0.3, 16, overlap=0.15, connect=False)
+            rings = list(storage.get_objects())
+            expected = successive_rings(polygon, 0.3, 16, 0.15)
+
+            self.assertEqual(len(rings), len(expected))
+            self.assertLess(unary_union(rings).hausdorff_distance(unary_union(expected)), 0.01)
+
+    def test_too_small(self):
+        self.assertIsNone(self.geo.clear_polygon(Point(0, 0).buffer(0.1), 0.5, 16))
+
+    def test_insert_many(self):
+        def get_pts(o):
+            return [o.coords[0], o.coords[-1]]
+
+        lines = [LineString([(i, 0), (i, 1)]) for i in range(10)]
+        storage = FlatCAMRTreeStorage()
+        storage.get_points = get_pts
+        storage.insert_many(lines[:5])
+        storage.insert_many(lines[5:])
+
+        self.assertEqual(list(storage.get_objects()), lines)
+        self.assertEqual(storage.nearest((7.1, 1.2)), ((7.0, 1.0), lines[7]))
+
+        storage.remove(lines[7])
+        self.assertEqual(storage.nearest((7.1, 1.2))[1], lines[8])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from multiprocessing import Pool
+
+from shapely.geometry import Polygon, Point
+from shapely.ops import unary_union
+
+from camlib import Geometry
+from tests.profiling_app import ProfilingApp, make_object
+
+
+def pads(count):
+    return [Point(3.0 * (i % 10), 3.0 * (i // 10)).buffer(1.0) for i in range(count)]
+
+
+class ClearPolygonsPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = Pool(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.terminate()
+
+    def setUp(self):
+        self.geo = make_object(Geometry, app=ProfilingApp())
+        self.geo.app.pool = self.pool
+
+    def test_same_as_serial(self):
+        polygons = pads(6) + [Polygon([(0, 0), (10, 0), (10, 4), (0, 4)], [[(2, 1), (3, 1), (3, 2), (2, 2)]])]
+        serial_methods = {
+            'standard': self.geo.clear_polygon,
+            'seed': self.geo.clear_polygon2,
+            'lines': self.geo.clear_polygon3
+        }
+
+        for method, clear_method in serial_methods.items():
+            results = self.geo.clear_polygons_pool(polygons, method, tooldia=0.2, steps_per_circle=16,
+                                                   overlap=0.1, connect=False, contour=True)
+            self.assertEqual(len(results), len(polygons))
+
+            # the results are in the order of the polygons
+            for polygon, result in zip(polygons, results):
+                expected = clear_method(polygon, 0.2, 16, overlap=0.1, connect=False, contour=True)
+                self.assertTrue(unary_union(result).equals(unary_union(list(expected.get_objects()))))
+
+    def test_not_cleared(self):
+        # the tool is bigger than the second polygon
+        polygons = [Point(0, 0).buffer(2.0), Point(10, 0).buffer(0.05), Point(20, 0).buffer(2.0)]
+        results = self.geo.clear_polygons_pool(polygons, 'combo', tooldia=0.5, steps_per_circle=16)
+        self.assertIsNotNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertIsNotNone(results[2])
+
+    def test_abort(self):
+        self.geo.app.abort_flag = True
+        with self.assertRaises(Exception) as cm:
+            self.geo.clear_polygons_pool(pads(50), 'standard', tooldia=0.1, steps_per_circle=16)
+        self.assertEqual(type(cm.exception).__name__, 'GracefulException')
+
+    def test_job(self):
+        paths = Geometry.clear_polygon_job('lines', Point(0, 0).buffer(2.0).wkb, 0.2, 16, 0.1, True, True)
+        self.assertTrue(paths)
+        self.assertIsNone(Geometry.clear_polygon_job('seed', Point(0, 0).buffer(0.05).wkb, 0.5, 16, 0.1, True, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from camlib import CNCjob
+from tests.profiling_app import make_object
+
+
+def path_length(pts, path, start):
+    return np.hypot(*np.diff(np.vstack((start, pts[path])), axis=0).T).sum()
+
+
+class NearestNeighbourOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.job = make_object(CNCjob)
+        self.pts = np.random.rand(500, 2) * [100, 40]
+        self.locations = [tuple(pt) for pt in self.pts]
+
+    def assertGreedy(self, pts, path, start):
+        # each drill is the nearest of the remaining ones, as for the Travelling Salesman Algorithm
+        self.assertEqual(sorted(path), list(range(len(pts))))
+
+        current = np.array(start)
+        remaining = np.ones(len(pts), dtype=bool)
+        for idx in path:
+            dist = np.hypot(*(pts[remaining] - current).T)
+            self.assertAlmostEqual(np.hypot(*(pts[idx] - current)), dist.min())
+            remaining[idx] = False
+            current = pts[idx]
+
+    def test_greedy(self):
+        path = self.job.optimized_nearest_neighbour(self.locations, start=(-10.0, 0.0))
+        self.assertGreedy(self.pts, path, (-10.0, 0.0))
+
+    def test_clustered(self):
+        # two clusters far apart: the cells are sized for the clusters, not for the bounding box of both
+        pts = np.vstack((np.random.rand(300, 2) * 10, np.random.rand(300, 2) * 10 + 1000))
+        grid = CNCjob.LocationsGrid(pts)
+        self.assertLess(max(len(cell) for cell in grid.cells.values()), 20)
+
+        path = self.job.optimized_nearest_neighbour([tuple(pt) for pt in pts], start=(0.0, 0.0))
+        self.assertGreedy(pts, path, (0.0, 0.0))
+
+    def test_two_opt(self):
+        greedy = self.job.optimized_nearest_neighbour(self.locations, start=(0.0, 0.0))
+        path = self.job.optimized_nearest_neighbour(self.locations, start=(0.0, 0.0), opt_time=5)
+
+        self.assertEqual(sorted(path), list(range(len(self.pts))))
+        self.assertEqual(path[0], greedy[0])
+        self.assertLess(path_length(self.pts, path, (0, 0)), path_length(self.pts, greedy, (0, 0)))
+
+    def test_duplicates(self):
+        locations = [(1.0, 1.0)] * 4 + [(float(x), 0.0) for x in range(6)]
+        path = self.job.optimized_nearest_neighbour(locations, opt_time=1)
+        self.assertEqual(sorted(path), list(range(len(locations))))
+        self.assertEqual(path[0], 0)
+        self.assertEqual(self.job.optimized_nearest_neighbour([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from types import SimpleNamespace
+
+import numpy as np
+from shapely.geometry import Point
+
+from appHeadless import HeadlessApp
+from appObjects.FlatCAMCNCJob import CNCJobObject
+from tests.profiling_app import make_object
+
+
+def make_job(tools_gcode, ppname='default', include_header=True):
+    # a CNCJob object of an engine of its own, with what the export uses
+    with HeadlessApp() as app:
+        job = make_object(CNCJobObject, 'job', app=app, multitool=True, origin_kind='geometry',
+                          cnc_tools={uid: {'gcode': gcode, 'data': {'ppname_g': ppname}}
+                                     for uid, gcode in enumerate(tools_gcode)},
+                          gc_header='(header)\n', gc_start='G21\n')
+    app.defaults.update({'cncjob_prepend': '', 'cncjob_append': '', 'cncjob_footer': False,
+                         'cncjob_al_status': False, 'cncjob_line_ending': False})
+    app.preprocessors = {ppname: SimpleNamespace(include_header=include_header)}
+    return job
+
+
+class GCodeExportTest(unittest.TestCase):
+
+    tools_gcode = ['T1\nG01 X1 Y1\n', 'T2\nG01 X2 Y2\n']
+
+    def export(self, job, **kwargs):
+        return job.export_gcode(to_file=True, **kwargs).getvalue()
+
+    def test_program(self):
+        job = make_job(self.tools_gcode)
+        self.assertEqual(self.export(job, preamble='PRE', postamble='POST'),
+                         '(header)\nG21\n\nPRE\nT1\nG01 X1 Y1\nT2\nG01 X2 Y2\n\nPOST\n')
+        self.assertEqual(self.export(job), '(header)\nG21\n\nT1\nG01 X1 Y1\nT2\nG01 X2 Y2\n\n')
+        self.assertEqual(self.export(job, postamble='POST'), '(header)\nG21\n\nT1\nG01 X1 Y1\nT2\nG01 X2 Y2\n\nPOST\n')
+
+    def test_single_tool(self):
+        job = make_job(self.tools_gcode)
+        job.multitool = False
+        job.gcode = 'G00 X0 Y0\n'
+        self.assertEqual(self.export(job, preamble='PRE'), '(header)\nG21\n\nPRE\nG00 X0 Y0\n\n')
+
+    def test_no_header(self):
+        job = make_job(self.tools_gcode, include_header=False)
+        self.assertEqual(self.export(job, preamble='PRE', postamble='POST'),
+                         'PRE\nT1\nG01 X1 Y1\nT2\nG01 X2 Y2\n\nPOST')
+
+    def test_hpgl(self):
+        # the PA coordinates are made integers, also on a line split between the GCode of two tools
+        job = make_job(['IN;\nPA1.7,2.2;\nPA3.', '9,4.0;\nPU;'], ppname='hpgl')
+        self.assertEqual(self.export(job, preamble='PRE', postamble='POST'),
+                         '(header)\n\nG21\n\nPRE\nIN;\nPA1,2;\nPA3,4;\nPU;\n\nPOST')
+
+    def test_write_file(self):
+        job = make_job(self.tools_gcode)
+        expected = self.export(job, preamble='PRE')
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'job.nc')
+            job.export_gcode(filename, preamble='PRE')
+            with open(filename, 'r', newline='') as f:
+                self.assertEqual(f.read(), expected.replace('\n', os.linesep))
+
+            job.app.defaults['cncjob_line_ending'] = True
+            job.export_gcode(filename, preamble='PRE')
+            with open(filename, 'r', newline='') as f:
+                self.assertEqual(f.read(), expected.replace('\n', '\r\n'))
+
+            # a failed export leaves the old file and no temporary one
+            def failing_chunks():
+                yield 'G00 X0\n'
+                raise MemoryError
+
+            with self.assertRaises(MemoryError):
+                job.write_gcode(filename, failing_chunks())
+            with open(filename, 'r', newline='') as f:
+                self.assertEqual(f.read(), expected.replace('\n', '\r\n'))
+            self.assertEqual(os.listdir(tmp_dir), ['job.nc'])
+
+    def test_autolevel(self):
+        job = make_job(['T1\nG00 Z2\nG00 X0 Y0\nG01 Z-0.1\n', 'G01 X30 Y0\nG01 X30 Y20\nG00 Z2\n'])
+        expected_input = self.export(job)
+
+        job.app.defaults.update({'cncjob_al_status': True, 'cncjob_al_method': 'v'})
+        job.ui = None
+        job.pp_excellon_name = job.pp_geometry_name = 'default'
+        job.coords_decimals = 4
+        probe_pts = np.array([(0, 0, 0.0), (30, 0, 0.1), (0, 20, 0.2), (30, 20, 0.3)])
+        job.al_voronoi_geo_storage = {idx: {'point': Point(pt[:2]), 'height': pt[2]}
+                                      for idx, pt in enumerate(probe_pts)}
+
+        # the autolevelled program is made from the pieces, as from the whole program
+        expected = ''.join(CNCJobObject.autolevell_gcode_lines(
+            StringIO(expected_input), height_fcn=lambda xy: CNCJobObject.autolevell_voronoi(probe_pts, xy),
+            step=20.0))
+        self.assertEqual(self.export(job), expected)
+        self.assertNotEqual(expected, expected_input)
+
+    def test_lines(self):
+        chunks = ['G00 X1\nG0', '1 X2\n', '', 'G01 X3\r\nM', '2']
+        self.assertEqual(list(CNCJobObject.gcode_lines(chunks)), ''.join(chunks).splitlines())
+
+
+if __name__ == '__main__':
+    unittest.main()
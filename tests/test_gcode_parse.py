@@ -0,0 +1,92 @@
+import unittest
+import logging
+
+import numpy as np
+
+from camlib import CNCjob
+from tests.profiling_app import make_object
+
+logging.disable(logging.WARNING)
+
+
+def make_job(gcode, pp_geometry_name='default'):
+    # a CNCjob with what the G-Code parsing uses
+    job = make_object(CNCjob, gcode=gcode, pp_geometry_name=pp_geometry_name, toolchange_xy_type='geometry',
+                      origin_kind='geometry', exc_tools={}, units='IN', steps_per_circle=16)
+    job.app.defaults.update({'geometry_toolchangexy': '', 'tools_drill_toolchangexy': ''})
+    return job
+
+
+class GCodeTokenizerTest(unittest.TestCase):
+
+    gcode = 'G21\n(comment X5 Y5)\nG00 Z2.0\nG00 X1.0Y2.0 ; rapid\nG01 Z-0.1 F50\nX 1 0.5 Y-3\nGX1\n'
+
+    def test_words_table(self):
+        gcode = self.gcode.replace('GX1\n', '')
+        table = make_job(gcode).gcode_words_table(gcode)
+        np.testing.assert_equal(table[:, :4], [
+            [21, np.nan, np.nan, np.nan],
+            [np.nan, np.nan, np.nan, np.nan],
+            [0, np.nan, np.nan, 2.0],
+            [0, 1.0, 2.0, np.nan],
+            [1, np.nan, np.nan, -0.1],
+            [np.nan, 10.5, -3, np.nan],
+            [np.nan, np.nan, np.nan, np.nan],
+        ])
+
+    def test_table_matches_lines(self):
+        # the G-Code tokenized all at once is the same as tokenized line by line
+        gcode = self.gcode.replace('GX1\n', '')
+        job = make_job(gcode)
+        table = job.gcode_words_table(gcode)
+        lines = gcode.splitlines()
+        self.assertEqual(len(table), len(lines) + 1)
+        for line, row in zip(lines, table):
+            codes = {code: value for code, value in job.codes_split(line).items() if code in job.gcode_table_codes}
+            self.assertEqual({code: value for code, value in zip(job.gcode_table_codes, row) if not np.isnan(value)},
+                             codes)
+
+    def test_letter_without_number(self):
+        # the parsing of the line stops at a letter without a number, left to the line by line tokenizer
+        job = make_job(self.gcode)
+        self.assertIsNone(job.gcode_words_table(self.gcode))
+        self.assertEqual(job.codes_split('GX1'), {})
+        self.assertEqual(len(job.gcode_codes_table(self.gcode)), len(self.gcode.splitlines()))
+
+
+class GCodeParseTest(unittest.TestCase):
+
+    def test_paths(self):
+        gcode = 'G21\nG00 Z2.0\nG00 X1.0Y1.0\nG01 Z-0.1\nG01 X5.0Y1.0\nG01 X5.0Y5.0\nG00 Z2.0\nG00 X0.0Y0.0\nM05\n'
+        job = make_job(gcode)
+        geometry = job.gcode_parse()
+
+        self.assertEqual(job.units, 'MM')
+        self.assertEqual([geo['kind'] for geo in geometry], [['T', 'F'], ['C', 'S'], ['T', 'F']])
+        self.assertEqual([list(geo['geom'].coords) for geo in geometry],
+                         [[(0, 0), (1, 1)], [(1, 1), (5, 1), (5, 5)], [(5, 5), (0, 0)]])
+
+        moves = job.gcode_moves
+        self.assertEqual(moves['path'].tolist(), [0, 0, 1, 2, 2, 2, 3, 3])
+        self.assertEqual(moves['kind'][moves['path'] == 1].tolist(), [CNCjob.MOVE_HOLE])
+        np.testing.assert_allclose(moves['z'], [2, 2, -0.1, -0.1, -0.1, -0.1, 2, 2])
+
+    def test_arc(self):
+        gcode = 'G00 Z-1.0\nG00 X10.0Y0.0\nG03 X-10.0Y0.0 I-10.0 J0.0\nG00 Z1.0\n'
+        geometry = make_job(gcode).gcode_parse()
+        coords = np.array(geometry[-1]['geom'].coords)
+        np.testing.assert_allclose(np.hypot(coords[2:, 0], coords[2:, 1]), 10.0)
+        self.assertGreater(coords[2:, 1].min(), -1e-9)
+
+    def test_dialect(self):
+        gcode = 'PU;\nPA400.0,0.0;\nPD;\nPA400.0,400.0;\nPU;\n'
+        geometry = make_job(gcode, pp_geometry_name='hpgl').gcode_parse()
+        self.assertEqual([geo['kind'][0] for geo in geometry], ['T', 'C'])
+        self.assertEqual(list(geometry[1]['geom'].coords), [(10, 0), (10, 10)])
+
+    def test_fail(self):
+        self.assertEqual(make_job('%\nG01 X1Y1\n').gcode_parse(), 'fail')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+from shapely.geometry import Point, LineString, Polygon, MultiPolygon, box
+import shapely.affinity as affinity
+
+from appCommon.GeometryBatch import GeometryBatch, scale_matrix, translate_matrix, rotate_matrix, skew_matrix
+
+
+def shapes():
+    return [
+        Point(1, 2).buffer(0.5),
+        box(0, 0, 2, 1),
+        LineString([(0, 0), (3, 1), (4, 4)]),
+        Point(5, 5),
+        MultiPolygon([box(10, 10, 11, 11), box(12, 10, 13, 11)]),
+        Polygon([(0, 0), (6, 0), (6, 6), (0, 6)], [[(1, 1), (2, 1), (2, 2), (1, 2)]]),
+        Polygon()
+    ]
+
+
+class GeometryBatchTest(unittest.TestCase):
+
+    def check_transform(self, matrix, affinity_function):
+        batch = GeometryBatch()
+        batch.add(shapes())
+        batch.affine(matrix)
+
+        for result, geo in zip(batch.result(0), shapes()):
+            expected = affinity_function(geo)
+            self.assertEqual(result.geom_type, expected.geom_type)
+            self.assertTrue(result.equals_exact(expected, 1e-9) or (result.is_empty and expected.is_empty))
+
+    def test_scale(self):
+        self.check_transform(scale_matrix(2.0, -0.5, (1, 3)),
+                             lambda geo: affinity.scale(geo, 2.0, -0.5, origin=(1, 3)))
+
+    def test_translate(self):
+        self.check_transform(translate_matrix(-3, 7.5), lambda geo: affinity.translate(geo, xoff=-3, yoff=7.5))
+
+    def test_rotate(self):
+        for angle in (90, -37.5, 180):
+            self.check_transform(rotate_matrix(angle, (2, -1)),
+                                 lambda geo: affinity.rotate(geo, angle, origin=(2, -1)))
+
+    def test_skew(self):
+        self.check_transform(skew_matrix(15, -30, (4, 4)), lambda geo: affinity.skew(geo, 15, -30, origin=(4, 4)))
+
+    def test_structure(self):
+        circle = Point(0, 0).buffer(1)
+        obj = {
+            'geometry': [{'solid': circle, 'follow': Point(0, 0)}, {'clear': [circle, [circle]]}],
+            'slots': [(Point(0, 0), Point(1, 0))],
+            'size': 0.5,
+            'other': None
+        }
+
+        batch = GeometryBatch()
+        idx = batch.add(obj)
+        other_idx = batch.add(circle)
+        batch.affine(translate_matrix(1, 0))
+
+        result = batch.result(idx)
+        moved = affinity.translate(circle, xoff=1)
+        self.assertTrue(result['geometry'][0]['solid'].equals(moved))
+        self.assertTrue(result['geometry'][0]['follow'].equals(Point(1, 0)))
+        self.assertTrue(result['geometry'][1]['clear'][1][0].equals(moved))
+        self.assertIsInstance(result['slots'][0], tuple)
+        self.assertTrue(result['slots'][0][1].equals(Point(2, 0)))
+        self.assertEqual(result['size'], 0.5)
+        self.assertIsNone(result['other'])
+        self.assertTrue(batch.result(other_idx).equals(moved))
+
+        # the original is not changed
+        self.assertTrue(obj['geometry'][0]['solid'].equals(circle))
+
+    def test_buffer(self):
+        lines = [LineString([(0, 0), (i, 1)]) for i in range(1, 20)]
+        batch = GeometryBatch()
+        batch.add(lines)
+        batch.buffer(0.1, resolution=8, join_style=2)
+        for result, line in zip(batch.result(0), lines):
+            self.assertAlmostEqual(result.area, line.buffer(0.1, resolution=8, join_style=2).area)
+
+    def test_progress(self):
+        reported = []
+        batch = GeometryBatch(progress=reported.append)
+        batch.chunk_size = 10
+        batch.add([Point(i, 0) for i in range(100)])
+        batch.affine(translate_matrix(1, 1))
+
+        self.assertEqual(reported, sorted(set(reported)))
+        self.assertEqual(len(reported), 10)
+        self.assertEqual(reported[-1], 99)
+
+
+class GerberTransformTest(unittest.TestCase):
+
+    def test_gerber_transform_all(self):
+        from appParsers.ParseGerber import Gerber
+        from tests.profiling_app import make_object
+
+        gerber = make_object(Gerber)
+        pad = Point(1, 1).buffer(0.5)
+        gerber.solid_geometry = [pad, box(2, 2, 3, 3)]
+        gerber.follow_geometry = [Point(1, 1)]
+        gerber.apertures = {
+            '10': {'type': 'C', 'size': 1.0, 'geometry': [{'solid': pad, 'follow': Point(1, 1)}]},
+            '11': {'type': 'C', 'size': 1.0}
+        }
+
+        gerber.transform_all(lambda batch: batch.buffer(0.1, resolution=16, join_style=1), follow=False)
+        self.assertAlmostEqual(gerber.solid_geometry[0].area, pad.buffer(0.1, resolution=16).area)
+        self.assertIs(gerber.follow_geometry[0].__class__, Point)
+        self.assertIs(gerber.apertures['10']['geometry'][0]['follow'].__class__, Point)
+        self.assertAlmostEqual(gerber.apertures['10']['geometry'][0]['solid'].area, gerber.solid_geometry[0].area)
+
+        gerber.transform_all(lambda batch: batch.affine(translate_matrix(1, 2)))
+        self.assertTrue(gerber.follow_geometry[0].equals(Point(2, 3)))
+        self.assertTrue(gerber.apertures['10']['geometry'][0]['follow'].equals(Point(2, 3)))
+        # the buffered box
+        for bound, expected in zip(gerber.solid_geometry[1].bounds, (2.9, 3.9, 4.1, 5.1)):
+            self.assertAlmostEqual(bound, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
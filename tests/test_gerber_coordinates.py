@@ -0,0 +1,42 @@
+import unittest
+import re
+from random import choice, randint, seed
+
+from appParsers.ParseGerber import parse_gerber_coordinates
+
+# same pattern as Gerber.lin_re
+lin_re = re.compile(r'^(?:G0?(1))?(?=.*X([\+-]?\d+))?(?=.*Y([\+-]?\d+))?[XY][^DIJ]*(?:D0?([123]))?\*$')
+
+
+class GerberCoordinatesTest(unittest.TestCase):
+
+    def check(self, stat):
+        groups = parse_gerber_coordinates(stat)
+        if groups is not None:
+            match = lin_re.search(stat)
+            self.assertIsNotNone(match, stat)
+            self.assertEqual(groups, match.groups(), stat)
+        return groups
+
+    def test_plain(self):
+        self.assertEqual(self.check('X12345Y-6789D01*'), (None, '12345', '-6789', '1'))
+        self.assertEqual(self.check('Y+10X20D2*'), (None, '20', '+10', '2'))
+        self.assertEqual(self.check('X100D03*'), (None, '100', None, '3'))
+        self.assertEqual(self.check('Y100*'), (None, None, '100', None))
+
+    def test_fallback(self):
+        # these are left to the regex patterns
+        for stat in ['X1Y1I5J0D01*', 'X1Y1D10*', 'X-Y1D01*', 'X1Y1D01', 'X1X2Y3*', 'G01X1Y1D01*', 'D01*',
+                     'X1Y1D001*', 'X1Y*', '%FSLAX24Y24*%']:
+            self.assertIsNone(self.check(stat), stat)
+
+    def test_random(self):
+        seed(0)
+        chars = ['X', 'Y', 'D', 'I', '0', '1', '2', '3', '9', '-', '+', '*']
+        for __ in range(20000):
+            stat = choice(['X', 'Y']) + ''.join(choice(chars) for __ in range(randint(0, 10))) + '*'
+            self.check(stat)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+import tkinter as tk
+
+from appHeadless import HeadlessApp, run_scripts, headless_script
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+GERBER = os.path.join(TESTS_DIR, 'gerber_files', 'simple1.gbr').replace('\\', '/')
+EXCELLON = os.path.join(TESTS_DIR, 'excellon_files', 'case1.drl').replace('\\', '/')
+
+
+class HeadlessTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.app = HeadlessApp()
+        except ImportError as e:
+            # the legacy canvas sets the Qt5Agg backend of matplotlib; it fails if pyplot runs with another one
+            raise unittest.SkipTest(str(e))
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.app.run('new')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_isolation_gcode(self):
+        filename = os.path.join(self.tmp_dir.name, 'top.nc').replace('\\', '/')
+        self.app.exec_command('''
+            open_gerber %s -outname top
+            isolate top -dia 0.2 -passes 2 -overlap 10
+            cncjob top_iso -dia 0.2 -z_cut -0.1 -z_move 2 -feedrate 100
+            write_gcode top_iso_cnc %s
+            ''' % (GERBER, filename))
+
+        self.assertEqual(self.app.collection.get_names(), ['top', 'top_iso', 'top_iso_cnc'])
+        with open(filename) as f:
+            gcode = f.read()
+        self.assertIn('G01', gcode)
+
+    def test_drill_gcode(self):
+        filename = os.path.join(self.tmp_dir.name, 'drl.nc')
+        self.app.run('open_excellon', EXCELLON, outname='drl')
+        self.app.run('drillcncjob', 'drl', drilled_dias='all', drillz=-1.5, travelz=2, feedrate_z=50,
+                     outname='drl_cnc')
+        self.app.run('write_gcode', 'drl_cnc', filename)
+
+        with open(filename) as f:
+            self.assertIn('G01 Z-1.5', f.read())
+
+    def test_errors(self):
+        with self.assertRaises(tk.TclError):
+            self.app.exec_command('isolate no_such_object -dia 0.2')
+        with self.assertRaises(KeyError):
+            self.app.run('no_such_command')
+
+        # the Gerber file code and the tools with a GUI are made by the App; the error names them
+        self.app.run('open_gerber', GERBER, outname='top')
+        for command, feature in (('export_gerber top %s' % os.path.join(self.tmp_dir.name, 'top.gbr'), 'Gerber'),
+                                 ('export_excellon top %s' % os.path.join(self.tmp_dir.name, 'top.drl'), 'Excellon'),
+                                 ('ncc top -all', 'NCC'), ('paint top -all', 'Paint')):
+            with self.assertRaisesRegex(tk.TclError, '%s.*headless' % feature):
+                self.app.exec_command(command)
+
+        # the boolean options are never evaluated
+        with self.assertRaises(tk.TclError):
+            self.app.exec_command('isolate top -dia 0.2 -combine {__import__("os")}')
+        self.app.exec_command('isolate top -dia 0.2 -combine yes -outname top_iso')
+        self.assertIn('top_iso', self.app.collection.get_names())
+
+        # nor the coordinates; a wrong one is reported and no job is made
+        self.app.run('open_excellon', EXCELLON, outname='drl')
+        for endxy in ('__import__("os").getcwd()', '1/8,0'):
+            self.app.run('drillcncjob', 'drl', drilled_dias='all', drillz=-1.5, travelz=2, feedrate_z=50,
+                         endxy=endxy, outname='drl_cnc')
+            self.assertNotIn('drl_cnc', self.app.collection.get_names())
+        with self.assertRaises(tk.TclError):
+            self.app.exec_command('set_origin 1/8,0')
+        self.app.run('drillcncjob', 'drl', drilled_dias='all', drillz=-1.5, travelz=2, feedrate_z=50,
+                     endxy='1.0, 2.0', outname='drl_cnc')
+        self.assertIn('drl_cnc', self.app.collection.get_names())
+
+    def test_panel(self):
+        self.app.exec_command('''
+            open_gerber %s -outname top
+            panelize top -columns 3 -rows 2 -outname pan
+            ''' % GERBER)
+        panel = self.app.collection.get_by_name('pan')
+
+        # the source is plotted once, at the offsets of the copies
+        geometry, offsets = panel.plot_instances(panel.solid_geometry)
+        self.assertEqual(len(offsets), 6)
+        self.assertEqual(offsets[0], (0.0, 0.0))
+        self.assertEqual(len(geometry) * 6, len(panel.solid_geometry))
+        self.assertIs(geometry[0], panel.solid_geometry[0])
+
+        # the copies are plotted one by one after the geometry is changed
+        self.app.exec_command('offset pan 1 1')
+        geometry, offsets = panel.plot_instances(panel.solid_geometry)
+        self.assertIsNone(offsets)
+        self.assertIs(geometry, panel.solid_geometry)
+
+    def test_project_entry(self):
+        self.app.run('open_gerber', GERBER, outname='top')
+        top = self.app.collection.get_by_name('top')
+
+        # the entry is taken again only after the object is changed
+        entry = top.project_entry()
+        self.assertIs(top.project_entry(), entry)
+        self.app.should_we_save = False
+        top.options['plot'] = False
+        self.assertFalse(self.app.should_we_save)
+        self.assertIsNot(top.project_entry(), entry)
+
+        entry = top.project_entry()
+        top.options['isotooldia'] = 0.3
+        self.assertTrue(self.app.should_we_save)
+        self.assertIsNot(top.project_entry(), entry)
+
+        entry = top.project_entry()
+        self.app.exec_command('offset top 1 1')
+        self.assertIsNot(top.project_entry(), entry)
+
+    def test_project(self):
+        filename = os.path.join(self.tmp_dir.name, 'p.FlatPrj').replace('\\', '/')
+        svg_filename = os.path.join(self.tmp_dir.name, 'top.svg').replace('\\', '/')
+        dxf_filename = os.path.join(self.tmp_dir.name, 'top_iso.dxf').replace('\\', '/')
+        self.app.exec_command('''
+            open_gerber %s -outname top
+            isolate top -dia 0.2
+            open_excellon %s -outname drl
+            save_project %s
+            export_svg top %s
+            export_dxf top_iso %s
+            new
+            open_project %s
+            ''' % (GERBER, EXCELLON, filename, svg_filename, dxf_filename, filename))
+
+        self.assertEqual(self.app.collection.get_names(), ['top', 'top_iso', 'drl'])
+        self.assertTrue(self.app.collection.get_by_name('drl').tools)
+        with open(svg_filename) as f:
+            self.assertIn('<svg', f.read())
+        self.assertTrue(os.path.getsize(dxf_filename))
+
+    def test_install(self):
+        from appObjects.FlatCAMObj import FlatCAMObj
+
+        self.assertIs(FlatCAMObj.app, self.app)
+        with HeadlessApp() as engine:
+            self.assertIs(FlatCAMObj.app, engine)
+        self.assertIs(FlatCAMObj.app, self.app)
+
+    def test_run_scripts(self):
+        script = os.path.join(self.tmp_dir.name, 'job.tcl')
+        with open(script, 'w') as f:
+            f.write('open_gerber %s -outname $shellvar_0\nputs [get_names]\n' % GERBER)
+
+        results = run_scripts([script, os.path.join(self.tmp_dir.name, 'missing.tcl')], shellvar='board')
+        self.assertEqual(results[0]['status'], 'done')
+        self.assertEqual(results[0]['objects'], ['board'])
+        self.assertIn('board\n', results[0]['output'])
+        self.assertEqual(results[1]['status'], 'fail')
+
+    def test_command_line(self):
+        self.assertEqual(headless_script(['--headless=1', '--shellfile=job.tcl', '--shellvar=1,2']), ('job.tcl', '1,2'))
+        # the GUI, the job server and the files to open need the App
+        for argv in (['--shellfile=job.tcl'], ['--headless=1'], ['--headless=1', '--shellfile=job.tcl', 'top.gbr'],
+                     ['--headless=1', '--shellfile=job.tcl', '--job_server=2'], ['--bad']):
+            self.assertIsNone(headless_script(argv))
+
+        script = os.path.join(self.tmp_dir.name, 'job.tcl')
+        with open(script, 'w') as f:
+            f.write('open_gerber %s -outname $shellvar_1\nputs [get_names]\n' % GERBER)
+        flatcam = os.path.join(os.path.dirname(TESTS_DIR), 'FlatCAM.py')
+        result = subprocess.run([sys.executable, flatcam, '--headless=1', '--shellfile=%s' % script,
+                                 "--shellvar=1,'board'"], capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('board\n', result.stdout)
+
+        with open(script, 'w') as f:
+            f.write('isolate no_such_object -dia 0.2\n')
+        result = subprocess.run([sys.executable, flatcam, '--headless=1', '--shellfile=%s' % script],
+                                capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from multiprocessing import Pool
+
+from shapely.geometry import Point, LineString, LinearRing, box
+from shapely.wkb import loads as wkb_loads
+
+from camlib import Geometry
+from tests.profiling_app import ProfilingApp, make_object
+
+
+def copper():
+    # touching and overlapping pads and tracks
+    pads = [Point(3.0 * i, 0).buffer(1.0) for i in range(5)]
+    tracks = [LineString([(3.0 * i, 0), (3.0 * i, 5)]).buffer(0.3) for i in range(5)]
+    return pads + tracks + [box(0, 5, 12, 6)]
+
+
+class IsolationGeometryPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = Pool(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.terminate()
+
+    def setUp(self):
+        self.geo = make_object(Geometry, app=ProfilingApp(), geo_steps_per_circle=16)
+        self.geo.app.pool = self.pool
+
+    def test_same_as_serial(self):
+        envelopes = [(0.1, 2), (0.25, 2), (0.4, 0), (0.4, 1), (-0.1, 2)]
+        results = self.geo.isolation_geometry_pool(copper(), envelopes)
+        self.assertEqual(len(results), len(envelopes))
+
+        for (offset, iso_type), result in zip(envelopes, results):
+            expected = self.geo.isolation_geometry(offset, geometry=copper(), iso_type=iso_type)
+            if iso_type == 2:
+                self.assertEqual(result.geom_type, expected.geom_type)
+                self.assertAlmostEqual(result.area, expected.area, places=2)
+                self.assertAlmostEqual(result.symmetric_difference(expected).area, 0.0, places=2)
+            else:
+                self.assertEqual(len(result), len(expected))
+                for ring, expected_ring in zip(result, expected):
+                    self.assertIsInstance(ring, LinearRing)
+                    self.assertAlmostEqual(ring.length, expected_ring.length, places=2)
+
+    def test_empty(self):
+        self.assertEqual(self.geo.isolation_geometry_pool([], [(0.1, 2)]), ['fail'])
+
+    def test_abort(self):
+        self.geo.app.abort_flag = True
+        with self.assertRaises(Exception) as cm:
+            self.geo.isolation_geometry_pool(copper(), [(0.1 * i, 2) for i in range(1, 20)])
+        self.assertEqual(type(cm.exception).__name__, 'GracefulException')
+
+    def test_job(self):
+        # the job runs on a detached geometry, without the app
+        envelope = wkb_loads(Geometry.isolation_geometry_job([geo.wkb for geo in copper()], 0.1, 2, 16))
+        self.assertAlmostEqual(envelope.area, self.geo.isolation_geometry(0.1, geometry=copper()).area, places=2)
+
+        detached = Geometry(geo_steps_per_circle=16, detached=True)
+        self.assertIsNone(detached.app)
+        self.assertFalse(detached.aborted())
+        self.assertIsNone(detached.temp_shapes)
+
+
+if __name__ == '__main__':
+    unittest.main()
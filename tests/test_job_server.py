@@ -0,0 +1,224 @@
+import unittest
+import os
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import tkinter as tk
+from unittest import mock
+from multiprocessing.connection import Listener, Client, AuthenticationError
+
+import simplejson as json
+
+from appJobServer import JobServer, run_jobs, server_authkey, user_dir
+from appJobWorker import split_script
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+GERBER = os.path.join(TESTS_DIR, 'gerber_files', 'simple1.gbr').replace('\\', '/')
+EXCELLON = os.path.join(TESTS_DIR, 'excellon_files', 'case1.drl').replace('\\', '/')
+
+
+class SplitScriptTest(unittest.TestCase):
+
+    def test_commands(self):
+        script = '# a comment\nset a 1\n\nproc p {x} {\n    return $x\n}\nputs [p $a]\n'
+        self.assertEqual(split_script(tk.Tcl(), script),
+                         ['set a 1', 'proc p {x} {\n    return $x\n}', 'puts [p $a]'])
+
+
+class JobServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.address = (os.path.join(cls.tmp_dir.name, 'jobs'), 'AF_UNIX') if os.name != 'nt' else \
+            (r'\\.\pipe\FlatCAMJobServerTest', 'AF_PIPE')
+        cls.authkey = b'test key'
+        cls.listener = Listener(*cls.address, authkey=cls.authkey)
+        cls.server = JobServer(processes=1)
+
+        cls.closed = False
+
+        def accept():
+            while not cls.closed:
+                try:
+                    conn = cls.listener.accept()
+                except (AuthenticationError, EOFError, OSError):
+                    # a client with a wrong key or one gone in the handshake
+                    continue
+                cls.server.accept(conn)
+        threading.Thread(target=accept, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.closed = True
+        cls.listener.close()
+        cls.server.shutdown()
+        cls.tmp_dir.cleanup()
+
+    def events(self, *jobs):
+        events = {}
+        for event in run_jobs(list(jobs), self.address, self.authkey):
+            events.setdefault(event['job'], []).append(event)
+        return events
+
+    def test_jobs(self):
+        filename = os.path.join(self.tmp_dir.name, 'drl.nc').replace('\\', '/')
+        script = 'open_gerber %s -outname top\nisolate top -dia 0.2\nset x 1\nputs [get_names]\n' % GERBER
+        steps = [['open_excellon', EXCELLON, {'outname': 'drl'}],
+                 ['drillcncjob', 'drl', {'drilled_dias': 'all', 'drillz': -1.5, 'travelz': 2, 'feedrate_z': 50,
+                                         'outname': 'drl_cnc'}],
+                 ['write_gcode', 'drl_cnc', filename]]
+        events = self.events({'id': 'script', 'script': script}, json.dumps({'id': 'steps', 'steps': steps}))
+
+        names = [event['event'] for event in events['script']]
+        self.assertEqual(names, ['queued', 'started', 'step', 'step', 'step', 'step', 'done'])
+        done = events['script'][-1]
+        self.assertEqual(done['objects'], ['top', 'top_iso'])
+        self.assertIn('top\ntop_iso\n', done['output'])
+        self.assertGreaterEqual(done['wait'], 0)
+        self.assertEqual([event['command'] for event in events['script'] if event['event'] == 'step'],
+                         ['open_gerber', 'isolate', 'set', 'puts'])
+
+        self.assertEqual(events['steps'][-1]['event'], 'done')
+        self.assertEqual(events['steps'][-2]['steps'], 3)
+        with open(filename) as f:
+            self.assertIn('G01 Z-1.5', f.read())
+
+        # the next job starts from a clean engine
+        done = self.events({'id': 'clean', 'script': 'puts [info exists x]\nputs [get_names]'})['clean'][-1]
+        self.assertEqual(done['objects'], [])
+        self.assertEqual(done['output'], '0\n\n')
+
+    def test_failures(self):
+        events = self.events({'id': 'tcl', 'script': 'open_gerber %s -outname g\nisolate nope -dia 0.1\nputs never'
+                              % GERBER},
+                             {'id': 'empty'},
+                             '{"id": "json"')
+
+        failed = events['tcl'][-1]
+        self.assertEqual(failed['event'], 'failed')
+        self.assertIn('nope', failed['error'])
+        self.assertEqual(failed['objects'], ['g'])
+        self.assertEqual(len([event for event in events['tcl'] if event['event'] == 'step']), 1)
+
+        self.assertEqual([event['event'] for event in events['empty']], ['failed'])
+        self.assertEqual(len(events), 3)
+
+    def test_safe(self):
+        # the jobs can not run programs or touch files other than with the FlatCAM commands
+        events = self.events({'id': 'exec', 'script': 'exec ls'},
+                             {'id': 'open', 'script': 'open %s' % GERBER},
+                             {'id': 'file', 'script': 'file delete %s' % GERBER})
+        for job in ('exec', 'open', 'file'):
+            self.assertEqual(events[job][-1]['event'], 'failed')
+            self.assertIn('invalid command name', events[job][-1]['error'])
+        self.assertTrue(os.path.exists(GERBER))
+
+    def test_authkey(self):
+        with self.assertRaises(AuthenticationError):
+            Client(*self.address, authkey=b'wrong key')
+        if os.name != 'nt':
+            # a client gone in the handshake
+            sock = socket.socket(socket.AF_UNIX)
+            sock.connect(self.address[0])
+            sock.close()
+
+        # the server still serves the next clients
+        self.assertEqual(self.events({'id': 'after', 'script': 'puts 1'})['after'][-1]['output'], '1\n')
+
+    def test_stats(self):
+        conn = Client(*self.address, authkey=self.authkey)
+        conn.send('stats')
+        stats = conn.recv()
+        conn.send('close')
+        conn.close()
+
+        self.assertEqual(stats['event'], 'stats')
+        self.assertEqual(stats['processes'], 1)
+        self.assertEqual(stats['running'], 0)
+
+
+class JobServerSetupTest(unittest.TestCase):
+
+    def test_user_authkey(self):
+        key = server_authkey()
+        self.assertGreaterEqual(len(key), 32)
+        self.assertEqual(server_authkey(), key)
+        if os.name != 'nt':
+            # only the user can read the key
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(user_dir(), 'job_server.key')).st_mode), 0o600)
+            self.assertEqual(stat.S_IMODE(os.stat(user_dir()).st_mode), 0o700)
+
+    def test_worker_imports(self):
+        # a spawned worker imports the main module of the parent as __mp_main__ and then appJobWorker
+        code = ("import runpy, sys\n"
+                "runpy.run_path('FlatCAM.py', run_name='__mp_main__')\n"
+                "import appJobWorker\n"
+                "print(sorted(m for m in sys.modules if m == 'app_Main' or m.startswith('PyQt5')))\n"
+                "appJobWorker.init_worker(None)\n"
+                "print(sorted(m for m in sys.modules if m in ('app_Main', 'appGUI.MainGUI')))\n")
+        out = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, stdout=subprocess.PIPE, check=True,
+                             universal_newlines=True).stdout
+        # the engine of the worker imports the Qt classes of the objects but not the App and its GUI
+        self.assertEqual(out.split('\n')[:2], ['[]', '[]'])
+
+
+class ArgsThreadTest(unittest.TestCase):
+
+    def test_listener(self):
+        try:
+            # the App reads its command line when it is imported
+            with mock.patch.object(sys, 'argv', ['FlatCAM.py']):
+                from app_Main import ArgsThread
+        except Exception as e:
+            raise unittest.SkipTest(str(e))
+        from PyQt5 import QtCore
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        address = (os.path.join(tmp_dir.name, 'ipc'), 'AF_UNIX') if os.name != 'nt' else \
+            (r'\\.\pipe\FlatCAMArgsThreadTest', 'AF_PIPE')
+        args_thread = ArgsThread()
+        received = []
+        args_thread.open_signal.connect(received.append, QtCore.Qt.DirectConnection)
+        loop = threading.Thread(target=args_thread.my_loop, args=(address, b'test key'), daemon=True)
+        loop.start()
+        try:
+            conn = None
+            for attempt in range(100):
+                try:
+                    conn = Client(*address, authkey=b'test key')
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    threading.Event().wait(0.05)
+            conn.send('close')
+            conn.close()
+
+            with self.assertRaises(AuthenticationError):
+                Client(*address, authkey=b'wrong key')
+            if os.name != 'nt':
+                sock = socket.socket(socket.AF_UNIX)
+                sock.connect(address[0])
+                sock.close()
+
+            conn = Client(*address, authkey=b'test key')
+            conn.send(['FlatCAM.py', 'board.gbr'])
+            conn.send('close')
+            conn.close()
+            for attempt in range(100):
+                if received:
+                    break
+                threading.Event().wait(0.05)
+            self.assertEqual(received, [['FlatCAM.py', 'board.gbr']])
+        finally:
+            args_thread.close_listener()
+            loop.join(5)
+            tmp_dir.cleanup()
+        self.assertFalse(loop.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
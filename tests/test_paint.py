@@ -5,6 +5,7 @@ from shapely.ops import unary_union
 from matplotlib.pyplot import plot, subplot, show, cla, clf, xlim, ylim, title
 from matplotlib.axes import *
 from camlib import *
+from descartes.patch import PolygonPatch
 from copy import deepcopy
 
 
@@ -85,5 +85,47 @@ class PathConnectTest1(unittest.TestCase):
         self.assertEqual(len(matches), 1)
 
 
+class ConnectPathsTest(unittest.TestCase):
+
+    def test_reversed_chain(self):
+        # a chain of segments, in random order and direction
+        points = [(float(i), float(i % 3)) for i in range(30)]
+        paths = [LineString(points[i:i + 2]) for i in range(29)]
+        paths = paths[::2] + [LineString(p.coords[::-1]) for p in paths[1::2]]
+
+        result = Geometry.connect_paths(paths)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(result[0].coords), 30)
+        self.assertTrue(result[0].equals(LineString(points)))
+
+    def test_rings_and_polygons_kept(self):
+        ring = LinearRing([[1, 1], [2, 2], [1, 3], [0, 2]])
+        polygon = Polygon([[5, 5], [6, 5], [6, 6]])
+        paths = [LineString([[0, 0], [1, 1]]), ring, polygon, LineString([[1, 1], [2, 1]])]
+
+        result = Geometry.connect_paths(paths)
+        self.assertEqual(len(result), 3)
+        self.assertIs(result[1], ring)
+        self.assertIs(result[2], polygon)
+        self.assertTrue(result[0].equals(LineString([[0, 0], [1, 1], [2, 1]])))
+
+    def test_tolerance(self):
+        paths = [LineString([[0, 0], [1, 1]]), LineString([[1 + 1e-9, 1 - 1e-9], [2, 1]])]
+
+        self.assertEqual(len(Geometry.connect_paths(paths)), 2)
+        result = Geometry.connect_paths(paths, tolerance=1e-6)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(list(result[0].coords), [(0, 0), (1, 1), (2, 1)])
+
+    def test_branch(self):
+        # three paths meet at (1, 1); the first two are joined
+        paths = [LineString([[0, 0], [1, 1]]), LineString([[1, 1], [2, 1]]), LineString([[1, 1], [1, 2]])]
+
+        result = Geometry.connect_paths(paths)
+        self.assertEqual(len(result), 2)
+        self.assertTrue(result[0].equals(LineString([[0, 0], [1, 1], [2, 1]])))
+        self.assertIs(result[1], paths[2])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import os
+import tempfile
+
+import numpy as np
+import simplejson as json
+from shapely.geometry import Point, LineString
+import shapely.affinity as affinity
+
+from camlib import to_dict, dict2obj
+from appCommon.PointArray import PointArray, SlotArray
+from appCommon.GeometryBatch import GeometryBatch, rotate_matrix, translate_matrix
+from appCommon.ProjectArchive import ProjectArchive
+
+
+def drills():
+    return [Point(0, 0), Point(1.5, -2), Point(10, 3.25)]
+
+
+def slots():
+    return [(Point(0, 0), Point(2, 0)), (Point(1, 1), Point(1, 4))]
+
+
+class PointArrayTest(unittest.TestCase):
+
+    def test_list_interface(self):
+        array = PointArray(drills()[:1])
+        array.append(drills()[1])
+        array.append((10, 3.25))
+
+        self.assertEqual(len(array), 3)
+        self.assertTrue(array)
+        self.assertFalse(PointArray())
+        self.assertEqual([pt.coords[0] for pt in array], [pt.coords[0] for pt in drills()])
+        self.assertTrue(array[-1].equals(Point(10, 3.25)))
+        self.assertEqual(len(array[1:]), 2)
+        self.assertIn(Point(1.5, -2), array)
+        self.assertNotIn(Point(1.5, 2), array)
+
+        array += [Point(7, 7)]
+        self.assertEqual(len(array + [Point(8, 8)]), 5)
+        self.assertEqual(len(array), 4)
+        self.assertIs(PointArray.of(array), array)
+
+    def test_concatenate(self):
+        moved = PointArray(drills()).affine(translate_matrix(20, 0))
+        array = PointArray.concatenate([PointArray(drills()), moved, drills()[:1], []])
+        np.testing.assert_array_equal(array.coords, np.vstack([PointArray(drills()).coords, moved.coords, [[0, 0]]]))
+        self.assertFalse(PointArray.concatenate([]))
+
+        array = SlotArray.concatenate([SlotArray(slots()), slots()])
+        self.assertIsInstance(array, SlotArray)
+        self.assertEqual(array.coords.shape, (4, 4))
+
+    def test_affine(self):
+        array = PointArray(drills())
+        rotated = array.affine(rotate_matrix(30, (1, 1)))
+
+        self.assertEqual(len(array), 3)
+        for result, pt in zip(rotated, drills()):
+            self.assertTrue(result.equals_exact(affinity.rotate(pt, 30, origin=(1, 1)), 1e-9))
+
+    def test_buffer(self):
+        for result, pt in zip(PointArray(drills()).buffer(0.4, 8), drills()):
+            self.assertTrue(result.equals_exact(pt.buffer(0.4, 8), 1e-9))
+
+        self.assertTrue(all(poly.is_empty for poly in PointArray(drills()).buffer(0.0)))
+
+    def test_slots(self):
+        array = SlotArray(slots())
+        array.append((5, 5, 6, 6))
+
+        self.assertEqual(len(array), 3)
+        self.assertEqual([(start.coords[0], stop.coords[0]) for start, stop in array][-1], ((5, 5), (6, 6)))
+        for result, (start, stop) in zip(array.buffer(0.25, 4), slots()):
+            self.assertTrue(result.equals(LineString([start, stop]).buffer(0.25, 4)))
+
+        moved = array.affine(translate_matrix(1, 2))
+        self.assertEqual((moved[0][0].coords[0], moved[0][1].coords[0]), ((1, 2), (3, 2)))
+
+    def test_geometry_batch(self):
+        tools = {1: {'drills': PointArray(drills()), 'slots': SlotArray(slots())}}
+
+        batch = GeometryBatch()
+        batch.add(tools)
+        batch.affine(translate_matrix(1, 1))
+        result = batch.result(0)
+        self.assertIsInstance(result[1]['drills'], PointArray)
+        self.assertTrue(result[1]['drills'][0].equals(Point(1, 1)))
+
+        # the transforms with no matrix are applied to the items
+        batch.map(lambda geo: affinity.scale(geo, 2, 2, origin=(0, 0)))
+        result = batch.result(0)
+        self.assertTrue(result[1]['drills'][0].equals(Point(2, 2)))
+        self.assertTrue(result[1]['slots'][1][1].equals(Point(4, 10)))
+
+    def test_serialization(self):
+        data = {'drills': PointArray(drills()), 'slots': SlotArray(slots())}
+
+        loaded = json.loads(json.dumps(data, default=to_dict), object_hook=dict2obj)
+        np.testing.assert_array_equal(loaded['drills'].coords, data['drills'].coords)
+        self.assertIsInstance(loaded['slots'], SlotArray)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'project.FlatPrj')
+            objs = [{'kind': 'excellon', 'options': {'name': 'drills.drl'}, 'tools': {1: data}}]
+            ProjectArchive.save(filename, ProjectArchive.snapshot(objs), {}, 8.994)
+            loaded = ProjectArchive(filename).load_objects()[0]['tools']['1']
+
+        np.testing.assert_array_equal(loaded['slots'].coords, data['slots'].coords)
+        self.assertIsInstance(loaded['drills'], PointArray)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+import unittest
+import os
+import lzma
+import tempfile
+import zipfile
+from unittest import mock
+
+import numpy as np
+import simplejson as json
+from shapely.geometry import Point, Polygon, MultiPolygon, LineString, LinearRing
+
+from camlib import ApertureMacro, to_dict
+from appCommon.ProjectArchive import ProjectArchive
+
+
+class ProjectArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, 'project.FlatPrj')
+
+        am = ApertureMacro(name='AM1')
+        am.raw = '1,1,0.5,0,0*'
+        square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)], [[(0.2, 0.2), (0.4, 0.2), (0.4, 0.4)]])
+
+        self.objs = [
+            {
+                'kind': 'gerber',
+                'options': {'name': 'top.gbr', 'isotooldia': 0.1},
+                'solid_geometry': MultiPolygon([square, Polygon([(2, 2), (3, 2), (3, 3)])]),
+                'apertures': {'10': {'type': 'C', 'size': 0.5, 'geometry': [{'solid': Point(1, 2).buffer(0.25),
+                                                                               'follow': Point(1, 2)}]},
+                              'macros': am},
+            },
+            {
+                'kind': 'geometry',
+                'options': {'name': 'empty'},
+                'solid_geometry': [Point(), Polygon(), LinearRing([(0, 0), (1, 0), (1, 1)]),
+                                   LineString([(0, 0, 1), (5, 5, 2)])],
+                'tools': {1: {'tooldia': 0.2}},
+                'moves': np.arange(12, dtype=float).reshape((4, 3)),
+            },
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assertSameData(self, loaded, original):
+        if isinstance(original, dict):
+            self.assertEqual(set(loaded), set(str(k) for k in original))
+            for key, val in original.items():
+                self.assertSameData(loaded[str(key)], val)
+        elif isinstance(original, (list, tuple)):
+            self.assertEqual(len(loaded), len(original))
+            for loaded_val, val in zip(loaded, original):
+                self.assertSameData(loaded_val, val)
+        elif isinstance(original, np.ndarray):
+            np.testing.assert_array_equal(loaded, original)
+        elif isinstance(original, ApertureMacro):
+            self.assertEqual(loaded.to_dict(), original.to_dict())
+        elif hasattr(original, 'geom_type'):
+            self.assertEqual(loaded.geom_type, original.geom_type)
+            self.assertEqual(loaded.wkt, original.wkt)
+        else:
+            self.assertEqual(loaded, original)
+
+    def test_round_trip(self):
+        for compression in ProjectArchive.compressors:
+            ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {'units': 'MM'}, 8.994,
+                                compression=compression)
+            self.assertTrue(ProjectArchive.is_archive(self.filename))
+
+            archive = ProjectArchive(self.filename)
+            self.assertTrue(archive.verify())
+            self.assertEqual(archive.options, {'units': 'MM'})
+            self.assertEqual([(e['kind'], e['name']) for e in archive.objects],
+                             [('gerber', 'top.gbr'), ('geometry', 'empty')])
+            for loaded, original in zip(archive.load_objects(), self.objs):
+                self.assertSameData(loaded, original)
+
+    def test_parallel_load(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs * 10), {}, 8.994)
+        archive = ProjectArchive(self.filename)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            loaded = [future.result() for future in archive.load_objects(executor)]
+        for loaded_obj, original in zip(loaded, self.objs * 10):
+            self.assertSameData(loaded_obj, original)
+
+    def test_corrupted_blob(self):
+        ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994, compression='none')
+        with zipfile.ZipFile(self.filename, 'r') as archive:
+            entries = {name: archive.read(name) for name in archive.namelist()}
+        entries['objs/1.bin'] = entries['objs/1.bin'][:-1] + b'\x00'
+        with zipfile.ZipFile(self.filename, 'w') as archive:
+            for name, data in entries.items():
+                archive.writestr(name, data)
+
+        archive = ProjectArchive(self.filename)
+        self.assertFalse(archive.verify())
+        archive.load_object(0)
+        with self.assertRaises(ValueError):
+            archive.load_object(1)
+
+    def test_snapshot(self):
+        snapshot = ProjectArchive.snapshot(self.objs)
+
+        # the changes made after the snapshot are not saved
+        self.objs[1]['solid_geometry'].append(Point(5, 5))
+        self.objs[1]['moves'][0, 0] = 100.0
+        self.objs[0]['options']['name'] = 'renamed.gbr'
+
+        ProjectArchive.save(self.filename, snapshot, {}, 8.994)
+        loaded = ProjectArchive(self.filename).load_objects()
+        self.assertEqual(len(loaded[1]['solid_geometry']), 4)
+        self.assertEqual(loaded[1]['moves'][0, 0], 0.0)
+        self.assertEqual(loaded[0]['options']['name'], 'top.gbr')
+
+    def test_journal(self):
+        journal = {}
+        self.assertEqual(ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994,
+                                             journal=journal), (2, 0))
+
+        # only the objects with changed geometry or arrays are encoded again
+        self.objs[0]['options']['isotooldia'] = 0.2
+        self.assertEqual(ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994,
+                                             journal=journal), (0, 2))
+
+        self.objs[1]['solid_geometry'][0] = Point(7, 7)
+        self.assertEqual(ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994,
+                                             journal=journal), (1, 1))
+        # the geometry is matched by its content, not by its identity
+        self.objs[1]['solid_geometry'][0] = Point(7, 7)
+        self.assertEqual(ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994,
+                                             journal=journal), (0, 2))
+        self.objs[1]['moves'][0, 0] = 100.0
+        self.assertEqual(ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994,
+                                             journal=journal), (1, 1))
+
+        archive = ProjectArchive(self.filename)
+        self.assertTrue(archive.verify())
+        for loaded, original in zip(archive.load_objects(), self.objs):
+            self.assertSameData(loaded, original)
+        self.assertFalse(os.path.exists(self.filename + '.tmp'))
+
+    def test_saved_entries(self):
+        journal = {}
+        snapshot = ProjectArchive.snapshot(self.objs)
+        ProjectArchive.save(self.filename, snapshot, {}, 8.994, journal=journal)
+
+        # the entries saved before are not encoded again, also when the blobs are not compressed
+        for compression in ('none', 'zlib'):
+            ProjectArchive.save(self.filename, snapshot, {}, 8.994, compression=compression, journal=journal)
+            with mock.patch.object(ProjectArchive, 'encode_part', side_effect=AssertionError):
+                self.assertEqual(ProjectArchive.save(self.filename, snapshot, {}, 8.994, compression=compression,
+                                                     journal=journal), (0, 2))
+
+        archive = ProjectArchive(self.filename)
+        self.assertTrue(archive.verify())
+        for loaded, original in zip(archive.load_objects(), self.objs):
+            self.assertSameData(loaded, original)
+
+    def test_interrupted_save(self):
+        ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994)
+        with open(self.filename, 'rb') as f:
+            saved = f.read()
+
+        # the old project stays and the temporary file is removed, even for the exceptions that are not errors
+        with mock.patch.object(ProjectArchive, 'encode_part', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994)
+        self.assertFalse(os.path.exists(self.filename + '.tmp'))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), saved)
+
+    def test_legacy_project(self):
+        # the JSON projects, plain or LZMA compressed, are not archives
+        text = json.dumps({'objs': self.objs[:1], 'options': {}, 'version': 8.994}, default=to_dict)
+        with open(self.filename, 'w') as f:
+            f.write(text)
+        self.assertFalse(ProjectArchive.is_archive(self.filename))
+
+        options, objs = ProjectArchive.read(self.filename)
+        self.assertEqual([(kind, name) for kind, name, __ in objs], [('gerber', 'top.gbr')])
+        self.assertEqual(objs[0][2]()['options']['isotooldia'], 0.1)
+
+        with lzma.open(self.filename, 'w') as f:
+            f.write(text.encode('utf-8'))
+        self.assertFalse(ProjectArchive.is_archive(self.filename))
+        self.assertEqual(len(ProjectArchive.read(self.filename)[1]), 1)
+
+    def test_read(self):
+        ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {'units': 'MM'}, 8.994)
+
+        options, objs = ProjectArchive.read(self.filename)
+        self.assertEqual(options, {'units': 'MM'})
+        self.assertEqual([(kind, name) for kind, name, __ in objs], [('gerber', 'top.gbr'), ('geometry', 'empty')])
+        self.assertSameData(objs[1][2](), self.objs[1])
+
+    def test_cancel(self):
+        from concurrent.futures import ThreadPoolExecutor
+        import threading
+
+        ProjectArchive.save(self.filename, ProjectArchive.snapshot(self.objs), {}, 8.994)
+        executor = ThreadPoolExecutor(max_workers=1)
+        busy = threading.Event()
+        executor.submit(busy.wait)
+
+        # the decoding that did not start is dropped
+        options, objs = ProjectArchive.read(self.filename, executor)
+        ProjectArchive.cancel(objs)
+        busy.set()
+        executor.shutdown(wait=True)
+        self.assertTrue(all(load.__self__.cancelled() for __, __, load in objs))
+
+        # the objects read without an executor are decoded when asked for
+        options, objs = ProjectArchive.read(self.filename)
+        ProjectArchive.cancel(objs)
+        self.assertSameData(objs[0][2](), self.objs[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from random import Random
+
+from shapely.geometry import LineString
+
+from camlib import FlatCAMRTreeStorage
+
+
+def get_pts(o):
+    return [o.coords[0], o.coords[-1]]
+
+
+class RTreeStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        rnd = Random(1)
+        self.lines = []
+        for __ in range(300):
+            x, y = rnd.uniform(0, 50), rnd.uniform(0, 50)
+            self.lines.append(LineString([(x, y), (x + rnd.uniform(-1, 1), y + rnd.uniform(-1, 1))]))
+
+    def check_nearest(self, storage, alive, pt):
+        match_pt, obj = storage.nearest(pt)
+        self.assertIn(match_pt, get_pts(obj))
+        self.assertTrue(any(o is obj for o in alive))
+        best = min((ept[0] - pt[0]) ** 2 + (ept[1] - pt[1]) ** 2 for o in alive for ept in get_pts(o))
+        self.assertAlmostEqual((match_pt[0] - pt[0]) ** 2 + (match_pt[1] - pt[1]) ** 2, best)
+
+    def test_nearest_remove(self):
+        storage = FlatCAMRTreeStorage()
+        storage.get_points = get_pts
+        for line in self.lines[:100]:
+            storage.insert(line)
+        storage.insert_many(self.lines[100:])
+
+        alive = list(self.lines)
+        rnd = Random(2)
+        # remove most of the objects, as path_connect() does, including queries far from all the points
+        while len(alive) > 1:
+            pt = (rnd.uniform(-100, 150), rnd.uniform(-100, 150))
+            self.check_nearest(storage, alive, pt)
+
+            obj = alive.pop(rnd.randrange(len(alive)))
+            storage.remove(obj)
+
+        self.check_nearest(storage, alive, (25, 25))
+        storage.remove(alive[0])
+        self.assertEqual(list(storage.get_objects()), [])
+        with self.assertRaises(StopIteration):
+            storage.nearest((0, 0))
+
+    def test_insert_after_remove(self):
+        storage = FlatCAMRTreeStorage()
+        storage.get_points = get_pts
+        storage.insert_many(self.lines[:10])
+        for line in self.lines[:9]:
+            storage.remove(line)
+
+        # the points outside the bounds of the loaded grid are found
+        for line in self.lines[10:]:
+            storage.insert(LineString([(c[0] + 500, c[1] - 500) for c in line.coords]))
+        storage.insert(self.lines[10])
+
+        alive = list(storage.get_objects())
+        self.assertEqual(storage.nearest(self.lines[10].coords[0]), (self.lines[10].coords[0], self.lines[10]))
+        self.check_nearest(storage, alive, (600, -600))
+        self.check_nearest(storage, alive, (0, 0))
+
+    def test_empty(self):
+        storage = FlatCAMRTreeStorage()
+        with self.assertRaises(StopIteration):
+            storage.nearest((0, 0))
+
+    def test_coincident_points(self):
+        storage = FlatCAMRTreeStorage()
+        storage.get_points = get_pts
+        lines = [LineString([(1, 1), (2, 2)]) for __ in range(20)]
+        storage.insert_many(lines)
+        for line in lines[:19]:
+            self.assertEqual(storage.nearest((0, 0))[0], (1.0, 1.0))
+            storage.remove(storage.nearest((0, 0))[1])
+        self.assertIs(storage.nearest((3, 3))[1], lines[19])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from shapely.geometry import Point, box
+from shapely.ops import nearest_points
+
+from appTools.ToolRulesCheck import RulesCheck
+
+
+def brute_force_violations(geo_list, size, target_list=None):
+    points_list = set()
+    for idx, geo in enumerate(geo_list):
+        targets = geo_list[idx + 1:] if target_list is None else target_list
+        for s_geo in targets:
+            if geo.distance(s_geo) < size:
+                loc_1, loc_2 = nearest_points(geo, s_geo)
+                dx = loc_1.x - loc_2.x
+                dy = loc_1.y - loc_2.y
+                points_list.add((min(loc_1.x, loc_2.x) + (abs(dx) / 2), min(loc_1.y, loc_2.y) + (abs(dy) / 2)))
+    return points_list
+
+
+class ClearanceTest(unittest.TestCase):
+
+    def setUp(self):
+        # a grid of pads with a pitch that alternates between 1.2 and 1.3 on the X axis
+        self.pads = []
+        x = 0.0
+        for col in range(20):
+            for row in range(20):
+                self.pads.append(box(x, row * 1.5, x + 1.0, row * 1.5 + 1.0))
+            x += 1.2 if col % 2 == 0 else 1.3
+
+    def test_same_set(self):
+        result = RulesCheck.clearance_violations(self.pads, 0.25)
+        self.assertEqual(result, brute_force_violations(self.pads, 0.25))
+        # only the 0.2 gaps are violations: 10 gaps per row, 20 rows
+        self.assertEqual(len(result), 200)
+
+    def test_no_violation(self):
+        self.assertEqual(len(RulesCheck.clearance_violations(self.pads, 0.15)), 0)
+
+    def test_two_sets(self):
+        holes = [Point(p.centroid.x + 0.55, p.centroid.y).buffer(0.1) for p in self.pads[::7]]
+        result = RulesCheck.clearance_violations(self.pads, 0.3, target_list=holes)
+        self.assertEqual(result, brute_force_violations(self.pads, 0.3, target_list=holes))
+
+    def test_empty(self):
+        self.assertEqual(RulesCheck.clearance_violations([], 0.1), set())
+        self.assertEqual(RulesCheck.clearance_violations(self.pads, 0.1, target_list=[]), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
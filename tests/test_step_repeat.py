@@ -0,0 +1,99 @@
+import unittest
+
+from shapely.geometry import Point, LineString
+from shapely.ops import unary_union
+
+from appCommon.StepRepeat import StepRepeat
+
+
+class StepRepeatTest(unittest.TestCase):
+
+    def test_offsets(self):
+        panel = StepRepeat(3, 2, 5.0, 4.0)
+        self.assertEqual(len(panel), 6)
+        self.assertEqual(panel.offsets, [(0.0, 0.0), (5.0, 0.0), (10.0, 0.0), (0.0, 4.0), (5.0, 4.0), (10.0, 4.0)])
+
+    def test_instances(self):
+        panel = StepRepeat(2, 2, 10.0, 20.0)
+        source = {
+            '1': {'drills': [Point(1, 1)], 'slots': [(Point(0, 0), Point(2, 0))]},
+            '2': {'drills': [], 'slots': []}
+        }
+
+        copies = list(panel.instances(source))
+        self.assertEqual(len(copies), 4)
+        for copy, (xoff, yoff) in zip(copies, panel.offsets):
+            self.assertTrue(copy['1']['drills'][0].equals(Point(1 + xoff, 1 + yoff)))
+            self.assertIsInstance(copy['1']['slots'][0], tuple)
+            self.assertTrue(copy['1']['slots'][0][1].equals(Point(2 + xoff, yoff)))
+            self.assertEqual(copy['2'], {'drills': [], 'slots': []})
+
+        # the source is not changed
+        self.assertTrue(source['1']['drills'][0].equals(Point(1, 1)))
+
+    def test_gerber_block(self):
+        panel = StepRepeat(3, 2, 5.0, 4.5)
+        self.assertEqual(panel.gerber_block('D10*\nX0Y0D03*\n', factor=2),
+                         '%SRX3Y2I10.000000J9.000000*%\nD10*\nX0Y0D03*\n%SR*%\n')
+
+
+class GerberStepRepeatTest(unittest.TestCase):
+
+    gerber_code = """G04 step and repeat*
+%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.5000*%
+%ADD11R,1.0X1.0*%
+G01*
+%LPD*%
+D10*
+%SRX3Y2I5.0J4.0*%
+X000000Y000000D02*
+X020000Y000000D01*
+D11*
+X010000Y010000D03*
+%SR*%
+D10*
+X300000Y300000D03*
+M02*
+"""
+
+    def parse(self, gerber_code):
+        from tests.profiling_app import ProfilingApp
+        from appParsers.ParseGerber import Gerber
+
+        class PanelGerber(Gerber):
+            app = ProfilingApp()
+
+        gerber = PanelGerber()
+        gerber.parse_lines(Gerber.gerber_statements(gerber_code.splitlines()))
+        return gerber
+
+    def test_parse(self):
+        gerber = self.parse(self.gerber_code)
+
+        # the block is copied 6 times, the flash after it is not
+        self.assertEqual(len(gerber.apertures['10']['geometry']), 7)
+        self.assertEqual(len(gerber.apertures['11']['geometry']), 6)
+        flashes = sorted((round(el['follow'].x, 4), round(el['follow'].y, 4))
+                         for el in gerber.apertures['11']['geometry'])
+        self.assertEqual(flashes, [(1.0, 1.0), (1.0, 5.0), (6.0, 1.0), (6.0, 5.0), (11.0, 1.0), (11.0, 5.0)])
+
+        copy_area = LineString([(0, 0), (2, 0)]).buffer(0.25).area + 1.0
+        flash_area = Point(0, 0).buffer(0.25).area
+        self.assertAlmostEqual(unary_union(gerber.solid_geometry).area, 6 * copy_area + flash_area, places=2)
+
+    def test_state_after_block(self):
+        # after the block the aperture and the current point are the ones left by the block
+        gerber = self.parse(self.gerber_code.replace('%SR*%\nD10*\nX300000Y300000D03*', '%SR*%\nX300000D03*'))
+
+        self.assertEqual(len(gerber.apertures['10']['geometry']), 6)
+        flashes = sorted((round(el['follow'].x, 4), round(el['follow'].y, 4))
+                         for el in gerber.apertures['11']['geometry'])
+        self.assertEqual(len(flashes), 7)
+        self.assertIn((30.0, 1.0), flashes)
+        self.assertEqual(gerber.graphics_state['aperture'], '11')
+
+
+if __name__ == '__main__':
+    unittest.main()
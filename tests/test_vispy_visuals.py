@@ -0,0 +1,116 @@
+import unittest
+
+import numpy as np
+from vispy import app
+
+from appGUI.VisPyVisuals import FlatCAMLineVisual, FlatCAMMeshVisual, ShapeBuffers
+
+
+def data_commands(vbo):
+    """
+    :return: (offset, rows) of the data uploads queued for the buffer since the last call, or None with a VisPy
+        version that does not queue them in the GLIR queue of the buffer
+    """
+    glir = getattr(vbo, '_glir', None)
+    if not hasattr(glir, 'clear'):
+        return None
+    return [(cmd[2], len(cmd[3])) for cmd in glir.clear() if cmd[0] == 'DATA']
+
+
+class VisPyVisualsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # the line visual asks the default app for its backend when it prepares the draw
+        try:
+            app.use_app('pyqt5')
+        except Exception as e:
+            raise unittest.SkipTest(str(e))
+
+    def test_line_range(self):
+        line = FlatCAMLineVisual()
+        pos = np.arange(16, dtype=np.float32).reshape(8, 2)
+        line.set_data(pos=pos, color=np.ones((8, 4), dtype=np.float32), connect='segments')
+        line._line_visual._prepare_draw(line._line_visual)
+        data_commands(line._line_visual._pos_vbo)
+
+        line.set_data_range(2, np.zeros((2, 2)), np.zeros((2, 4)))
+        self.assertTrue((line.pos[2:4] == 0).all())
+        self.assertTrue((line.pos[4:] == pos[4:]).all())
+        uploads = data_commands(line._line_visual._pos_vbo)
+        if not line._changed['pos'] and uploads is not None:
+            # only the range is uploaded; the VisPy versions that upload the data at each draw skip this
+            self.assertEqual(uploads, [(2 * 8, 2)])
+
+    def test_line_fallback(self):
+        line = FlatCAMLineVisual()
+        line.set_data(pos=np.zeros((4, 2), dtype=np.float32), color=np.ones((4, 4), dtype=np.float32),
+                      connect='segments')
+        line._line_visual._prepare_draw(line._line_visual)
+
+        # a VisPy version with other line buffers: the data is set again
+        line._line_visual._pos_vbo = None
+        line.set_data_range(0, np.ones((2, 2)), np.zeros((2, 4)))
+        self.assertTrue(line._changed['pos'])
+        self.assertTrue((line.pos[:2] == 1).all())
+
+    def test_mesh_range(self):
+        mesh = FlatCAMMeshVisual()
+        pos = np.arange(12, dtype=np.float32).reshape(6, 2)
+        mesh.set_flat_data(pos, np.ones((6, 4), dtype=np.float32))
+        self.assertIsNone(mesh._update_data())
+        mesh._data_changed = False
+        queued = data_commands(mesh._vertices) is not None
+        data_commands(mesh._colors_vbo)
+
+        mesh.set_flat_range(3, np.zeros((3, 2)), np.zeros((3, 4)))
+        self.assertFalse(mesh._data_changed)
+        if queued:
+            self.assertEqual(data_commands(mesh._vertices), [(3 * 12, 3)])
+            self.assertEqual(data_commands(mesh._colors_vbo), [(3 * 16, 3)])
+        faces = mesh.mesh_data.get_vertices(indexed='faces')
+        self.assertTrue((faces[1] == 0).all())
+        self.assertTrue((faces[0] == pos[:3]).all())
+
+    def test_mesh_fallback(self):
+        mesh = FlatCAMMeshVisual()
+        mesh.set_flat_data(np.zeros((3, 2), dtype=np.float32), np.ones((3, 4), dtype=np.float32))
+        mesh._update_data()
+        mesh._data_changed = False
+
+        # a shader with no base_color keeps the colors in its own buffer: the mesh is set again
+        mesh._colors_bound = False
+        mesh.set_flat_range(0, np.ones((3, 2)), np.zeros((3, 4)))
+        self.assertTrue(mesh._data_changed)
+        self.assertTrue((mesh.mesh_data.get_vertex_colors(indexed='faces') == 0).all())
+
+        # a VisPy version with no flag of the pending upload: the mesh is set again
+        mesh._update_data()
+        mesh.unfreeze()
+        del mesh._data_changed
+        mesh.set_flat_range(0, np.full((3, 2), 2.0), np.ones((3, 4)))
+        self.assertTrue((mesh.mesh_data.get_vertices(indexed='faces')[..., :2] == 2).all())
+
+        mesh.set_flat_data()
+        self.assertFalse(mesh._update_data())
+
+    def test_shape_offsets(self):
+        buffers = ShapeBuffers()
+        data = {
+            'line_pts': np.array([[0, 0], [1, 0]], dtype=np.float32),
+            'mesh_vertices': np.array([[0, 0], [1, 0], [0, 1]], dtype=np.float32),
+            'mesh_tris': np.array([0, 1, 2]),
+            'line_rgba': (1, 0, 0, 1), 'mesh_rgba': (0, 1, 0, 1), 'visible': True,
+            'offsets': [(0, 0), (10, 0), (0, 5)]
+        }
+        buffers.add(1, data)
+
+        # one tessellation, drawn at each offset
+        self.assertEqual(buffers.ranges[1], [0, 6, 0, 9])
+        self.assertTrue((buffers.lines.pts[2:4] == [[10, 0], [11, 0]]).all())
+        self.assertTrue((buffers.meshes.pts[6:9] == [[0, 5], [1, 5], [0, 6]]).all())
+        self.assertEqual(buffers.bounds(0), (0.0, 11.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
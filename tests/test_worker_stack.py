@@ -0,0 +1,115 @@
+import unittest
+import threading
+from concurrent.futures import CancelledError
+
+from PyQt5 import QtCore
+
+from appWorkerStack import WorkerStack, CancelToken, task_cancelled
+
+
+class WorkerStackTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.qapp = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def setUp(self):
+        self.stack = WorkerStack(workers_number=2)
+
+    def tearDown(self):
+        self.stack.cancel_all()
+        for thread in self.stack.threads:
+            thread.quit()
+            thread.wait()
+
+    def block_workers(self):
+        """
+        :return:    an event that releases the two tasks that keep the workers busy
+        """
+        release = threading.Event()
+        started = [threading.Event(), threading.Event()]
+        for event in started:
+            self.stack.submit(lambda e: (e.set(), release.wait(5)), event)
+        for event in started:
+            self.assertTrue(event.wait(5))
+        return release
+
+    def test_result(self):
+        future = self.stack.add_task({'fcn': lambda a, b: a + b, 'params': [2, 3]})
+        self.assertEqual(future.result(timeout=5), 5)
+
+        failed = self.stack.submit(lambda: 1 / 0)
+        self.assertIsInstance(failed.exception(timeout=5), ZeroDivisionError)
+
+    def test_priority(self):
+        release = self.block_workers()
+
+        order = []
+        futures = [self.stack.submit(order.append, 'batch', priority='batch'),
+                   self.stack.submit(order.append, 'normal'),
+                   self.stack.submit(order.append, 'interactive', priority='interactive')]
+        self.assertEqual(self.stack.stats()['queued'], {'interactive': 1, 'normal': 1, 'batch': 1})
+        self.assertEqual(self.stack.stats()['running'], 2)
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(order[0], 'interactive')
+        self.assertEqual(set(order), {'interactive', 'normal', 'batch'})
+
+    def test_batch_leaves_a_worker(self):
+        release = threading.Event()
+        batch = [self.stack.submit(release.wait, 5, priority='batch') for __ in range(3)]
+
+        # one worker is kept for the interactive tasks
+        self.assertEqual(self.stack.submit(lambda: 'plot', priority='interactive').result(timeout=5), 'plot')
+        self.assertEqual(self.stack.stats()['queued']['batch'], 2)
+
+        release.set()
+        for future in batch:
+            self.assertTrue(future.result(timeout=5))
+
+    def test_cancel(self):
+        release = self.block_workers()
+
+        queued = self.stack.submit(lambda: 'never')
+        self.assertTrue(queued.cancel())
+        with self.assertRaises(CancelledError):
+            queued.result(timeout=5)
+
+        # a running task sees its token
+        started = threading.Event()
+
+        def running_task():
+            started.set()
+            for __ in range(500):
+                if task_cancelled():
+                    return True
+                threading.Event().wait(0.01)
+            return False
+
+        token = CancelToken()
+        release.set()
+        running = self.stack.submit(running_task, token=token)
+        self.assertTrue(started.wait(5))
+        running.cancel()
+        self.assertTrue(running.result(timeout=5))
+        self.assertGreaterEqual(self.stack.stats()['cancelled'], 1)
+
+    def test_dependencies(self):
+        release = threading.Event()
+        first = self.stack.submit(release.wait, 5)
+        second = self.stack.submit(lambda: first.result() and 'second', after=[first])
+        self.assertEqual(self.stack.stats()['waiting'], 1)
+
+        release.set()
+        self.assertEqual(second.result(timeout=5), 'second')
+
+        failed = self.stack.submit(lambda: 1 / 0)
+        dependent = self.stack.submit(lambda: 'never', after=[failed])
+        with self.assertRaises(CancelledError):
+            dependent.result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
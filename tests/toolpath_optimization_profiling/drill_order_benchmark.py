@@ -0,0 +1,58 @@
+# ##########################################################
+# Compares the drill path optimizations of the CNCjob:
+# travel distance and runtime
+# Usage: python drill_order_benchmark.py [drills_nr] [opt_time]
+# ##########################################################
+
+import sys
+import time
+import platform
+
+import numpy as np
+
+sys.path.append('../')
+sys.path.append('../../')
+
+from camlib import CNCjob
+from profiling_app import make_object
+
+
+def make_drills(drills_nr):
+    # clusters of vias around the components and some scattered ones
+    centers = np.random.rand(max(drills_nr // 50, 1), 2) * 100
+    drills = centers[np.random.randint(len(centers), size=drills_nr)] + np.random.randn(drills_nr, 2) * 2
+    drills[::10] = np.random.rand(len(drills[::10]), 2) * 100
+    return [tuple(pt) for pt in np.round(drills, 4)]
+
+
+def travel(locations, path, start):
+    pts = np.array([start] + [locations[idx] if isinstance(idx, (int, np.integer)) else idx for idx in path])
+    return np.hypot(*np.diff(pts, axis=0).T).sum()
+
+
+if __name__ == '__main__':
+    drills_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    opt_time = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    job = make_object(CNCjob)
+    locations = make_drills(drills_nr)
+    start = (0.0, 0.0)
+
+    methods = {
+        'T': lambda: job.optimized_travelling_salesman(list(locations), start=start)[1:],
+        'N': lambda: job.optimized_nearest_neighbour(locations, start=start, opt_time=0),
+        'N + 2-opt': lambda: job.optimized_nearest_neighbour(locations, start=start, opt_time=opt_time),
+    }
+    if platform.architecture()[0] == '64bit':
+        methods['B'] = lambda: job.optimized_ortools_basic(locations=locations)
+        methods['M'] = lambda: job.optimized_ortools_meta(locations=locations, opt_time=opt_time)
+
+    for name, method in methods.items():
+        # these build the whole distance matrix or search all the drills for each of them
+        if name in ['T', 'B', 'M'] and drills_nr > 5000:
+            print("%-10s skipped, too slow for %d drills" % (name, drills_nr))
+            continue
+        t0 = time.time()
+        path = method()
+        print("%-10s %d drills, travel %.1f, %.2f s" % (name, drills_nr, travel(locations, path, start),
+                                                       time.time() - t0))
@@ -0,0 +1,52 @@
+# ##########################################################
+# Times Geometry.path_connect() and Geometry.connect_paths() on chains of segments, shuffled and with random
+# directions, and compares the joined paths with the ones of shapely.ops.linemerge()
+# Usage: python path_connect_benchmark.py [segments_nr]
+# ##########################################################
+
+import sys
+import time
+import random
+import logging
+
+from shapely.geometry import LineString
+from shapely.ops import linemerge
+
+sys.path.append('../../')
+
+from camlib import Geometry, FlatCAMRTreeStorage
+
+
+if __name__ == '__main__':
+    logging.getLogger('base2').setLevel(logging.INFO)
+
+    segments_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(0)
+
+    # 100 chains
+    points = [(float(i), float((i * 7) % 5)) for i in range(segments_nr + 1)]
+    segments = [LineString(points[i:i + 2]) for i in range(segments_nr) if i % (segments_nr // 100) != 0]
+    random.shuffle(segments)
+    segments = [LineString(seg.coords[::-1]) if random.random() < 0.5 else seg for seg in segments]
+    print("%d segments" % len(segments))
+
+    t0 = time.time()
+    merged = list(linemerge(segments).geoms)
+    print("linemerge():      %.2f s, %d paths" % (time.time() - t0, len(merged)))
+
+    t0 = time.time()
+    connected = Geometry.connect_paths(segments)
+    print("connect_paths():  %.2f s, %d paths" % (time.time() - t0, len(connected)))
+
+    storage = FlatCAMRTreeStorage()
+    storage.get_points = lambda o: [o.coords[0], o.coords[-1]]
+    storage.insert_many(segments)
+    t0 = time.time()
+    connected_storage = Geometry.path_connect(storage)
+    print("path_connect():   %.2f s, %d paths" % (time.time() - t0, len(list(connected_storage.get_objects()))))
+
+    def key(geo):
+        return geo.bounds
+
+    print("Same paths as linemerge(): %s" %
+          all(a.equals(b) for a, b in zip(sorted(merged, key=key), sorted(connected, key=key))))
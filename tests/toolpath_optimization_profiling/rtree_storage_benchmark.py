@@ -0,0 +1,87 @@
+# ##########################################################
+# Compares FlatCAMRTreeStorage (coordinate arrays, grid hash and removal masks) with the rtree index storage it
+# replaced, on a greedy nearest / remove walk through random segments, as in Geometry.path_connect()
+# Usage: python rtree_storage_benchmark.py [segments_nr]
+# ##########################################################
+
+import sys
+import time
+import logging
+
+import numpy as np
+from rtree import index as rtindex
+
+sys.path.append('../../')
+
+from camlib import FlatCAMRTreeStorage
+
+
+class RTreeIndexStorage:
+    # the storage as it was, with an rtree index where the points are inserted and deleted one by one
+    def __init__(self):
+        self.rti = rtindex.Index()
+        self.obj2points = []
+        self.points_nr = 0
+        self.objects = []
+        self.indexes = {}
+        self.get_points = lambda go: go.coords
+
+    def insert(self, obj):
+        objid = len(self.objects)
+        self.objects.append(obj)
+        self.indexes[id(obj)] = objid
+        self.obj2points.append([])
+        for pt in self.get_points(obj):
+            self.rti.insert(self.points_nr, (pt[0], pt[1], pt[0], pt[1]), obj=objid)
+            self.obj2points[objid].append(self.points_nr)
+            self.points_nr += 1
+
+    def remove(self, obj):
+        objid = self.indexes[id(obj)]
+        self.objects[objid] = None
+        for ptid, pt in zip(self.obj2points[objid], self.get_points(obj)):
+            self.rti.delete(ptid, (pt[0], pt[1], pt[0], pt[1]))
+
+    def nearest(self, pt):
+        item = next(self.rti.nearest(pt, objects=True))
+        return (item.bbox[0], item.bbox[1]), self.objects[item.object]
+
+
+def walk(storage_class, segments):
+    t0 = time.time()
+    storage = storage_class()
+    # the segments are tuples of their two end points
+    storage.get_points = lambda seg: seg
+    for seg in segments:
+        storage.insert(seg)
+    t1 = time.time()
+
+    # go to the nearest segment end, then to its other end, like path_connect() does
+    order = []
+    current = (0.0, 0.0)
+    for __ in range(len(segments)):
+        pt, seg = storage.nearest(current)
+        storage.remove(seg)
+        order.append(seg)
+        current = seg[1] if pt == seg[0] else seg[0]
+    t2 = time.time()
+    return order, t1 - t0, t2 - t1
+
+
+if __name__ == '__main__':
+    logging.getLogger('base2').setLevel(logging.INFO)
+
+    segments_nr = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = np.random.default_rng(0)
+    starts = rng.random((segments_nr, 2)) * np.sqrt(segments_nr)
+    ends = starts + rng.random((segments_nr, 2)) - 0.5
+    segments = [(tuple(a), tuple(b)) for a, b in zip(starts.tolist(), ends.tolist())]
+
+    print("%d segments" % segments_nr)
+    results = {}
+    for name, storage_class in (('rtree index', RTreeIndexStorage), ('grid hash', FlatCAMRTreeStorage)):
+        order, insert_time, walk_time = walk(storage_class, segments)
+        results[name] = order
+        print("%-12s insert: %.2f s, nearest / remove walk: %.2f s" % (name, insert_time, walk_time))
+
+    print("Same order: %s" % (results['rtree index'] == results['grid hash']))